@@ -0,0 +1,142 @@
+"""esquema inicial
+
+Tabelas de formulários, perguntas, opções, versões publicadas, regras
+condicionais e submissões.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 11:46:44.234212
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('formulario',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=255), nullable=False),
+    sa.Column('descricao', sa.Text(), nullable=True),
+    sa.Column('ordem', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_formulario_id'), 'formulario', ['id'], unique=False)
+
+    op.create_table('formulario_versao',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_formulario', sa.Integer(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.Column('conteudo', sa.LargeBinary(), nullable=False),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('publicado_em', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['id_formulario'], ['formulario.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_formulario', 'versao', name='uq_formulario_versao')
+    )
+    op.create_index(op.f('ix_formulario_versao_id'), 'formulario_versao', ['id'], unique=False)
+
+    op.create_table('pergunta',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_formulario', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=255), nullable=False),
+    sa.Column('codigo', sa.String(length=100), nullable=True),
+    sa.Column('orientacao_resposta', sa.Text(), nullable=True),
+    sa.Column('ordem', sa.Integer(), nullable=True),
+    sa.Column('obrigatoria', sa.Boolean(), nullable=True),
+    sa.Column('sub_pergunta', sa.Boolean(), nullable=True),
+    sa.Column('tipo_pergunta', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['id_formulario'], ['formulario.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pergunta_id'), 'pergunta', ['id'], unique=False)
+
+    op.create_table('submissao',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_formulario', sa.Integer(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('revisao', sa.Integer(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['id_formulario'], ['formulario.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_submissao_id'), 'submissao', ['id'], unique=False)
+    op.create_index(op.f('ix_submissao_id_formulario'), 'submissao', ['id_formulario'], unique=False)
+
+    op.create_table('opcoes_resposta_pergunta',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_opcao_resposta', sa.Integer(), nullable=False),
+    sa.Column('id_pergunta', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_pergunta'], ['pergunta.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_opcoes_resposta_pergunta_id'), 'opcoes_resposta_pergunta', ['id'], unique=False)
+
+    op.create_table('opcoes_respostas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_pergunta', sa.Integer(), nullable=False),
+    sa.Column('resposta', sa.Text(), nullable=True),
+    sa.Column('ordem', sa.Integer(), nullable=True),
+    sa.Column('resposta_aberta', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['id_pergunta'], ['pergunta.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_opcoes_respostas_id'), 'opcoes_respostas', ['id'], unique=False)
+
+    op.create_table('regra_condicional',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_formulario', sa.Integer(), nullable=False),
+    sa.Column('id_pergunta_origem', sa.Integer(), nullable=False),
+    sa.Column('operador', sa.String(length=20), nullable=False),
+    sa.Column('valor', sa.Text(), nullable=True),
+    sa.Column('id_pergunta_destino', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_formulario'], ['formulario.id'], ),
+    sa.ForeignKeyConstraint(['id_pergunta_destino'], ['pergunta.id'], ),
+    sa.ForeignKeyConstraint(['id_pergunta_origem'], ['pergunta.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_regra_condicional_id'), 'regra_condicional', ['id'], unique=False)
+    op.create_index(op.f('ix_regra_condicional_id_formulario'), 'regra_condicional', ['id_formulario'], unique=False)
+
+    op.create_table('resposta_submissao',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_submissao', sa.Integer(), nullable=False),
+    sa.Column('id_pergunta', sa.Integer(), nullable=False),
+    sa.Column('valor', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['id_submissao'], ['submissao.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_submissao', 'id_pergunta', name='uq_resposta_submissao')
+    )
+    op.create_index(op.f('ix_resposta_submissao_id'), 'resposta_submissao', ['id'], unique=False)
+
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_resposta_submissao_id'), table_name='resposta_submissao')
+    op.drop_table('resposta_submissao')
+    op.drop_index(op.f('ix_regra_condicional_id_formulario'), table_name='regra_condicional')
+    op.drop_index(op.f('ix_regra_condicional_id'), table_name='regra_condicional')
+    op.drop_table('regra_condicional')
+    op.drop_index(op.f('ix_opcoes_respostas_id'), table_name='opcoes_respostas')
+    op.drop_table('opcoes_respostas')
+    op.drop_index(op.f('ix_opcoes_resposta_pergunta_id'), table_name='opcoes_resposta_pergunta')
+    op.drop_table('opcoes_resposta_pergunta')
+    op.drop_index(op.f('ix_submissao_id_formulario'), table_name='submissao')
+    op.drop_index(op.f('ix_submissao_id'), table_name='submissao')
+    op.drop_table('submissao')
+    op.drop_index(op.f('ix_pergunta_id'), table_name='pergunta')
+    op.drop_table('pergunta')
+    op.drop_index(op.f('ix_formulario_versao_id'), table_name='formulario_versao')
+    op.drop_table('formulario_versao')
+    op.drop_index(op.f('ix_formulario_id'), table_name='formulario')
+    op.drop_table('formulario')
@@ -0,0 +1,41 @@
+"""tenants e shards
+
+Coluna tenant em formulario e tabela tenant_shard com as atribuições
+explícitas de tenants a shards.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 14:02:11.518093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tenant_shard',
+    sa.Column('tenant', sa.String(length=100), nullable=False),
+    sa.Column('shard', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('tenant')
+    )
+
+    with op.batch_alter_table('formulario') as batch_op:
+        batch_op.add_column(sa.Column('tenant', sa.String(length=100), server_default='padrao', nullable=False))
+        batch_op.create_index(batch_op.f('ix_formulario_tenant'), ['tenant'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('formulario') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_formulario_tenant'))
+        batch_op.drop_column('tenant')
+
+    op.drop_table('tenant_shard')
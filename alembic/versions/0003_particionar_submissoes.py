@@ -0,0 +1,136 @@
+"""particionar submissões por mês
+
+Adiciona criado_em a resposta_submissao (a data de criação da submissão) e, no
+PostgreSQL, recria submissao e resposta_submissao como tabelas particionadas por
+intervalo de criado_em, com uma partição por mês e uma partição padrão. As
+partições seguintes são criadas por app.db.particoes. A migração não importa a
+aplicação: os auxiliares de datas são cópias.
+
+No PostgreSQL as chaves primárias passam a ser (id, criado_em), pois devem conter
+a chave de partição, e resposta_submissao referencia submissao por (id_submissao,
+criado_em).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 15:20:37.904412
+
+"""
+from datetime import date
+from typing import Iterator, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELAS = ('submissao', 'resposta_submissao')
+# Partições criadas à frente do mês atual; as seguintes são criadas pela manutenção
+# (python -m app.db.particoes), conforme PARTICOES_MESES_A_FRENTE
+MESES_A_FRENTE = 3
+
+
+# Cópias dos auxiliares de app.db.particoes, para que a migração não mude com a aplicação
+def primeiro_dia(dia: date) -> date:
+    return dia.replace(day=1)
+
+
+def somar_meses(mes: date, quantidade: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def meses(inicio: date, fim: date) -> Iterator[date]:
+    mes = primeiro_dia(inicio)
+    while mes <= fim:
+        yield mes
+        mes = somar_meses(mes, 1)
+
+
+def nome_particao(tabela: str, mes: date) -> str:
+    return f"{tabela}_p{mes:%Y_%m}"
+
+
+def _reconstruir(particionar: bool) -> None:
+    """
+    Recria submissao e resposta_submissao (particionadas ou não), copiando os dados
+    e preservando as sequências dos IDs
+    """
+    conn = op.get_bind()
+    for tabela in TABELAS:
+        op.execute(f"ALTER SEQUENCE {tabela}_id_seq OWNED BY NONE")
+        if particionar:
+            op.execute(f"CREATE TABLE {tabela}_nova (LIKE {tabela} INCLUDING DEFAULTS) PARTITION BY RANGE (criado_em)")
+            op.execute(f"CREATE TABLE {tabela}_padrao PARTITION OF {tabela}_nova DEFAULT")
+        else:
+            op.execute(f"CREATE TABLE {tabela}_nova (LIKE {tabela} INCLUDING DEFAULTS)")
+
+    if particionar:
+        hoje = primeiro_dia(date.today())
+        inicio = None
+        if not context.is_offline_mode():
+            inicio = conn.scalar(sa.text("SELECT min(criado_em) FROM submissao"))
+        inicio = primeiro_dia(inicio.date()) if inicio else hoje
+        for mes in meses(inicio, somar_meses(hoje, MESES_A_FRENTE)):
+            for tabela in TABELAS:
+                op.execute(
+                    f"CREATE TABLE {nome_particao(tabela, mes)} PARTITION OF {tabela}_nova "
+                    f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{somar_meses(mes, 1).isoformat()}')"
+                )
+
+    for tabela in TABELAS:
+        op.execute(f"INSERT INTO {tabela}_nova SELECT * FROM {tabela}")
+    for tabela in reversed(TABELAS):
+        op.execute(f"DROP TABLE {tabela}")
+    for tabela in TABELAS:
+        op.execute(f"ALTER TABLE {tabela}_nova RENAME TO {tabela}")
+
+    chave = "id, criado_em" if particionar else "id"
+    op.execute(f"ALTER TABLE submissao ADD CONSTRAINT submissao_pkey PRIMARY KEY ({chave})")
+    op.create_index(op.f('ix_submissao_id'), 'submissao', ['id'], unique=False)
+    op.create_index(op.f('ix_submissao_id_formulario'), 'submissao', ['id_formulario'], unique=False)
+    op.create_foreign_key('submissao_id_formulario_fkey', 'submissao', 'formulario', ['id_formulario'], ['id'])
+
+    op.execute(f"ALTER TABLE resposta_submissao ADD CONSTRAINT resposta_submissao_pkey PRIMARY KEY ({chave})")
+    op.create_index(op.f('ix_resposta_submissao_id'), 'resposta_submissao', ['id'], unique=False)
+    op.create_unique_constraint('uq_resposta_submissao', 'resposta_submissao', ['id_submissao', 'id_pergunta', 'criado_em'])
+    if particionar:
+        op.create_foreign_key(
+            'resposta_submissao_id_submissao_fkey', 'resposta_submissao', 'submissao',
+            ['id_submissao', 'criado_em'], ['id', 'criado_em'],
+        )
+    else:
+        op.create_foreign_key('resposta_submissao_id_submissao_fkey', 'resposta_submissao', 'submissao', ['id_submissao'], ['id'])
+
+    for tabela in TABELAS:
+        op.execute(f"ALTER SEQUENCE {tabela}_id_seq OWNED BY {tabela}.id")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('resposta_submissao') as batch_op:
+        batch_op.add_column(sa.Column('criado_em', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+        batch_op.drop_constraint('uq_resposta_submissao', type_='unique')
+        batch_op.create_unique_constraint('uq_resposta_submissao', ['id_submissao', 'id_pergunta', 'criado_em'])
+
+    op.execute(
+        "UPDATE resposta_submissao SET criado_em = "
+        "(SELECT submissao.criado_em FROM submissao WHERE submissao.id = resposta_submissao.id_submissao)"
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _reconstruir(particionar=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        _reconstruir(particionar=False)
+
+    with op.batch_alter_table('resposta_submissao') as batch_op:
+        batch_op.drop_constraint('uq_resposta_submissao', type_='unique')
+        batch_op.create_unique_constraint('uq_resposta_submissao', ['id_submissao', 'id_pergunta'])
+        batch_op.drop_column('criado_em')
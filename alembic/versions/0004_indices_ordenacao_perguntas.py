@@ -0,0 +1,39 @@
+"""índices das ordenações de perguntas
+
+Um índice (id_formulario, campo, id) para cada campo aceito em sort_by na
+listagem das perguntas de um formulário, e (id_formulario, id) para a ordenação
+por id. Também servem às consultas que só filtram por formulário.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 16:41:09.227310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = {
+    'ix_pergunta_formulario_id': ['id_formulario', 'id'],
+    'ix_pergunta_formulario_ordem': ['id_formulario', 'ordem', 'id'],
+    'ix_pergunta_formulario_titulo': ['id_formulario', 'titulo', 'id'],
+    'ix_pergunta_formulario_codigo': ['id_formulario', 'codigo', 'id'],
+    'ix_pergunta_formulario_tipo': ['id_formulario', 'tipo_pergunta', 'id'],
+}
+
+
+def upgrade() -> None:
+    for nome, colunas in INDICES.items():
+        op.create_index(nome, 'pergunta', colunas, unique=False)
+
+
+def downgrade() -> None:
+    for nome in INDICES:
+        op.drop_index(nome, table_name='pergunta')
@@ -0,0 +1,80 @@
+"""tipo_pergunta como código
+
+Cria a tabela de consulta tipo_pergunta (código smallint e nome) e converte
+pergunta.tipo_pergunta de texto para o código do tipo, com chave estrangeira
+para a tabela. A grafia antiga "multipla_escola" passa a multipla_escolha, e
+tipos desconhecidos, que já eram validados como texto livre, passam a
+texto_livre. O índice (id_formulario, tipo_pergunta, id) é recriado sobre o código.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 18:12:40.581337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Códigos fixos de app.models.tipos.CODIGOS
+TIPOS = {
+    1: 'Sim_Não',
+    2: 'unica_escolha',
+    3: 'multipla_escolha',
+    4: 'texto_livre',
+    5: 'Inteiro',
+    6: 'Numero com duas casas decimais',
+}
+TEXTO_LIVRE = 4
+ALIASES = {'multipla_escola': 3}
+
+INDICE = 'ix_pergunta_formulario_tipo'
+CHAVE_ESTRANGEIRA = 'fk_pergunta_tipo_pergunta'
+
+
+def upgrade() -> None:
+    tabela = op.create_table('tipo_pergunta',
+    sa.Column('codigo', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('nome', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('codigo'),
+    sa.UniqueConstraint('nome')
+    )
+    op.bulk_insert(tabela, [{'codigo': codigo, 'nome': nome} for codigo, nome in TIPOS.items()])
+
+    op.drop_index(INDICE, table_name='pergunta')
+    op.add_column('pergunta', sa.Column('tipo_codigo', sa.SmallInteger(), nullable=True))
+    pergunta = sa.table('pergunta', sa.column('tipo_pergunta', sa.String), sa.column('tipo_codigo', sa.SmallInteger))
+    nomes = {nome: codigo for codigo, nome in TIPOS.items()}
+    op.execute(pergunta.update().values(
+        tipo_codigo=sa.case({**nomes, **ALIASES}, value=pergunta.c.tipo_pergunta, else_=TEXTO_LIVRE)
+    ))
+
+    with op.batch_alter_table('pergunta') as batch_op:
+        batch_op.drop_column('tipo_pergunta')
+        batch_op.alter_column('tipo_codigo', new_column_name='tipo_pergunta', existing_type=sa.SmallInteger(), nullable=False)
+    with op.batch_alter_table('pergunta') as batch_op:
+        batch_op.create_foreign_key(CHAVE_ESTRANGEIRA, 'tipo_pergunta', ['tipo_pergunta'], ['codigo'])
+    op.create_index(INDICE, 'pergunta', ['id_formulario', 'tipo_pergunta', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(INDICE, table_name='pergunta')
+    op.add_column('pergunta', sa.Column('tipo_nome', sa.String(length=50), nullable=True))
+    pergunta = sa.table('pergunta', sa.column('tipo_pergunta', sa.SmallInteger), sa.column('tipo_nome', sa.String))
+    op.execute(pergunta.update().values(tipo_nome=sa.case(TIPOS, value=pergunta.c.tipo_pergunta)))
+
+    with op.batch_alter_table('pergunta') as batch_op:
+        batch_op.drop_constraint(CHAVE_ESTRANGEIRA, type_='foreignkey')
+    with op.batch_alter_table('pergunta') as batch_op:
+        batch_op.drop_column('tipo_pergunta')
+        batch_op.alter_column('tipo_nome', new_column_name='tipo_pergunta', existing_type=sa.String(length=50), nullable=False)
+    op.create_index(INDICE, 'pergunta', ['id_formulario', 'tipo_pergunta', 'id'], unique=False)
+
+    op.drop_table('tipo_pergunta')
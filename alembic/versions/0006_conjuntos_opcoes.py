@@ -0,0 +1,193 @@
+"""conjuntos de opções
+
+Cria conjunto_opcoes e passa as opções de respostas múltiplas a pertencer a um
+conjunto, referenciado pelas perguntas por pergunta.id_conjunto_opcoes. As opções
+existentes são deduplicadas: perguntas com as mesmas opções (mesmo hash de
+conteúdo, calculado como em app.crud.opcoes) passam a compartilhar um conjunto, formado pelas
+linhas da primeira delas, e as linhas repetidas são removidas.
+
+Versões já publicadas guardam as opções com os ids antigos e continuam válidas.
+A deduplicação lê os dados, em lotes de perguntas, por isso a migração não pode ser
+gerada com --sql.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 19:03:52.114920
+
+"""
+import hashlib
+import json
+from itertools import groupby
+from typing import Iterable, List, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOTE = 5000
+# Perguntas lidas por vez na deduplicação
+LOTE_PERGUNTAS = 1000
+
+conjunto_opcoes = sa.Table(
+    'conjunto_opcoes', sa.MetaData(), sa.Column('id', sa.Integer, primary_key=True), sa.Column('hash', sa.String)
+)
+opcoes_respostas = sa.table(
+    'opcoes_respostas',
+    sa.column('id', sa.Integer), sa.column('id_pergunta', sa.Integer), sa.column('id_conjunto', sa.Integer),
+    sa.column('resposta', sa.Text), sa.column('ordem', sa.Integer), sa.column('resposta_aberta', sa.Boolean),
+)
+pergunta = sa.table('pergunta', sa.column('id', sa.Integer), sa.column('id_conjunto_opcoes', sa.Integer))
+
+
+# Cópias de normalizar_opcoes e hash_opcoes (app.crud.opcoes) no momento desta
+# migração, para que ela não mude com a aplicação
+def normalizar_opcoes(opcoes: Iterable[dict]) -> List[dict]:
+    normalizadas = [
+        {
+            'resposta': opcao.get('resposta'),
+            'ordem': opcao.get('ordem') or 0,
+            'resposta_aberta': bool(opcao.get('resposta_aberta')),
+        }
+        for opcao in opcoes
+    ]
+    normalizadas.sort(key=lambda opcao: opcao['ordem'])
+    return normalizadas
+
+
+def hash_opcoes(opcoes: List[dict]) -> str:
+    canonico = json.dumps(
+        [[opcao['resposta'], opcao['ordem'], opcao['resposta_aberta']] for opcao in opcoes],
+        ensure_ascii=False, separators=(',', ':'),
+    )
+    return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+
+def _executar_em_lotes(conn, stmt, parametros: list) -> None:
+    for inicio in range(0, len(parametros), LOTE):
+        conn.execute(stmt, parametros[inicio:inicio + LOTE])
+
+
+def _deduplicar_opcoes() -> None:
+    """
+    Agrupa as opções por pergunta, cria um conjunto por conteúdo distinto e aponta
+    as perguntas para ele. As perguntas são processadas em faixas de LOTE_PERGUNTAS
+    ids; só os hashes dos conjuntos já criados ficam em memória.
+    """
+    conn = op.get_bind()
+    conn.execute(opcoes_respostas.update().where(opcoes_respostas.c.ordem.is_(None)).values(ordem=0))
+    conn.execute(
+        opcoes_respostas.update().where(opcoes_respostas.c.resposta_aberta.is_(None)).values(resposta_aberta=False)
+    )
+
+    # Índice temporário para ler as opções de cada faixa de perguntas
+    op.create_index('ix_opcoes_respostas_id_pergunta_tmp', 'opcoes_respostas', ['id_pergunta'])
+
+    conjuntos = {}
+    ultima_pergunta = 0
+    while True:
+        # Uma faixa de ids de perguntas por vez, pela chave primária, para não carregar todas as opções
+        perguntas_lote = conn.scalars(
+            sa.select(pergunta.c.id).where(pergunta.c.id > ultima_pergunta).order_by(pergunta.c.id).limit(LOTE_PERGUNTAS)
+        ).all()
+        if not perguntas_lote:
+            break
+
+        linhas = conn.execute(
+            sa.select(opcoes_respostas)
+            .where(opcoes_respostas.c.id_pergunta.between(perguntas_lote[0], perguntas_lote[-1]))
+            .order_by(opcoes_respostas.c.id_pergunta, opcoes_respostas.c.ordem, opcoes_respostas.c.id)
+        ).mappings().all()
+        ultima_pergunta = perguntas_lote[-1]
+
+        opcoes_mantidas, perguntas = [], []
+        for pergunta_id, grupo in groupby(linhas, key=lambda linha: linha['id_pergunta']):
+            opcoes = list(grupo)
+            hash_conteudo = hash_opcoes(normalizar_opcoes(opcoes))
+            conjunto_id = conjuntos.get(hash_conteudo)
+            if conjunto_id is None:
+                conjunto_id = conn.execute(
+                    conjunto_opcoes.insert().values(hash=hash_conteudo)
+                ).inserted_primary_key[0]
+                conjuntos[hash_conteudo] = conjunto_id
+                opcoes_mantidas.extend({'b_id': opcao['id'], 'b_conjunto': conjunto_id} for opcao in opcoes)
+            perguntas.append({'b_id': pergunta_id, 'b_conjunto': conjunto_id})
+
+        _executar_em_lotes(
+            conn,
+            opcoes_respostas.update().where(opcoes_respostas.c.id == sa.bindparam('b_id')).values(id_conjunto=sa.bindparam('b_conjunto')),
+            opcoes_mantidas,
+        )
+        _executar_em_lotes(
+            conn,
+            pergunta.update().where(pergunta.c.id == sa.bindparam('b_id')).values(id_conjunto_opcoes=sa.bindparam('b_conjunto')),
+            perguntas,
+        )
+    op.drop_index('ix_opcoes_respostas_id_pergunta_tmp', table_name='opcoes_respostas')
+    conn.execute(opcoes_respostas.delete().where(opcoes_respostas.c.id_conjunto.is_(None)))
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        raise RuntimeError('A migração 0006 deduplica as opções lendo os dados e não pode ser gerada com --sql')
+
+    op.create_table('conjunto_opcoes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=255), nullable=True),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('hash')
+    )
+    op.create_index(op.f('ix_conjunto_opcoes_id'), 'conjunto_opcoes', ['id'], unique=False)
+
+    with op.batch_alter_table('pergunta') as batch_op:
+        batch_op.add_column(sa.Column('id_conjunto_opcoes', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_pergunta_id_conjunto_opcoes'), ['id_conjunto_opcoes'], unique=False)
+        batch_op.create_foreign_key('fk_pergunta_conjunto_opcoes', 'conjunto_opcoes', ['id_conjunto_opcoes'], ['id'])
+    op.add_column('opcoes_respostas', sa.Column('id_conjunto', sa.Integer(), nullable=True))
+
+    _deduplicar_opcoes()
+
+    with op.batch_alter_table('opcoes_respostas') as batch_op:
+        batch_op.drop_column('id_pergunta')
+        batch_op.alter_column('id_conjunto', existing_type=sa.Integer(), nullable=False)
+    with op.batch_alter_table('opcoes_respostas') as batch_op:
+        batch_op.create_index(batch_op.f('ix_opcoes_respostas_id_conjunto'), ['id_conjunto'], unique=False)
+        batch_op.create_foreign_key('fk_opcoes_respostas_conjunto', 'conjunto_opcoes', ['id_conjunto'], ['id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('opcoes_respostas') as batch_op:
+        batch_op.drop_constraint('fk_opcoes_respostas_conjunto', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_opcoes_respostas_id_conjunto'))
+        batch_op.alter_column('id_conjunto', existing_type=sa.Integer(), nullable=True)
+        batch_op.add_column(sa.Column('id_pergunta', sa.Integer(), nullable=True))
+
+    # Uma cópia das opções do conjunto para cada pergunta que o referencia
+    op.execute(opcoes_respostas.insert().from_select(
+        ['id_pergunta', 'resposta', 'ordem', 'resposta_aberta'],
+        sa.select(pergunta.c.id, opcoes_respostas.c.resposta, opcoes_respostas.c.ordem, opcoes_respostas.c.resposta_aberta)
+        .select_from(pergunta.join(opcoes_respostas, opcoes_respostas.c.id_conjunto == pergunta.c.id_conjunto_opcoes))
+        .order_by(pergunta.c.id, opcoes_respostas.c.ordem, opcoes_respostas.c.id),
+    ))
+    op.execute(opcoes_respostas.delete().where(opcoes_respostas.c.id_conjunto.is_not(None)))
+
+    with op.batch_alter_table('opcoes_respostas') as batch_op:
+        batch_op.drop_column('id_conjunto')
+        batch_op.alter_column('id_pergunta', existing_type=sa.Integer(), nullable=False)
+    with op.batch_alter_table('opcoes_respostas') as batch_op:
+        batch_op.create_foreign_key('fk_opcoes_respostas_pergunta', 'pergunta', ['id_pergunta'], ['id'])
+
+    with op.batch_alter_table('pergunta') as batch_op:
+        batch_op.drop_constraint('fk_pergunta_conjunto_opcoes', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_pergunta_id_conjunto_opcoes'))
+    with op.batch_alter_table('pergunta') as batch_op:
+        batch_op.drop_column('id_conjunto_opcoes')
+
+    op.drop_index(op.f('ix_conjunto_opcoes_id'), table_name='conjunto_opcoes')
+    op.drop_table('conjunto_opcoes')
@@ -0,0 +1,43 @@
+"""caixa de saída de eventos
+
+Cria evento_saida, a caixa de saída (outbox) em que os eventos de alteração são
+gravados na transação da alteração e de onde o despachante os entrega aos destinos
+(veja app.core.saida).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 21:14:08.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('evento_saida',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_formulario', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('conteudo', sa.Text(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('disponivel_em', sa.DateTime(), nullable=False),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_evento_saida_disponivel_em'), 'evento_saida', ['disponivel_em'], unique=False)
+    op.create_index(op.f('ix_evento_saida_id'), 'evento_saida', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_evento_saida_id'), table_name='evento_saida')
+    op.drop_index(op.f('ix_evento_saida_disponivel_em'), table_name='evento_saida')
+    op.drop_table('evento_saida')
@@ -0,0 +1,39 @@
+"""requisições idempotentes
+
+Cria requisicao_idempotente, onde ficam as respostas das escritas feitas com o
+cabeçalho Idempotency-Key até expirarem (veja app.core.idempotencia).
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 22:31:47.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('requisicao_idempotente',
+    sa.Column('chave', sa.LargeBinary(length=32), nullable=False),
+    sa.Column('impressao', sa.LargeBinary(length=32), nullable=False),
+    sa.Column('status', sa.SmallInteger(), nullable=True),
+    sa.Column('tipo_conteudo', sa.String(length=100), nullable=True),
+    sa.Column('corpo', sa.LargeBinary(), nullable=True),
+    sa.Column('expira_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('chave')
+    )
+    op.create_index(op.f('ix_requisicao_idempotente_expira_em'), 'requisicao_idempotente', ['expira_em'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_requisicao_idempotente_expira_em'), table_name='requisicao_idempotente')
+    op.drop_table('requisicao_idempotente')
@@ -0,0 +1,45 @@
+"""chave estrangeira das respostas com criado_em no SQLite
+
+No PostgreSQL, a migração 0003 já fez resposta_submissao referenciar submissao por
+(id_submissao, criado_em), a chave primária da tabela particionada. Esta migração
+aplica a mesma chave estrangeira no SQLite, em que as tabelas não são particionadas,
+para que o esquema siga os modelos nos dois bancos.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 10:12:41.286530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A chave estrangeira criada na migração 0001 não tem nome no SQLite
+CONVENCAO = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('resposta_submissao', naming_convention=CONVENCAO) as batch_op:
+        batch_op.drop_constraint('fk_resposta_submissao_id_submissao_submissao', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'resposta_submissao_id_submissao_fkey', 'submissao',
+            ['id_submissao', 'criado_em'], ['id', 'criado_em'],
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('resposta_submissao') as batch_op:
+        batch_op.drop_constraint('resposta_submissao_id_submissao_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('resposta_submissao_id_submissao_fkey', 'submissao', ['id_submissao'], ['id'])
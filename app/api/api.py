@@ -1,7 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import formularios, perguntas
+from app.api.endpoints import formularios, perguntas, conjuntos_opcoes, versoes, regras, eventos, submissoes
 
 api_router = APIRouter()
 api_router.include_router(formularios.router, prefix="/formularios", tags=["formularios"])
 api_router.include_router(perguntas.router, prefix="/perguntas", tags=["perguntas"])
+api_router.include_router(conjuntos_opcoes.router, prefix="/conjuntos-opcoes", tags=["conjuntos-opcoes"])
+api_router.include_router(versoes.router, prefix="/formularios", tags=["versoes"])
+api_router.include_router(regras.router, prefix="/formularios", tags=["regras"])
+api_router.include_router(eventos.router, prefix="/formularios", tags=["eventos"])
+api_router.include_router(submissoes.router, prefix="/submissoes", tags=["submissoes"])
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db, get_db_leitura
+from app.crud import opcoes as crud_opcoes
+from app.schemas.pergunta import ConjuntoOpcoes, ConjuntoOpcoesCreate
+
+router = APIRouter()
+
+@router.post("/", response_model=ConjuntoOpcoes, status_code=status.HTTP_201_CREATED)
+def create_conjunto(
+    conjunto: ConjuntoOpcoesCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Obtém o conjunto com as opções informadas, criando-o se ainda não existir.
+    Conjuntos com o mesmo conteúdo são o mesmo conjunto; o nome só é usado na criação.
+    """
+    return crud_opcoes.create_conjunto(db, [opcao.model_dump() for opcao in conjunto.opcoes], conjunto.nome)
+
+@router.get("/{conjunto_id}", response_model=ConjuntoOpcoes)
+def read_conjunto(
+    conjunto_id: int,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Recupera um conjunto de opções pelo ID.
+    """
+    db_conjunto = crud_opcoes.get_conjunto(db, conjunto_id)
+    if db_conjunto is None:
+        raise HTTPException(status_code=404, detail="Conjunto de opções não encontrado")
+    return db_conjunto
@@ -0,0 +1,36 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.eventos import transmitir_eventos
+from app.db.database import get_db_leitura
+from app.db.shards import shard_da_sessao
+from app.crud import formulario as crud_formulario
+
+router = APIRouter()
+
+@router.get("/{formulario_id}/eventos", response_class=StreamingResponse)
+def stream_eventos(
+    formulario_id: int,
+    desde: Optional[str] = Query(None, description="Id do último evento recebido (alternativa ao Last-Event-ID)"),
+    last_event_id: Optional[str] = Header(None),
+    x_tenant: Optional[str] = Header(None),
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Transmite as alterações do formulário (perguntas, regras e o próprio formulário)
+    como server-sent events. Cada evento traz um id; ao reconectar com Last-Event-ID
+    (enviado automaticamente pelo EventSource) ou ?desde=, os eventos perdidos são
+    reenviados. O evento "reset" indica que o cliente deve recarregar as perguntas.
+    """
+    if crud_formulario.get_formulario(db, formulario_id=formulario_id, tenant=x_tenant) is None:
+        raise HTTPException(status_code=404, detail="Formulário não encontrado")
+    chave = (shard_da_sessao(db), formulario_id)
+    # A transmissão não usa o banco: devolve a conexão ao pool antes de abri-la
+    db.close()
+    return StreamingResponse(
+        transmitir_eventos(chave, desde=last_event_id or desde),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
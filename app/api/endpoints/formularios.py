@@ -1,58 +1,105 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Query, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.core.coalescencia import responder_coalescido
+from app.core.config import settings
+from app.core.paginacao import decodificar_cursor, montar_pagina
+from app.db.contagem import contar
+from app.db.database import get_db, get_db_leitura, get_sessoes_leitura
+from app.db.shards import PaginacaoShardsError, consultar_shards, executar_em_shards, origem_da_sessao
 from app.crud import formulario as crud_formulario
-from app.schemas.formulario import Formulario, FormularioCreate, FormularioUpdate
+from app.schemas.formulario import Formulario, FormularioClone, FormularioCreate, FormularioUpdate
+from app.schemas.paginacao import Pagina
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Formulario])
+@router.get("/", response_model=Union[List[Formulario], Pagina[Formulario]])
 def read_formularios(
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINACAO_LIMITE_MAXIMO),
+    envelope: bool = Query(False, description="Responde com items, total, total_exato e next_cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior (implica envelope)"),
+    x_tenant: Optional[str] = Header(None),
+    sessoes: List[Session] = Depends(get_sessoes_leitura)
 ):
     """
     Recupera uma lista de formulários com paginação.
+    Sem o cabeçalho X-Tenant, combina os formulários de todos os shards.
     """
-    formularios = crud_formulario.get_formularios(db, skip=skip, limit=limit)
-    return formularios
+    apos = None
+    if cursor is not None:
+        try:
+            dados = decodificar_cursor(cursor)
+            apos = (int(dados["id"]), str(dados["tenant"]))
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=422, detail="Cursor inválido")
+
+    try:
+        formularios = consultar_shards(
+            sessoes,
+            lambda db, skip, limit: crud_formulario.get_formularios(db, skip=skip, limit=limit, tenant=x_tenant, apos=apos),
+            chave=lambda formulario: (formulario.id, formulario.tenant),
+            skip=skip,
+            limit=limit,
+        )
+    except PaginacaoShardsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not envelope and cursor is None:
+        return formularios
+
+    # Com o tenant, a contagem usa o índice ix_formulario_tenant; sem ele, a tabela toda
+    contagens = executar_em_shards(sessoes, lambda db: contar(
+        db, crud_formulario.contagem_formularios(tenant=x_tenant), "formulario",
+        seletiva=x_tenant is not None, filtrada=x_tenant is not None,
+    ))
+    return montar_pagina(
+        formularios, limit,
+        total=sum(contagem.total for contagem in contagens),
+        exato=all(contagem.exato for contagem in contagens),
+        chave=lambda formulario: {"id": formulario.id, "tenant": formulario.tenant},
+    )
 
 @router.post("/", response_model=Formulario, status_code=status.HTTP_201_CREATED)
 def create_formulario(
     formulario: FormularioCreate, 
+    x_tenant: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Cria um novo formulário.
+    Cria um novo formulário para o tenant do cabeçalho X-Tenant.
     """
-    return crud_formulario.create_formulario(db=db, formulario=formulario)
+    return crud_formulario.create_formulario(db=db, formulario=formulario, tenant=x_tenant)
 
 @router.get("/{formulario_id}", response_model=Formulario)
 def read_formulario(
     formulario_id: int, 
-    db: Session = Depends(get_db)
+    x_tenant: Optional[str] = Header(None),
+    db: Session = Depends(get_db_leitura)
 ):
     """
     Recupera um formulário específico pelo ID.
+    Leituras simultâneas do mesmo formulário compartilham a consulta.
     """
-    db_formulario = crud_formulario.get_formulario(db, formulario_id=formulario_id)
-    if db_formulario is None:
-        raise HTTPException(status_code=404, detail="Formulário não encontrado")
-    return db_formulario
+    def consultar():
+        db_formulario = crud_formulario.get_formulario(db, formulario_id=formulario_id, tenant=x_tenant)
+        if db_formulario is None:
+            raise HTTPException(status_code=404, detail="Formulário não encontrado")
+        return db_formulario
+
+    return responder_coalescido(("formulario", formulario_id, x_tenant, origem_da_sessao(db)), consultar, Formulario)
 
 @router.put("/{formulario_id}", response_model=Formulario)
 def update_formulario(
     formulario_id: int, 
     formulario: FormularioUpdate, 
+    x_tenant: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Atualiza um formulário existente.
     """
-    db_formulario = crud_formulario.update_formulario(db, formulario_id=formulario_id, formulario=formulario)
+    db_formulario = crud_formulario.update_formulario(db, formulario_id=formulario_id, formulario=formulario, tenant=x_tenant)
     if db_formulario is None:
         raise HTTPException(status_code=404, detail="Formulário não encontrado")
     return db_formulario
@@ -60,12 +107,30 @@ def update_formulario(
 @router.delete("/{formulario_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_formulario(
     formulario_id: int, 
+    x_tenant: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Remove um formulário.
     """
-    success = crud_formulario.delete_formulario(db, formulario_id=formulario_id)
+    success = crud_formulario.delete_formulario(db, formulario_id=formulario_id, tenant=x_tenant)
     if not success:
         raise HTTPException(status_code=404, detail="Formulário não encontrado")
     return None
+
+@router.post("/{formulario_id}/clone", response_model=Formulario, status_code=status.HTTP_201_CREATED)
+def clonar_formulario(
+    formulario_id: int,
+    dados: Optional[FormularioClone] = None,
+    x_tenant: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Cria uma cópia do formulário, com as suas perguntas, opções e regras condicionais.
+    """
+    db_formulario = crud_formulario.clonar_formulario(
+        db, formulario_id=formulario_id, tenant=x_tenant, titulo=dados.titulo if dados else None
+    )
+    if db_formulario is None:
+        raise HTTPException(status_code=404, detail="Formulário não encontrado")
+    return db_formulario
@@ -1,43 +1,150 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, Dict, List, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.core.coalescencia import responder_coalescido
+from app.core.config import settings
+from app.core.paginacao import decodificar_cursor, montar_pagina
+from app.db.contagem import contar
+from app.db.database import get_db, get_db_leitura, get_sessoes_leitura
+from app.db.shards import PaginacaoShardsError, consultar_shards, executar_em_shards, origem_da_sessao
 from app.crud import pergunta as crud_pergunta
-from app.schemas.pergunta import Pergunta, PerguntaCreate, PerguntaUpdate
+from app.schemas.paginacao import Pagina
+from app.models.tipos import TipoPergunta
+from app.schemas.pergunta import (
+    DiferencaOpcoes, OpcoesRespostasItem, Pergunta, PerguntaAlteracaoLote, PerguntaCreate, PerguntaUpdate,
+    ResultadoAlteracaoLote,
+)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Pergunta])
+def ordenacao_perguntas(
+    sort: Optional[str] = Query(None, description="Campo e direção da ordenação, ex.: ordem:desc"),
+    sort_by: Optional[str] = Query(None, description="Campo da ordenação (alternativa a sort)"),
+    sort_order: Optional[str] = Query(None, description="asc ou desc (alternativa a sort)"),
+) -> Tuple[str, str]:
+    """
+    Campo e direção da ordenação das listagens, restritos aos campos indexados
+    """
+    try:
+        return crud_pergunta.interpretar_ordenacao(sort, sort_by, sort_order)
+    except ValueError as erro:
+        raise HTTPException(status_code=422, detail=str(erro))
+
+def _apos_do_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """
+    Chave de ordenação (valor, id) guardada no cursor, que deve ter sido gerado com a mesma ordenação
+    """
+    try:
+        dados = decodificar_cursor(cursor)
+        valor, ultimo_id = dados["valor"], int(dados["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=422, detail="Cursor inválido")
+    if dados.get("sort") != f"{sort_by}:{sort_order}":
+        raise HTTPException(status_code=422, detail="Cursor gerado com outra ordenação")
+    tipo = crud_pergunta.ORDENACOES[sort_by].type.python_type
+    if valor is not None and tipo is TipoPergunta:
+        try:
+            valor = TipoPergunta(valor)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Cursor inválido")
+    if valor is not None and not isinstance(valor, tipo):
+        raise HTTPException(status_code=422, detail="Cursor inválido")
+    return valor, ultimo_id
+
+def _listar_perguntas(
+    sessoes: List[Session],
+    tenant: Optional[str],
+    filtros: Dict[str, Any],
+    ordenacao: Tuple[str, str],
+    skip: int,
+    limit: int,
+    envelope: bool,
+    cursor: Optional[str],
+) -> Response:
+    """
+    Lista as perguntas das sessões (uma por shard), como lista ou envelope com o total,
+    coalescendo as leituras simultâneas com os mesmos parâmetros
+    """
+    sort_by, sort_order = ordenacao
+    apos = _apos_do_cursor(cursor, sort_by, sort_order) if cursor is not None else None
+    envelope = envelope or cursor is not None
+
+    def chave(pergunta):
+        valor = crud_pergunta.valor_ordenacao(pergunta, sort_by)
+        return (valor is None, valor if valor is not None else 0, pergunta.id)
+
+    def consultar():
+        try:
+            perguntas = consultar_shards(
+                sessoes,
+                lambda db, skip, limit: crud_pergunta.get_perguntas(
+                    db,
+                    skip=skip,
+                    limit=limit,
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    tenant=tenant,
+                    apos=apos,
+                    **filtros
+                ),
+                chave=chave,
+                skip=skip,
+                limit=limit,
+                reverso=sort_order == "desc",
+            )
+        except PaginacaoShardsError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not envelope:
+            return perguntas
+
+        # As perguntas de um formulário são contadas pelos índices ix_pergunta_formulario_*;
+        # as listagens sem formulário usam a estimativa do PostgreSQL
+        contagens = executar_em_shards(sessoes, lambda db: contar(
+            db, crud_pergunta.contagem_perguntas(tenant=tenant, **filtros), "pergunta",
+            seletiva=filtros["formulario_id"] is not None,
+            filtrada=tenant is not None or any(valor is not None for valor in filtros.values()),
+        ))
+        return montar_pagina(
+            perguntas, limit,
+            total=sum(contagem.total for contagem in contagens),
+            exato=all(contagem.exato for contagem in contagens),
+            chave=lambda pergunta: {"sort": f"{sort_by}:{sort_order}", "valor": getattr(pergunta, sort_by), "id": pergunta.id},
+        )
+
+    origem = tuple(origem_da_sessao(db) for db in sessoes)
+    chave_leitura = ("perguntas", tenant, origem, tuple(sorted(filtros.items())), sort_by, sort_order, skip, limit, envelope, cursor)
+    return responder_coalescido(chave_leitura, consultar, Pagina[Pergunta] if envelope else List[Pergunta])
+
+@router.get("/", response_model=Union[List[Pergunta], Pagina[Pergunta]])
 def read_perguntas(
-    skip: int = 0, 
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINACAO_LIMITE_MAXIMO),
     formulario_id: Optional[int] = None,
-    tipo_pergunta: Optional[str] = None,
+    tipo_pergunta: Optional[TipoPergunta] = None,
     obrigatoria: Optional[bool] = None,
     sub_pergunta: Optional[bool] = None,
-    sort_by: str = "ordem",
-    sort_order: str = "asc",
-    db: Session = Depends(get_db)
+    ordenacao: Tuple[str, str] = Depends(ordenacao_perguntas),
+    envelope: bool = Query(False, description="Responde com items, total, total_exato e next_cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior (implica envelope)"),
+    x_tenant: Optional[str] = Header(None),
+    sessoes: List[Session] = Depends(get_sessoes_leitura)
 ):
     """
     Recupera uma lista de perguntas com suporte a:
     - Filtros (por tipo, obrigatoriedade, etc.)
-    - Ordenação
-    - Paginação
-    """
-    perguntas = crud_pergunta.get_perguntas(
-        db, 
-        skip=skip, 
-        limit=limit,
-        formulario_id=formulario_id,
-        tipo_pergunta=tipo_pergunta,
-        obrigatoria=obrigatoria,
-        sub_pergunta=sub_pergunta,
-        sort_by=sort_by,
-        sort_order=sort_order
-    )
-    return perguntas
+    - Ordenação (sort=campo:direcao, ex.: ordem:desc)
+    - Paginação, por skip ou pelo cursor, com o total em envelope=true
+    Sem o cabeçalho X-Tenant, combina as perguntas de todos os shards.
+    Leituras simultâneas com os mesmos parâmetros compartilham a consulta.
+    """
+    filtros = {
+        "formulario_id": formulario_id,
+        "tipo_pergunta": tipo_pergunta,
+        "obrigatoria": obrigatoria,
+        "sub_pergunta": sub_pergunta,
+    }
+    return _listar_perguntas(sessoes, x_tenant, filtros, ordenacao, skip, limit, envelope, cursor)
 
 @router.post("/", response_model=Pergunta, status_code=status.HTTP_201_CREATED)
 def create_pergunta(
@@ -45,14 +152,37 @@ def create_pergunta(
     db: Session = Depends(get_db)
 ):
     """
-    Cria uma nova pergunta.
+    Cria uma nova pergunta. As opções informadas são associadas ao conjunto de
+    opções com o mesmo conteúdo; sem elas, id_conjunto_opcoes referencia um conjunto.
+    """
+    try:
+        return crud_pergunta.create_pergunta(db=db, pergunta=pergunta)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.patch("/", response_model=ResultadoAlteracaoLote)
+def update_perguntas(
+    alteracao: PerguntaAlteracaoLote,
+    x_tenant: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Altera em lote as perguntas do filtro (ids, formulario_id e/ou tipo_pergunta),
+    aplicando apenas os campos informados em valores, em um único UPDATE.
+    Com dry_run=true, retorna apenas o total de perguntas que seriam alteradas.
     """
-    return crud_pergunta.create_pergunta(db=db, pergunta=pergunta)
+    try:
+        total, perguntas = crud_pergunta.update_perguntas(
+            db, alteracao.filtro, alteracao.valores, dry_run=alteracao.dry_run, tenant=x_tenant
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"total": total, "dry_run": alteracao.dry_run, "perguntas": perguntas}
 
 @router.get("/{pergunta_id}", response_model=Pergunta)
 def read_pergunta(
     pergunta_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_leitura)
 ):
     """
     Recupera uma pergunta específica pelo ID.
@@ -71,7 +201,10 @@ def update_pergunta(
     """
     Atualiza uma pergunta existente.
     """
-    db_pergunta = crud_pergunta.update_pergunta(db, pergunta_id=pergunta_id, pergunta=pergunta)
+    try:
+        db_pergunta = crud_pergunta.update_pergunta(db, pergunta_id=pergunta_id, pergunta=pergunta)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if db_pergunta is None:
         raise HTTPException(status_code=404, detail="Pergunta não encontrada")
     return db_pergunta
@@ -89,33 +222,93 @@ def delete_pergunta(
         raise HTTPException(status_code=404, detail="Pergunta não encontrada")
     return None
 
-@router.get("/formulario/{formulario_id}", response_model=List[Pergunta])
+def _responder_diferenca(resultado) -> dict:
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Pergunta não encontrada")
+    db_pergunta, diferenca = resultado
+    return {**diferenca, "pergunta": db_pergunta}
+
+@router.put("/{pergunta_id}/opcoes", response_model=DiferencaOpcoes)
+def replace_opcoes_respostas(
+    pergunta_id: int,
+    opcoes: List[OpcoesRespostasItem],
+    db: Session = Depends(get_db)
+):
+    """
+    Substitui a lista completa de opções de respostas múltiplas da pergunta, em uma
+    transação: opções sem id são inseridas, as com id de uma opção atual a alteram e
+    as opções atuais ausentes da lista são removidas.
+    """
+    try:
+        return _responder_diferenca(crud_pergunta.substituir_opcoes_respostas(db, pergunta_id, opcoes))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.patch("/{pergunta_id}/opcoes", response_model=DiferencaOpcoes)
+def upsert_opcoes_respostas(
+    pergunta_id: int,
+    opcoes: List[OpcoesRespostasItem],
+    db: Session = Depends(get_db)
+):
+    """
+    Insere ou altera opções de respostas múltiplas da pergunta, em uma transação,
+    mantendo as opções atuais ausentes da lista.
+    """
+    try:
+        return _responder_diferenca(
+            crud_pergunta.substituir_opcoes_respostas(db, pergunta_id, opcoes, manter_ausentes=True)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/{pergunta_id}/opcoes-resposta", response_model=DiferencaOpcoes)
+def replace_opcoes_resposta(
+    pergunta_id: int,
+    ids_opcoes: List[int],
+    db: Session = Depends(get_db)
+):
+    """
+    Substitui as opções de resposta (id_opcao_resposta) da pergunta pela lista informada.
+    """
+    return _responder_diferenca(crud_pergunta.substituir_opcoes_resposta(db, pergunta_id, ids_opcoes))
+
+@router.patch("/{pergunta_id}/opcoes-resposta", response_model=DiferencaOpcoes)
+def upsert_opcoes_resposta(
+    pergunta_id: int,
+    ids_opcoes: List[int],
+    db: Session = Depends(get_db)
+):
+    """
+    Acrescenta à pergunta as opções de resposta (id_opcao_resposta) que ela ainda não tem.
+    """
+    return _responder_diferenca(
+        crud_pergunta.substituir_opcoes_resposta(db, pergunta_id, ids_opcoes, manter_ausentes=True)
+    )
+
+@router.get("/formulario/{formulario_id}", response_model=Union[List[Pergunta], Pagina[Pergunta]])
 def read_perguntas_by_formulario(
     formulario_id: int,
-    skip: int = 0, 
-    limit: int = 100,
-    tipo_pergunta: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINACAO_LIMITE_MAXIMO),
+    tipo_pergunta: Optional[TipoPergunta] = None,
     obrigatoria: Optional[bool] = None,
     sub_pergunta: Optional[bool] = None,
-    sort_by: str = "ordem",
-    sort_order: str = "asc",
-    db: Session = Depends(get_db)
+    ordenacao: Tuple[str, str] = Depends(ordenacao_perguntas),
+    envelope: bool = Query(False, description="Responde com items, total, total_exato e next_cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior (implica envelope)"),
+    db: Session = Depends(get_db_leitura)
 ):
     """
     Recupera todas as perguntas de um formulário específico com suporte a:
     - Filtros (por tipo, obrigatoriedade, etc.)
-    - Ordenação
-    - Paginação
-    """
-    perguntas = crud_pergunta.get_perguntas(
-        db, 
-        skip=skip, 
-        limit=limit,
-        formulario_id=formulario_id,
-        tipo_pergunta=tipo_pergunta,
-        obrigatoria=obrigatoria,
-        sub_pergunta=sub_pergunta,
-        sort_by=sort_by,
-        sort_order=sort_order
-    )
-    return perguntas
+    - Ordenação (sort=campo:direcao, ex.: ordem:desc)
+    - Paginação, por skip ou pelo cursor, com o total em envelope=true
+    Leituras simultâneas com os mesmos parâmetros compartilham a consulta.
+    """
+    filtros = {
+        "formulario_id": formulario_id,
+        "tipo_pergunta": tipo_pergunta,
+        "obrigatoria": obrigatoria,
+        "sub_pergunta": sub_pergunta,
+    }
+    return _listar_perguntas([db], None, filtros, ordenacao, skip, limit, envelope, cursor)
@@ -0,0 +1,123 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db, get_db_leitura
+from app.crud import regra as crud_regra
+from app.crud import versao as crud_versao
+from app.schemas.regra import (
+    RegraCondicional, RegraCondicionalCreate, RespostasAvaliacao,
+    ResultadoAvaliacao, ResultadoValidacao, ErroResposta
+)
+
+router = APIRouter()
+
+def _obter_grafo(db: Session, formulario_id: int, versao: Optional[int]) -> tuple:
+    """
+    Obtém o grafo de regras compilado da versão informada ou da mais recente
+    """
+    if versao is None:
+        versao = crud_versao.get_ultima_versao(db, formulario_id=formulario_id)
+    grafo = crud_versao.get_grafo(db, formulario_id, versao) if versao else None
+    if grafo is None:
+        raise HTTPException(status_code=404, detail="Formulário sem versão publicada")
+    return versao, grafo
+
+@router.get("/{formulario_id}/regras", response_model=List[RegraCondicional])
+def read_regras(
+    formulario_id: int,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Lista as regras condicionais de um formulário.
+    """
+    return crud_regra.get_regras(db, formulario_id=formulario_id)
+
+@router.post("/{formulario_id}/regras", response_model=RegraCondicional, status_code=status.HTTP_201_CREATED)
+def create_regra(
+    formulario_id: int,
+    regra: RegraCondicionalCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Cria uma regra condicional do tipo "mostrar a pergunta de destino se a
+    resposta da pergunta de origem satisfizer o operador".
+    """
+    try:
+        db_regra = crud_regra.create_regra(db, formulario_id=formulario_id, regra=regra)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if db_regra is None:
+        raise HTTPException(status_code=404, detail="Formulário não encontrado")
+    return db_regra
+
+@router.delete("/{formulario_id}/regras/{regra_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_regra(
+    formulario_id: int,
+    regra_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Remove uma regra condicional.
+    """
+    success = crud_regra.delete_regra(db, formulario_id=formulario_id, regra_id=regra_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Regra não encontrada")
+    return None
+
+@router.post("/{formulario_id}/avaliar", response_model=ResultadoAvaliacao)
+def avaliar_respostas(
+    formulario_id: int,
+    avaliacao: RespostasAvaliacao,
+    versao: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Calcula as perguntas visíveis e obrigatórias para um conjunto parcial de respostas,
+    usando a versão publicada informada ou a mais recente.
+    """
+    versao, grafo = _obter_grafo(db, formulario_id, versao)
+    estado = grafo.novo_estado(avaliacao.respostas)
+    return ResultadoAvaliacao(
+        versao=versao,
+        visiveis=grafo.ordenar(estado.visiveis),
+        obrigatorias=grafo.ordenar(estado.obrigatorias),
+        pendentes=grafo.ordenar(estado.pendentes),
+    )
+
+@router.post("/{formulario_id}/validar", response_model=ResultadoValidacao)
+def validar_respostas(
+    formulario_id: int,
+    avaliacao: RespostasAvaliacao,
+    versao: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Valida um conjunto completo de respostas: tipos, opções e perguntas obrigatórias
+    visíveis. Respostas de perguntas ocultas pelas regras são desconsideradas.
+    """
+    versao, grafo = _obter_grafo(db, formulario_id, versao)
+    erros = [
+        ErroResposta(id_pergunta=pergunta_id, mensagem="Pergunta não pertence ao formulário")
+        for pergunta_id in avaliacao.respostas
+        if pergunta_id not in grafo.perguntas
+    ]
+
+    estado = grafo.novo_estado(avaliacao.respostas)
+    erros.extend(
+        ErroResposta(id_pergunta=pergunta_id, mensagem=mensagem)
+        for pergunta_id, mensagem in estado.validar().items()
+    )
+    erros.extend(
+        ErroResposta(id_pergunta=pergunta_id, mensagem="Resposta obrigatória")
+        for pergunta_id in grafo.ordenar(estado.pendentes)
+    )
+
+    return ResultadoValidacao(
+        versao=versao,
+        valido=not erros,
+        erros=erros,
+        visiveis=grafo.ordenar(estado.visiveis),
+        obrigatorias=grafo.ordenar(estado.obrigatorias),
+        pendentes=grafo.ordenar(estado.pendentes),
+    )
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import get_db, get_db_leitura
+from app.crud import submissao as crud_submissao
+from app.schemas.submissao import Submissao, SubmissaoCreate, SubmissaoResumo, OperacaoResposta, ResultadoRascunho
+
+router = APIRouter()
+
+def _erros_detalhe(erros: dict) -> list:
+    return [{"id_pergunta": pergunta_id, "mensagem": mensagem} for pergunta_id, mensagem in erros.items()]
+
+def _montar_submissao(db: Session, db_submissao) -> Submissao:
+    return Submissao(
+        id=db_submissao.id,
+        id_formulario=db_submissao.id_formulario,
+        versao=db_submissao.versao,
+        status=db_submissao.status,
+        revisao=db_submissao.revisao,
+        criado_em=db_submissao.criado_em,
+        atualizado_em=db_submissao.atualizado_em,
+        respostas=crud_submissao.get_respostas(db, db_submissao.id, db_submissao.criado_em),
+    )
+
+def _obter_submissao(db: Session, submissao_id: int):
+    db_submissao = crud_submissao.get_submissao(db, submissao_id=submissao_id)
+    if db_submissao is None:
+        raise HTTPException(status_code=404, detail="Submissão não encontrada")
+    return db_submissao
+
+@router.post("/", response_model=Submissao, status_code=status.HTTP_201_CREATED)
+def create_submissao(
+    submissao: SubmissaoCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Inicia um rascunho de submissão para a versão publicada de um formulário.
+    """
+    db_submissao = crud_submissao.create_submissao(db, submissao=submissao)
+    if db_submissao is None:
+        raise HTTPException(status_code=404, detail="Formulário sem versão publicada")
+    return _montar_submissao(db, db_submissao)
+
+@router.get("/", response_model=List[SubmissaoResumo])
+def read_submissoes(
+    formulario_id: Optional[int] = None,
+    criado_de: Optional[datetime] = None,
+    criado_ate: Optional[datetime] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINACAO_LIMITE_MAXIMO),
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Lista submissões, mais recentes primeiro, opcionalmente criadas no intervalo
+    [criado_de, criado_ate). Informar o intervalo limita a leitura às partições
+    mensais correspondentes.
+    """
+    submissoes = crud_submissao.get_submissoes(
+        db,
+        formulario_id=formulario_id,
+        criado_de=criado_de,
+        criado_ate=criado_ate,
+        skip=skip,
+        limit=limit,
+    )
+    return [SubmissaoResumo.model_validate(submissao, from_attributes=True) for submissao in submissoes]
+
+@router.get("/{submissao_id}", response_model=Submissao)
+def read_submissao(
+    submissao_id: int,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Recupera uma submissão com suas respostas.
+    """
+    return _montar_submissao(db, _obter_submissao(db, submissao_id))
+
+@router.patch("/{submissao_id}", response_model=ResultadoRascunho)
+def update_rascunho(
+    submissao_id: int,
+    operacoes: List[OperacaoResposta],
+    db: Session = Depends(get_db)
+):
+    """
+    Salva parcialmente um rascunho a partir de operações no estilo JSON Patch
+    (`add`, `replace` ou `remove` com path `/<id_pergunta>`).
+    Somente as respostas alteradas são gravadas e revalidadas.
+    """
+    db_submissao = _obter_submissao(db, submissao_id)
+    alteracoes = {
+        operacao.id_pergunta: None if operacao.op == "remove" else operacao.value
+        for operacao in operacoes
+    }
+    try:
+        revisao, alteradas, estado = crud_submissao.aplicar_alteracoes(db, db_submissao, alteracoes)
+    except crud_submissao.ErroValidacaoRespostas as e:
+        raise HTTPException(status_code=422, detail=_erros_detalhe(e.erros))
+    except crud_submissao.ConflitoRevisaoError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return ResultadoRascunho(
+        id=submissao_id,
+        revisao=revisao,
+        respostas_alteradas=len(alteracoes),
+        visibilidade_alterada=estado.grafo.ordenar(alteradas),
+        pendentes=estado.grafo.ordenar(estado.pendentes),
+    )
+
+@router.post("/{submissao_id}/enviar", response_model=Submissao)
+def enviar_submissao(
+    submissao_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Valida todas as respostas do rascunho e o marca como enviado.
+    """
+    db_submissao = _obter_submissao(db, submissao_id)
+    try:
+        db_submissao = crud_submissao.enviar_submissao(db, db_submissao)
+    except crud_submissao.ErroValidacaoRespostas as e:
+        raise HTTPException(status_code=422, detail=_erros_detalhe(e.erros))
+    except crud_submissao.ConflitoRevisaoError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _montar_submissao(db, db_submissao)
@@ -0,0 +1,90 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.core.codificacao import escolher_codificacao, formato_resposta
+from app.core.config import settings
+from app.db.database import get_db, get_db_leitura
+from app.crud import versao as crud_versao
+from app.schemas.versao import FormularioVersao, FormularioPublicado
+
+router = APIRouter()
+
+def _responder_snapshot(request: Request, snapshot: crud_versao.SnapshotFormulario, cache_control: str) -> Response:
+    """
+    Monta a resposta com o conteúdo pré-serializado da versão publicada, em JSON ou
+    MessagePack e já comprimido na codificação aceita pelo cliente
+    """
+    formato = formato_resposta.get()
+    codificacao = escolher_codificacao(request.headers.get("accept-encoding")) if settings.COMPRESSAO_ENABLED else None
+    # Cada representação tem a sua ETag; qualquer uma delas identifica a mesma versão no If-None-Match
+    base = f"{snapshot.hash}-{snapshot.versao}"
+    sufixos = "".join(f"-{parte}" for parte in ("msgpack" if formato else None, codificacao) if parte)
+    headers = {"ETag": f'"{base}{sufixos}"', "Cache-Control": cache_control, "Vary": "Accept, Accept-Encoding"}
+    etags = [etag.strip().removeprefix("W/").strip('"') for etag in request.headers.get("if-none-match", "").split(",")]
+    if any(etag == base or etag.startswith(f"{base}-") for etag in etags):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if codificacao is not None:
+        headers["Content-Encoding"] = codificacao
+    return Response(
+        content=snapshot.variante(formato, codificacao),
+        media_type=formato or "application/json",
+        headers=headers,
+    )
+
+@router.post("/{formulario_id}/publicar", response_model=FormularioVersao, status_code=status.HTTP_201_CREATED)
+def publicar_formulario(
+    formulario_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Publica o estado atual do formulário como uma nova versão imutável.
+    """
+    try:
+        db_versao = crud_versao.publicar_formulario(db, formulario_id=formulario_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if db_versao is None:
+        raise HTTPException(status_code=404, detail="Formulário não encontrado")
+    return db_versao
+
+@router.get("/{formulario_id}/versoes", response_model=List[FormularioVersao])
+def read_versoes(
+    formulario_id: int,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Lista as versões publicadas de um formulário.
+    """
+    return crud_versao.get_versoes(db, formulario_id=formulario_id)
+
+@router.get("/{formulario_id}/publicado", response_model=FormularioPublicado)
+def read_ultima_versao(
+    formulario_id: int,
+    request: Request,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Recupera o conteúdo da versão publicada mais recente de um formulário.
+    """
+    versao = crud_versao.get_ultima_versao(db, formulario_id=formulario_id)
+    snapshot = crud_versao.get_snapshot(db, formulario_id, versao) if versao else None
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Formulário sem versão publicada")
+    return _responder_snapshot(request, snapshot, "no-cache")
+
+@router.get("/{formulario_id}/versoes/{versao}", response_model=FormularioPublicado)
+def read_versao(
+    formulario_id: int,
+    versao: int,
+    request: Request,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Recupera o conteúdo congelado de uma versão publicada.
+    Como versões são imutáveis, a resposta pode ser armazenada em cache indefinidamente.
+    """
+    snapshot = crud_versao.get_snapshot(db, formulario_id, versao)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Versão não encontrada")
+    return _responder_snapshot(request, snapshot, "public, max-age=31536000, immutable")
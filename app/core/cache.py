@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+# Registro de todos os caches criados, usado para inspeção e limpeza
+caches: List["CacheLRU"] = []
+
+class CacheLRU:
+    """
+    Cache em memória com política LRU (least recently used), seguro para threads.
+
+    Mantém contadores de acertos e falhas para acompanhar a eficácia do cache.
+    """
+
+    def __init__(self, nome: str, tamanho_maximo: int = 1024):
+        self.nome = nome
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._itens: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        caches.append(self)
+
+    def get(self, chave: Hashable, padrao: Optional[Any] = None) -> Any:
+        """
+        Obtém um item do cache, marcando-o como usado recentemente
+        """
+        with self._lock:
+            try:
+                valor = self._itens[chave]
+            except KeyError:
+                self.falhas += 1
+                return padrao
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def set(self, chave: Hashable, valor: Any) -> None:
+        """
+        Armazena um item no cache, descartando o menos usado se necessário
+        """
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, chave: Hashable) -> None:
+        """
+        Remove um item do cache, se existir
+        """
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        """
+        Remove todos os itens do cache
+        """
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+def limpar_caches() -> None:
+    """
+    Limpa todos os caches registrados
+    """
+    for cache in caches:
+        cache.limpar()
@@ -0,0 +1,128 @@
+"""
+Coalescência de leituras idênticas simultâneas (single-flight).
+
+Quando várias requisições pedem a mesma leitura ao mesmo tempo, apenas a primeira
+(líder) consulta o banco e serializa a resposta; as demais aguardam e recebem o
+mesmo corpo. A coalescência vale apenas para leituras em andamento: nada é
+guardado depois que a líder termina.
+
+Commits de sessões do processo avançam uma geração que faz parte da chave, de modo
+que uma leitura iniciada após uma escrita local nunca recebe o resultado de uma
+consulta anterior a ela. Escritas feitas por outros processos podem ficar de fora
+de uma leitura coalescida pelo tempo de uma consulta, como numa réplica.
+"""
+import itertools
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.codificacao import RespostaAPI, formato_resposta
+from app.core.config import settings
+from app.core.metricas import registro
+
+leituras_coalescidas = registro.contador(
+    "coalesced_reads_total", "Leituras executadas (lider) ou atendidas por uma leitura idêntica em andamento (seguidor)",
+    ("papel",),
+)
+
+_geracao = itertools.count(1)
+_geracao_atual = 0
+
+@event.listens_for(Session, "after_commit")
+def _avancar_geracao(session):
+    global _geracao_atual
+    _geracao_atual = next(_geracao)
+
+def geracao_escritas() -> int:
+    """
+    Número de commits feitos no processo até agora
+    """
+    return _geracao_atual
+
+class _Voo:
+    """
+    Leitura em andamento e o seu resultado, compartilhado com as seguidoras
+    """
+    __slots__ = ("concluido", "resultado", "erro")
+
+    def __init__(self):
+        self.concluido = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+class Coalescedor:
+    """
+    Executa uma função uma única vez por chave entre as chamadas simultâneas
+    """
+
+    def __init__(self):
+        self._voos: Dict[Hashable, _Voo] = {}
+        self._lock = threading.Lock()
+
+    def executar(self, chave: Hashable, funcao: Callable[[], Any]) -> Any:
+        """
+        Executa `funcao` ou, se já houver uma execução em andamento com a mesma chave,
+        aguarda o seu resultado (ou a sua exceção)
+        """
+        with self._lock:
+            voo = self._voos.get(chave)
+            lider = voo is None
+            if lider:
+                voo = self._voos[chave] = _Voo()
+
+        if not lider:
+            leituras_coalescidas.inc("seguidor")
+            voo.concluido.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resultado
+
+        leituras_coalescidas.inc("lider")
+        try:
+            voo.resultado = funcao()
+        except Exception as erro:
+            voo.erro = erro
+            raise
+        finally:
+            with self._lock:
+                del self._voos[chave]
+            voo.concluido.set()
+        return voo.resultado
+
+    def __len__(self) -> int:
+        return len(self._voos)
+
+coalescedor = Coalescedor()
+
+_adaptadores: Dict[Any, TypeAdapter] = {}
+
+def _adaptador(modelo) -> TypeAdapter:
+    adaptador = _adaptadores.get(modelo)
+    if adaptador is None:
+        adaptador = _adaptadores[modelo] = TypeAdapter(modelo)
+    return adaptador
+
+def responder_coalescido(chave: tuple, consultar: Callable[[], Any], modelo) -> Response:
+    """
+    Resposta de uma leitura serializada com o response_model `modelo`, coalescida com
+    as leituras simultâneas de mesma chave. A chave deve identificar a rota, os
+    parâmetros normalizados e o banco lido; o formato negociado e a geração de
+    escritas são acrescentados aqui.
+    """
+    def produzir():
+        adaptador = _adaptador(modelo)
+        conteudo = adaptador.dump_python(
+            adaptador.validate_python(consultar(), from_attributes=True), mode="json", by_alias=True
+        )
+        resposta = RespostaAPI(conteudo)
+        return resposta.body, resposta.media_type
+
+    if settings.COALESCENCIA_ENABLED:
+        corpo, tipo = coalescedor.executar((formato_resposta.get(), geracao_escritas()) + chave, produzir)
+    else:
+        corpo, tipo = produzir()
+    return Response(content=corpo, media_type=tipo)
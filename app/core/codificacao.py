@@ -0,0 +1,116 @@
+"""
+Negociação do formato (JSON ou MessagePack) e da compressão (gzip ou brotli) das respostas.
+
+brotli e msgpack são dependências opcionais: sem elas, as respostas usam apenas
+gzip e JSON.
+"""
+import gzip
+import zlib
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgpack = None
+
+MEDIA_MSGPACK = "application/msgpack"
+MEDIAS_MSGPACK = {MEDIA_MSGPACK, "application/x-msgpack"}
+
+# Formato negociado para a requisição em andamento (None para JSON), definido pelo
+# CompressaoMiddleware e lido por RespostaAPI ao serializar o corpo
+formato_resposta: ContextVar[Optional[str]] = ContextVar("formato_resposta", default=None)
+
+def _preferencias(cabecalho: Optional[str]) -> dict:
+    """
+    Valores de um cabeçalho Accept* com os seus pesos (q)
+    """
+    preferencias = {}
+    for item in (cabecalho or "").split(","):
+        valor, *parametros = [parte.strip() for parte in item.split(";")]
+        if not valor:
+            continue
+        peso = 1.0
+        for parametro in parametros:
+            nome, _, numero = parametro.partition("=")
+            if nome.strip() == "q":
+                try:
+                    peso = float(numero)
+                except ValueError:
+                    peso = 0.0
+        preferencias[valor.lower()] = peso
+    return preferencias
+
+def codificacoes_disponiveis() -> tuple:
+    """
+    Codificações suportadas, da preferida para a menos preferida
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def escolher_codificacao(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Escolhe a codificação de conteúdo aceita pelo cliente, preferindo brotli em caso
+    de empate nos pesos. None se o cliente não aceitar nenhuma compressão suportada.
+    """
+    preferencias = _preferencias(accept_encoding)
+    melhor, melhor_peso = None, 0.0
+    for codificacao in codificacoes_disponiveis():
+        peso = preferencias.get(codificacao, preferencias.get("*", 0.0))
+        if peso > melhor_peso:
+            melhor, melhor_peso = codificacao, peso
+    return melhor
+
+def aceita_msgpack(accept: Optional[str]) -> bool:
+    """
+    Indica se o cliente prefere MessagePack a JSON no cabeçalho Accept
+    """
+    if msgpack is None:
+        return False
+    preferencias = _preferencias(accept)
+    peso_msgpack = max((preferencias.get(media, 0.0) for media in MEDIAS_MSGPACK), default=0.0)
+    return peso_msgpack > 0 and peso_msgpack >= preferencias.get("application/json", 0.0)
+
+def comprimir(dados: bytes, codificacao: str, nivel: int) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(dados, quality=nivel)
+    return gzip.compress(dados, compresslevel=nivel, mtime=0)
+
+class Compressor:
+    """
+    Compressão incremental de respostas enviadas em vários pedaços
+    """
+
+    def __init__(self, codificacao: str, nivel: int):
+        if codificacao == "br":
+            self._compressor = brotli.Compressor(quality=nivel)
+            self._processar, self._finalizar = self._compressor.process, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+            self._processar, self._finalizar = self._compressor.compress, self._compressor.flush
+
+    def processar(self, dados: bytes) -> bytes:
+        return self._processar(dados)
+
+    def finalizar(self) -> bytes:
+        return self._finalizar()
+
+def empacotar_msgpack(conteudo: Any) -> bytes:
+    return msgpack.packb(conteudo, use_bin_type=True)
+
+class RespostaAPI(JSONResponse):
+    """
+    Resposta padrão da API: JSON ou, quando negociado pelo cliente, MessagePack
+    """
+
+    def render(self, conteudo: Any) -> bytes:
+        if formato_resposta.get() == MEDIA_MSGPACK:
+            self.media_type = MEDIA_MSGPACK
+            return empacotar_msgpack(conteudo)
+        return super().render(conteudo)
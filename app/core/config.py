@@ -1,23 +1,156 @@
-import os
+from typing import Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
-
-load_dotenv()
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "API Formulários Dinâmicos"
     PROJECT_DESCRIPTION: str = "API para um sistema de formulários dinâmicos"
     API_V1_STR: str = "/api/v1"
     
-    POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
-    POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
-    POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "localhost")
-    POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
-    POSTGRES_DB: str = os.getenv("POSTGRES_DB", "forms_db")
+    POSTGRES_USER: str = "postgres"
+    POSTGRES_PASSWORD: str = "postgres"
+    POSTGRES_SERVER: str = "localhost"
+    POSTGRES_PORT: str = "5432"
+    POSTGRES_DB: str = "forms_db"
     
-    DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    # Montada a partir das variáveis POSTGRES_* quando não informada
+    DATABASE_URL: Optional[str] = None
+
+    # Pool de conexões, criado na inicialização de cada worker
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Réplicas de leitura (URLs separadas por vírgula). As rotas GET leem das réplicas,
+    # distribuídas por round_robin ou menos_conexoes; após uma escrita, o cliente lê do
+    # primário por DB_STICKY_SECONDS segundos (cookie db_primario)
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_STRATEGY: str = "round_robin"
+    DB_STICKY_SECONDS: int = 5
+
+    # Shards por tenant, no formato "nome=url,nome=url". Cada formulário (e suas perguntas,
+    # opções e submissões) fica no shard do seu tenant, informado no cabeçalho X-Tenant.
+    # O mapa tenant -> shard fica na tabela tenant_shard do banco principal; tenants sem
+    # entrada são distribuídos por hash. Vazio desativa o sharding.
+    DATABASE_SHARDS: str = ""
+    TENANT_PADRAO: str = "padrao"
+    SHARD_FANOUT_WORKERS: int = 8
+
+    # Particionamento mensal de submissao e resposta_submissao (PostgreSQL). A manutenção
+    # (python -m app.db.particoes) cria as partições dos próximos PARTICOES_MESES_A_FRENTE
+    # meses e retira as anteriores a SUBMISSOES_RETENCAO_MESES meses (0 mantém todas),
+    # arquivando-as em CSV comprimido em SUBMISSOES_ARQUIVO_DIR ou, sem diretório,
+    # apenas desanexando-as
+    PARTICOES_MESES_A_FRENTE: int = 3
+    SUBMISSOES_RETENCAO_MESES: int = 0
+    SUBMISSOES_ARQUIVO_DIR: Optional[str] = None
+
+    # Limite de registros por página nas listagens (parâmetro limit)
+    PAGINACAO_LIMITE_MAXIMO: int = 500
+    # Acima deste número de registros, o total das listagens (envelope=true) deixa de ser
+    # contado exatamente e passa a ser estimado pelas estatísticas do PostgreSQL
+    PAGINACAO_CONTAGEM_EXATA_MAXIMA: int = 10000
+
+    # Chaves de API aceitas no cabeçalho X-API-Key, separadas por vírgula. Identificam os clientes
+    # nos limites de taxa e nas Idempotency-Key; sem chave ou com uma chave desconhecida, o
+    # cliente é identificado pelo IP.
+    CHAVES_API: str = ""
+
+    # Limite de taxa por cliente (chave de API de CHAVES_API ou, na sua ausência, o IP) com baldes de
+    # tokens: RATE_LIMIT_TAXA requisições por segundo com rajadas de até RATE_LIMIT_RAJADA no
+    # total e RATE_LIMIT_ROTA_TAXA/RATE_LIMIT_ROTA_RAJADA em cada rota. RATE_LIMIT_ROTAS ajusta
+    # rotas específicas, no formato "GET /api/v1/perguntas/=5:10,POST /api/v1/formularios/=2:5".
+    # Com RATE_LIMIT_REDIS_URL, os baldes são compartilhados entre processos pelo Redis.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TAXA: float = 50.0
+    RATE_LIMIT_RAJADA: int = 100
+    RATE_LIMIT_ROTA_TAXA: float = 20.0
+    RATE_LIMIT_ROTA_RAJADA: int = 40
+    RATE_LIMIT_ROTAS: str = ""
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+
+    # Requisições simultâneas por processo (padrão: DB_POOL_SIZE + DB_MAX_OVERFLOW) e por
+    # cliente. Acima do limite global, novas requisições recebem 503 em vez de esperar por
+    # uma conexão do pool; acima do limite do cliente, 429.
+    MAX_REQUISICOES_SIMULTANEAS: Optional[int] = None
+    MAX_REQUISICOES_POR_CLIENTE: int = 8
+
+    # Leituras idênticas simultâneas de formulários e perguntas compartilham uma única
+    # consulta e serialização (single-flight)
+    COALESCENCIA_ENABLED: bool = True
+
+    # Feed de alterações dos formulários (server-sent events). Com EVENTOS_BACKEND=postgres, os
+    # eventos são distribuídos entre os workers por LISTEN/NOTIFY; com "memoria", apenas dentro
+    # do processo. Cada formulário guarda os últimos EVENTOS_HISTORICO eventos para a retomada
+    # (Last-Event-ID); uma conexão com mais de EVENTOS_FILA_MAXIMA eventos pendentes recebe reset.
+    EVENTOS_BACKEND: str = "memoria"
+    EVENTOS_HISTORICO: int = 256
+    EVENTOS_FILA_MAXIMA: int = 1000
+    EVENTOS_HEARTBEAT_SEGUNDOS: float = 15.0
+    EVENTOS_RETRY_MS: int = 3000
+
+    # Caixa de saída (outbox): os eventos de alteração são gravados na tabela evento_saida na
+    # transação da alteração e entregues, em lotes de até OUTBOX_LOTE, aos destinos de
+    # OUTBOX_DESTINOS ("arquivo" em OUTBOX_ARQUIVO e "webhook" em OUTBOX_WEBHOOK_URL); sem
+    # destinos, os eventos não são gravados. Os caches locais não dependem da caixa de saída:
+    # são invalidados por cada worker ao publicar os eventos (veja app.core.eventos).
+    # O despachante verifica a tabela a cada OUTBOX_INTERVALO segundos; após uma falha, o lote
+    # é reentregue com espera crescente de até OUTBOX_ESPERA_MAXIMA segundos. Sem
+    # OUTBOX_DESPACHANTE_ENABLED, os workers apenas gravam os eventos e o despacho fica a cargo
+    # de um processo separado (python -m app.core.saida).
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_DESPACHANTE_ENABLED: bool = True
+    OUTBOX_DESTINOS: str = ""
+    OUTBOX_ARQUIVO: str = "eventos.jsonl"
+    OUTBOX_WEBHOOK_URL: Optional[str] = None
+    OUTBOX_LOTE: int = 500
+    OUTBOX_INTERVALO: float = 1.0
+    OUTBOX_ESPERA_MAXIMA: float = 300.0
+
+    # Escritas (POST e PATCH) com o cabeçalho Idempotency-Key: a resposta da primeira execução
+    # fica no banco principal por IDEMPOTENCIA_TTL_SEGUNDOS e é repetida às novas tentativas com a
+    # mesma chave, sem executar a requisição outra vez. As IDEMPOTENCIA_CACHE_TAMANHO respostas
+    # mais recentes também ficam em memória. Uma execução interrompida libera a chave após
+    # IDEMPOTENCIA_RESERVA_SEGUNDOS segundos.
+    IDEMPOTENCIA_ENABLED: bool = True
+    IDEMPOTENCIA_TTL_SEGUNDOS: int = 86400
+    IDEMPOTENCIA_RESERVA_SEGUNDOS: int = 60
+    IDEMPOTENCIA_CACHE_TAMANHO: int = 10000
+
+    # Compressão das respostas (brotli, se instalado, ou gzip) a partir de COMPRESSAO_TAMANHO_MINIMO
+    # bytes. As versões publicadas são servidas já comprimidas, sem recompressão por requisição.
+    COMPRESSAO_ENABLED: bool = True
+    COMPRESSAO_TAMANHO_MINIMO: int = 1024
+    COMPRESSAO_NIVEL_GZIP: int = 6
+    COMPRESSAO_NIVEL_BROTLI: int = 4
+
+    # Métricas no formato Prometheus expostas em /metrics
+    METRICS_ENABLED: bool = True
+    # Com vários workers, diretório compartilhado onde cada processo grava as suas métricas
+    # a cada METRICS_EXPORT_INTERVAL segundos; /metrics combina os valores de todos eles
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+    METRICS_EXPORT_INTERVAL: float = 5.0
+
+    # Perfil de consultas SQL: em todas as requisições ou sob demanda pelo cabeçalho X-Profile-SQL
+    SQL_PROFILE_ENABLED: bool = False
+    SQL_PROFILE_HEADER_ENABLED: bool = False
+    SQL_PROFILE_HISTORY: int = 50
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_SLOW_QUERY_MS: float = 200.0
+
+    @model_validator(mode="after")
+    def montar_database_url(self) -> "Settings":
+        if not self.DATABASE_URL:
+            self.DATABASE_URL = (
+                f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+                f"@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            )
+        return self
 
     class Config:
         case_sensitive = True
+        env_file = ".env"
 
 settings = Settings()
@@ -0,0 +1,354 @@
+"""
+Feed de alterações dos formulários, transmitido por server-sent events.
+
+As funções de app/crud registram na sessão (registrar_evento) as perguntas e regras
+criadas, alteradas, reordenadas e excluídas e as alterações do próprio formulário.
+Os eventos só são publicados se a transação for confirmada:
+
+- EVENTOS_BACKEND=memoria (padrão): após o commit, no broker do processo;
+- EVENTOS_BACKEND=postgres: com NOTIFY na própria transação. Cada worker escuta o
+  canal (LISTEN) no banco principal e nos shards e repassa os eventos ao seu broker,
+  de modo que editores conectados a workers diferentes recebem as alterações uns
+  dos outros.
+
+Ao publicar um evento, cada worker também remove dos seus caches locais os itens
+afetados (veja invalidar_caches); com EVENTOS_BACKEND=postgres, a invalidação chega a
+todos os workers, não só ao que fez a alteração.
+
+O broker guarda os últimos EVENTOS_HISTORICO eventos de cada formulário. O id de
+cada evento é o token de retomada: ao reconectar com Last-Event-ID (ou ?desde=), o
+cliente recebe os eventos posteriores a ele. Se o token já saiu do histórico, ou se
+o cliente não acompanhou o ritmo dos eventos, recebe um evento "reset" e deve
+recarregar as perguntas.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import select
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.cache import CacheLRU
+from app.core.config import settings
+from app.core.metricas import registro
+from app.core.saida import gravar_saida, saida_ativa
+from app.db.shards import shard_da_sessao
+
+logger = logging.getLogger(__name__)
+
+CANAL = "formulario_eventos"
+# O payload do NOTIFY é limitado a 8000 bytes; acima disto, o evento segue sem os dados
+TAMANHO_MAXIMO_NOTIFY = 7500
+RESET = "reset"
+
+eventos_publicados = registro.contador(
+    "change_events_published_total", "Eventos de alteração de formulários confirmados", ("tipo",)
+)
+conexoes_eventos = registro.medidor("change_event_streams", "Conexões de eventos abertas")
+conexoes_atrasadas = registro.contador(
+    "change_event_streams_lagged_total", "Conexões de eventos que não acompanharam o ritmo e receberam reset"
+)
+
+_sequencia = itertools.count(1)
+
+def _novo_id() -> str:
+    """
+    Id único entre processos: instante, pid e sequência do processo
+    """
+    return f"{time.time_ns():x}-{os.getpid():x}-{next(_sequencia):x}"
+
+class Assinatura:
+    """
+    Conexão de eventos de um formulário, consumida no loop asyncio da requisição.
+    Recebe None quando precisa de um reset.
+    """
+
+    def __init__(self, chave: Hashable, loop: asyncio.AbstractEventLoop, tamanho: int):
+        self.chave = chave
+        self.loop = loop
+        self.fila: "asyncio.Queue[Optional[dict]]" = asyncio.Queue(maxsize=tamanho)
+
+    def _colocar(self, evento: Optional[dict]) -> None:
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Descarta os pendentes: o cliente recarrega as perguntas e segue a partir daqui
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(None)
+            conexoes_atrasadas.inc()
+
+    def entregar(self, evento: Optional[dict]) -> None:
+        """
+        Entrega um evento a partir de qualquer thread
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._colocar, evento)
+        except RuntimeError:
+            # Loop já encerrado; a assinatura é cancelada ao fim da transmissão
+            pass
+
+class BrokerEventos:
+    """
+    Distribui os eventos às conexões abertas de cada formulário e guarda os mais
+    recentes para a retomada. Seguro para threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (shard, formulario_id) -> deque com os últimos eventos
+        self._historicos = CacheLRU("eventos_historico", tamanho_maximo=10000)
+        self._assinaturas: Dict[Hashable, Set[Assinatura]] = {}
+
+    def publicar(self, evento: dict) -> None:
+        chave = (evento["shard"], evento["formulario_id"])
+        with self._lock:
+            historico = self._historicos.get(chave)
+            if historico is None:
+                historico = deque(maxlen=settings.EVENTOS_HISTORICO)
+                self._historicos.set(chave, historico)
+            historico.append(evento)
+            assinaturas = list(self._assinaturas.get(chave, ()))
+        for assinatura in assinaturas:
+            assinatura.entregar(evento)
+
+    def assinar(
+        self, chave: Hashable, desde: Optional[str], loop: asyncio.AbstractEventLoop
+    ) -> Tuple[Assinatura, Optional[List[dict]]]:
+        """
+        Abre uma assinatura e retorna os eventos posteriores ao token `desde`, ou None
+        se ele não estiver no histórico. A assinatura e a leitura do histórico são
+        atômicas em relação às publicações: nenhum evento é perdido ou repetido.
+        """
+        assinatura = Assinatura(chave, loop, settings.EVENTOS_FILA_MAXIMA)
+        with self._lock:
+            self._assinaturas.setdefault(chave, set()).add(assinatura)
+            if desde is None:
+                return assinatura, []
+            historico = list(self._historicos.get(chave) or ())
+        for posicao, evento in enumerate(historico):
+            if evento["id"] == desde:
+                return assinatura, historico[posicao + 1:]
+        return assinatura, None
+
+    def cancelar(self, assinatura: Assinatura) -> None:
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.chave)
+            if assinaturas is not None:
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    del self._assinaturas[assinatura.chave]
+
+    def reiniciar(self) -> None:
+        """
+        Pede reset a todas as conexões, quando eventos podem ter sido perdidos
+        """
+        with self._lock:
+            assinaturas = [assinatura for grupo in self._assinaturas.values() for assinatura in grupo]
+        for assinatura in assinaturas:
+            assinatura.entregar(None)
+
+broker = BrokerEventos()
+
+def registrar_evento(
+    db: Session, formulario_id: int, tipo: str, dados: Union[dict, Callable[[], dict], None] = None
+) -> None:
+    """
+    Registra um evento a publicar quando a transação da sessão for confirmada.
+    `dados` pode ser uma função, chamada no commit (após o flush, com os ids gerados).
+    """
+    db.info.setdefault("eventos_pendentes", []).append((formulario_id, tipo, dados))
+
+def _payload_notify(evento: dict) -> str:
+    payload = json.dumps(evento, separators=(",", ":"), default=str)
+    if len(payload.encode("utf-8")) > TAMANHO_MAXIMO_NOTIFY:
+        payload = json.dumps({**evento, "dados": None}, separators=(",", ":"), default=str)
+    return payload
+
+def _notificar_postgres(session: Session) -> bool:
+    return settings.EVENTOS_BACKEND == "postgres" and session.get_bind().dialect.name == "postgresql"
+
+@event.listens_for(Session, "before_commit")
+def _preparar_eventos(session):
+    pendentes = session.info.pop("eventos_pendentes", None)
+    if not pendentes:
+        return
+    session.flush()
+    shard = shard_da_sessao(session)
+    eventos = [
+        {
+            "id": _novo_id(),
+            "shard": shard,
+            "formulario_id": formulario_id,
+            "tipo": tipo,
+            "dados": dados() if callable(dados) else dados,
+        }
+        for formulario_id, tipo, dados in pendentes
+    ]
+    if saida_ativa():
+        # Na mesma transação da alteração, para os destinos da caixa de saída
+        gravar_saida(session, eventos)
+    if _notificar_postgres(session):
+        # Entregue pelo PostgreSQL a todos os ouvintes, inclusive o deste processo, no commit
+        for evento in eventos:
+            session.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": CANAL, "payload": _payload_notify(evento)})
+    else:
+        session.info["eventos_prontos"] = eventos
+
+def invalidar_caches(evento: dict) -> None:
+    """
+    Remove dos caches deste processo os itens afetados por um evento: as versões
+    publicadas, os grafos de regras e os estados dos rascunhos de um formulário
+    excluído. Sem os dados (payload do NOTIFY truncado), limpa esses caches inteiros.
+    Os conjuntos de opções não são alterados nem excluídos e não precisam de invalidação.
+    """
+    if evento["tipo"] != "formulario_excluido":
+        return
+    from app.crud.submissao import cache_estados
+    from app.crud.versao import cache_grafos, cache_versoes, invalidar_cache
+
+    dados = evento.get("dados")
+    if dados is None:
+        for cache in (cache_versoes, cache_grafos, cache_estados):
+            cache.limpar()
+        return
+    for versao in dados.get("versoes", ()):
+        invalidar_cache(evento["formulario_id"], versao, evento["shard"])
+    for submissao_id in dados.get("submissoes", ()):
+        cache_estados.invalidar((evento["shard"], submissao_id))
+
+def _publicar(evento: dict) -> None:
+    invalidar_caches(evento)
+    broker.publicar(evento)
+    eventos_publicados.inc(evento["tipo"])
+
+@event.listens_for(Session, "after_commit")
+def _publicar_eventos(session):
+    for evento in session.info.pop("eventos_prontos", ()):
+        _publicar(evento)
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_eventos(session, transacao: SessionTransaction):
+    # Uma transação raiz encerrada sem commit (rollback ou close) descarta os seus eventos
+    if transacao.parent is None:
+        session.info.pop("eventos_pendentes", None)
+        session.info.pop("eventos_prontos", None)
+
+class OuvintePostgres(threading.Thread):
+    """
+    Thread que escuta o canal de eventos (LISTEN) nos bancos informados e publica as
+    notificações no broker, invalidando os caches locais afetados. Usa conexões próprias, fora do pool, e se reconecta após
+    falhas; como eventos podem ter sido perdidos, as conexões abertas recebem reset.
+    """
+
+    def __init__(self, engines: List[Engine]):
+        super().__init__(name="eventos-postgres", daemon=True)
+        self.engines = engines
+        self._parar = threading.Event()
+
+    def _conectar(self) -> list:
+        conexoes = []
+        for engine in self.engines:
+            dialeto = engine.dialect
+            argumentos, opcoes = dialeto.create_connect_args(engine.url)
+            conexao = dialeto.connect(*argumentos, **opcoes)
+            conexao.autocommit = True
+            with conexao.cursor() as cursor:
+                cursor.execute(f"LISTEN {CANAL}")
+            conexoes.append(conexao)
+        return conexoes
+
+    def run(self) -> None:
+        primeira = True
+        while not self._parar.is_set():
+            conexoes = []
+            try:
+                conexoes = self._conectar()
+                if not primeira:
+                    broker.reiniciar()
+                primeira = False
+                while not self._parar.is_set():
+                    prontas, _, _ = select.select(conexoes, [], [], 1.0)
+                    for conexao in prontas:
+                        conexao.poll()
+                        while conexao.notifies:
+                            notificacao = conexao.notifies.pop(0)
+                            _publicar(json.loads(notificacao.payload))
+            except Exception:
+                logger.exception("Falha ao escutar os eventos de formulários; reconectando")
+                self._parar.wait(1.0)
+            finally:
+                for conexao in conexoes:
+                    try:
+                        conexao.close()
+                    except Exception:
+                        pass
+
+    def parar(self) -> None:
+        self._parar.set()
+
+def iniciar_eventos() -> Optional[OuvintePostgres]:
+    """
+    Inicia o ouvinte do PostgreSQL, com EVENTOS_BACKEND=postgres. Chamado no lifespan
+    de cada worker.
+    """
+    if settings.EVENTOS_BACKEND != "postgres":
+        return None
+    from app.db.database import get_engine
+    from app.db.shards import get_shards
+
+    engines = {}
+    for engine in [get_engine(), *get_shards().values()]:
+        if engine.dialect.name == "postgresql":
+            engines.setdefault(str(engine.url), engine)
+    if not engines:
+        return None
+    ouvinte = OuvintePostgres(list(engines.values()))
+    ouvinte.start()
+    return ouvinte
+
+def formatar_evento(evento: Optional[dict]) -> str:
+    """
+    Evento no formato text/event-stream; None é o evento de reset
+    """
+    if evento is None:
+        return f"event: {RESET}\ndata: {{}}\n\n"
+    dados = json.dumps(evento, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {dados}\n\n"
+
+async def transmitir_eventos(
+    chave: Hashable, desde: Optional[str] = None, intervalo: Optional[float] = None
+) -> AsyncIterator[str]:
+    """
+    Eventos do formulário `chave` ((shard, formulario_id)) no formato text/event-stream,
+    retomando após o token `desde`. Sem eventos, envia um comentário a cada `intervalo`
+    segundos para manter a conexão aberta.
+    """
+    intervalo = intervalo if intervalo is not None else settings.EVENTOS_HEARTBEAT_SEGUNDOS
+    assinatura, pendentes = broker.assinar(chave, desde, asyncio.get_running_loop())
+    conexoes_eventos.inc()
+    try:
+        yield f"retry: {settings.EVENTOS_RETRY_MS}\n\n"
+        if pendentes is None:
+            yield formatar_evento(None)
+        else:
+            for evento in pendentes:
+                yield formatar_evento(evento)
+        while True:
+            try:
+                evento = await asyncio.wait_for(assinatura.fila.get(), intervalo)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield formatar_evento(evento)
+    finally:
+        broker.cancelar(assinatura)
+        conexoes_eventos.dec()
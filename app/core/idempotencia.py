@@ -0,0 +1,200 @@
+"""
+Escritas idempotentes com o cabeçalho Idempotency-Key.
+
+A primeira requisição com uma chave a reserva na tabela requisicao_idempotente do
+banco principal (um INSERT na chave primária, atômico entre processos e servidores),
+é executada e tem a sua resposta guardada na mesma linha. As novas tentativas com a
+mesma chave recebem a resposta guardada sem executar a requisição outra vez; enquanto
+a primeira ainda é executada, recebem 409. Uma chave reutilizada em outra requisição
+(com outra impressão: método, caminho, tenant, formato da resposta e corpo) recebe 422.
+
+As respostas guardadas mais recentes também ficam em um cache LRU em memória, de
+modo que uma nova tentativa atendida pelo mesmo worker não consulta o banco, e uma
+requisição nova custa um único INSERT antes da execução. Respostas 5xx não são
+guardadas: a reserva é desfeita e o cliente pode tentar de novo.
+"""
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheLRU
+from app.core.config import settings
+from app.core.metricas import registro
+from app.db.database import SessionLocal, get_engine
+from app.models.models import RequisicaoIdempotente
+
+logger = logging.getLogger(__name__)
+
+requisicoes_idempotentes = registro.contador(
+    "idempotency_requests_total", "Requisições com Idempotency-Key, por resultado", ("resultado",)
+)
+
+# Segundos entre as remoções das respostas expiradas, em cada processo
+INTERVALO_LIMPEZA = 300.0
+# Respostas maiores não ficam no cache em memória, só no banco
+TAMANHO_MAXIMO_CACHE = 64 * 1024
+
+def _agora() -> datetime:
+    # Horário UTC sem fuso, igual em todos os bancos
+    return datetime.utcnow()
+
+def calcular_chave(cliente: str, chave: str) -> bytes:
+    """
+    Chave guardada: a Idempotency-Key no escopo do cliente que a enviou
+    """
+    return hashlib.sha256(f"{cliente}\n{chave}".encode("utf-8")).digest()
+
+def calcular_impressao(metodo: str, caminho: str, tenant: str, formato: str, corpo: bytes) -> bytes:
+    """
+    Impressão da requisição, para recusar a mesma chave em requisições diferentes.
+    `formato` é o tipo de mídia negociado para a resposta (JSON ou MessagePack).
+    """
+    resumo = hashlib.sha256(f"{metodo}\n{caminho}\n{tenant}\n{formato}\n".encode("utf-8"))
+    resumo.update(corpo)
+    return resumo.digest()
+
+class RespostaGuardada:
+    """
+    Resposta guardada para uma chave; sem status enquanto a requisição é executada
+    """
+    __slots__ = ("impressao", "status", "tipo_conteudo", "corpo", "expira_em")
+
+    def __init__(
+        self, impressao: bytes, status: Optional[int], tipo_conteudo: Optional[str],
+        corpo: Optional[bytes], expira_em: datetime,
+    ):
+        self.impressao = impressao
+        self.status = status
+        self.tipo_conteudo = tipo_conteudo
+        self.corpo = corpo
+        self.expira_em = expira_em
+
+    @property
+    def concluida(self) -> bool:
+        return self.status is not None
+
+def _sessao_principal() -> Session:
+    # As reservas não alteram os dados da aplicação: não ativam a afinidade com o primário
+    return SessionLocal(bind=get_engine(), info={"afinidade_primario": False})
+
+class ArmazemIdempotencia:
+    """
+    Respostas das requisições com Idempotency-Key: no banco, compartilhadas entre os
+    processos, e as mais recentes em memória. Seguro para threads.
+    """
+
+    def __init__(self, abrir_sessao: Callable[[], Session] = _sessao_principal):
+        self.abrir_sessao = abrir_sessao
+        self._respostas = CacheLRU("respostas_idempotentes", tamanho_maximo=settings.IDEMPOTENCIA_CACHE_TAMANHO)
+        self._lock = threading.Lock()
+        self._proxima_limpeza = time.monotonic() + INTERVALO_LIMPEZA
+
+    def reservar(self, chave: bytes, impressao: bytes) -> Optional[RespostaGuardada]:
+        """
+        Reserva a chave para executar a requisição e retorna None ou, se a chave já
+        estiver em uso, retorna a resposta guardada (concluída ou em andamento)
+        """
+        agora = _agora()
+        guardada = self._respostas.get(chave)
+        if guardada is not None:
+            if guardada.expira_em > agora:
+                return guardada
+            self._respostas.invalidar(chave)
+        self._limpar_expiradas(agora)
+
+        with self.abrir_sessao() as db:
+            # Poucas voltas bastam: só se repete se a linha expirar ou sumir entre o INSERT e o SELECT
+            for _ in range(3):
+                try:
+                    db.execute(insert(RequisicaoIdempotente).values(
+                        chave=chave,
+                        impressao=impressao,
+                        expira_em=agora + timedelta(seconds=settings.IDEMPOTENCIA_RESERVA_SEGUNDOS),
+                    ))
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+
+                linha = db.execute(
+                    select(RequisicaoIdempotente).where(RequisicaoIdempotente.chave == chave)
+                ).scalar_one_or_none()
+                if linha is None:
+                    continue
+                if linha.expira_em <= agora:
+                    # Resposta expirada ou reserva de uma execução interrompida
+                    db.execute(delete(RequisicaoIdempotente).where(
+                        RequisicaoIdempotente.chave == chave, RequisicaoIdempotente.expira_em <= agora
+                    ))
+                    db.commit()
+                    continue
+                guardada = RespostaGuardada(
+                    linha.impressao, linha.status, linha.tipo_conteudo, linha.corpo, linha.expira_em
+                )
+                db.rollback()
+                if guardada.concluida:
+                    self._guardar_em_memoria(chave, guardada)
+                return guardada
+        raise RuntimeError("Não foi possível reservar a Idempotency-Key")
+
+    def guardar(
+        self, chave: bytes, impressao: bytes, status: int, tipo_conteudo: Optional[str], corpo: bytes
+    ) -> None:
+        """
+        Guarda a resposta da requisição que reservou a chave
+        """
+        expira_em = _agora() + timedelta(seconds=settings.IDEMPOTENCIA_TTL_SEGUNDOS)
+        with self.abrir_sessao() as db:
+            atualizadas = db.execute(
+                update(RequisicaoIdempotente)
+                .where(RequisicaoIdempotente.chave == chave, RequisicaoIdempotente.impressao == impressao)
+                .values(status=status, tipo_conteudo=tipo_conteudo, corpo=corpo, expira_em=expira_em)
+            ).rowcount
+            db.commit()
+        if atualizadas:
+            self._guardar_em_memoria(chave, RespostaGuardada(impressao, status, tipo_conteudo, corpo, expira_em))
+        else:
+            # A reserva expirou durante a execução e a chave foi reservada por outra requisição
+            logger.warning("Reserva de Idempotency-Key expirada antes de guardar a resposta")
+
+    def liberar(self, chave: bytes) -> None:
+        """
+        Desfaz a reserva de uma requisição que falhou, para que possa ser repetida
+        """
+        with self.abrir_sessao() as db:
+            db.execute(delete(RequisicaoIdempotente).where(
+                RequisicaoIdempotente.chave == chave, RequisicaoIdempotente.status.is_(None)
+            ))
+            db.commit()
+
+    def _guardar_em_memoria(self, chave: bytes, guardada: RespostaGuardada) -> None:
+        if guardada.corpo is None or len(guardada.corpo) <= TAMANHO_MAXIMO_CACHE:
+            self._respostas.set(chave, guardada)
+
+    def _limpar_expiradas(self, agora: datetime) -> None:
+        """
+        Remove do banco as respostas expiradas, no máximo uma vez a cada INTERVALO_LIMPEZA
+        segundos por processo
+        """
+        with self._lock:
+            if time.monotonic() < self._proxima_limpeza:
+                return
+            self._proxima_limpeza = time.monotonic() + INTERVALO_LIMPEZA
+        try:
+            with self.abrir_sessao() as db:
+                removidas = db.execute(
+                    delete(RequisicaoIdempotente).where(RequisicaoIdempotente.expira_em <= agora)
+                ).rowcount
+                db.commit()
+            logger.debug("Respostas idempotentes expiradas removidas: %d", removidas)
+        except Exception:
+            logger.exception("Falha ao remover as respostas idempotentes expiradas")
+
+armazem = ArmazemIdempotencia()
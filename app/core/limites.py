@@ -0,0 +1,224 @@
+"""
+Limites de taxa com baldes de tokens e de requisições simultâneas.
+
+Cada balde acumula tokens à taxa configurada até a capacidade (rajada); cada
+requisição consome um token de todos os baldes que a cobrem (o do cliente e o do
+cliente na rota) ou de nenhum, se algum estiver vazio. Os baldes ficam em memória,
+por processo, ou no Redis, compartilhados entre processos e servidores.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - depende do ambiente
+    redis = None
+
+# Balde consultado: (chave, taxa em tokens por segundo, capacidade)
+Balde = Tuple[str, float, float]
+
+class Decisao:
+    """
+    Resultado da consulta aos baldes de uma requisição
+    """
+    __slots__ = ("permitido", "espera", "restantes")
+
+    def __init__(self, permitido: bool, espera: float, restantes: int):
+        self.permitido = permitido
+        # Segundos até haver token em todos os baldes (0 se permitido)
+        self.espera = espera
+        # Tokens restantes no balde mais vazio
+        self.restantes = restantes
+
+class BackendMemoria:
+    """
+    Baldes em memória, limitados aos `maximo_chaves` clientes mais recentes
+    """
+
+    def __init__(self, maximo_chaves: int = 100_000):
+        self._baldes: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._maximo_chaves = maximo_chaves
+        self._lock = threading.Lock()
+
+    def consumir(self, baldes: List[Balde], agora: float) -> Decisao:
+        with self._lock:
+            estados = []
+            for chave, taxa, capacidade in baldes:
+                tokens, ultimo = self._baldes.get(chave, (capacidade, agora))
+                tokens = min(capacidade, tokens + (agora - ultimo) * taxa)
+                estados.append((chave, taxa, tokens))
+
+            permitido = all(tokens >= 1 for _, _, tokens in estados)
+            espera = 0.0
+            for chave, taxa, tokens in estados:
+                if permitido:
+                    tokens -= 1
+                elif tokens < 1:
+                    espera = max(espera, (1 - tokens) / taxa if taxa > 0 else float("inf"))
+                self._baldes[chave] = [tokens, agora]
+                self._baldes.move_to_end(chave)
+            while len(self._baldes) > self._maximo_chaves:
+                self._baldes.popitem(last=False)
+            return Decisao(permitido, espera, int(min(tokens for _, _, tokens in estados)) - int(permitido))
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._baldes.clear()
+
+class BackendRedis:
+    """
+    Baldes no Redis, atualizados atomicamente por um script Lua, para que todos os
+    workers e servidores compartilhem os mesmos limites
+    """
+
+    SCRIPT = """
+    local agora = tonumber(ARGV[1])
+    local estados = {}
+    local permitido = 1
+    for i, chave in ipairs(KEYS) do
+        local taxa = tonumber(ARGV[i * 2])
+        local capacidade = tonumber(ARGV[i * 2 + 1])
+        local balde = redis.call('HMGET', chave, 'tokens', 'ultimo')
+        local tokens = tonumber(balde[1]) or capacidade
+        local ultimo = tonumber(balde[2]) or agora
+        tokens = math.min(capacidade, tokens + math.max(0, agora - ultimo) * taxa)
+        if tokens < 1 then permitido = 0 end
+        estados[i] = {tokens, taxa, capacidade}
+    end
+    local espera = 0
+    local restantes = nil
+    for i, chave in ipairs(KEYS) do
+        local tokens, taxa, capacidade = estados[i][1], estados[i][2], estados[i][3]
+        if permitido == 1 then
+            tokens = tokens - 1
+        elseif tokens < 1 and taxa > 0 then
+            espera = math.max(espera, (1 - tokens) / taxa)
+        end
+        redis.call('HSET', chave, 'tokens', tokens, 'ultimo', agora)
+        redis.call('PEXPIRE', chave, math.ceil(capacidade / math.max(taxa, 0.001) * 1000) + 1000)
+        if restantes == nil or tokens < restantes then restantes = tokens end
+    end
+    return {permitido, tostring(espera), math.floor(restantes or 0)}
+    """
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL requer o pacote redis")
+        self._cliente = redis.Redis.from_url(url)
+        self._script = self._cliente.register_script(self.SCRIPT)
+
+    def consumir(self, baldes: List[Balde], agora: float) -> Decisao:
+        argumentos = [agora]
+        for _, taxa, capacidade in baldes:
+            argumentos += [taxa, capacidade]
+        permitido, espera, restantes = self._script(keys=[f"limite:{chave}" for chave, _, _ in baldes], args=argumentos)
+        return Decisao(bool(permitido), float(espera), int(restantes))
+
+    def limpar(self) -> None:
+        for chave in self._cliente.scan_iter("limite:*"):
+            self._cliente.delete(chave)
+
+@lru_cache(maxsize=8)
+def _ler_limites_rotas(texto: str) -> Dict[str, Tuple[float, float]]:
+    limites = {}
+    for item in texto.split(","):
+        if item.strip():
+            rota, valores = item.rsplit("=", 1)
+            taxa, rajada = valores.split(":")
+            limites[rota.strip()] = (float(taxa), float(rajada))
+    return limites
+
+def _limites_rotas() -> Dict[str, Tuple[float, float]]:
+    # Interpretado uma vez para cada valor de RATE_LIMIT_ROTAS, não a cada requisição
+    return _ler_limites_rotas(settings.RATE_LIMIT_ROTAS)
+
+@lru_cache(maxsize=8)
+def _ler_chaves_api(texto: str) -> FrozenSet[str]:
+    return frozenset(chave.strip() for chave in texto.split(",") if chave.strip())
+
+def chaves_api() -> FrozenSet[str]:
+    """
+    Chaves de API aceitas em X-API-Key (CHAVES_API)
+    """
+    return _ler_chaves_api(settings.CHAVES_API)
+
+class LimitadorTaxa:
+    """
+    Limite de taxa por cliente e por cliente em cada rota
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    url = settings.RATE_LIMIT_REDIS_URL
+                    self._backend = BackendRedis(url) if url else BackendMemoria()
+        return self._backend
+
+    def verificar(self, cliente: str, rota: str, agora: Optional[float] = None) -> Decisao:
+        """
+        Consome um token dos baldes do cliente e da rota (identificada por "MÉTODO caminho")
+        """
+        taxa_rota, rajada_rota = _limites_rotas().get(rota, (settings.RATE_LIMIT_ROTA_TAXA, settings.RATE_LIMIT_ROTA_RAJADA))
+        baldes = [
+            (f"cliente:{cliente}", settings.RATE_LIMIT_TAXA, settings.RATE_LIMIT_RAJADA),
+            (f"rota:{cliente}:{rota}", taxa_rota, rajada_rota),
+        ]
+        return self.backend.consumir(baldes, time.time() if agora is None else agora)
+
+    def limpar(self) -> None:
+        """
+        Esvazia o estado dos baldes e volta a ler o backend das configurações
+        """
+        if self._backend is not None:
+            self._backend.limpar()
+        self._backend = None
+
+class LimitadorConcorrencia:
+    """
+    Contagem das requisições em andamento no processo, no total e por cliente
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._por_cliente: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def maximo(self) -> int:
+        return settings.MAX_REQUISICOES_SIMULTANEAS or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+    def adquirir(self, cliente: str) -> Optional[str]:
+        """
+        Registra o início de uma requisição. Retorna o motivo da recusa ("sobrecarga"
+        ou "concorrencia_cliente") ou None se a requisição puder prosseguir.
+        """
+        with self._lock:
+            if self._por_cliente.get(cliente, 0) >= settings.MAX_REQUISICOES_POR_CLIENTE:
+                return "concorrencia_cliente"
+            if self.total >= self.maximo():
+                return "sobrecarga"
+            self.total += 1
+            self._por_cliente[cliente] = self._por_cliente.get(cliente, 0) + 1
+            return None
+
+    def liberar(self, cliente: str) -> None:
+        with self._lock:
+            self.total -= 1
+            restantes = self._por_cliente[cliente] - 1
+            if restantes:
+                self._por_cliente[cliente] = restantes
+            else:
+                del self._por_cliente[cliente]
+
+limitador_taxa = LimitadorTaxa()
+limitador_concorrencia = LimitadorConcorrencia()
@@ -0,0 +1,307 @@
+import bisect
+import glob
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Limites padrão (em segundos) dos histogramas de latência
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+class Metrica:
+    """
+    Base das métricas: guarda valores por combinação de rótulos
+    """
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._valores: Dict[Tuple[str, ...], object] = {}
+
+    def amostras(self) -> Iterable[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def vazia(self) -> "Metrica":
+        """
+        Nova métrica com a mesma definição e sem valores
+        """
+        return type(self)(self.nome, self.ajuda, self.rotulos)
+
+    def exportar(self) -> list:
+        """
+        Valores atuais em formato serializável em JSON
+        """
+        with self._lock:
+            return [[list(chave), valor] for chave, valor in self._valores.items()]
+
+    def combinar(self, chave: Tuple[str, ...], valor, pid: str) -> None:
+        """
+        Soma os valores exportados por outro processo
+        """
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def renderizar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for sufixo, rotulos, valor in self.amostras():
+            linhas.append(f"{self.nome}{sufixo}{rotulos} {_formatar_numero(valor)}")
+        return linhas
+
+class Contador(Metrica):
+    """
+    Valor que só aumenta (ex.: total de requisições)
+    """
+    tipo = "counter"
+
+    def inc(self, *valores_rotulos: str, valor: float = 1.0) -> None:
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0.0) + valor
+
+    def amostras(self):
+        with self._lock:
+            itens = list(self._valores.items())
+        for chave, valor in itens:
+            yield "", _formatar_rotulos(self.rotulos, chave), valor
+
+class Medidor(Metrica):
+    """
+    Valor que pode subir e descer (ex.: requisições em andamento).
+
+    `modo` define como os valores de vários processos são combinados: "soma",
+    "max", "min" ou "todos" (uma série por processo, com o rótulo pid). Medidores
+    descrevem o estado de processos vivos e são descartados quando o processo termina.
+    """
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), modo: str = "soma"):
+        if modo not in ("soma", "max", "min", "todos"):
+            raise ValueError(f"Modo de combinação inválido: {modo}")
+        super().__init__(nome, ajuda, rotulos)
+        self.modo = modo
+
+    def inc(self, *valores_rotulos: str, valor: float = 1.0) -> None:
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0.0) + valor
+
+    def dec(self, *valores_rotulos: str, valor: float = 1.0) -> None:
+        self.inc(*valores_rotulos, valor=-valor)
+
+    def set(self, *valores_rotulos: str, valor: float) -> None:
+        with self._lock:
+            self._valores[valores_rotulos] = valor
+
+    def vazia(self) -> "Medidor":
+        vazia = Medidor(self.nome, self.ajuda, self.rotulos, self.modo)
+        if self.modo == "todos":
+            vazia.rotulos = self.rotulos + ("pid",)
+        return vazia
+
+    def combinar(self, chave: Tuple[str, ...], valor, pid: str) -> None:
+        with self._lock:
+            if self.modo == "todos":
+                self._valores[chave + (pid,)] = valor
+            elif chave not in self._valores or self.modo == "soma":
+                self._valores[chave] = self._valores.get(chave, 0.0) + valor
+            else:
+                self._valores[chave] = (max if self.modo == "max" else min)(self._valores[chave], valor)
+
+    def amostras(self):
+        with self._lock:
+            itens = list(self._valores.items())
+        for chave, valor in itens:
+            yield "", _formatar_rotulos(self.rotulos, chave), valor
+
+class Histograma(Metrica):
+    """
+    Distribuição de valores em faixas cumulativas (ex.: latência)
+    """
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def vazia(self) -> "Histograma":
+        return Histograma(self.nome, self.ajuda, self.rotulos, self.buckets)
+
+    def exportar(self) -> list:
+        with self._lock:
+            return [[list(chave), [list(estado[0]), estado[1], estado[2]]] for chave, estado in self._valores.items()]
+
+    def combinar(self, chave: Tuple[str, ...], valor, pid: str) -> None:
+        contagens, soma, total = valor
+        with self._lock:
+            estado = self._valores.get(chave)
+            if estado is None:
+                estado = self._valores[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            estado[0] = [atual + nova for atual, nova in zip(estado[0], contagens)]
+            estado[1] += soma
+            estado[2] += total
+
+    def observar(self, *valores_rotulos: str, valor: float) -> None:
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            estado = self._valores.get(valores_rotulos)
+            if estado is None:
+                # Contagens por faixa (a última é +Inf), soma e total
+                estado = self._valores[valores_rotulos] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            estado[0][indice] += 1
+            estado[1] += valor
+            estado[2] += 1
+
+    def amostras(self):
+        with self._lock:
+            itens = [(chave, [list(estado[0]), estado[1], estado[2]]) for chave, estado in self._valores.items()]
+        for chave, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += contagem
+                yield "_bucket", _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(limite)}"'), acumulado
+            yield "_sum", _formatar_rotulos(self.rotulos, chave), soma
+            yield "_count", _formatar_rotulos(self.rotulos, chave), total
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas da aplicação, exportadas no formato texto do Prometheus
+    """
+
+    def __init__(self):
+        self.metricas: Dict[str, Metrica] = {}
+        self.coletores: List[Callable[[], None]] = []
+
+    def _registrar(self, metrica: Metrica) -> Metrica:
+        return self.metricas.setdefault(metrica.nome, metrica)
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def medidor(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), modo: str = "soma") -> Medidor:
+        return self._registrar(Medidor(nome, ajuda, rotulos, modo))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_LATENCIA) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, rotulos, buckets))
+
+    def coletor(self, funcao: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registra uma função executada a cada coleta para atualizar métricas derivadas
+        """
+        self.coletores.append(funcao)
+        return funcao
+
+    def renderizar(self, diretorio: Optional[str] = None) -> str:
+        """
+        Métricas deste processo ou, com `diretorio`, combinadas de todos os
+        processos que exportam para ele (veja salvar)
+        """
+        if diretorio:
+            metricas = self._combinar(diretorio)
+        else:
+            for coletor in self.coletores:
+                coletor()
+            metricas = self.metricas
+        linhas: List[str] = []
+        for metrica in metricas.values():
+            linhas.extend(metrica.renderizar())
+        return "\n".join(linhas) + "\n"
+
+    # Modo multiprocesso: cada worker grava periodicamente os seus valores em
+    # <diretorio>/metricas_<pid>.json e qualquer worker combina os arquivos na coleta.
+
+    def salvar(self, diretorio: str, pid: Optional[int] = None) -> None:
+        """
+        Grava os valores deste processo no diretório de métricas compartilhado
+        """
+        for coletor in self.coletores:
+            coletor()
+        dados = {nome: {"tipo": metrica.tipo, "valores": metrica.exportar()} for nome, metrica in self.metricas.items()}
+        _gravar_json(os.path.join(diretorio, f"metricas_{pid or os.getpid()}.json"), dados)
+
+    def _combinar(self, diretorio: str) -> Dict[str, Metrica]:
+        self.salvar(diretorio)
+        combinadas = {nome: metrica.vazia() for nome, metrica in self.metricas.items()}
+        for caminho in sorted(glob.glob(os.path.join(diretorio, "metricas_*.json"))):
+            pid = os.path.basename(caminho)[len("metricas_"):-len(".json")]
+            dados = _ler_json(caminho)
+            for nome, exportada in dados.items():
+                metrica = combinadas.get(nome)
+                if metrica is None:
+                    continue
+                for chave, valor in exportada["valores"]:
+                    metrica.combinar(tuple(chave), valor, pid)
+        return combinadas
+
+    def iniciar_exportacao(self, diretorio: str, intervalo: float) -> threading.Event:
+        """
+        Grava os valores deste processo a cada `intervalo` segundos em uma thread.
+        Retorna um evento que, quando sinalizado, encerra a thread.
+        """
+        parar = threading.Event()
+
+        def exportar():
+            while not parar.wait(intervalo):
+                self.salvar(diretorio)
+
+        threading.Thread(target=exportar, name="exportacao-metricas", daemon=True).start()
+        return parar
+
+def marcar_processo_encerrado(diretorio: str, pid: int) -> None:
+    """
+    Incorpora os contadores e histogramas de um processo encerrado ao arquivo
+    acumulado dos processos encerrados e descarta os seus medidores. Deve ser
+    chamado por um único processo (o master do servidor).
+    """
+    caminho = os.path.join(diretorio, f"metricas_{pid}.json")
+    if not os.path.exists(caminho):
+        return
+    caminho_encerrados = os.path.join(diretorio, "metricas_encerrados.json")
+    acumulado = _ler_json(caminho_encerrados)
+    for nome, exportada in _ler_json(caminho).items():
+        if exportada["tipo"] == Medidor.tipo:
+            continue
+        valores = {tuple(chave): valor for chave, valor in acumulado.get(nome, {}).get("valores", [])}
+        for chave, valor in exportada["valores"]:
+            atual = valores.get(tuple(chave))
+            if atual is None:
+                valores[tuple(chave)] = valor
+            elif exportada["tipo"] == Histograma.tipo:
+                valores[tuple(chave)] = [[a + b for a, b in zip(atual[0], valor[0])], atual[1] + valor[1], atual[2] + valor[2]]
+            else:
+                valores[tuple(chave)] = atual + valor
+        acumulado[nome] = {"tipo": exportada["tipo"], "valores": [[list(chave), valor] for chave, valor in valores.items()]}
+    _gravar_json(caminho_encerrados, acumulado)
+    os.remove(caminho)
+
+def _gravar_json(caminho: str, dados: dict) -> None:
+    # Grava em um arquivo temporário e renomeia, para que a leitura nunca veja um arquivo parcial
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo)
+    os.replace(temporario, caminho)
+
+def _ler_json(caminho: str) -> dict:
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+registro = RegistroMetricas()
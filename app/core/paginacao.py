@@ -0,0 +1,37 @@
+"""
+Cursores opacos da paginação por chave (keyset).
+
+O cursor guarda a chave de ordenação do último item de uma página; a página seguinte
+começa logo após essa chave, sem o custo de OFFSET crescer com a profundidade.
+"""
+import base64
+import json
+from typing import Any, Callable, Dict, List
+
+def codificar_cursor(dados: Dict[str, Any]) -> str:
+    conteudo = json.dumps(dados, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(conteudo).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decodifica um cursor gerado por codificar_cursor. Levanta ValueError se for inválido.
+    """
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+    if not isinstance(dados, dict):
+        raise ValueError("Cursor inválido")
+    return dados
+
+def montar_pagina(itens: List[Any], limit: int, total: int, exato: bool, chave: Callable[[Any], Dict[str, Any]]) -> dict:
+    """
+    Envelope de uma página (schemas.paginacao.Pagina). Há cursor para a próxima página
+    quando esta veio completa; `chave` extrai do último item os dados do cursor.
+    """
+    return {
+        "items": itens,
+        "total": total,
+        "total_exato": exato,
+        "next_cursor": codificar_cursor(chave(itens[-1])) if itens and len(itens) >= limit else None,
+    }
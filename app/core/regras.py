@@ -0,0 +1,265 @@
+import heapq
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.core.validacao import OpcoesValidacao, opcoes_validacao, validar_resposta
+
+class CicloRegrasError(ValueError):
+    """
+    Erro lançado quando as regras condicionais formam um ciclo
+    """
+
+def _texto(valor: Any) -> str:
+    if valor is True:
+        return "Sim"
+    if valor is False:
+        return "Não"
+    return str(valor)
+
+def _numero(valor: Any) -> Optional[float]:
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+def _igual(resposta: Any, valor: Optional[str]) -> bool:
+    if isinstance(resposta, list):
+        return valor in {_texto(item) for item in resposta}
+    return _texto(resposta) == valor
+
+def _contem(resposta: Any, valor: Optional[str]) -> bool:
+    if isinstance(resposta, list):
+        return valor in {_texto(item) for item in resposta}
+    return valor is not None and valor in _texto(resposta)
+
+def _maior(resposta: Any, valor: Optional[str]) -> bool:
+    a, b = _numero(resposta), _numero(valor)
+    return a is not None and b is not None and a > b
+
+def _menor(resposta: Any, valor: Optional[str]) -> bool:
+    a, b = _numero(resposta), _numero(valor)
+    return a is not None and b is not None and a < b
+
+# Operadores suportados pelas regras condicionais
+OPERADORES: Dict[str, Callable[[Any, Optional[str]], bool]] = {
+    "igual": _igual,
+    "diferente": lambda resposta, valor: not _igual(resposta, valor),
+    "contem": _contem,
+    "maior": _maior,
+    "menor": _menor,
+    "respondida": lambda resposta, valor: True,
+}
+
+class RegraCompilada:
+    """
+    Regra "mostrar destino se origem <operador> valor" pronta para avaliação
+    """
+    __slots__ = ("indice", "origem", "destino", "teste", "valor")
+
+    def __init__(self, indice: int, origem: int, destino: int, operador: str, valor: Optional[str]):
+        self.indice = indice
+        self.origem = origem
+        self.destino = destino
+        self.teste = OPERADORES[operador]
+        self.valor = valor
+
+    def dispara(self, resposta: Any) -> bool:
+        return resposta is not None and self.teste(resposta, self.valor)
+
+class GrafoRegras:
+    """
+    Regras condicionais de um formulário compiladas em um grafo acíclico.
+
+    Uma pergunta alvo de regras só fica visível quando ao menos uma delas dispara;
+    as demais perguntas estão sempre visíveis. A resposta de uma pergunta oculta
+    é desconsiderada, o que propaga a ocultação pelas regras que dependem dela.
+    """
+
+    def __init__(self, perguntas: Iterable[dict], regras: Iterable[dict]):
+        self.perguntas: Dict[int, dict] = {pergunta["id"]: pergunta for pergunta in perguntas}
+        self.posicao: Dict[int, int] = {id: indice for indice, id in enumerate(self.perguntas)}
+        self.regras: List[RegraCompilada] = []
+        self.regras_por_origem: Dict[int, List[RegraCompilada]] = {}
+        self.condicionais: Set[int] = set()
+
+        for regra in regras:
+            origem, destino = regra["id_pergunta_origem"], regra["id_pergunta_destino"]
+            if origem not in self.perguntas or destino not in self.perguntas:
+                raise ValueError("Regra referencia pergunta de outro formulário")
+            compilada = RegraCompilada(len(self.regras), origem, destino, regra["operador"], regra.get("valor"))
+            self.regras.append(compilada)
+            self.regras_por_origem.setdefault(origem, []).append(compilada)
+            self.condicionais.add(destino)
+
+        # Valores aceitos das perguntas de escolha, calculados uma vez por conjunto de opções
+        self.opcoes: Dict[int, OpcoesValidacao] = {}
+        por_conjunto: Dict[int, OpcoesValidacao] = {}
+        for id, pergunta in self.perguntas.items():
+            if not pergunta.get("opcoes_respostas_multiplas"):
+                continue
+            conjunto_id = pergunta.get("id_conjunto_opcoes")
+            if conjunto_id is None:
+                self.opcoes[id] = opcoes_validacao(pergunta)
+                continue
+            if conjunto_id not in por_conjunto:
+                por_conjunto[conjunto_id] = opcoes_validacao(pergunta)
+            self.opcoes[id] = por_conjunto[conjunto_id]
+
+        self.ordem = self._ordenar_topologicamente()
+        self.obrigatorias: Set[int] = {id for id, pergunta in self.perguntas.items() if pergunta.get("obrigatoria")}
+
+    @classmethod
+    def de_snapshot(cls, dados: dict) -> "GrafoRegras":
+        """
+        Compila o grafo a partir do conteúdo de uma versão publicada
+        """
+        return cls(dados.get("perguntas", []), dados.get("regras", []))
+
+    def _ordenar_topologicamente(self) -> Dict[int, int]:
+        """
+        Calcula a posição de cada pergunta na ordem topológica (algoritmo de Kahn)
+        """
+        grau_entrada = {id: 0 for id in self.perguntas}
+        for regra in self.regras:
+            grau_entrada[regra.destino] += 1
+
+        fila = [id for id, grau in grau_entrada.items() if grau == 0]
+        ordem: Dict[int, int] = {}
+        while fila:
+            atual = fila.pop()
+            ordem[atual] = len(ordem)
+            for regra in self.regras_por_origem.get(atual, ()):
+                grau_entrada[regra.destino] -= 1
+                if grau_entrada[regra.destino] == 0:
+                    fila.append(regra.destino)
+
+        if len(ordem) != len(self.perguntas):
+            raise CicloRegrasError("As regras condicionais formam um ciclo")
+        return ordem
+
+    def ordenar(self, pergunta_ids: Iterable[int]) -> List[int]:
+        """
+        Ordena perguntas na ordem de exibição do formulário
+        """
+        return sorted(pergunta_ids, key=self.posicao.__getitem__)
+
+    def novo_estado(self, respostas: Optional[Dict[int, Any]] = None) -> "EstadoAvaliacao":
+        """
+        Cria um estado de avaliação, opcionalmente já com respostas aplicadas
+        """
+        estado = EstadoAvaliacao(self)
+        if respostas:
+            estado.aplicar(respostas)
+        return estado
+
+class EstadoAvaliacao:
+    """
+    Visibilidade e obrigatoriedade das perguntas para um conjunto parcial de respostas.
+
+    As alterações são aplicadas de forma incremental: apenas as regras cuja origem
+    foi afetada são reavaliadas, de modo que o custo é proporcional às respostas
+    alteradas e às perguntas cuja visibilidade mudou, e não ao tamanho do formulário.
+    """
+
+    def __init__(self, grafo: GrafoRegras):
+        self.grafo = grafo
+        self.respostas: Dict[int, Any] = {}
+        self.visiveis: Set[int] = set(grafo.perguntas) - grafo.condicionais
+        self.pendentes: Set[int] = grafo.obrigatorias & self.visiveis
+        self._disparadas = [False] * len(grafo.regras)
+        self._contagem: Dict[int, int] = {}
+
+    def copiar(self) -> "EstadoAvaliacao":
+        """
+        Cópia independente do estado, que pode ser alterada sem afetar o original
+        (o grafo, imutável, é compartilhado)
+        """
+        copia = EstadoAvaliacao.__new__(EstadoAvaliacao)
+        copia.grafo = self.grafo
+        copia.respostas = dict(self.respostas)
+        copia.visiveis = set(self.visiveis)
+        copia.pendentes = set(self.pendentes)
+        copia._disparadas = list(self._disparadas)
+        copia._contagem = dict(self._contagem)
+        return copia
+
+    @property
+    def obrigatorias(self) -> Set[int]:
+        """
+        Perguntas obrigatórias atualmente visíveis
+        """
+        return self.grafo.obrigatorias & self.visiveis
+
+    def _atualizar_pendente(self, pergunta_id: int) -> None:
+        if (
+            pergunta_id in self.grafo.obrigatorias
+            and pergunta_id in self.visiveis
+            and self.respostas.get(pergunta_id) in (None, "", [])
+        ):
+            self.pendentes.add(pergunta_id)
+        else:
+            self.pendentes.discard(pergunta_id)
+
+    def aplicar(self, alteracoes: Dict[int, Any]) -> Set[int]:
+        """
+        Aplica respostas alteradas (None remove a resposta) e propaga os efeitos.
+        Retorna o conjunto de perguntas cuja visibilidade mudou.
+        """
+        ordem = self.grafo.ordem
+        fila: List[tuple] = []
+        agendadas: Set[int] = set()
+
+        for pergunta_id, valor in alteracoes.items():
+            if pergunta_id not in self.grafo.perguntas:
+                continue
+            if valor is None:
+                self.respostas.pop(pergunta_id, None)
+            else:
+                self.respostas[pergunta_id] = valor
+            self._atualizar_pendente(pergunta_id)
+            if pergunta_id not in agendadas:
+                agendadas.add(pergunta_id)
+                heapq.heappush(fila, (ordem[pergunta_id], pergunta_id))
+
+        alteradas: Set[int] = set()
+        while fila:
+            _, origem = heapq.heappop(fila)
+            resposta = self.respostas.get(origem) if origem in self.visiveis else None
+            for regra in self.grafo.regras_por_origem.get(origem, ()):
+                dispara = regra.dispara(resposta)
+                if dispara == self._disparadas[regra.indice]:
+                    continue
+                self._disparadas[regra.indice] = dispara
+                destino = regra.destino
+                contagem = self._contagem.get(destino, 0) + (1 if dispara else -1)
+                self._contagem[destino] = contagem
+
+                visivel = contagem > 0
+                if visivel == (destino in self.visiveis):
+                    continue
+                if visivel:
+                    self.visiveis.add(destino)
+                else:
+                    self.visiveis.discard(destino)
+                alteradas ^= {destino}
+                self._atualizar_pendente(destino)
+                if destino not in agendadas:
+                    agendadas.add(destino)
+                    heapq.heappush(fila, (ordem[destino], destino))
+
+        return alteradas
+
+    def validar(self, pergunta_ids: Optional[Iterable[int]] = None) -> Dict[int, str]:
+        """
+        Valida as respostas informadas (ou apenas as indicadas) das perguntas visíveis.
+        Retorna um dicionário com a mensagem de erro por pergunta.
+        """
+        erros: Dict[int, str] = {}
+        ids = self.respostas.keys() if pergunta_ids is None else pergunta_ids
+        for pergunta_id in ids:
+            valor = self.respostas.get(pergunta_id)
+            if valor is None or pergunta_id not in self.visiveis:
+                continue
+            erro = validar_resposta(self.grafo.perguntas[pergunta_id], valor, self.grafo.opcoes.get(pergunta_id))
+            if erro:
+                erros[pergunta_id] = erro
+        return erros
@@ -0,0 +1,282 @@
+"""
+Caixa de saída (transactional outbox) dos eventos de alteração.
+
+Os eventos registrados pelas funções de app/crud (veja app.core.eventos) são gravados
+na tabela evento_saida na mesma transação da alteração: se a alteração for
+confirmada, o evento também é, e vice-versa. O despachante, uma thread em cada
+worker, lê os eventos pendentes em lotes, em ordem de id, entrega cada lote a todos
+os destinos configurados em OUTBOX_DESTINOS e só então os remove.
+
+A entrega é at-least-once: se um destino falhar, o lote inteiro é entregue de novo a
+todos os destinos após um intervalo crescente, e um processo interrompido entre a
+entrega e a remoção reentrega o lote. Os destinos devem tolerar eventos repetidos
+(use o id do evento para descartá-los). No PostgreSQL, os lotes são reservados com
+FOR UPDATE SKIP LOCKED, de modo que vários workers despacham em paralelo sem
+entregar o mesmo lote ao mesmo tempo.
+"""
+import json
+import logging
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metricas import registro
+from app.db.database import SessionLocal
+from app.models.models import EventoSaida
+
+logger = logging.getLogger(__name__)
+
+eventos_entregues = registro.contador(
+    "outbox_events_delivered_total", "Eventos da caixa de saída entregues por destino", ("destino",)
+)
+falhas_entrega = registro.contador(
+    "outbox_delivery_failures_total", "Lotes da caixa de saída cuja entrega falhou, por destino", ("destino",)
+)
+atraso_entrega = registro.histograma(
+    "outbox_delivery_lag_seconds", "Tempo entre a gravação de um evento e a sua entrega",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+# Todos os workers veem a mesma tabela: combinados pelo máximo, não pela soma
+eventos_pendentes = registro.medidor(
+    "outbox_pending_events", "Eventos aguardando entrega na caixa de saída", ("shard",), modo="max"
+)
+atraso_pendentes = registro.medidor(
+    "outbox_lag_seconds", "Idade do evento pendente mais antigo da caixa de saída", ("shard",), modo="max"
+)
+
+def _agora() -> datetime:
+    # Horário UTC sem fuso, igual em todos os bancos
+    return datetime.utcnow()
+
+def saida_ativa() -> bool:
+    """
+    Os eventos são gravados na caixa de saída com OUTBOX_ENABLED e ao menos um destino
+    """
+    return settings.OUTBOX_ENABLED and bool(settings.OUTBOX_DESTINOS.strip())
+
+def gravar_saida(session: Session, eventos: Sequence[dict]) -> None:
+    """
+    Grava os eventos na caixa de saída, na transação da sessão
+    """
+    agora = _agora()
+    session.execute(insert(EventoSaida), [
+        {
+            "id_formulario": evento["formulario_id"],
+            "tipo": evento["tipo"],
+            "conteudo": json.dumps(evento, ensure_ascii=False, separators=(",", ":"), default=str),
+            "criado_em": agora,
+            "disponivel_em": agora,
+            "tentativas": 0,
+        }
+        for evento in eventos
+    ])
+    session.info["saida_gravada"] = True
+
+@event.listens_for(Session, "after_commit")
+def _acordar_despachante(session):
+    if session.info.pop("saida_gravada", False):
+        _novos_eventos.set()
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_marcacao(session, transacao):
+    if transacao.parent is None:
+        session.info.pop("saida_gravada", None)
+
+_novos_eventos = threading.Event()
+
+class Destino:
+    """
+    Destino dos eventos da caixa de saída. `entregar` recebe um lote de eventos, em
+    ordem, e levanta uma exceção se a entrega falhar.
+    """
+    nome = "destino"
+
+    def entregar(self, eventos: List[dict]) -> None:
+        raise NotImplementedError
+
+class DestinoArquivo(Destino):
+    """
+    Acrescenta os eventos a um arquivo, um JSON por linha (para exportação e análise)
+    """
+    nome = "arquivo"
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+
+    def entregar(self, eventos: List[dict]) -> None:
+        with open(self.caminho, "a", encoding="utf-8") as arquivo:
+            for evento in eventos:
+                arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + "\n")
+
+class DestinoWebhook(Destino):
+    """
+    Envia cada lote em um POST JSON ({"eventos": [...]}); respostas diferentes de 2xx
+    são falhas. Sem OUTBOX_WEBHOOK_URL, apenas registra os eventos no log, no lugar
+    de um serviço externo.
+    """
+    nome = "webhook"
+
+    def __init__(self, url: Optional[str], timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def entregar(self, eventos: List[dict]) -> None:
+        corpo = json.dumps({"eventos": eventos}, ensure_ascii=False, default=str).encode("utf-8")
+        if not self.url:
+            logger.info("Webhook (sem URL configurada): %d eventos, %d bytes", len(eventos), len(corpo))
+            return
+        requisicao = urllib.request.Request(
+            self.url, data=corpo, method="POST", headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+            if not 200 <= resposta.status < 300:
+                raise RuntimeError(f"Webhook respondeu {resposta.status}")
+
+def destinos_configurados() -> List[Destino]:
+    """
+    Destinos de OUTBOX_DESTINOS (ex.: "arquivo,webhook")
+    """
+    fabricas = {
+        "arquivo": lambda: DestinoArquivo(settings.OUTBOX_ARQUIVO),
+        "webhook": lambda: DestinoWebhook(settings.OUTBOX_WEBHOOK_URL),
+    }
+    destinos = []
+    for nome in (parte.strip() for parte in settings.OUTBOX_DESTINOS.split(",")):
+        if not nome:
+            continue
+        if nome not in fabricas:
+            raise ValueError(f"Destino da caixa de saída desconhecido: {nome}")
+        destinos.append(fabricas[nome]())
+    return destinos
+
+def despachar_lote(db: Session, destinos: Sequence[Destino], tamanho: Optional[int] = None) -> int:
+    """
+    Entrega aos destinos um lote de eventos pendentes e os remove. Retorna o número de
+    eventos entregues; após uma falha, adia o lote e retorna 0.
+    """
+    agora = _agora()
+    consulta = (
+        select(EventoSaida.id, EventoSaida.conteudo, EventoSaida.criado_em, EventoSaida.tentativas)
+        .where(EventoSaida.disponivel_em <= agora)
+        .order_by(EventoSaida.id)
+        .limit(tamanho or settings.OUTBOX_LOTE)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        consulta = consulta.with_for_update(skip_locked=True)
+    linhas = db.execute(consulta).all()
+    if not linhas:
+        db.rollback()
+        return 0
+
+    ids = [linha.id for linha in linhas]
+    eventos = [json.loads(linha.conteudo) for linha in linhas]
+    for destino in destinos:
+        try:
+            destino.entregar(eventos)
+        except Exception:
+            logger.exception("Falha ao entregar %d eventos ao destino %s", len(eventos), destino.nome)
+            falhas_entrega.inc(destino.nome)
+            espera = min(2 ** max(linha.tentativas for linha in linhas), settings.OUTBOX_ESPERA_MAXIMA)
+            db.execute(
+                update(EventoSaida)
+                .where(EventoSaida.id.in_(ids))
+                .values(tentativas=EventoSaida.tentativas + 1, disponivel_em=agora + timedelta(seconds=espera))
+            )
+            db.commit()
+            return 0
+        eventos_entregues.inc(destino.nome, valor=len(eventos))
+
+    db.execute(delete(EventoSaida).where(EventoSaida.id.in_(ids)))
+    db.commit()
+    entregue = _agora()
+    for linha in linhas:
+        atraso_entrega.observar(valor=(entregue - linha.criado_em).total_seconds())
+    return len(linhas)
+
+def medir_pendentes(db: Session, shard: str) -> None:
+    """
+    Atualiza as métricas de eventos pendentes e da idade do mais antigo
+    """
+    total, mais_antigo = db.execute(select(func.count(), func.min(EventoSaida.criado_em))).one()
+    db.rollback()
+    eventos_pendentes.set(shard, valor=total)
+    atraso_pendentes.set(shard, valor=(_agora() - mais_antigo).total_seconds() if mais_antigo else 0.0)
+
+class DespachanteSaida(threading.Thread):
+    """
+    Thread que despacha a caixa de saída de cada banco (o principal e os shards):
+    logo após um commit local com eventos ou, no máximo, a cada OUTBOX_INTERVALO
+    segundos, para os eventos gravados por outros processos.
+    """
+
+    def __init__(self, engines: Dict[str, Engine], destinos: Sequence[Destino]):
+        super().__init__(name="despachante-saida", daemon=True)
+        self.engines = engines
+        self.destinos = list(destinos)
+        self._parar = threading.Event()
+
+    def despachar(self) -> int:
+        """
+        Esvazia as caixas de saída, lote a lote. Retorna o número de eventos entregues.
+        """
+        total = 0
+        for shard, engine in self.engines.items():
+            with SessionLocal(bind=engine, info={"shard": shard}) as db:
+                while not self._parar.is_set():
+                    entregues = despachar_lote(db, self.destinos)
+                    total += entregues
+                    if entregues < settings.OUTBOX_LOTE:
+                        break
+                medir_pendentes(db, shard)
+        return total
+
+    def run(self) -> None:
+        while not self._parar.is_set():
+            _novos_eventos.clear()
+            try:
+                self.despachar()
+            except Exception:
+                logger.exception("Falha ao despachar a caixa de saída")
+            _novos_eventos.wait(settings.OUTBOX_INTERVALO)
+
+    def parar(self) -> None:
+        self._parar.set()
+        _novos_eventos.set()
+
+def criar_despachante() -> DespachanteSaida:
+    """
+    Despachante das caixas de saída do banco principal e dos shards
+    """
+    from app.db.database import get_engine
+    from app.db.shards import SHARD_PADRAO, get_shards
+
+    return DespachanteSaida({SHARD_PADRAO: get_engine(), **get_shards()}, destinos_configurados())
+
+def iniciar_saida() -> Optional[DespachanteSaida]:
+    """
+    Inicia o despachante da caixa de saída, com a caixa de saída ativa (veja
+    saida_ativa) e OUTBOX_DESPACHANTE_ENABLED. Chamado no lifespan de cada worker.
+    """
+    if not (saida_ativa() and settings.OUTBOX_DESPACHANTE_ENABLED):
+        return None
+    despachante = criar_despachante()
+    despachante.start()
+    return despachante
+
+if __name__ == "__main__":
+    # Despachante em um processo separado dos workers
+    logging.basicConfig(level=logging.INFO)
+    despachante = criar_despachante()
+    despachante.start()
+    try:
+        while despachante.is_alive():
+            despachante.join(timeout=1.0)
+    except KeyboardInterrupt:
+        despachante.parar()
+        despachante.join()
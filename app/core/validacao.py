@@ -0,0 +1,92 @@
+from decimal import Decimal, InvalidOperation
+from typing import Any, FrozenSet, NamedTuple, Optional
+
+from app.models.tipos import TipoPergunta
+
+def _tipo_da_pergunta(nome: Optional[str]) -> TipoPergunta:
+    """
+    Tipo pelo nome gravado no conteúdo das versões. As grafias antigas são resolvidas
+    pelo próprio enum; nomes desconhecidos são validados como texto livre.
+    """
+    try:
+        return TipoPergunta(nome)
+    except ValueError:
+        return TipoPergunta.TEXTO_LIVRE
+
+class OpcoesValidacao(NamedTuple):
+    """
+    Valores aceitos em uma pergunta de escolha (id ou texto de cada opção) e se
+    alguma opção aceita resposta aberta
+    """
+    valores: FrozenSet[Any]
+    aberta: bool
+
+def opcoes_validacao(pergunta: dict) -> OpcoesValidacao:
+    """
+    Valores aceitos a partir das opções da pergunta
+    """
+    valores = set()
+    aberta = False
+    for opcao in pergunta.get("opcoes_respostas_multiplas") or []:
+        valores.add(opcao["id"])
+        if opcao.get("resposta") is not None:
+            valores.add(opcao["resposta"])
+        aberta = aberta or bool(opcao.get("resposta_aberta"))
+    return OpcoesValidacao(frozenset(valores), aberta)
+
+def _validar_escolha(opcoes: OpcoesValidacao, valor: Any) -> Optional[str]:
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+        return "Resposta deve ser o id ou o texto de uma opção"
+    if valor not in opcoes.valores and not (isinstance(valor, str) and opcoes.aberta):
+        return "Opção de resposta inválida"
+    return None
+
+def validar_resposta(pergunta: dict, valor: Any, opcoes: Optional[OpcoesValidacao] = None) -> Optional[str]:
+    """
+    Valida o valor de uma resposta de acordo com o tipo da pergunta.
+    Retorna a mensagem de erro ou None se a resposta for válida.
+
+    `opcoes` são os valores aceitos já calculados para a pergunta (veja
+    GrafoRegras.opcoes); sem eles, são calculados a partir da pergunta.
+    """
+    tipo = _tipo_da_pergunta(pergunta.get("tipo_pergunta"))
+
+    if tipo is TipoPergunta.SIM_NAO:
+        if isinstance(valor, bool) or valor in ("Sim", "Não"):
+            return None
+        return "Resposta deve ser 'Sim' ou 'Não'"
+
+    if tipo is TipoPergunta.UNICA_ESCOLHA:
+        return _validar_escolha(opcoes or opcoes_validacao(pergunta), valor)
+
+    if tipo is TipoPergunta.MULTIPLA_ESCOLHA:
+        if not isinstance(valor, list):
+            return "Resposta deve ser uma lista de opções"
+        opcoes = opcoes or opcoes_validacao(pergunta)
+        for item in valor:
+            erro = _validar_escolha(opcoes, item)
+            if erro:
+                return erro
+        return None
+
+    if tipo is TipoPergunta.INTEIRO:
+        if isinstance(valor, bool):
+            return "Resposta deve ser um número inteiro"
+        if isinstance(valor, int) or (isinstance(valor, str) and valor.lstrip("-").isdigit()):
+            return None
+        return "Resposta deve ser um número inteiro"
+
+    if tipo is TipoPergunta.NUMERO_DECIMAL:
+        if isinstance(valor, bool) or not isinstance(valor, (int, float, str)):
+            return "Resposta deve ser um número"
+        try:
+            numero = Decimal(str(valor))
+        except InvalidOperation:
+            return "Resposta deve ser um número"
+        if not numero.is_finite() or numero.as_tuple().exponent < -2:
+            return "Resposta deve ter no máximo duas casas decimais"
+        return None
+
+    if not isinstance(valor, str):
+        return "Resposta deve ser um texto"
+    return None
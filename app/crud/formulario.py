@@ -1,57 +1,226 @@
+from sqlalchemy import Integer, and_, func, insert, literal, or_, select, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.models import Formulario
-from app.schemas.formulario import FormularioCreate, FormularioUpdate
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.core.eventos import registrar_evento
+from app.models.models import Formulario, OpcaoResposta, Pergunta, RegraCondicional
+from app.schemas.formulario import Formulario as FormularioSchema, FormularioCreate, FormularioUpdate
 
-def get_formulario(db: Session, formulario_id: int):
+def get_formulario(db: Session, formulario_id: int, tenant: Optional[str] = None):
     """
-    Obtém um formulário pelo ID
+    Obtém um formulário pelo ID, opcionalmente restrito a um tenant
     """
-    return db.query(Formulario).filter(Formulario.id == formulario_id).first()
+    query = db.query(Formulario).filter(Formulario.id == formulario_id)
+    if tenant is not None:
+        query = query.filter(Formulario.tenant == tenant)
+    return query.first()
 
-def get_formularios(db: Session, skip: int = 0, limit: int = 100):
+def get_formularios(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    tenant: Optional[str] = None,
+    apos: Optional[Tuple[int, str]] = None,
+):
     """
-    Obtém uma lista de formulários com paginação
+    Obtém uma lista de formulários com paginação, opcionalmente restrita a um tenant.
+    `apos` é a chave (id, tenant) do último formulário da página anterior.
     """
-    return db.query(Formulario).offset(skip).limit(limit).all()
+    limit = min(limit, settings.PAGINACAO_LIMITE_MAXIMO)
+    query = db.query(Formulario)
+    if tenant is not None:
+        query = query.filter(Formulario.tenant == tenant)
+    if apos is not None:
+        ultimo_id, ultimo_tenant = apos
+        query = query.filter(or_(
+            Formulario.id > ultimo_id, and_(Formulario.id == ultimo_id, Formulario.tenant > ultimo_tenant)
+        ))
+    return query.order_by(Formulario.id, Formulario.tenant).offset(skip).limit(limit).all()
 
-def create_formulario(db: Session, formulario: FormularioCreate):
+def contagem_formularios(tenant: Optional[str] = None):
     """
-    Cria um novo formulário
+    Consulta dos formulários, sem ordenação nem paginação, para contar o total
     """
-    db_formulario = Formulario(**formulario.model_dump())
+    stmt = select(Formulario.id)
+    if tenant is not None:
+        stmt = stmt.where(Formulario.tenant == tenant)
+    return stmt
+
+def _dados_formulario(db_formulario: Formulario) -> dict:
+    """
+    Formulário no formato das respostas, para os eventos de alteração
+    """
+    return FormularioSchema.model_validate(db_formulario, from_attributes=True).model_dump(mode="json")
+
+def create_formulario(db: Session, formulario: FormularioCreate, tenant: Optional[str] = None):
+    """
+    Cria um novo formulário para o tenant informado
+    """
+    db_formulario = Formulario(**formulario.model_dump(), tenant=tenant or settings.TENANT_PADRAO)
     db.add(db_formulario)
+    db.flush()
+    registrar_evento(db, db_formulario.id, "formulario_criado", lambda: _dados_formulario(db_formulario))
     db.commit()
     db.refresh(db_formulario)
     return db_formulario
 
-def update_formulario(db: Session, formulario_id: int, formulario: FormularioUpdate):
+def update_formulario(db: Session, formulario_id: int, formulario: FormularioUpdate, tenant: Optional[str] = None):
     """
     Atualiza um formulário existente
     """
-    db_formulario = get_formulario(db, formulario_id)
+    db_formulario = get_formulario(db, formulario_id, tenant)
     if db_formulario:
         update_data = formulario.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_formulario, key, value)
+        registrar_evento(db, formulario_id, "formulario_atualizado", lambda: _dados_formulario(db_formulario))
         db.commit()
         db.refresh(db_formulario)
     return db_formulario
 
-def delete_formulario(db: Session, formulario_id: int):
+def delete_formulario(db: Session, formulario_id: int, tenant: Optional[str] = None):
     """
     Exclui um formulário pelo ID e todas as suas perguntas relacionadas
     """
-    from app.models.models import Pergunta
+    from app.models.models import FormularioVersao, Submissao, RespostaSubmissao
+    from app.crud.versao import invalidar_cache
+    from app.crud.submissao import cache_estados
+    from app.db.shards import shard_da_sessao
     
     # Verificar se o formulário existe
-    db_formulario = get_formulario(db, formulario_id)
+    db_formulario = get_formulario(db, formulario_id, tenant)
+    shard = shard_da_sessao(db)
     if db_formulario:
-        # Excluir todas as perguntas relacionadas ao formulário
+        # Excluir as submissões e suas respostas
+        submissoes = [id for (id,) in db.query(Submissao.id).filter(Submissao.id_formulario == formulario_id)]
+        for submissao_id in submissoes:
+            cache_estados.invalidar((shard, submissao_id))
+        db.query(RespostaSubmissao).filter(RespostaSubmissao.id_submissao.in_(submissoes)).delete(synchronize_session=False)
+        db.query(Submissao).filter(Submissao.id_formulario == formulario_id).delete()
+        
+        # Excluir as regras condicionais e todas as perguntas relacionadas ao formulário
+        db.query(RegraCondicional).filter(RegraCondicional.id_formulario == formulario_id).delete()
+        perguntas = db.query(Pergunta.id).filter(Pergunta.id_formulario == formulario_id).scalar_subquery()
+        db.query(OpcaoResposta).filter(OpcaoResposta.id_pergunta.in_(perguntas)).delete(synchronize_session=False)
         db.query(Pergunta).filter(Pergunta.id_formulario == formulario_id).delete()
         
+        # Excluir as versões publicadas e removê-las do cache
+        versoes = db.query(FormularioVersao.versao).filter(FormularioVersao.id_formulario == formulario_id).all()
+        for (versao,) in versoes:
+            invalidar_cache(formulario_id, versao, shard)
+        db.query(FormularioVersao).filter(FormularioVersao.id_formulario == formulario_id).delete()
+        
         # Excluir o formulário
+        # Os demais workers invalidam os seus caches ao receber o evento (veja app.core.eventos)
+        registrar_evento(db, formulario_id, "formulario_excluido", {
+            "id": formulario_id, "versoes": [versao for (versao,) in versoes], "submissoes": submissoes,
+        })
         db.delete(db_formulario)
         db.commit()
         return True
     return False
+
+# Colunas copiadas na clonagem; as demais (ids e id_formulario) são remapeadas
+COLUNAS_PERGUNTA = (
+    "titulo", "codigo", "orientacao_resposta", "ordem", "obrigatoria", "sub_pergunta",
+    "tipo_pergunta", "id_conjunto_opcoes",
+)
+
+def _mapa_perguntas(db: Session, formulario_id: int):
+    """
+    CTE (antigo, novo) com o id de cada pergunta do formulário e o id da sua cópia,
+    ou None se o formulário não tiver perguntas. A n-ésima pergunta de origem (pelo id)
+    recebe o n-ésimo id reservado.
+
+    No PostgreSQL, os ids são reservados com nextval, sem bloquear a tabela: podem não
+    ser consecutivos se houver inserções concorrentes, por isso o mapeamento é passado
+    ao banco como dois arrays. No SQLite, a transação já detém o bloqueio de escrita e
+    os ids seguem o maior id atual.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        antigos = db.execute(
+            select(Pergunta.id).where(Pergunta.id_formulario == formulario_id).order_by(Pergunta.id)
+        ).scalars().all()
+        if not antigos:
+            return None
+        novos = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('pergunta', 'id')) FROM generate_series(1, :quantidade)"),
+            {"quantidade": len(antigos)},
+        ).scalars().all()
+        pares = func.unnest(
+            literal(antigos, postgresql.ARRAY(Integer)), literal(sorted(novos), postgresql.ARRAY(Integer))
+        ).table_valued("antigo", "novo")
+        return select(pares.c.antigo, pares.c.novo).cte("mapa_perguntas")
+
+    quantidade = db.execute(
+        select(func.count()).select_from(Pergunta).where(Pergunta.id_formulario == formulario_id)
+    ).scalar()
+    if not quantidade:
+        return None
+    primeiro = (db.execute(select(func.max(Pergunta.id))).scalar() or 0) + 1
+    return (
+        select(
+            Pergunta.id.label("antigo"),
+            (literal(primeiro - 1) + func.row_number().over(order_by=Pergunta.id)).label("novo"),
+        )
+        .where(Pergunta.id_formulario == formulario_id)
+        .cte("mapa_perguntas")
+    )
+
+def clonar_formulario(
+    db: Session, formulario_id: int, tenant: Optional[str] = None, titulo: Optional[str] = None
+) -> Optional[Formulario]:
+    """
+    Copia um formulário, suas perguntas, as opções de cada pergunta e as regras
+    condicionais em uma transação, com um INSERT ... SELECT por tabela.
+
+    Os ids das perguntas são remapeados no banco: a n-ésima pergunta de origem (pelo
+    id) recebe o n-ésimo id reservado (veja _mapa_perguntas), e as opções e as regras
+    usam o mesmo mapeamento. Os conjuntos de opções são compartilhados, não copiados.
+    Versões publicadas e submissões não são copiadas.
+    """
+    origem = get_formulario(db, formulario_id, tenant)
+    if origem is None:
+        return None
+
+    novo_id = db.execute(
+        insert(Formulario)
+        .from_select(
+            ["titulo", "descricao", "ordem", "tenant"],
+            select(
+                literal(titulo) if titulo is not None else Formulario.titulo,
+                Formulario.descricao, Formulario.ordem, Formulario.tenant,
+            ).where(Formulario.id == formulario_id),
+        )
+        .returning(Formulario.id)
+    ).scalar_one()
+
+    mapa = _mapa_perguntas(db, formulario_id)
+    if mapa is not None:
+        db.execute(insert(Pergunta).from_select(
+            ["id", "id_formulario", *COLUNAS_PERGUNTA],
+            select(mapa.c.novo, literal(novo_id), *(Pergunta.__table__.c[coluna] for coluna in COLUNAS_PERGUNTA))
+            .join(mapa, mapa.c.antigo == Pergunta.id),
+        ))
+        db.execute(insert(OpcaoResposta).from_select(
+            ["id_opcao_resposta", "id_pergunta"],
+            select(OpcaoResposta.id_opcao_resposta, mapa.c.novo)
+            .join(mapa, mapa.c.antigo == OpcaoResposta.id_pergunta)
+            .order_by(OpcaoResposta.id),
+        ))
+
+        mapa_origem, mapa_destino = mapa.alias("mapa_origem"), mapa.alias("mapa_destino")
+        db.execute(insert(RegraCondicional).from_select(
+            ["id_formulario", "id_pergunta_origem", "operador", "valor", "id_pergunta_destino"],
+            select(literal(novo_id), mapa_origem.c.novo, RegraCondicional.operador, RegraCondicional.valor, mapa_destino.c.novo)
+            .join(mapa_origem, mapa_origem.c.antigo == RegraCondicional.id_pergunta_origem)
+            .join(mapa_destino, mapa_destino.c.antigo == RegraCondicional.id_pergunta_destino)
+            .where(RegraCondicional.id_formulario == formulario_id)
+            .order_by(RegraCondicional.id),
+        ))
+
+    db_formulario = get_formulario(db, novo_id)
+    registrar_evento(db, novo_id, "formulario_criado", lambda: {**_dados_formulario(db_formulario), "origem": formulario_id})
+    db.commit()
+    return db_formulario
@@ -0,0 +1,127 @@
+"""
+Conjuntos de opções de resposta.
+
+Perguntas com as mesmas opções (um "Sim/Não", uma escala Likert) referenciam um
+único conjunto, identificado pelo hash do seu conteúdo. Como os conjuntos não são
+alterados depois de criados, as suas opções ficam em cache por shard e id: cada
+conjunto é lido do banco uma vez por processo, não uma vez por pergunta.
+"""
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import CacheLRU
+from app.db.shards import shard_da_sessao
+from app.models.models import ConjuntoOpcoes, OpcoesRespostas, Pergunta
+from app.schemas.pergunta import OpcoesRespostas as OpcoesRespostasSchema
+
+# Opções de cada conjunto, já no formato das respostas; (shard, id) -> tupla de opções
+cache_conjuntos = CacheLRU("conjuntos_opcoes", tamanho_maximo=4096)
+
+def normalizar_opcoes(opcoes: Iterable[dict]) -> List[dict]:
+    """
+    Campos de conteúdo das opções, na ordem do conjunto (pela ordem e, no empate,
+    pela posição informada)
+    """
+    normalizadas = [
+        {
+            "resposta": opcao.get("resposta"),
+            "ordem": opcao.get("ordem") or 0,
+            "resposta_aberta": bool(opcao.get("resposta_aberta")),
+        }
+        for opcao in opcoes
+    ]
+    normalizadas.sort(key=lambda opcao: opcao["ordem"])
+    return normalizadas
+
+def hash_opcoes(opcoes: List[dict]) -> str:
+    """
+    Hash do conteúdo de opções normalizadas (veja normalizar_opcoes)
+    """
+    canonico = json.dumps(
+        [[opcao["resposta"], opcao["ordem"], opcao["resposta_aberta"]] for opcao in opcoes],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+
+def get_conjunto(db: Session, conjunto_id: int) -> Optional[ConjuntoOpcoes]:
+    """
+    Obtém um conjunto de opções pelo ID, com as suas opções
+    """
+    return (
+        db.query(ConjuntoOpcoes)
+        .options(selectinload(ConjuntoOpcoes.opcoes))
+        .filter(ConjuntoOpcoes.id == conjunto_id)
+        .first()
+    )
+
+def obter_conjunto(db: Session, opcoes: Iterable[dict], nome: Optional[str] = None) -> ConjuntoOpcoes:
+    """
+    Obtém o conjunto com as opções informadas, criando-o se ainda não existir.
+    O nome só é usado na criação. Não faz commit.
+    """
+    normalizadas = normalizar_opcoes(opcoes)
+    hash_conteudo = hash_opcoes(normalizadas)
+    conjunto = db.query(ConjuntoOpcoes).filter(ConjuntoOpcoes.hash == hash_conteudo).first()
+    if conjunto is not None:
+        return conjunto
+
+    try:
+        # Em um savepoint: se outra transação criar o mesmo conjunto, usa o dela
+        with db.begin_nested():
+            conjunto = ConjuntoOpcoes(
+                nome=nome, hash=hash_conteudo, opcoes=[OpcoesRespostas(**opcao) for opcao in normalizadas]
+            )
+            db.add(conjunto)
+    except IntegrityError:
+        conjunto = db.query(ConjuntoOpcoes).filter(ConjuntoOpcoes.hash == hash_conteudo).one()
+    return conjunto
+
+def create_conjunto(db: Session, opcoes: Iterable[dict], nome: Optional[str] = None) -> ConjuntoOpcoes:
+    """
+    Obtém ou cria o conjunto com as opções informadas e faz commit
+    """
+    conjunto = obter_conjunto(db, opcoes, nome)
+    db.commit()
+    return get_conjunto(db, conjunto.id)
+
+def opcoes_dos_conjuntos(db: Session, conjunto_ids: Iterable[int]) -> Dict[int, tuple]:
+    """
+    Opções de cada conjunto, do cache ou, para os conjuntos ausentes, de uma única consulta
+    """
+    shard = shard_da_sessao(db)
+    conjuntos, faltantes = {}, []
+    for conjunto_id in conjunto_ids:
+        opcoes = cache_conjuntos.get((shard, conjunto_id))
+        if opcoes is None:
+            faltantes.append(conjunto_id)
+        else:
+            conjuntos[conjunto_id] = opcoes
+
+    if faltantes:
+        carregadas: Dict[int, list] = {conjunto_id: [] for conjunto_id in faltantes}
+        linhas = db.execute(
+            select(OpcoesRespostas.__table__)
+            .where(OpcoesRespostas.id_conjunto.in_(faltantes))
+            .order_by(OpcoesRespostas.id_conjunto, OpcoesRespostas.ordem, OpcoesRespostas.id)
+        ).mappings()
+        for linha in linhas:
+            carregadas[linha["id_conjunto"]].append(OpcoesRespostasSchema.model_validate(dict(linha)))
+        for conjunto_id, opcoes in carregadas.items():
+            conjuntos[conjunto_id] = tuple(opcoes)
+            cache_conjuntos.set((shard, conjunto_id), conjuntos[conjunto_id])
+    return conjuntos
+
+def carregar_opcoes(db: Session, perguntas: Sequence[Pergunta]) -> None:
+    """
+    Anexa às perguntas as opções dos seus conjuntos (Pergunta.opcoes_respostas_multiplas)
+    """
+    conjuntos = opcoes_dos_conjuntos(
+        db, {pergunta.id_conjunto_opcoes for pergunta in perguntas if pergunta.id_conjunto_opcoes is not None}
+    )
+    for pergunta in perguntas:
+        pergunta._opcoes_anexadas = (pergunta.id_conjunto_opcoes, conjuntos.get(pergunta.id_conjunto_opcoes, ()))
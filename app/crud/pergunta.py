@@ -1,105 +1,323 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
-from typing import List, Optional, Dict, Any
-from app.models.models import Pergunta, OpcaoResposta, OpcoesRespostas
-from app.schemas.pergunta import PerguntaCreate, PerguntaUpdate
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, delete, func, insert, lambda_stmt, or_, select, update
+from typing import List, Optional, Dict, Any, Tuple
+from app.core.config import settings
+from app.core.eventos import registrar_evento
+from app.crud.opcoes import carregar_opcoes, get_conjunto, normalizar_opcoes, obter_conjunto
+from app.models.models import ConjuntoOpcoes, Formulario, Pergunta, OpcaoResposta, RegraCondicional
+from app.models.tipos import TipoPergunta
+from app.schemas.pergunta import (
+    OpcoesRespostas as OpcoesRespostasSchema, OpcoesRespostasItem, Pergunta as PerguntaSchema, PerguntaCreate,
+    PerguntaFiltroLote, PerguntaUpdate, PerguntaUpdateLote,
+)
+
+# Carrega as opções junto com as perguntas, evitando uma consulta por pergunta (N+1)
+# ao serializar as respostas com response_model=Pergunta. As opções dos conjuntos
+# (opcoes_respostas_multiplas) são anexadas depois por carregar_opcoes, a partir do cache.
+CARREGAR_OPCOES = (
+    selectinload(Pergunta.opcoes_respostas),
+)
 
 def get_pergunta(db: Session, pergunta_id: int):
     """
     Obtém uma pergunta pelo ID
     """
-    return db.query(Pergunta).filter(Pergunta.id == pergunta_id).first()
+    db_pergunta = db.query(Pergunta).options(*CARREGAR_OPCOES).filter(Pergunta.id == pergunta_id).first()
+    if db_pergunta is not None:
+        carregar_opcoes(db, [db_pergunta])
+    return db_pergunta
+
+# Campos aceitos em sort_by. Cada um é servido pelo índice (id_formulario, campo, id)
+# declarado em Pergunta, usado nas listagens das perguntas de um formulário.
+ORDENACOES = {
+    "ordem": Pergunta.ordem,
+    "id": Pergunta.id,
+    "titulo": Pergunta.titulo,
+    "codigo": Pergunta.codigo,
+    "tipo_pergunta": Pergunta.tipo_pergunta,
+}
+DIRECOES = ("asc", "desc")
+
+def interpretar_ordenacao(
+    sort: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = None,
+) -> Tuple[str, str]:
+    """
+    Obtém o campo e a direção da ordenação a partir de sort ("campo:direcao") ou,
+    na sua ausência, de sort_by e sort_order. Levanta ValueError se o campo não
+    estiver em ORDENACOES ou a direção for inválida.
+    """
+    if sort:
+        campo, _, direcao = sort.partition(":")
+    else:
+        campo, direcao = sort_by or "ordem", sort_order or "asc"
+    campo, direcao = campo.strip(), (direcao.strip() or "asc").lower()
+    if campo not in ORDENACOES:
+        raise ValueError(f"Ordenação inválida: {campo}. Use um de: {', '.join(ORDENACOES)}")
+    if direcao not in DIRECOES:
+        raise ValueError(f"Direção de ordenação inválida: {direcao}. Use asc ou desc")
+    return campo, direcao
+
+def _clausulas_ordenacao(campo: str, direcao: str) -> tuple:
+    """
+    ORDER BY de uma ordenação, desempatado pelo id. Os nulos ficam no fim em ordem
+    crescente e no início em ordem decrescente, como na leitura do índice nos dois sentidos.
+    """
+    coluna = ORDENACOES[campo]
+    if direcao == "desc":
+        return (coluna.desc().nulls_first(), Pergunta.id.desc())
+    return (coluna.asc().nulls_last(), Pergunta.id.asc())
 
-def get_perguntas(
-    db: Session, 
+def valor_ordenacao(pergunta: Pergunta, campo: str) -> Any:
+    """
+    Valor de `campo` na ordem usada pelo banco: o tipo da pergunta é ordenado pelo
+    código gravado, não pelo nome
+    """
+    valor = getattr(pergunta, campo)
+    return valor.codigo if isinstance(valor, TipoPergunta) else valor
+
+# Ordenações pré-construídas: a instrução abaixo referencia sempre os mesmos objetos,
+# o que mantém a chave do cache de instruções estável
+CLAUSULAS_ORDENACAO = {
+    (campo, direcao): _clausulas_ordenacao(campo, direcao) for campo in ORDENACOES for direcao in DIRECOES
+}
+
+def consulta_perguntas(
     skip: int = 0, 
     limit: int = 100, 
     formulario_id: Optional[int] = None,
-    tipo_pergunta: Optional[str] = None,
+    tipo_pergunta: Optional[TipoPergunta] = None,
     obrigatoria: Optional[bool] = None,
     sub_pergunta: Optional[bool] = None,
     sort_by: str = "ordem",
-    sort_order: str = "asc"
+    sort_order: str = "asc",
+    tenant: Optional[str] = None,
+    apos: Optional[Tuple[Any, int]] = None
 ):
     """
-    Obtém uma lista de perguntas com filtros, ordenação e paginação
+    Monta a consulta das perguntas com lambda_stmt: a construção e a compilação do
+    SQL ficam em cache por combinação de filtros, e os valores entram como parâmetros.
+
+    `apos` é a chave de ordenação (valor do campo, id) da última pergunta da página
+    anterior: a consulta começa logo depois dela (paginação por chave).
     """
-    query = db.query(Pergunta)
+    campo, direcao = interpretar_ordenacao(sort_by=sort_by, sort_order=sort_order)
+    ordenacao = CLAUSULAS_ORDENACAO[(campo, direcao)]
+    limit = min(limit, settings.PAGINACAO_LIMITE_MAXIMO)
+
+    stmt = lambda_stmt(lambda: select(Pergunta).options(*CARREGAR_OPCOES))
+    
+    if tenant is not None:
+        stmt += lambda s: s.join(Pergunta.formulario).where(Formulario.tenant == tenant)
     
     # Aplicar filtros
     if formulario_id is not None:
-        query = query.filter(Pergunta.id_formulario == formulario_id)
+        stmt += lambda s: s.where(Pergunta.id_formulario == formulario_id)
     
     if tipo_pergunta is not None:
-        query = query.filter(Pergunta.tipo_pergunta == tipo_pergunta)
+        stmt += lambda s: s.where(Pergunta.tipo_pergunta == tipo_pergunta)
     
     if obrigatoria is not None:
-        query = query.filter(Pergunta.obrigatoria == obrigatoria)
+        stmt += lambda s: s.where(Pergunta.obrigatoria == obrigatoria)
     
     if sub_pergunta is not None:
-        query = query.filter(Pergunta.sub_pergunta == sub_pergunta)
+        stmt += lambda s: s.where(Pergunta.sub_pergunta == sub_pergunta)
     
-    # Aplicar ordenação
-    if sort_order.lower() == "desc":
-        query = query.order_by(desc(getattr(Pergunta, sort_by)))
-    else:
-        query = query.order_by(asc(getattr(Pergunta, sort_by)))
+    if apos is not None:
+        # Continua a partir da chave informada, na ordem de _clausulas_ordenacao
+        # (nulos no fim em ordem crescente e no início em ordem decrescente)
+        coluna, (valor, ultimo_id) = ORDENACOES[campo], apos
+        if direcao == "asc" and valor is None:
+            stmt += lambda s: s.where(coluna.is_(None), Pergunta.id > ultimo_id)
+        elif direcao == "asc":
+            stmt += lambda s: s.where(
+                or_(coluna > valor, and_(coluna == valor, Pergunta.id > ultimo_id), coluna.is_(None))
+            )
+        elif valor is None:
+            stmt += lambda s: s.where(or_(coluna.is_not(None), Pergunta.id < ultimo_id))
+        else:
+            stmt += lambda s: s.where(or_(coluna < valor, and_(coluna == valor, Pergunta.id < ultimo_id)))
     
-    # Aplicar paginação
-    return query.offset(skip).limit(limit).all()
+    # Aplicar ordenação e paginação
+    stmt += lambda s: s.order_by(*ordenacao).offset(skip).limit(limit)
+    return stmt
+
+def contagem_perguntas(
+    formulario_id: Optional[int] = None,
+    tipo_pergunta: Optional[TipoPergunta] = None,
+    obrigatoria: Optional[bool] = None,
+    sub_pergunta: Optional[bool] = None,
+    tenant: Optional[str] = None
+):
+    """
+    Consulta das perguntas dos filtros, sem ordenação nem paginação, para contar o total
+    """
+    stmt = select(Pergunta.id)
+    if tenant is not None:
+        stmt = stmt.join(Pergunta.formulario).where(Formulario.tenant == tenant)
+    if formulario_id is not None:
+        stmt = stmt.where(Pergunta.id_formulario == formulario_id)
+    if tipo_pergunta is not None:
+        stmt = stmt.where(Pergunta.tipo_pergunta == tipo_pergunta)
+    if obrigatoria is not None:
+        stmt = stmt.where(Pergunta.obrigatoria == obrigatoria)
+    if sub_pergunta is not None:
+        stmt = stmt.where(Pergunta.sub_pergunta == sub_pergunta)
+    return stmt
+
+def get_perguntas(db: Session, **filtros):
+    """
+    Obtém uma lista de perguntas com filtros, ordenação e paginação
+    (parâmetros de consulta_perguntas)
+    """
+    perguntas = db.execute(consulta_perguntas(**filtros)).scalars().all()
+    carregar_opcoes(db, perguntas)
+    return perguntas
+
+def _verificar_conjunto(db: Session, conjunto_id: Optional[int]) -> None:
+    """
+    Levanta ValueError se o conjunto de opções informado não existir
+    """
+    if conjunto_id is not None and db.get(ConjuntoOpcoes, conjunto_id) is None:
+        raise ValueError(f"Conjunto de opções {conjunto_id} não encontrado")
+
+def _dados_pergunta(db_pergunta: Pergunta) -> dict:
+    """
+    Pergunta no formato das respostas, para os eventos de alteração
+    """
+    return PerguntaSchema.model_validate(db_pergunta, from_attributes=True).model_dump(mode="json")
 
 def create_pergunta(db: Session, pergunta: PerguntaCreate):
     """
-    Cria uma nova pergunta com opções de respostas múltiplas, se fornecidas
+    Cria uma nova pergunta. As opções de respostas múltiplas, se fornecidas, são
+    associadas ao conjunto com o mesmo conteúdo, criado se ainda não existir;
+    sem elas, a pergunta pode referenciar um conjunto por id_conjunto_opcoes.
+    Levanta ValueError se esse conjunto não existir.
     """
-    # Extrair opções de respostas múltiplas antes de criar a pergunta
-    opcoes_data = None
     pergunta_dict = pergunta.model_dump()
+    opcoes_data = pergunta_dict.pop('opcoes_respostas_multiplas', None)
     
-    if 'opcoes_respostas_multiplas' in pergunta_dict and pergunta_dict['opcoes_respostas_multiplas']:
-        opcoes_data = pergunta_dict.pop('opcoes_respostas_multiplas')
+    if opcoes_data:
+        pergunta_dict['id_conjunto_opcoes'] = obter_conjunto(db, opcoes_data).id
+    else:
+        _verificar_conjunto(db, pergunta_dict.get('id_conjunto_opcoes'))
     
     # Criar a pergunta
     db_pergunta = Pergunta(**pergunta_dict)
     db.add(db_pergunta)
+    registrar_evento(db, db_pergunta.id_formulario, "pergunta_criada", lambda: _dados_pergunta(db_pergunta))
     db.commit()
     db.refresh(db_pergunta)
-    
-    # Adicionar opções de respostas múltiplas, se existirem
-    if opcoes_data:
-        for opcao in opcoes_data:
-            db_opcao = OpcoesRespostas(
-                id_pergunta=db_pergunta.id,
-                resposta=opcao.get('resposta'),
-                ordem=opcao.get('ordem', 0),
-                resposta_aberta=opcao.get('resposta_aberta', False)
-            )
-            db.add(db_opcao)
-        
-        db.commit()
-        db.refresh(db_pergunta)
-    
+    carregar_opcoes(db, [db_pergunta])
     return db_pergunta
 
 def update_pergunta(db: Session, pergunta_id: int, pergunta: PerguntaUpdate):
     """
-    Atualiza uma pergunta existente
+    Atualiza uma pergunta existente. Levanta ValueError se o conjunto de opções
+    informado não existir. Movida para outro formulário, a pergunta perde as regras
+    condicionais do formulário anterior.
     """
     db_pergunta = get_pergunta(db, pergunta_id)
     if db_pergunta:
         update_data = pergunta.model_dump(exclude_unset=True)
+        _verificar_conjunto(db, update_data.get('id_conjunto_opcoes'))
+        formulario_anterior = db_pergunta.id_formulario
         for key, value in update_data.items():
             setattr(db_pergunta, key, value)
+        if db_pergunta.id_formulario != formulario_anterior:
+            # As regras do formulário anterior que dependem da pergunta deixam de valer
+            regras = db.query(RegraCondicional.id).filter(
+                or_(RegraCondicional.id_pergunta_origem == pergunta_id, RegraCondicional.id_pergunta_destino == pergunta_id)
+            ).all()
+            for (regra_id,) in regras:
+                registrar_evento(db, formulario_anterior, "regra_excluida", {"id": regra_id})
+            db.query(RegraCondicional).filter(
+                RegraCondicional.id.in_([regra_id for (regra_id,) in regras])
+            ).delete(synchronize_session=False)
+            registrar_evento(db, formulario_anterior, "pergunta_excluida", {"id": pergunta_id})
+            registrar_evento(db, db_pergunta.id_formulario, "pergunta_criada", lambda: _dados_pergunta(db_pergunta))
+        else:
+            tipo = "pergunta_reordenada" if set(update_data) == {"ordem"} else "pergunta_atualizada"
+            registrar_evento(db, db_pergunta.id_formulario, tipo, lambda: _dados_pergunta(db_pergunta))
         db.commit()
         db.refresh(db_pergunta)
+        carregar_opcoes(db, [db_pergunta])
     return db_pergunta
 
+def _condicoes_lote(filtro: PerguntaFiltroLote, tenant: Optional[str] = None) -> list:
+    """
+    Condições do WHERE de uma alteração em lote. Levanta ValueError sem nenhum filtro,
+    para que um corpo incompleto não altere todas as perguntas.
+    """
+    condicoes = []
+    if filtro.ids is not None:
+        condicoes.append(Pergunta.id.in_(filtro.ids))
+    if filtro.formulario_id is not None:
+        condicoes.append(Pergunta.id_formulario == filtro.formulario_id)
+    if filtro.tipo_pergunta is not None:
+        condicoes.append(Pergunta.tipo_pergunta == filtro.tipo_pergunta)
+    if not condicoes:
+        raise ValueError("Informe ids, formulario_id ou tipo_pergunta no filtro")
+    if tenant is not None:
+        condicoes.append(Pergunta.id_formulario.in_(select(Formulario.id).where(Formulario.tenant == tenant)))
+    return condicoes
+
+def update_perguntas(
+    db: Session,
+    filtro: PerguntaFiltroLote,
+    valores: PerguntaUpdateLote,
+    dry_run: bool = False,
+    tenant: Optional[str] = None,
+) -> Tuple[int, List[PerguntaSchema]]:
+    """
+    Aplica a alteração parcial `valores` a todas as perguntas do filtro com um único
+    UPDATE ... RETURNING e retorna o total e as perguntas alteradas, já no formato das
+    respostas (sem recarregar cada linha após o commit). Com dry_run, apenas conta as
+    perguntas que seriam alteradas. Levanta ValueError sem filtro, sem valores ou se o
+    conjunto de opções informado não existir.
+    """
+    condicoes = _condicoes_lote(filtro, tenant)
+    update_data = valores.model_dump(exclude_unset=True)
+    if not update_data:
+        raise ValueError("Informe ao menos um campo a alterar")
+    if dry_run:
+        return db.scalar(select(func.count()).select_from(Pergunta).where(*condicoes)), []
+
+    _verificar_conjunto(db, update_data.get('id_conjunto_opcoes'))
+    db_perguntas = db.scalars(
+        update(Pergunta)
+        .where(*condicoes)
+        .values(**update_data)
+        .returning(Pergunta)
+        .options(*CARREGAR_OPCOES)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).all()
+    db_perguntas = sorted(db_perguntas, key=lambda db_pergunta: db_pergunta.id)
+    carregar_opcoes(db, db_perguntas)
+
+    # Serializadas antes do commit, que expiraria os atributos de todas as perguntas
+    perguntas = [PerguntaSchema.model_validate(db_pergunta, from_attributes=True) for db_pergunta in db_perguntas]
+    tipo = "pergunta_reordenada" if set(update_data) == {"ordem"} else "pergunta_atualizada"
+    for pergunta in perguntas:
+        registrar_evento(db, pergunta.id_formulario, tipo, pergunta.model_dump(mode="json"))
+    db.commit()
+    return len(perguntas), perguntas
+
 def delete_pergunta(db: Session, pergunta_id: int):
     """
     Exclui uma pergunta pelo ID
     """
     db_pergunta = get_pergunta(db, pergunta_id)
     if db_pergunta:
+        # Excluir as regras condicionais que dependem da pergunta
+        db.query(RegraCondicional).filter(
+            or_(RegraCondicional.id_pergunta_origem == pergunta_id, RegraCondicional.id_pergunta_destino == pergunta_id)
+        ).delete(synchronize_session=False)
+        # Excluir as opções de resposta da pergunta (o conjunto de opções é compartilhado e permanece)
+        db.query(OpcaoResposta).filter(OpcaoResposta.id_pergunta == pergunta_id).delete(synchronize_session=False)
+        registrar_evento(db, db_pergunta.id_formulario, "pergunta_excluida", {"id": pergunta_id})
+        db.expire(db_pergunta)
         db.delete(db_pergunta)
         db.commit()
         return True
@@ -112,16 +330,109 @@ def create_opcao_resposta(db: Session, opcao_resposta_data: Dict[str, Any]):
     """
     db_opcao = OpcaoResposta(**opcao_resposta_data)
     db.add(db_opcao)
+    db_pergunta = db.get(Pergunta, db_opcao.id_pergunta)
+    if db_pergunta is not None:
+        registrar_evento(db, db_pergunta.id_formulario, "pergunta_atualizada", lambda: _dados_pergunta(db_pergunta))
     db.commit()
     db.refresh(db_opcao)
     return db_opcao
 
-def create_opcoes_respostas(db: Session, opcoes_respostas_data: Dict[str, Any]):
+def create_opcoes_respostas(db: Session, opcoes_respostas_data: Dict[str, Any]) -> Optional[OpcoesRespostasSchema]:
     """
-    Cria uma nova opção de respostas múltiplas
+    Acrescenta uma opção de respostas múltiplas à pergunta `id_pergunta`. Como os
+    conjuntos não são alterados, a pergunta passa a referenciar o conjunto com as
+    opções atuais mais a nova. Retorna a nova opção, com id_pergunta, como antes
+    dos conjuntos de opções.
     """
-    db_opcoes = OpcoesRespostas(**opcoes_respostas_data)
-    db.add(db_opcoes)
+    dados = dict(opcoes_respostas_data)
+    pergunta_id = dados.pop("id_pergunta")
+    db_pergunta = get_pergunta(db, pergunta_id)
+    if db_pergunta is None:
+        return None
+    atuais = [opcao.model_dump(include=set(CAMPOS_OPCAO)) for opcao in db_pergunta.opcoes_respostas_multiplas]
+    db_pergunta.id_conjunto_opcoes = obter_conjunto(db, atuais + [dados]).id
+    registrar_evento(db, db_pergunta.id_formulario, "pergunta_atualizada", lambda: _dados_pergunta(db_pergunta))
     db.commit()
-    db.refresh(db_opcoes)
-    return db_opcoes
+
+    # O conteúdo da nova opção está no conjunto; repetido, qualquer uma das linhas serve
+    nova = normalizar_opcoes([dados])[0]
+    conjunto = get_conjunto(db, db_pergunta.id_conjunto_opcoes)
+    opcao = next(
+        opcao for opcao in reversed(conjunto.opcoes)
+        if {campo: getattr(opcao, campo) for campo in CAMPOS_OPCAO} == nova
+    )
+    return OpcoesRespostasSchema.model_validate(opcao, from_attributes=True).model_copy(update={"id_pergunta": pergunta_id})
+
+CAMPOS_OPCAO = ("resposta", "ordem", "resposta_aberta")
+
+def substituir_opcoes_respostas(
+    db: Session, pergunta_id: int, opcoes: List[OpcoesRespostasItem], manter_ausentes: bool = False
+) -> Optional[Tuple[Pergunta, Dict[str, int]]]:
+    """
+    Substitui as opções de respostas múltiplas da pergunta em uma única transação e
+    retorna a pergunta e a diferença (inseridas, alteradas, removidas). Opções com id
+    alteram a opção atual correspondente, apenas nos campos informados; sem id, são
+    novas. As opções atuais ausentes da lista são removidas ou, com manter_ausentes,
+    mantidas. Como os conjuntos não são alterados, a pergunta passa a referenciar o
+    conjunto com o conteúdo resultante. Retorna None se a pergunta não existir e
+    levanta ValueError se um id não for de uma opção atual da pergunta.
+    """
+    db_pergunta = get_pergunta(db, pergunta_id)
+    if db_pergunta is None:
+        return None
+    atuais = {opcao.id: opcao.model_dump(include=set(CAMPOS_OPCAO)) for opcao in db_pergunta.opcoes_respostas_multiplas}
+
+    resultado, inseridas, alteradas = [], 0, 0
+    for opcao in opcoes:
+        if opcao.id is None:
+            resultado.append(opcao.model_dump(include=set(CAMPOS_OPCAO)))
+            inseridas += 1
+            continue
+        if opcao.id not in atuais:
+            raise ValueError(f"Opção {opcao.id} não pertence à pergunta {pergunta_id} ou está repetida")
+        atual = atuais.pop(opcao.id)
+        nova = {**atual, **opcao.model_dump(include=set(CAMPOS_OPCAO), exclude_unset=True)}
+        alteradas += nova != atual
+        resultado.append(nova)
+    removidas = 0 if manter_ausentes else len(atuais)
+    if manter_ausentes:
+        resultado.extend(atuais.values())
+
+    if inseridas or alteradas or removidas:
+        db_pergunta.id_conjunto_opcoes = obter_conjunto(db, resultado).id if resultado else None
+        registrar_evento(db, db_pergunta.id_formulario, "pergunta_atualizada", lambda: _dados_pergunta(db_pergunta))
+        db.commit()
+        db_pergunta = get_pergunta(db, pergunta_id)
+    return db_pergunta, {"inseridas": inseridas, "alteradas": alteradas, "removidas": removidas}
+
+def substituir_opcoes_resposta(
+    db: Session, pergunta_id: int, ids_opcoes: List[int], manter_ausentes: bool = False
+) -> Optional[Tuple[Pergunta, Dict[str, int]]]:
+    """
+    Substitui as opções de resposta (id_opcao_resposta) da pergunta pelas informadas,
+    com um DELETE das removidas e um INSERT das novas na mesma transação, e retorna a
+    pergunta e a diferença. Com manter_ausentes, apenas acrescenta as que faltam.
+    Retorna None se a pergunta não existir.
+    """
+    db_pergunta = get_pergunta(db, pergunta_id)
+    if db_pergunta is None:
+        return None
+    atuais = {opcao.id_opcao_resposta for opcao in db_pergunta.opcoes_respostas}
+    desejadas = list(dict.fromkeys(ids_opcoes))
+    novas = [id_opcao for id_opcao in desejadas if id_opcao not in atuais]
+    removidas = set() if manter_ausentes else atuais.difference(desejadas)
+
+    if removidas:
+        db.execute(delete(OpcaoResposta).where(
+            OpcaoResposta.id_pergunta == pergunta_id, OpcaoResposta.id_opcao_resposta.in_(removidas)
+        ))
+    if novas:
+        db.execute(insert(OpcaoResposta), [
+            {"id_pergunta": pergunta_id, "id_opcao_resposta": id_opcao} for id_opcao in novas
+        ])
+    if novas or removidas:
+        db.expire(db_pergunta, ["opcoes_respostas"])
+        registrar_evento(db, db_pergunta.id_formulario, "pergunta_atualizada", lambda: _dados_pergunta(db_pergunta))
+        db.commit()
+        db_pergunta = get_pergunta(db, pergunta_id)
+    return db_pergunta, {"inseridas": len(novas), "alteradas": 0, "removidas": len(removidas)}
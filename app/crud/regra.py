@@ -0,0 +1,64 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.eventos import registrar_evento
+from app.core.regras import GrafoRegras
+from app.models.models import Formulario, Pergunta, RegraCondicional
+from app.schemas.regra import RegraCondicional as RegraCondicionalSchema, RegraCondicionalCreate
+
+def get_regras(db: Session, formulario_id: int) -> List[RegraCondicional]:
+    """
+    Obtém as regras condicionais de um formulário
+    """
+    return (
+        db.query(RegraCondicional)
+        .filter(RegraCondicional.id_formulario == formulario_id)
+        .order_by(RegraCondicional.id)
+        .all()
+    )
+
+def create_regra(db: Session, formulario_id: int, regra: RegraCondicionalCreate) -> Optional[RegraCondicional]:
+    """
+    Cria uma nova regra condicional.
+    Lança ValueError se a regra referenciar perguntas de outro formulário ou criar um ciclo.
+    """
+    if db.query(Formulario.id).filter(Formulario.id == formulario_id).first() is None:
+        return None
+
+    perguntas = [
+        {"id": pergunta_id}
+        for (pergunta_id,) in db.query(Pergunta.id).filter(Pergunta.id_formulario == formulario_id)
+    ]
+    regras = [
+        {"id_pergunta_origem": r.id_pergunta_origem, "id_pergunta_destino": r.id_pergunta_destino, "operador": r.operador}
+        for r in get_regras(db, formulario_id)
+    ]
+    regras.append(regra.model_dump())
+
+    # Compilar o grafo garante que as perguntas existem e que não há ciclos
+    GrafoRegras(perguntas, regras)
+
+    db_regra = RegraCondicional(id_formulario=formulario_id, **regra.model_dump())
+    db.add(db_regra)
+    registrar_evento(
+        db, formulario_id, "regra_criada",
+        lambda: RegraCondicionalSchema.model_validate(db_regra, from_attributes=True).model_dump(mode="json"),
+    )
+    db.commit()
+    db.refresh(db_regra)
+    return db_regra
+
+def delete_regra(db: Session, formulario_id: int, regra_id: int) -> bool:
+    """
+    Exclui uma regra condicional pelo ID
+    """
+    db_regra = (
+        db.query(RegraCondicional)
+        .filter(RegraCondicional.id == regra_id, RegraCondicional.id_formulario == formulario_id)
+        .first()
+    )
+    if db_regra:
+        registrar_evento(db, formulario_id, "regra_excluida", {"id": regra_id})
+        db.delete(db_regra)
+        db.commit()
+        return True
+    return False
@@ -0,0 +1,225 @@
+import json
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.cache import CacheLRU
+from app.db.particoes import primeiro_dia, somar_meses
+from app.db.shards import shard_da_sessao
+from app.core.regras import EstadoAvaliacao
+from app.core.validacao import validar_resposta
+from app.crud import versao as crud_versao
+from app.models.models import Submissao, RespostaSubmissao
+from app.schemas.submissao import SubmissaoCreate
+
+# Estado de avaliação dos rascunhos em edição, associado à revisão da submissão.
+# Os estados em cache são compartilhados entre requisições e nunca alterados:
+# quem precisa alterá-los trabalha sobre uma cópia (EstadoAvaliacao.copiar).
+cache_estados = CacheLRU("estados_rascunho", tamanho_maximo=1024)
+
+# Data de criação das submissões, que nunca muda. Com ela, as consultas por ID leem
+# só a partição do mês da submissão em vez de procurar o ID em todas as partições.
+cache_criacao = CacheLRU("criacao_submissoes", tamanho_maximo=10000)
+
+class ErroValidacaoRespostas(ValueError):
+    """
+    Erro lançado quando respostas não passam na validação
+    """
+    def __init__(self, erros: Dict[int, str]):
+        super().__init__("Respostas inválidas")
+        self.erros = erros
+
+class ConflitoRevisaoError(Exception):
+    """
+    Erro lançado quando a submissão foi alterada concorrentemente ou já foi enviada
+    """
+
+def create_submissao(db: Session, submissao: SubmissaoCreate) -> Optional[Submissao]:
+    """
+    Cria um rascunho vinculado à versão publicada informada ou à mais recente
+    """
+    versao = submissao.versao or crud_versao.get_ultima_versao(db, submissao.id_formulario)
+    if not versao or crud_versao.get_snapshot(db, submissao.id_formulario, versao) is None:
+        return None
+
+    db_submissao = Submissao(id_formulario=submissao.id_formulario, versao=versao, status="rascunho", revisao=0)
+    db.add(db_submissao)
+    db.commit()
+    db.refresh(db_submissao)
+    cache_criacao.set((shard_da_sessao(db), db_submissao.id), db_submissao.criado_em)
+    return db_submissao
+
+def _no_mes_de(criado_em: datetime) -> tuple:
+    """
+    Condições que restringem a submissão ao mês da sua criação. O intervalo, e não a
+    igualdade, permite ao PostgreSQL descartar as demais partições e não depende da
+    precisão com que o banco guarda criado_em.
+    """
+    inicio = datetime.combine(primeiro_dia(criado_em.date()), datetime.min.time())
+    fim = datetime.combine(somar_meses(inicio.date(), 1), datetime.min.time())
+    return (Submissao.criado_em >= inicio, Submissao.criado_em < fim)
+
+def get_submissao(db: Session, submissao_id: int, criado_em: Optional[datetime] = None) -> Optional[Submissao]:
+    """
+    Obtém uma submissão pelo ID. Com a data de criação, informada ou já conhecida
+    por este processo, a consulta lê apenas a partição do seu mês.
+    """
+    chave = (shard_da_sessao(db), submissao_id)
+    criado_em = criado_em or cache_criacao.get(chave)
+    query = db.query(Submissao).filter(Submissao.id == submissao_id)
+    if criado_em is not None:
+        query = query.filter(*_no_mes_de(criado_em))
+    db_submissao = query.first()
+    if db_submissao is not None:
+        cache_criacao.set(chave, db_submissao.criado_em)
+    return db_submissao
+
+def get_submissoes(
+    db: Session,
+    formulario_id: Optional[int] = None,
+    criado_de: Optional[datetime] = None,
+    criado_ate: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Submissao]:
+    """
+    Obtém submissões criadas no intervalo [criado_de, criado_ate), mais recentes primeiro.
+    O intervalo restringe a consulta às partições dos meses correspondentes.
+    """
+    query = db.query(Submissao)
+    if formulario_id is not None:
+        query = query.filter(Submissao.id_formulario == formulario_id)
+    if criado_de is not None:
+        query = query.filter(Submissao.criado_em >= criado_de)
+    if criado_ate is not None:
+        query = query.filter(Submissao.criado_em < criado_ate)
+    return query.order_by(Submissao.criado_em.desc(), Submissao.id.desc()).offset(skip).limit(limit).all()
+
+def get_respostas(db: Session, submissao_id: int, criado_em: Optional[datetime] = None) -> Dict[int, Any]:
+    """
+    Obtém as respostas de uma submissão indexadas pelo ID da pergunta.
+    Com a data de criação da submissão, a consulta lê apenas a partição do seu mês.
+    """
+    linhas = db.query(RespostaSubmissao.id_pergunta, RespostaSubmissao.valor).filter(
+        RespostaSubmissao.id_submissao == submissao_id
+    )
+    if criado_em is not None:
+        linhas = linhas.filter(RespostaSubmissao.criado_em == criado_em)
+    return {pergunta_id: json.loads(valor) for pergunta_id, valor in linhas}
+
+def _get_estado(db: Session, submissao: Submissao) -> EstadoAvaliacao:
+    """
+    Obtém o estado de avaliação do rascunho, reconstruindo-o apenas se a revisão
+    em cache estiver desatualizada (por exemplo, alterada por outro processo)
+    """
+    entrada = cache_estados.get((shard_da_sessao(db), submissao.id))
+    if entrada is not None and entrada[0] == submissao.revisao:
+        return entrada[1]
+
+    grafo = crud_versao.get_grafo(db, submissao.id_formulario, submissao.versao)
+    estado = grafo.novo_estado(get_respostas(db, submissao.id, submissao.criado_em))
+    cache_estados.set((shard_da_sessao(db), submissao.id), (submissao.revisao, estado))
+    return estado
+
+def _upsert_respostas(db: Session, valores: list) -> None:
+    """
+    Grava respostas com INSERT ... ON CONFLICT DO UPDATE em um único comando
+    """
+    dialeto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialeto.insert(RespostaSubmissao)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RespostaSubmissao.id_submissao, RespostaSubmissao.id_pergunta, RespostaSubmissao.criado_em],
+        set_={"valor": stmt.excluded.valor},
+    )
+    db.execute(stmt, valores)
+
+def aplicar_alteracoes(db: Session, submissao: Submissao, alteracoes: Dict[int, Any]) -> Tuple[int, Set[int], EstadoAvaliacao]:
+    """
+    Aplica apenas as respostas alteradas de um rascunho (None remove a resposta).
+
+    As respostas alteradas são validadas contra a versão publicada em cache e gravadas
+    com upsert; o custo é proporcional ao número de respostas alteradas.
+    Retorna a nova revisão, as perguntas cuja visibilidade mudou e o estado de avaliação.
+    """
+    if submissao.status != "rascunho":
+        raise ConflitoRevisaoError("Submissão já enviada")
+
+    estado = _get_estado(db, submissao)
+    perguntas = estado.grafo.perguntas
+
+    erros = {}
+    for pergunta_id, valor in alteracoes.items():
+        if pergunta_id not in perguntas:
+            erros[pergunta_id] = "Pergunta não pertence ao formulário"
+        elif valor is not None:
+            erro = validar_resposta(perguntas[pergunta_id], valor, estado.grafo.opcoes.get(pergunta_id))
+            if erro:
+                erros[pergunta_id] = erro
+    if erros:
+        raise ErroValidacaoRespostas(erros)
+
+    # Controle de concorrência otimista pela revisão da submissão
+    revisao = submissao.revisao
+    resultado = db.execute(
+        update(Submissao)
+        .where(Submissao.id == submissao.id, *_no_mes_de(submissao.criado_em))
+        .where(Submissao.revisao == revisao, Submissao.status == "rascunho")
+        .values(revisao=revisao + 1, atualizado_em=func.now())
+    )
+    if resultado.rowcount == 0:
+        db.rollback()
+        raise ConflitoRevisaoError("Submissão alterada concorrentemente")
+
+    gravar = [
+        {"id_submissao": submissao.id, "id_pergunta": pergunta_id, "valor": json.dumps(valor), "criado_em": submissao.criado_em}
+        for pergunta_id, valor in alteracoes.items()
+        if valor is not None
+    ]
+    remover = [pergunta_id for pergunta_id, valor in alteracoes.items() if valor is None]
+    if gravar:
+        _upsert_respostas(db, gravar)
+    if remover:
+        db.execute(
+            delete(RespostaSubmissao).where(
+                RespostaSubmissao.id_submissao == submissao.id,
+                RespostaSubmissao.criado_em == submissao.criado_em,
+                RespostaSubmissao.id_pergunta.in_(remover),
+            )
+        )
+    db.commit()
+
+    # Aplica sobre uma cópia: o estado em cache pode estar em uso por outra requisição
+    estado = estado.copiar()
+    alteradas = estado.aplicar(alteracoes)
+    cache_estados.set((shard_da_sessao(db), submissao.id), (revisao + 1, estado))
+    return revisao + 1, alteradas, estado
+
+def enviar_submissao(db: Session, submissao: Submissao) -> Submissao:
+    """
+    Valida o conjunto completo de respostas e marca a submissão como enviada.
+    Lança ErroValidacaoRespostas se houver respostas inválidas ou obrigatórias pendentes.
+    """
+    if submissao.status != "rascunho":
+        raise ConflitoRevisaoError("Submissão já enviada")
+
+    estado = _get_estado(db, submissao)
+    erros = estado.validar()
+    for pergunta_id in estado.pendentes:
+        erros[pergunta_id] = "Resposta obrigatória"
+    if erros:
+        raise ErroValidacaoRespostas(erros)
+
+    resultado = db.execute(
+        update(Submissao)
+        .where(Submissao.id == submissao.id, *_no_mes_de(submissao.criado_em))
+        .where(Submissao.revisao == submissao.revisao)
+        .values(status="enviada", revisao=submissao.revisao + 1, atualizado_em=func.now())
+    )
+    if resultado.rowcount == 0:
+        db.rollback()
+        raise ConflitoRevisaoError("Submissão alterada concorrentemente")
+    db.commit()
+    cache_estados.invalidar((shard_da_sessao(db), submissao.id))
+    db.refresh(submissao)
+    return submissao
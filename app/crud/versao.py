@@ -0,0 +1,214 @@
+import gzip
+import hashlib
+import json
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheLRU
+from app.core.codificacao import MEDIA_MSGPACK, comprimir, empacotar_msgpack
+from app.db.shards import SHARD_PADRAO, shard_da_sessao
+from app.core.regras import GrafoRegras
+from app.crud.opcoes import carregar_opcoes
+from app.crud.pergunta import CARREGAR_OPCOES
+from app.models.models import Formulario, FormularioVersao, Pergunta, RegraCondicional
+from app.schemas.pergunta import Pergunta as PerguntaSchema
+from app.schemas.regra import RegraCondicional as RegraCondicionalSchema
+from app.schemas.versao import FormularioPublicado
+
+# Versões publicadas são imutáveis, por isso podem permanecer em cache indefinidamente
+cache_versoes = CacheLRU("versoes_formulario", tamanho_maximo=512)
+cache_grafos = CacheLRU("grafos_regras", tamanho_maximo=512)
+
+class SnapshotFormulario:
+    """
+    Conteúdo de uma versão publicada, pronto para ser servido ou consultado
+    """
+    __slots__ = ("id_formulario", "versao", "hash", "json", "gzip", "_dados", "_variantes")
+
+    def __init__(self, id_formulario: int, versao: int, hash: str, conteudo_gzip: bytes):
+        self.id_formulario = id_formulario
+        self.versao = versao
+        self.hash = hash
+        self.gzip = conteudo_gzip
+        self.json = gzip.decompress(conteudo_gzip)
+        self._dados = None
+        self._variantes = {}
+
+    def variante(self, formato: Optional[str], codificacao: Optional[str]) -> bytes:
+        """
+        Corpo da resposta no formato (JSON ou MessagePack) e na codificação pedidos.
+        O JSON com gzip é o próprio conteúdo armazenado; as demais variantes são
+        calculadas no primeiro uso e mantidas junto com o snapshot em cache.
+        """
+        if formato is None and codificacao == "gzip":
+            return self.gzip
+        if formato is None and codificacao is None:
+            return self.json
+        chave = (formato, codificacao)
+        corpo = self._variantes.get(chave)
+        if corpo is None:
+            corpo = empacotar_msgpack(self.dados) if formato == MEDIA_MSGPACK else self.json
+            if codificacao is not None:
+                # Calculada uma única vez por versão, por isso com o nível máximo
+                corpo = comprimir(corpo, codificacao, 11 if codificacao == "br" else 9)
+            self._variantes[chave] = corpo
+        return corpo
+
+    @property
+    def dados(self) -> dict:
+        """
+        Conteúdo desserializado, calculado apenas no primeiro acesso
+        """
+        if self._dados is None:
+            self._dados = json.loads(self.json)
+        return self._dados
+
+def serializar_formulario(db: Session, formulario: Formulario, versao: int) -> bytes:
+    """
+    Serializa o formulário completo (perguntas, opções e regras condicionais) em JSON
+    """
+    perguntas = (
+        db.query(Pergunta)
+        .options(*CARREGAR_OPCOES)
+        .filter(Pergunta.id_formulario == formulario.id)
+        .order_by(Pergunta.ordem, Pergunta.id)
+        .all()
+    )
+    carregar_opcoes(db, perguntas)
+    regras = (
+        db.query(RegraCondicional)
+        .filter(RegraCondicional.id_formulario == formulario.id)
+        .order_by(RegraCondicional.id)
+        .all()
+    )
+
+    publicado = FormularioPublicado(
+        id_formulario=formulario.id,
+        versao=versao,
+        titulo=formulario.titulo,
+        descricao=formulario.descricao,
+        ordem=formulario.ordem,
+        perguntas=[PerguntaSchema.model_validate(pergunta, from_attributes=True) for pergunta in perguntas],
+        regras=[RegraCondicionalSchema.model_validate(regra, from_attributes=True) for regra in regras],
+    )
+    return publicado.model_dump_json().encode("utf-8")
+
+def hash_conteudo(conteudo_json: bytes) -> str:
+    """
+    Calcula o hash do conteúdo ignorando o número da versão
+    """
+    dados = json.loads(conteudo_json)
+    dados.pop("versao", None)
+    canonico = json.dumps(dados, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(canonico).hexdigest()
+
+def get_ultima_versao(db: Session, formulario_id: int) -> Optional[int]:
+    """
+    Obtém o número da versão publicada mais recente de um formulário
+    """
+    return (
+        db.query(func.max(FormularioVersao.versao))
+        .filter(FormularioVersao.id_formulario == formulario_id)
+        .scalar()
+    )
+
+def get_versoes(db: Session, formulario_id: int) -> List[FormularioVersao]:
+    """
+    Obtém os metadados de todas as versões publicadas de um formulário
+    """
+    return (
+        db.query(FormularioVersao)
+        .filter(FormularioVersao.id_formulario == formulario_id)
+        .order_by(FormularioVersao.versao)
+        .all()
+    )
+
+def publicar_formulario(db: Session, formulario_id: int) -> Optional[FormularioVersao]:
+    """
+    Congela o estado atual do formulário em uma nova versão imutável.
+
+    Se o conteúdo não mudou desde a última publicação, a versão existente é retornada.
+    Levanta ValueError se as regras condicionais não puderem ser compiladas.
+    """
+    formulario = db.query(Formulario).filter(Formulario.id == formulario_id).first()
+    if formulario is None:
+        return None
+
+    ultima = get_ultima_versao(db, formulario_id) or 0
+    conteudo_json = serializar_formulario(db, formulario, ultima + 1)
+    hash_atual = hash_conteudo(conteudo_json)
+
+    if ultima:
+        versao_atual = (
+            db.query(FormularioVersao)
+            .filter(
+                FormularioVersao.id_formulario == formulario_id,
+                FormularioVersao.versao == ultima,
+            )
+            .first()
+        )
+        if versao_atual.hash == hash_atual:
+            return versao_atual
+
+    # Uma versão cujas regras não compilam não poderia ser avaliada
+    GrafoRegras.de_snapshot(json.loads(conteudo_json))
+
+    db_versao = FormularioVersao(
+        id_formulario=formulario_id,
+        versao=ultima + 1,
+        conteudo=gzip.compress(conteudo_json, mtime=0),
+        hash=hash_atual,
+    )
+    db.add(db_versao)
+    db.commit()
+    db.refresh(db_versao)
+    return db_versao
+
+def get_snapshot(db: Session, formulario_id: int, versao: int) -> Optional[SnapshotFormulario]:
+    """
+    Obtém o conteúdo de uma versão publicada, consultando o cache antes do banco
+    """
+    chave = (shard_da_sessao(db), formulario_id, versao)
+    snapshot = cache_versoes.get(chave)
+    if snapshot is not None:
+        return snapshot
+
+    db_versao = (
+        db.query(FormularioVersao)
+        .filter(
+            FormularioVersao.id_formulario == formulario_id,
+            FormularioVersao.versao == versao,
+        )
+        .first()
+    )
+    if db_versao is None:
+        return None
+
+    snapshot = SnapshotFormulario(formulario_id, versao, db_versao.hash, db_versao.conteudo)
+    cache_versoes.set(chave, snapshot)
+    return snapshot
+
+def get_grafo(db: Session, formulario_id: int, versao: int) -> Optional[GrafoRegras]:
+    """
+    Obtém as regras de uma versão publicada compiladas em grafo, consultando o cache
+    """
+    chave = (shard_da_sessao(db), formulario_id, versao)
+    grafo = cache_grafos.get(chave)
+    if grafo is not None:
+        return grafo
+
+    snapshot = get_snapshot(db, formulario_id, versao)
+    if snapshot is None:
+        return None
+
+    grafo = GrafoRegras.de_snapshot(snapshot.dados)
+    cache_grafos.set(chave, grafo)
+    return grafo
+
+def invalidar_cache(formulario_id: int, versao: int, shard: str = SHARD_PADRAO) -> None:
+    """
+    Remove uma versão e seu grafo de regras dos caches
+    """
+    cache_versoes.invalidar((shard, formulario_id, versao))
+    cache_grafos.invalidar((shard, formulario_id, versao))
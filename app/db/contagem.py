@@ -0,0 +1,86 @@
+"""
+Total de registros das listagens paginadas.
+
+Consultas seletivas (restritas por um filtro indexado, como o formulário das
+perguntas) são contadas exatamente. Nas consultas amplas, o PostgreSQL fornece uma
+estimativa: pg_class.reltuples, sem filtros, ou a estimativa do planejador, com
+filtros. A contagem exata é limitada a PAGINACAO_CONTAGEM_EXATA_MAXIMA registros;
+acima disso, o total também é estimado.
+"""
+import json
+import logging
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class Contagem(NamedTuple):
+    total: int
+    exato: bool
+
+def _estimativa_tabela(db: Session, tabela: str) -> Optional[int]:
+    linhas = db.scalar(text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:tabela)"), {"tabela": tabela})
+    # reltuples é -1 (ou 0, em versões antigas) enquanto a tabela não foi analisada
+    return int(linhas) if linhas is not None and linhas > 0 else None
+
+def comando_explain(consulta: Select, dialeto: Dialect) -> Tuple[str, dict]:
+    """
+    EXPLAIN (FORMAT JSON) da consulta e os seus parâmetros, já convertidos pelos tipos
+    das colunas (ex.: TipoPergunta no código smallint), para exec_driver_sql
+    """
+    compilada = consulta.compile(dialect=dialeto)
+    parametros = {}
+    for nome, valor in compilada.params.items():
+        processador = compilada.binds[nome].type.dialect_impl(dialeto).bind_processor(dialeto)
+        parametros[nome] = processador(valor) if processador is not None else valor
+    return f"EXPLAIN (FORMAT JSON) {compilada}", parametros
+
+def _estimativa_planejador(db: Session, consulta: Select) -> Optional[int]:
+    comando, parametros = comando_explain(consulta, db.get_bind().dialect)
+    plano = db.connection().exec_driver_sql(comando, parametros).scalar()
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]["Plan"]["Plan Rows"])
+
+def estimar(db: Session, consulta: Select, tabela: str, filtrada: bool) -> Optional[int]:
+    """
+    Estimativa do número de registros da consulta pelas estatísticas do PostgreSQL,
+    ou None em outros bancos ou se não houver estatísticas
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    try:
+        # Em um savepoint, para que uma falha não invalide a transação da requisição
+        with db.begin_nested():
+            return _estimativa_planejador(db, consulta) if filtrada else _estimativa_tabela(db, tabela)
+    except DBAPIError:
+        logger.exception("Falha ao estimar o total de %s", tabela)
+        return None
+
+def contar(db: Session, consulta: Select, tabela: str, seletiva: bool, filtrada: bool) -> Contagem:
+    """
+    Total de registros de `consulta` (um SELECT sem ordenação nem paginação).
+
+    `seletiva` indica que a consulta usa um filtro indexado que restringe bem o
+    resultado, e `filtrada`, que ela tem algum filtro (sem filtros, o total é o da tabela).
+    """
+    if not seletiva:
+        estimativa = estimar(db, consulta, tabela, filtrada)
+        if estimativa is not None:
+            return Contagem(estimativa, False)
+
+    maximo = settings.PAGINACAO_CONTAGEM_EXATA_MAXIMA
+    total = db.scalar(select(func.count()).select_from(consulta.limit(maximo + 1).subquery()))
+    if total <= maximo:
+        return Contagem(total, True)
+
+    # Contar todos os registros custaria caro: usa a estimativa ou, sem ela, o mínimo conhecido
+    estimativa = estimar(db, consulta, tabela, filtrada)
+    return Contagem(max(estimativa or 0, total), False)
@@ -1,19 +1,141 @@
+import threading
+from typing import Optional
+from fastapi import HTTPException, Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.roteamento import COOKIE_PRIMARIO, RoteadorReplicas, afinidade_primario_ativa
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+# O engine (e o pool de conexões) é criado sob demanda, na inicialização de cada
+# worker, e não na importação do módulo: assim a importação não abre conexões
+# nem herda sockets do processo pai em servidores pre-fork.
+_engine: Optional[Engine] = None
+_roteador: Optional[RoteadorReplicas] = None
+_roteador_configurado = False
+_lock_engine = threading.Lock()
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
+def criar_engine(url: Optional[str] = None) -> Engine:
+    """
+    Cria um engine com as configurações de pool da aplicação
+    """
+    url = url or settings.DATABASE_URL
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+def get_engine() -> Engine:
+    """
+    Obtém o engine da aplicação, criando-o no primeiro uso
+    """
+    global _engine
+    if _engine is None:
+        with _lock_engine:
+            if _engine is None:
+                _engine = criar_engine()
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+def get_roteador() -> Optional[RoteadorReplicas]:
+    """
+    Obtém o roteador das réplicas de leitura, ou None se não houver réplicas configuradas
+    """
+    global _roteador, _roteador_configurado
+    if not _roteador_configurado:
+        with _lock_engine:
+            if not _roteador_configurado:
+                urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+                if urls:
+                    _roteador = RoteadorReplicas([criar_engine(url) for url in urls], settings.DB_REPLICA_STRATEGY)
+                _roteador_configurado = True
+    return _roteador
+
+def dispose_engine() -> None:
+    """
+    Fecha as conexões dos pools e descarta os engines do primário, das réplicas e dos shards
+    """
+    from app.db.shards import dispose_shards
+    global _engine, _roteador, _roteador_configurado
+    dispose_shards()
+    with _lock_engine:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+        if _roteador is not None:
+            _roteador.dispose()
+            _roteador = None
+        _roteador_configurado = False
+
+def _sessao_do_tenant(request: Request):
+    """
+    Abre uma sessão no shard do tenant da requisição (cabeçalho X-Tenant),
+    ou None se o sharding não estiver configurado
+    """
+    from app.db.shards import get_shards, sessao_do_shard, shard_do_tenant
+    if not get_shards():
+        return None
+    tenant = request.headers.get("X-Tenant")
+    if not tenant:
+        raise HTTPException(status_code=400, detail="Cabeçalho X-Tenant obrigatório")
+    return sessao_do_shard(shard_do_tenant(tenant))
+
 # Dependency
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    db = _sessao_do_tenant(request) or SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
         db.close()
+
+# Dependency das rotas somente leitura: usa uma réplica, exceto logo após uma
+# escrita do mesmo cliente, quando a réplica ainda pode não ter a alteração.
+# Com sharding, lê do primário do shard do tenant: DATABASE_REPLICA_URLS são réplicas
+# do banco principal e não há réplicas por shard, então elas não são usadas.
+def get_db_leitura(request: Request):
+    roteador = get_roteador()
+    if (
+        roteador is None
+        or afinidade_primario_ativa(request.cookies.get(COOKIE_PRIMARIO))
+        or settings.DATABASE_SHARDS
+    ):
+        yield from get_db(request)
+        return
+
+    indice = roteador.adquirir()
+    db = SessionLocal(bind=roteador.engines[indice], info={"replica": True})
+    try:
+        yield db
+    finally:
+        db.close()
+        roteador.liberar(indice)
+
+# Dependency das listagens que podem abranger vários shards: sem o cabeçalho
+# X-Tenant, abre uma sessão em cada shard; nos demais casos, a mesma sessão de get_db_leitura
+def get_sessoes_leitura(request: Request):
+    from app.db.shards import get_shards, sessao_do_shard
+    if get_shards() and not request.headers.get("X-Tenant"):
+        sessoes = [sessao_do_shard(nome) for nome in sorted(get_shards())]
+        try:
+            yield sessoes
+        finally:
+            for db in sessoes:
+                db.close()
+        return
+
+    dependencia = get_db_leitura(request)
+    try:
+        yield [next(dependencia)]
+    finally:
+        dependencia.close()
@@ -0,0 +1,157 @@
+"""
+Manutenção das partições mensais de submissões (PostgreSQL).
+
+As tabelas submissao e resposta_submissao são particionadas por intervalo de
+criado_em (veja a migração 0003), uma partição por mês, além de uma partição
+padrão que recebe linhas fora dos meses criados. Esta manutenção deve rodar
+periodicamente (por exemplo, diariamente):
+
+    python -m app.db.particoes
+
+Ela cria as partições dos próximos meses e retira as partições antigas,
+arquivando-as em CSV comprimido antes de removê-las.
+"""
+import argparse
+import gzip
+import os
+import re
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+
+# Ordem de criação; a retirada segue a ordem inversa, pois resposta_submissao
+# referencia submissao
+TABELAS_PARTICIONADAS = ("submissao", "resposta_submissao")
+
+# Chave do advisory lock que serializa a manutenção entre processos
+_CHAVE_LOCK = 7_310_037
+
+def primeiro_dia(dia: date) -> date:
+    return dia.replace(day=1)
+
+def somar_meses(mes: date, quantidade: int) -> date:
+    """
+    Primeiro dia do mês `quantidade` meses após (ou antes de) `mes`
+    """
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+def meses(inicio: date, fim: date) -> Iterator[date]:
+    """
+    Primeiros dias dos meses de `inicio` a `fim`, inclusive
+    """
+    mes = primeiro_dia(inicio)
+    while mes <= fim:
+        yield mes
+        mes = somar_meses(mes, 1)
+
+def nome_particao(tabela: str, mes: date) -> str:
+    return f"{tabela}_p{mes:%Y_%m}"
+
+def sql_criar_particao(tabela: str, mes: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {nome_particao(tabela, mes)} PARTITION OF {tabela} "
+        f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{somar_meses(mes, 1).isoformat()}')"
+    )
+
+def criar_particoes(conn: Connection, inicio: date, fim: date) -> List[str]:
+    """
+    Cria as partições mensais de `inicio` a `fim` que ainda não existem
+    """
+    existentes = {nome for tabela in TABELAS_PARTICIONADAS for nome, _ in listar_particoes(conn, tabela)}
+    criadas = []
+    for mes in meses(inicio, fim):
+        for tabela in TABELAS_PARTICIONADAS:
+            if nome_particao(tabela, mes) not in existentes:
+                conn.execute(text(sql_criar_particao(tabela, mes)))
+                criadas.append(nome_particao(tabela, mes))
+    return criadas
+
+def listar_particoes(conn: Connection, tabela: str) -> List[Tuple[str, date]]:
+    """
+    Partições mensais anexadas à tabela, com o mês de cada uma, em ordem cronológica
+    """
+    nomes = conn.scalars(text(
+        "SELECT filha.relname FROM pg_inherits "
+        "JOIN pg_class filha ON filha.oid = pg_inherits.inhrelid "
+        "JOIN pg_class pai ON pai.oid = pg_inherits.inhparent "
+        "WHERE pai.relname = :tabela"
+    ), {"tabela": tabela})
+    padrao = re.compile(rf"^{tabela}_p(\d{{4}})_(\d{{2}})$")
+    particoes = []
+    for nome in nomes:
+        encontrado = padrao.match(nome)
+        if encontrado:
+            particoes.append((nome, date(int(encontrado.group(1)), int(encontrado.group(2)), 1)))
+    return sorted(particoes, key=lambda particao: particao[1])
+
+def _arquivar(conn: Connection, nome: str, diretorio: str) -> str:
+    """
+    Copia uma partição para um CSV comprimido com gzip
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"{nome}.csv.gz")
+    cursor = conn.connection.cursor()
+    with gzip.open(caminho, "wt", encoding="utf-8") as arquivo:
+        cursor.copy_expert(f"COPY {nome} TO STDOUT WITH (FORMAT csv, HEADER)", arquivo)
+    return caminho
+
+def retirar_particoes(conn: Connection, antes_de: date, diretorio: Optional[str] = None) -> List[str]:
+    """
+    Desanexa as partições de meses anteriores a `antes_de`. Com um diretório,
+    arquiva cada partição em CSV comprimido e a remove; sem diretório, as
+    partições desanexadas permanecem no banco como tabelas comuns.
+    """
+    retiradas = []
+    for tabela in reversed(TABELAS_PARTICIONADAS):
+        for nome, mes in listar_particoes(conn, tabela):
+            if mes >= primeiro_dia(antes_de):
+                break
+            conn.execute(text(f"ALTER TABLE {tabela} DETACH PARTITION {nome}"))
+            if diretorio:
+                _arquivar(conn, nome, diretorio)
+                conn.execute(text(f"DROP TABLE {nome}"))
+            retiradas.append(nome)
+    return retiradas
+
+def manter_particoes(engine: Engine, hoje: Optional[date] = None) -> Dict[str, List[str]]:
+    """
+    Cria as partições do mês atual e dos próximos PARTICOES_MESES_A_FRENTE meses e
+    retira as anteriores ao período de retenção. Não faz nada fora do PostgreSQL.
+    """
+    if engine.dialect.name != "postgresql":
+        return {"criadas": [], "retiradas": []}
+
+    mes_atual = primeiro_dia(hoje or date.today())
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:chave)"), {"chave": _CHAVE_LOCK})
+        criadas = criar_particoes(conn, mes_atual, somar_meses(mes_atual, settings.PARTICOES_MESES_A_FRENTE))
+        retiradas = []
+        if settings.SUBMISSOES_RETENCAO_MESES > 0:
+            retiradas = retirar_particoes(
+                conn,
+                somar_meses(mes_atual, -settings.SUBMISSOES_RETENCAO_MESES),
+                settings.SUBMISSOES_ARQUIVO_DIR,
+            )
+    return {"criadas": criadas, "retiradas": retiradas}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.db.database import criar_engine
+
+    parser = argparse.ArgumentParser(description="Manutenção das partições mensais de submissões")
+    parser.add_argument("--database-url", default=None, help="URL do banco (padrão: DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    engine = criar_engine(args.database_url)
+    try:
+        resultado = manter_particoes(engine)
+    finally:
+        engine.dispose()
+    print(f"Partições criadas: {len(resultado['criadas'])}; retiradas: {len(resultado['retiradas'])}")
+
+if __name__ == "__main__":
+    main()
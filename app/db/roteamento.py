@@ -0,0 +1,99 @@
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Cookie que mantém as leituras de um cliente no primário logo após uma escrita,
+# até que as réplicas tenham recebido a alteração (read-your-writes).
+# O valor é o instante (epoch) em que a afinidade expira.
+COOKIE_PRIMARIO = "db_primario"
+
+ESTRATEGIAS = ("round_robin", "menos_conexoes")
+
+class EscritasRequisicao:
+    """
+    Indica se a requisição em andamento confirmou alguma transação no banco
+    """
+    __slots__ = ("confirmadas",)
+
+    def __init__(self):
+        self.confirmadas = 0
+
+# Escritas da requisição em andamento. O endpoint roda no threadpool com uma cópia
+# do contexto, que aponta para o mesmo objeto, então os commits são visíveis no middleware.
+escritas_requisicao: ContextVar[Optional[EscritasRequisicao]] = ContextVar("escritas_requisicao", default=None)
+
+@event.listens_for(Session, "after_commit")
+def _transacao_confirmada(session: Session) -> None:
+    # Sessões internas (ex.: reservas de Idempotency-Key) não alteram os dados lidos das réplicas
+    if not session.info.get("afinidade_primario", True):
+        return
+    escritas = escritas_requisicao.get()
+    if escritas is not None:
+        escritas.confirmadas += 1
+
+class RoteadorReplicas:
+    """
+    Distribui as sessões de leitura entre as réplicas, em rodízio (round_robin)
+    ou pela réplica com menos sessões abertas por este processo (menos_conexoes)
+    """
+
+    def __init__(self, engines: List[Engine], estrategia: str = "round_robin"):
+        if not engines:
+            raise ValueError("Nenhuma réplica informada")
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estratégia de roteamento inválida: {estrategia}")
+        self.engines = list(engines)
+        self.estrategia = estrategia
+        self._proxima = itertools.count()
+        self._em_uso = [0] * len(self.engines)
+        self._lock = threading.Lock()
+
+    def adquirir(self) -> int:
+        """
+        Escolhe uma réplica e a marca como em uso. Retorna o seu índice.
+        """
+        with self._lock:
+            inicio = next(self._proxima) % len(self.engines)
+            if self.estrategia == "round_robin":
+                indice = inicio
+            else:
+                # Em caso de empate, o rodízio evita concentrar as leituras na primeira réplica
+                ordem = list(range(inicio, len(self.engines))) + list(range(inicio))
+                indice = min(ordem, key=lambda i: self._em_uso[i])
+            self._em_uso[indice] += 1
+            return indice
+
+    def liberar(self, indice: int) -> None:
+        with self._lock:
+            self._em_uso[indice] -= 1
+
+    def em_uso(self) -> List[int]:
+        with self._lock:
+            return list(self._em_uso)
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+def valor_cookie_primario(duracao: int, agora: Optional[float] = None) -> str:
+    """
+    Valor do cookie de afinidade com o primário válido por `duracao` segundos
+    """
+    return str(int((agora or time.time()) + duracao))
+
+def afinidade_primario_ativa(valor_cookie: Optional[str], agora: Optional[float] = None) -> bool:
+    """
+    Indica se o cookie de afinidade com o primário ainda não expirou
+    """
+    if not valor_cookie:
+        return False
+    try:
+        return int(valor_cookie) > (agora or time.time())
+    except ValueError:
+        return False
@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheLRU
+from app.core.config import settings
+from app.db.database import SessionLocal, criar_engine, get_engine
+
+# Nome do shard das sessões abertas no banco principal, quando não há sharding
+SHARD_PADRAO = "padrao"
+
+# Mapa tenant -> shard. As atribuições explícitas ficam no banco principal; o cache
+# evita uma consulta ao catálogo por requisição.
+cache_tenants = CacheLRU("tenants_shards", tamanho_maximo=10000)
+
+class PaginacaoShardsError(ValueError):
+    """
+    Erro lançado quando a página pedida de uma consulta em todos os shards vai além
+    de PAGINACAO_LIMITE_MAXIMO registros
+    """
+
+_shards: Optional[Dict[str, Engine]] = None
+_lock_shards = threading.Lock()
+# Threads das consultas em paralelo nos shards, compartilhadas pelas requisições do
+# processo e criadas no primeiro uso (após o fork, em servidores pre-fork)
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _urls_shards() -> Dict[str, str]:
+    urls = {}
+    for item in settings.DATABASE_SHARDS.split(","):
+        if item.strip():
+            nome, url = item.split("=", 1)
+            urls[nome.strip()] = url.strip()
+    return urls
+
+def get_shards() -> Dict[str, Engine]:
+    """
+    Obtém os engines dos shards pelo nome, criando-os no primeiro uso.
+    Vazio quando o sharding não está configurado.
+    """
+    global _shards
+    if _shards is None:
+        with _lock_shards:
+            if _shards is None:
+                _shards = {nome: criar_engine(url) for nome, url in _urls_shards().items()}
+    return _shards
+
+def dispose_shards() -> None:
+    """
+    Fecha as conexões dos pools e descarta os engines dos shards
+    """
+    global _shards, _executor
+    with _lock_shards:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+        if _shards is not None:
+            for engine in _shards.values():
+                engine.dispose()
+            _shards = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Obtém o executor das consultas em paralelo, com SHARD_FANOUT_WORKERS threads
+    """
+    global _executor
+    if _executor is None:
+        with _lock_shards:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.SHARD_FANOUT_WORKERS, thread_name_prefix="shards"
+                )
+    return _executor
+
+def shard_do_tenant(tenant: str) -> str:
+    """
+    Obtém o shard de um tenant: a atribuição explícita do catálogo ou,
+    na sua ausência, um shard escolhido de forma estável pelo hash do tenant
+    """
+    shard = cache_tenants.get(tenant)
+    if shard is not None:
+        return shard
+
+    from app.models.models import TenantShard
+    with SessionLocal(bind=get_engine()) as db:
+        atribuicao = db.get(TenantShard, tenant)
+    nomes = sorted(get_shards())
+    if atribuicao is not None and atribuicao.shard in nomes:
+        shard = atribuicao.shard
+    else:
+        shard = nomes[zlib.crc32(tenant.encode()) % len(nomes)]
+    cache_tenants.set(tenant, shard)
+    return shard
+
+def atribuir_shard(tenant: str, shard: str) -> None:
+    """
+    Atribui explicitamente um tenant a um shard no catálogo.
+    Não move os dados já existentes do tenant.
+    """
+    from app.models.models import TenantShard
+    if shard not in get_shards():
+        raise ValueError(f"Shard desconhecido: {shard}")
+    with SessionLocal(bind=get_engine()) as db:
+        db.merge(TenantShard(tenant=tenant, shard=shard))
+        db.commit()
+    cache_tenants.invalidar(tenant)
+
+def sessao_do_shard(nome: str) -> Session:
+    """
+    Abre uma sessão no shard informado, identificada pelo nome do shard
+    """
+    return SessionLocal(bind=get_shards()[nome], info={"shard": nome})
+
+def shard_da_sessao(db: Session) -> str:
+    """
+    Nome do shard de uma sessão, usado para separar as entradas dos caches
+    por banco (os IDs só são únicos dentro de um shard)
+    """
+    return db.info.get("shard", SHARD_PADRAO)
+
+def origem_da_sessao(db: Session) -> tuple:
+    """
+    Shard da sessão e se ela lê de uma réplica, usados nas chaves das leituras coalescidas
+    """
+    return (shard_da_sessao(db), db.info.get("replica", False))
+
+def executar_em_shards(sessoes: List[Session], funcao: Callable[[Session], Any]) -> List[Any]:
+    """
+    Executa `funcao` em cada sessão, em paralelo quando há mais de uma. As threads
+    são compartilhadas pelo processo: com muitas requisições simultâneas, as consultas
+    aguardam na fila do executor em vez de abrir mais threads.
+    """
+    if len(sessoes) == 1:
+        return [funcao(sessoes[0])]
+
+    executor = _get_executor()
+    # Cada thread roda com uma cópia do contexto da requisição (perfil SQL, métricas)
+    futuros = [executor.submit(copy_context().run, funcao, db) for db in sessoes]
+    return [futuro.result() for futuro in futuros]
+
+def consultar_shards(
+    sessoes: List[Session],
+    consulta: Callable[[Session, int, int], List[Any]],
+    chave: Callable[[Any], Any],
+    skip: int = 0,
+    limit: int = 100,
+    reverso: bool = False,
+) -> List[Any]:
+    """
+    Executa uma consulta paginada em todas as sessões em paralelo e intercala os
+    resultados já ordenados de cada shard pela mesma chave de ordenação.
+
+    Cada shard devolve as suas skip + limit primeiras linhas; a página é então
+    recortada do resultado combinado. Como o custo cresce com skip em todos os shards,
+    páginas que vão além de PAGINACAO_LIMITE_MAXIMO linhas são recusadas com
+    PaginacaoShardsError.
+    """
+    if len(sessoes) == 1:
+        return consulta(sessoes[0], skip, limit)
+
+    if skip + limit > settings.PAGINACAO_LIMITE_MAXIMO:
+        raise PaginacaoShardsError(
+            f"Paginação além de {settings.PAGINACAO_LIMITE_MAXIMO} registros em todos os shards; "
+            "informe o cabeçalho X-Tenant ou use o cursor"
+        )
+
+    resultados = executar_em_shards(sessoes, lambda db: consulta(db, 0, skip + limit))
+    return list(itertools.islice(heapq.merge(*resultados, key=chave, reverse=reverso), skip, skip + limit))
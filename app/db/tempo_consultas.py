@@ -0,0 +1,39 @@
+"""
+Tempo das consultas SQL, medido uma única vez para toda a aplicação.
+
+Os eventos são registrados na classe Engine para cobrir todos os engines criados pela
+aplicação (inclusive os usados nos testes), não apenas o principal. O início de cada
+consulta fica no seu contexto de execução, descartado com ela: uma consulta que falha
+não deixa estado na conexão. Quem precisa do tempo das consultas (as métricas, o perfil
+de consultas SQL) registra um observador com observar_consultas.
+"""
+import time
+from typing import Callable, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Chamados após cada consulta com o SQL e a duração em segundos
+Observador = Callable[[str, float], None]
+observadores: List[Observador] = []
+
+def observar_consultas(observador: Observador) -> Observador:
+    """
+    Registra um observador das consultas; pode ser usado como decorador
+    """
+    observadores.append(observador)
+    return observador
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._inicio_consulta = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_inicio_consulta", None)
+    if inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    for observador in observadores:
+        observador(statement, duracao)
@@ -1,38 +1,140 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+"""
+Ponto de entrada da aplicação.
+
+A importação deste módulo só carrega as configurações: as rotas, os middlewares e os
+módulos de CRUD e de schemas que eles importam são carregados em create_app, e os
+serviços de fundo, no lifespan. A instância `app` (usada por `app.main:app` no
+gunicorn e no uvicorn) é criada no primeiro acesso ao atributo.
+"""
+from contextlib import asynccontextmanager
 
-from app.api.api import api_router
 from app.core.config import settings
-from app.db.database import Base, engine
-
-# Criar tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    description=settings.PROJECT_DESCRIPTION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
-)
-
-# Configurar CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Incluir rotas da API
-app.include_router(api_router, prefix=settings.API_V1_STR)
-
-@app.get("/")
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Cria o engine e o pool de conexões na inicialização do worker (após o fork, em
+    servidores pre-fork) e os fecha no encerramento.
+    O esquema do banco é gerenciado pelas migrações do Alembic (alembic upgrade head).
+    """
+    from app.core.eventos import iniciar_eventos
+    from app.core.metricas import registro
+    from app.core.saida import iniciar_saida
+    from app.db.database import dispose_engine, get_engine
+
+    get_engine()
+    ouvinte_eventos = iniciar_eventos()
+    despachante_saida = iniciar_saida()
+    exportacao = None
+    if settings.METRICS_MULTIPROC_DIR:
+        exportacao = registro.iniciar_exportacao(settings.METRICS_MULTIPROC_DIR, settings.METRICS_EXPORT_INTERVAL)
+    yield
+    if exportacao is not None:
+        exportacao.set()
+        registro.salvar(settings.METRICS_MULTIPROC_DIR)
+    if ouvinte_eventos is not None:
+        ouvinte_eventos.parar()
+    if despachante_saida is not None:
+        despachante_saida.parar()
+        despachante_saida.join(timeout=settings.OUTBOX_INTERVALO + 5)
+    dispose_engine()
+
 def root():
     """
     Rota raiz para verificar se a API está funcionando.
     """
     return {"message": "API de Formulários Dinâmicos funcionando!"}
 
+def metrics():
+    """
+    Exporta as métricas da aplicação no formato texto do Prometheus,
+    combinando as de todos os workers quando METRICS_MULTIPROC_DIR está definido.
+    """
+    from fastapi import Response
+    from app.core.metricas import registro
+
+    return Response(content=registro.renderizar(settings.METRICS_MULTIPROC_DIR), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def sql_profiles():
+    """
+    Lista os perfis de consultas SQL das requisições perfiladas mais recentes.
+    """
+    from fastapi import HTTPException
+    from app.middleware.perfil_sql import historico_perfis, perfilamento_disponivel
+
+    if not perfilamento_disponivel():
+        raise HTTPException(status_code=404, detail="Perfil de consultas SQL desativado")
+    return list(historico_perfis)
+
+def create_app():
+    """
+    Cria a aplicação. Não acessa o banco de dados: as conexões são abertas no lifespan.
+    """
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from app.api.api import api_router
+    from app.core.codificacao import RespostaAPI
+    from app.middleware.compressao import CompressaoMiddleware
+    from app.middleware.idempotencia import IdempotenciaMiddleware
+    from app.middleware.limites import LimitesMiddleware
+    from app.middleware.perfil_sql import PerfilSQLMiddleware
+    from app.middleware.replicas import AfinidadePrimarioMiddleware
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        description=settings.PROJECT_DESCRIPTION,
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
+        default_response_class=RespostaAPI,
+    )
+
+    # Escritas idempotentes com Idempotency-Key. Fica dentro dos limites: requisições
+    # rejeitadas por eles não reservam a chave e podem ser repetidas.
+    app.add_middleware(IdempotenciaMiddleware)
+
+    # Limites de taxa e de requisições simultâneas por cliente e proteção contra sobrecarga.
+    # Fica dentro dos demais middlewares para que as rejeições tenham cabeçalhos CORS e métricas.
+    app.add_middleware(LimitesMiddleware)
+
+    # Configurar CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Respostas em JSON ou MessagePack e comprimidas com brotli ou gzip, conforme o cliente
+    app.add_middleware(CompressaoMiddleware)
+
+    # Coletar métricas de latência, tamanho das respostas e consultas SQL por rota
+    if settings.METRICS_ENABLED:
+        from app.middleware.metricas import MetricasMiddleware
+        app.add_middleware(MetricasMiddleware)
+
+    # Perfil de consultas SQL por requisição e log de consultas lentas
+    app.add_middleware(PerfilSQLMiddleware)
+
+    # Leituras no primário logo após uma escrita, quando há réplicas de leitura
+    app.add_middleware(AfinidadePrimarioMiddleware)
+
+    # Incluir rotas da API
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/debug/sql-profiles", sql_profiles, methods=["GET"], include_in_schema=False)
+    return app
+
+def __getattr__(nome: str):
+    # Cria a instância `app` no primeiro acesso (from app.main import app, app.main:app)
+    if nome == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
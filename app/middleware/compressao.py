@@ -0,0 +1,164 @@
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.codificacao import (
+    MEDIA_MSGPACK, Compressor, aceita_msgpack, comprimir, escolher_codificacao, formato_resposta, msgpack,
+)
+from app.core.config import settings
+from app.core.metricas import registro
+
+# Tipos de conteúdo que se beneficiam de compressão. Eventos (text/event-stream)
+# não são comprimidos para não atrasar o envio de cada evento.
+TIPOS_COMPRIMIVEIS = ("text/", "application/json", MEDIA_MSGPACK, "application/javascript", "application/xml", "image/svg+xml")
+TIPOS_NAO_COMPRIMIVEIS = ("text/event-stream",)
+
+bytes_codificados = registro.contador(
+    "http_response_encoded_bytes_total", "Bytes enviados no corpo das respostas comprimíveis, após a compressão",
+    ("encoding", "origem"),
+)
+bytes_originais = registro.contador(
+    "http_response_unencoded_bytes_total", "Bytes do corpo das respostas antes da compressão pelo middleware",
+    ("encoding",),
+)
+cpu_compressao = registro.histograma(
+    "http_compression_cpu_seconds", "Tempo de CPU gasto comprimindo cada resposta", ("encoding",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1),
+)
+
+def _adicionar_vary(cabecalhos: MutableHeaders, valor: str) -> None:
+    if valor.lower() not in {item.strip().lower() for item in cabecalhos.get("vary", "").split(",")}:
+        cabecalhos.add_vary_header(valor)
+
+def _comprimivel(tipo: str) -> bool:
+    return tipo.startswith(TIPOS_COMPRIMIVEIS) and not tipo.startswith(TIPOS_NAO_COMPRIMIVEIS)
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI que negocia o formato (JSON ou MessagePack, pelo cabeçalho Accept)
+    e comprime as respostas com brotli ou gzip (pelo cabeçalho Accept-Encoding).
+
+    Respostas menores que COMPRESSAO_TAMANHO_MINIMO e respostas que já trazem
+    Content-Encoding (as versões publicadas, pré-comprimidas) são enviadas como estão.
+    Respostas em vários pedaços são acumuladas até o tamanho mínimo e então
+    comprimidas de forma incremental.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = Headers(scope=scope)
+        token = formato_resposta.set(MEDIA_MSGPACK if aceita_msgpack(cabecalhos.get("accept")) else None)
+        try:
+            codificacao = escolher_codificacao(cabecalhos.get("accept-encoding"))
+            await self.app(scope, receive, _EnvioComprimido(send, codificacao))
+        finally:
+            formato_resposta.reset(token)
+
+class _EnvioComprimido:
+    """
+    Função send que comprime o corpo de uma resposta
+    """
+
+    def __init__(self, send, codificacao):
+        self.send = send
+        self.codificacao = codificacao
+        self.inicio = None
+        self.modo = None  # "direto", "pre-comprimido", "acumulando" ou "comprimindo"
+        self.buffer = []
+        self.tamanho = 0
+        self.compressor = None
+        self.cpu = 0.0
+
+    async def __call__(self, mensagem):
+        if mensagem["type"] == "http.response.start":
+            await self._iniciar(mensagem)
+        elif mensagem["type"] == "http.response.body" and self.modo != "direto":
+            await self._corpo(mensagem)
+        else:
+            await self.send(mensagem)
+
+    async def _iniciar(self, mensagem):
+        cabecalhos = MutableHeaders(raw=mensagem.setdefault("headers", []))
+        tipo = cabecalhos.get("content-type", "")
+        if not _comprimivel(tipo):
+            self.modo = "direto"
+            await self.send(mensagem)
+            return
+
+        _adicionar_vary(cabecalhos, "Accept-Encoding")
+        if msgpack is not None and tipo.startswith(("application/json", MEDIA_MSGPACK)):
+            _adicionar_vary(cabecalhos, "Accept")
+        if "content-encoding" in cabecalhos:
+            self.modo = "pre-comprimido"
+        elif not settings.COMPRESSAO_ENABLED or self.codificacao is None or mensagem["status"] in (204, 304):
+            self.modo = "direto"
+        else:
+            self.modo = "acumulando"
+            self.inicio = mensagem
+            return
+        self.codificacao = cabecalhos.get("content-encoding", "identity")
+        await self.send(mensagem)
+
+    async def _corpo(self, mensagem):
+        corpo = mensagem.get("body", b"")
+        mais = mensagem.get("more_body", False)
+
+        if self.modo == "pre-comprimido":
+            bytes_codificados.inc(self.codificacao, "pre-comprimido", valor=len(corpo))
+            await self.send(mensagem)
+            return
+
+        if self.modo == "acumulando":
+            self.buffer.append(corpo)
+            self.tamanho += len(corpo)
+            if mais and self.tamanho < settings.COMPRESSAO_TAMANHO_MINIMO:
+                return
+            corpo, self.buffer = b"".join(self.buffer), []
+            if not mais and self.tamanho < settings.COMPRESSAO_TAMANHO_MINIMO:
+                # Pequena demais para compensar a compressão
+                self.modo = "direto"
+                await self.send(self.inicio)
+                await self.send({"type": "http.response.body", "body": corpo})
+                return
+            await self._iniciar_compressao(completa=not mais, corpo=corpo)
+            return
+
+        self.tamanho += len(corpo)
+        inicio_cpu = time.thread_time()
+        saida = self.compressor.processar(corpo)
+        if not mais:
+            saida += self.compressor.finalizar()
+        self.cpu += time.thread_time() - inicio_cpu
+        await self._enviar_comprimido(saida, mais)
+
+    def _nivel(self) -> int:
+        return settings.COMPRESSAO_NIVEL_BROTLI if self.codificacao == "br" else settings.COMPRESSAO_NIVEL_GZIP
+
+    async def _iniciar_compressao(self, completa: bool, corpo: bytes):
+        self.modo = "comprimindo"
+        cabecalhos = MutableHeaders(raw=self.inicio["headers"])
+        cabecalhos["Content-Encoding"] = self.codificacao
+        inicio_cpu = time.thread_time()
+        if completa:
+            saida = comprimir(corpo, self.codificacao, self._nivel())
+            cabecalhos["Content-Length"] = str(len(saida))
+        else:
+            self.compressor = Compressor(self.codificacao, self._nivel())
+            saida = self.compressor.processar(corpo)
+            del cabecalhos["Content-Length"]
+        self.cpu += time.thread_time() - inicio_cpu
+        await self.send(self.inicio)
+        await self._enviar_comprimido(saida, not completa)
+
+    async def _enviar_comprimido(self, saida: bytes, mais: bool):
+        bytes_codificados.inc(self.codificacao, "middleware", valor=len(saida))
+        if not mais:
+            bytes_originais.inc(self.codificacao, valor=self.tamanho)
+            cpu_compressao.observar(self.codificacao, valor=self.cpu)
+        await self.send({"type": "http.response.body", "body": saida, "more_body": mais})
@@ -0,0 +1,134 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+
+from app.core.codificacao import MEDIA_MSGPACK, aceita_msgpack
+from app.core.config import settings
+from app.core.idempotencia import armazem, calcular_chave, calcular_impressao, requisicoes_idempotentes
+from app.middleware.limites import identificar_cliente
+
+METODOS_IDEMPOTENTES = {"POST", "PATCH"}
+TAMANHO_MAXIMO_CHAVE = 255
+
+async def _ler_corpo(receive) -> bytes:
+    partes = []
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] != "http.request":
+            break
+        partes.append(mensagem.get("body", b""))
+        if not mensagem.get("more_body", False):
+            break
+    return b"".join(partes)
+
+class IdempotenciaMiddleware:
+    """
+    Middleware ASGI que torna idempotentes as escritas da API (POST e PATCH) com o
+    cabeçalho Idempotency-Key (veja app.core.idempotencia):
+
+    - primeira requisição com a chave: é executada e a sua resposta, guardada;
+    - nova tentativa com a mesma chave e a mesma requisição: recebe a resposta guardada,
+      com o cabeçalho Idempotent-Replayed, sem executar a requisição;
+    - nova tentativa enquanto a primeira ainda é executada: 409, com Retry-After;
+    - a mesma chave em outra requisição (método, caminho, tenant, formato da resposta
+      ou corpo): 422.
+
+    As chaves são separadas por cliente (chave de API ou IP), como nos limites de taxa.
+    Requisições sem o cabeçalho seguem sem custo adicional.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.IDEMPOTENCIA_ENABLED
+            or scope["method"] not in METODOS_IDEMPOTENTES
+            or not scope["path"].startswith(settings.API_V1_STR)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = Headers(scope=scope)
+        chave_cliente = cabecalhos.get("idempotency-key")
+        if chave_cliente is None:
+            await self.app(scope, receive, send)
+            return
+        if not chave_cliente.strip() or len(chave_cliente) > TAMANHO_MAXIMO_CHAVE:
+            resposta = JSONResponse(
+                {"detail": f"Idempotency-Key deve ter de 1 a {TAMANHO_MAXIMO_CHAVE} caracteres"}, status_code=400
+            )
+            await resposta(scope, receive, send)
+            return
+
+        corpo = await _ler_corpo(receive)
+        caminho = scope["path"]
+        if scope.get("query_string"):
+            caminho += "?" + scope["query_string"].decode("latin-1")
+        chave = calcular_chave(identificar_cliente(scope), chave_cliente)
+        # A resposta guardada está no formato negociado pelo Accept (JSON ou MessagePack)
+        formato = MEDIA_MSGPACK if aceita_msgpack(cabecalhos.get("accept")) else "application/json"
+        impressao = calcular_impressao(scope["method"], caminho, cabecalhos.get("x-tenant", ""), formato, corpo)
+
+        guardada = await run_in_threadpool(armazem.reservar, chave, impressao)
+        if guardada is not None:
+            await self._responder_guardada(scope, receive, send, guardada, impressao)
+            return
+
+        corpo_entregue = False
+
+        async def receber():
+            nonlocal corpo_entregue
+            if not corpo_entregue:
+                corpo_entregue = True
+                return {"type": "http.request", "body": corpo, "more_body": False}
+            return await receive()
+
+        status_resposta = None
+        tipo_conteudo = None
+        partes = []
+
+        async def enviar(mensagem):
+            nonlocal status_resposta, tipo_conteudo
+            if mensagem["type"] == "http.response.start":
+                status_resposta = mensagem["status"]
+                tipo_conteudo = Headers(raw=mensagem.get("headers", [])).get("content-type")
+            elif mensagem["type"] == "http.response.body":
+                partes.append(mensagem.get("body", b""))
+            await send(mensagem)
+
+        concluida = False
+        try:
+            await self.app(scope, receber, enviar)
+            concluida = True
+        finally:
+            if concluida and status_resposta is not None and status_resposta < 500:
+                await run_in_threadpool(
+                    armazem.guardar, chave, impressao, status_resposta, tipo_conteudo, b"".join(partes)
+                )
+                requisicoes_idempotentes.inc("executada")
+            else:
+                await run_in_threadpool(armazem.liberar, chave)
+                requisicoes_idempotentes.inc("falha")
+
+    async def _responder_guardada(self, scope, receive, send, guardada, impressao: bytes):
+        if guardada.impressao != impressao:
+            requisicoes_idempotentes.inc("divergente")
+            resposta = JSONResponse(
+                {"detail": "Idempotency-Key já usada em outra requisição"}, status_code=422
+            )
+        elif not guardada.concluida:
+            requisicoes_idempotentes.inc("em_andamento")
+            resposta = JSONResponse(
+                {"detail": "Requisição com a mesma Idempotency-Key em andamento"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+        else:
+            requisicoes_idempotentes.inc("repetida")
+            cabecalhos = {"Idempotent-Replayed": "true"}
+            if guardada.tipo_conteudo:
+                cabecalhos["Content-Type"] = guardada.tipo_conteudo
+            resposta = Response(content=guardada.corpo or b"", status_code=guardada.status, headers=cabecalhos)
+        await resposta(scope, receive, send)
@@ -0,0 +1,106 @@
+import math
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.limites import chaves_api, limitador_concorrencia, limitador_taxa
+from app.core.metricas import registro
+
+requisicoes_rejeitadas = registro.contador(
+    "rate_limit_rejected_total", "Requisições rejeitadas pelos limites de taxa e de concorrência", ("motivo",)
+)
+
+def identificar_cliente(scope) -> str:
+    """
+    Identifica o cliente pela chave de API, se for uma das chaves configuradas, ou pelo
+    IP. Chaves desconhecidas são ignoradas: trocar de chave a cada requisição não dá ao
+    cliente novos baldes. Usado também para separar as Idempotency-Key por cliente
+    (veja app.middleware.idempotencia).
+    """
+    chave = Headers(scope=scope).get("x-api-key")
+    if chave and chave in chaves_api():
+        return f"chave:{chave}"
+    cliente = scope.get("client")
+    return f"ip:{cliente[0] if cliente else 'desconhecido'}"
+
+def _rota(scope) -> str:
+    """
+    Método e caminho da rota (ex.: GET /api/v1/perguntas/{pergunta_id}), para que os
+    baldes por rota não dependam dos identificadores no caminho
+    """
+    for rota in scope["app"].routes:
+        correspondencia, _ = rota.matches(scope)
+        if correspondencia == Match.FULL:
+            return f"{scope['method']} {rota.path}"
+    return f"{scope['method']} desconhecida"
+
+class LimitesMiddleware:
+    """
+    Middleware ASGI que aplica os limites às rotas da API:
+
+    - requisições simultâneas no processo: acima de MAX_REQUISICOES_SIMULTANEAS, responde
+      503 imediatamente em vez de enfileirar a requisição à espera de uma conexão do pool;
+    - requisições simultâneas por cliente: acima de MAX_REQUISICOES_POR_CLIENTE, responde 429;
+    - baldes de tokens por cliente e por cliente em cada rota: sem tokens, responde 429
+      com Retry-After indicando quando haverá um token disponível.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or not scope["path"].startswith(settings.API_V1_STR)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        cliente = identificar_cliente(scope)
+        decisao = limitador_taxa.verificar(cliente, _rota(scope))
+        if not decisao.permitido:
+            await self._rejeitar(scope, receive, send, 429, "taxa", "Limite de requisições excedido", decisao.espera)
+            return
+
+        motivo = limitador_concorrencia.adquirir(cliente)
+        if motivo == "sobrecarga":
+            await self._rejeitar(scope, receive, send, 503, motivo, "Servidor sobrecarregado, tente novamente", 1)
+            return
+        if motivo is not None:
+            await self._rejeitar(scope, receive, send, 429, motivo, "Requisições simultâneas demais para o cliente", 1)
+            return
+
+        liberada = False
+
+        def liberar():
+            nonlocal liberada
+            if not liberada:
+                liberada = True
+                limitador_concorrencia.liberar(cliente)
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                mensagem.setdefault("headers", []).append(
+                    (b"x-ratelimit-remaining", str(max(decisao.restantes, 0)).encode())
+                )
+                # Transmissões de eventos ficam abertas sem usar o banco: não ocupam vaga
+                if Headers(raw=mensagem["headers"]).get("content-type", "").startswith("text/event-stream"):
+                    liberar()
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            liberar()
+
+    async def _rejeitar(self, scope, receive, send, status_code: int, motivo: str, detalhe: str, espera: float):
+        requisicoes_rejeitadas.inc(motivo)
+        resposta = JSONResponse(
+            {"detail": detalhe},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(min(espera, 3600)))), "X-RateLimit-Remaining": "0"},
+        )
+        await resposta(scope, receive, send)
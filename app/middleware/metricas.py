@@ -0,0 +1,158 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+from app.core.cache import caches
+from app.core.metricas import registro
+from app.db.tempo_consultas import observar_consultas
+
+# Métricas HTTP
+requisicoes_total = registro.contador(
+    "http_requests_total", "Total de requisições HTTP", ("method", "route", "status")
+)
+latencia_requisicao = registro.histograma(
+    "http_request_duration_seconds", "Latência das requisições HTTP", ("method", "route")
+)
+requisicoes_em_andamento = registro.medidor(
+    "http_requests_in_flight", "Requisições HTTP em andamento"
+)
+tamanho_resposta = registro.histograma(
+    "http_response_size_bytes", "Tamanho do corpo das respostas HTTP", ("method", "route"),
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+
+# Métricas de banco de dados
+consultas_por_requisicao = registro.histograma(
+    "http_request_db_queries", "Consultas SQL executadas por requisição", ("method", "route"),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+tempo_banco_por_requisicao = registro.histograma(
+    "http_request_db_duration_seconds", "Tempo gasto no banco por requisição", ("method", "route")
+)
+latencia_consulta = registro.histograma(
+    "db_query_duration_seconds", "Latência das consultas SQL"
+)
+checkouts_pool = registro.contador(
+    "db_pool_checkouts_total", "Conexões retiradas do pool"
+)
+conexoes_abertas = registro.contador(
+    "db_pool_connections_created_total", "Conexões novas abertas pelo pool"
+)
+conexoes_em_uso = registro.medidor(
+    "db_pool_checked_out", "Conexões do pool atualmente em uso"
+)
+
+# Métricas de cache, atualizadas a cada coleta
+acertos_cache = registro.medidor("cache_hits", "Acertos acumulados do cache", ("cache",))
+falhas_cache = registro.medidor("cache_misses", "Falhas acumuladas do cache", ("cache",))
+# A proporção não pode ser somada entre processos: no modo multiprocesso há uma série por worker
+taxa_acerto_cache = registro.medidor("cache_hit_ratio", "Proporção de acertos do cache", ("cache",), modo="todos")
+itens_cache = registro.medidor("cache_items", "Itens armazenados no cache", ("cache",))
+
+@registro.coletor
+def _coletar_caches() -> None:
+    for cache in caches:
+        acertos, falhas = cache.acertos, cache.falhas
+        acertos_cache.set(cache.nome, valor=acertos)
+        falhas_cache.set(cache.nome, valor=falhas)
+        taxa_acerto_cache.set(cache.nome, valor=acertos / (acertos + falhas) if acertos + falhas else 0.0)
+        itens_cache.set(cache.nome, valor=len(cache))
+
+class EstatisticasBanco:
+    """
+    Contagem e duração das consultas SQL executadas durante uma requisição
+    """
+    __slots__ = ("consultas", "duracao")
+
+    def __init__(self):
+        self.consultas = 0
+        self.duracao = 0.0
+
+# Estatísticas da requisição em andamento. O endpoint roda no threadpool com uma
+# cópia do contexto, que aponta para o mesmo objeto, então as contagens são visíveis aqui.
+estatisticas_banco: ContextVar[Optional[EstatisticasBanco]] = ContextVar("estatisticas_banco", default=None)
+
+@observar_consultas
+def _medir_consulta(statement: str, duracao: float) -> None:
+    latencia_consulta.observar(valor=duracao)
+    estatisticas = estatisticas_banco.get()
+    if estatisticas is not None:
+        estatisticas.consultas += 1
+        estatisticas.duracao += duracao
+
+# Os eventos são registrados na classe Pool para cobrir todos os engines criados
+# pela aplicação (inclusive os usados nos testes), não apenas o principal.
+@event.listens_for(Pool, "connect")
+def _conexao_criada(dbapi_connection, connection_record):
+    conexoes_abertas.inc()
+
+@event.listens_for(Pool, "checkout")
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    checkouts_pool.inc()
+    conexoes_em_uso.inc()
+
+@event.listens_for(Pool, "checkin")
+def _checkin(dbapi_connection, connection_record):
+    conexoes_em_uso.dec()
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que mede latência, tamanho da resposta, requisições em andamento
+    e consultas SQL por rota. Usa o caminho da rota (ex.: /perguntas/{pergunta_id})
+    como rótulo para manter a cardinalidade das métricas limitada.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._rotas = {}
+
+    def _nome_rota(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "desconhecida"
+        rota = self._rotas.get(endpoint)
+        if rota is None:
+            rota = "desconhecida"
+            for candidata in scope["app"].routes:
+                if getattr(candidata, "endpoint", None) is endpoint:
+                    rota = candidata.path
+                    break
+            self._rotas[endpoint] = rota
+        return rota
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        tamanho = 0
+
+        async def enviar(mensagem):
+            nonlocal status_code, tamanho
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+            elif mensagem["type"] == "http.response.body":
+                tamanho += len(mensagem.get("body", b""))
+            await send(mensagem)
+
+        estatisticas = EstatisticasBanco()
+        token = estatisticas_banco.set(estatisticas)
+        requisicoes_em_andamento.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            requisicoes_em_andamento.dec()
+            estatisticas_banco.reset(token)
+
+            metodo, rota = scope["method"], self._nome_rota(scope)
+            requisicoes_total.inc(metodo, rota, str(status_code))
+            latencia_requisicao.observar(metodo, rota, valor=duracao)
+            tamanho_resposta.observar(metodo, rota, valor=tamanho)
+            consultas_por_requisicao.observar(metodo, rota, valor=estatisticas.consultas)
+            tempo_banco_por_requisicao.observar(metodo, rota, valor=estatisticas.duracao)
@@ -0,0 +1,190 @@
+import logging
+import os
+import re
+import sys
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.db.tempo_consultas import observar_consultas
+
+logger = logging.getLogger("app.sql")
+
+# Diretório do pacote app, usado para localizar a origem das consultas
+_DIRETORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IGNORAR_ORIGEM = (
+    os.path.join(_DIRETORIO_APP, "middleware"),
+    os.path.join(_DIRETORIO_APP, "db"),
+)
+
+_RE_LISTA_IN = re.compile(r"IN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_RE_POSTCOMPILE = re.compile(r"\(__\[POSTCOMPILE_\w+\]\)")
+_RE_ESPACOS = re.compile(r"\s+")
+
+def normalizar_sql(statement: str) -> str:
+    """
+    Reduz uma consulta ao seu formato, ignorando o tamanho de listas IN e espaços
+    """
+    formato = _RE_POSTCOMPILE.sub("(...)", statement)
+    formato = _RE_LISTA_IN.sub("IN (...)", formato)
+    return _RE_ESPACOS.sub(" ", formato).strip()
+
+def _origem_consulta() -> str:
+    """
+    Primeiro ponto do código da aplicação (fora do middleware e da camada de banco)
+    na pilha de chamadas da consulta
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if arquivo.startswith(_DIRETORIO_APP) and not arquivo.startswith(_IGNORAR_ORIGEM):
+            relativo = os.path.relpath(arquivo, os.path.dirname(_DIRETORIO_APP))
+            return f"{relativo}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "desconhecida"
+
+class PerfilSQL:
+    """
+    Consultas SQL executadas durante uma requisição (ou bloco de código),
+    com duração e origem, e detecção de padrões N+1
+    """
+
+    def __init__(self, limite_n_mais_um: Optional[int] = None):
+        self.limite_n_mais_um = limite_n_mais_um or settings.SQL_N_PLUS_ONE_THRESHOLD
+        self.consultas: List[dict] = []
+
+    def registrar(self, statement: str, duracao: float, origem: str) -> None:
+        self.consultas.append({
+            "sql": normalizar_sql(statement),
+            "duracao_ms": round(duracao * 1000, 3),
+            "origem": origem,
+        })
+
+    @property
+    def tempo_total_ms(self) -> float:
+        return round(sum(consulta["duracao_ms"] for consulta in self.consultas), 3)
+
+    @property
+    def n_mais_um(self) -> List[dict]:
+        """
+        Formatos de consulta repetidos ao menos `limite_n_mais_um` vezes
+        """
+        repeticoes = Counter(consulta["sql"] for consulta in self.consultas)
+        suspeitas = []
+        for sql, total in repeticoes.items():
+            if total >= self.limite_n_mais_um:
+                origens = sorted({c["origem"] for c in self.consultas if c["sql"] == sql})
+                suspeitas.append({"sql": sql, "repeticoes": total, "origens": origens})
+        return suspeitas
+
+    @property
+    def lentas(self) -> List[dict]:
+        return [c for c in self.consultas if c["duracao_ms"] >= settings.SQL_SLOW_QUERY_MS]
+
+    def resumo(self) -> Dict:
+        return {
+            "consultas": len(self.consultas),
+            "tempo_total_ms": self.tempo_total_ms,
+            "n_mais_um": self.n_mais_um,
+            "lentas": self.lentas,
+            "detalhes": self.consultas,
+        }
+
+    def cabecalho(self) -> str:
+        return (
+            f"consultas={len(self.consultas)}; tempo_ms={self.tempo_total_ms}; "
+            f"n_mais_um={len(self.n_mais_um)}; lentas={len(self.lentas)}"
+        )
+
+# Perfil ativo no contexto atual (requisição ou bloco perfilar_sql)
+perfil_atual: ContextVar[Optional[PerfilSQL]] = ContextVar("perfil_sql", default=None)
+
+# Perfis das requisições mais recentes, consultados pela rota de depuração
+historico_perfis: deque = deque(maxlen=settings.SQL_PROFILE_HISTORY)
+_contador_perfis = iter(range(1, sys.maxsize))
+_lock_historico = threading.Lock()
+
+@observar_consultas
+def _perfilar_consulta(statement: str, duracao: float) -> None:
+    perfil = perfil_atual.get()
+    lenta = duracao * 1000 >= settings.SQL_SLOW_QUERY_MS
+    if perfil is None and not lenta:
+        return
+
+    origem = _origem_consulta()
+    if perfil is not None:
+        perfil.registrar(statement, duracao, origem)
+    if lenta:
+        logger.warning("Consulta lenta (%.1f ms) em %s: %s", duracao * 1000, origem, normalizar_sql(statement))
+
+@contextmanager
+def perfilar_sql(limite_n_mais_um: Optional[int] = None):
+    """
+    Registra as consultas executadas no bloco. Útil em testes para detectar regressões:
+
+        with perfilar_sql() as perfil:
+            crud_pergunta.get_perguntas(db)
+        assert not perfil.n_mais_um
+    """
+    perfil = PerfilSQL(limite_n_mais_um)
+    token = perfil_atual.set(perfil)
+    try:
+        yield perfil
+    finally:
+        perfil_atual.reset(token)
+
+def perfilamento_disponivel() -> bool:
+    return settings.SQL_PROFILE_ENABLED or settings.SQL_PROFILE_HEADER_ENABLED
+
+class PerfilSQLMiddleware:
+    """
+    Middleware ASGI que perfila as consultas SQL da requisição quando habilitado
+    para todas as requisições (SQL_PROFILE_ENABLED) ou quando o cliente envia o
+    cabeçalho X-Profile-SQL (SQL_PROFILE_HEADER_ENABLED). O resumo é retornado no
+    cabeçalho X-SQL-Profile e o perfil completo fica disponível em /debug/sql-profiles.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _deve_perfilar(self, scope) -> bool:
+        if settings.SQL_PROFILE_ENABLED:
+            return True
+        if not settings.SQL_PROFILE_HEADER_ENABLED:
+            return False
+        return any(nome == b"x-profile-sql" and valor not in (b"", b"0") for nome, valor in scope["headers"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._deve_perfilar(scope):
+            await self.app(scope, receive, send)
+            return
+
+        perfil = PerfilSQL()
+        with _lock_historico:
+            perfil_id = next(_contador_perfis)
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [
+                    (b"x-sql-profile", perfil.cabecalho().encode()),
+                    (b"x-sql-profile-id", str(perfil_id).encode()),
+                ]
+            await send(mensagem)
+
+        token = perfil_atual.set(perfil)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            perfil_atual.reset(token)
+            resumo = perfil.resumo()
+            resumo.update({"id": perfil_id, "metodo": scope["method"], "caminho": scope["path"]})
+            with _lock_historico:
+                historico_perfis.append(resumo)
+            for suspeita in resumo["n_mais_um"]:
+                logger.warning(
+                    "Possível N+1 em %s %s: %d repetições de %s (%s)",
+                    scope["method"], scope["path"], suspeita["repeticoes"], suspeita["sql"], ", ".join(suspeita["origens"])
+                )
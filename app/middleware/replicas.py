@@ -0,0 +1,47 @@
+from app.core.config import settings
+from app.db.roteamento import COOKIE_PRIMARIO, EscritasRequisicao, escritas_requisicao, valor_cookie_primario
+
+METODOS_LEITURA = {"GET", "HEAD", "OPTIONS"}
+
+class AfinidadePrimarioMiddleware:
+    """
+    Middleware ASGI que, após uma escrita bem-sucedida, envia o cookie db_primario
+    para que as leituras seguintes do mesmo cliente usem o primário por
+    DB_STICKY_SECONDS segundos, tempo suficiente para as réplicas receberem a alteração.
+    Só as requisições que confirmaram uma transação recebem o cookie: um POST somente
+    leitura, como /avaliar e /validar, continua lendo das réplicas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in METODOS_LEITURA
+            or not settings.DATABASE_REPLICA_URLS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        escritas = EscritasRequisicao()
+        token = escritas_requisicao.set(escritas)
+
+        async def enviar(mensagem):
+            if (
+                mensagem["type"] == "http.response.start"
+                and mensagem["status"] < 400
+                and escritas.confirmadas
+            ):
+                duracao = settings.DB_STICKY_SECONDS
+                cookie = (
+                    f"{COOKIE_PRIMARIO}={valor_cookie_primario(duracao)}; Max-Age={duracao}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            escritas_requisicao.reset(token)
@@ -1,6 +1,25 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, ForeignKey, ForeignKeyConstraint, Text, LargeBinary, DateTime, Index, PrimaryKeyConstraint, UniqueConstraint, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import FetchedValue
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
+from app.models.tipos import CODIGOS, CodigoTipoPergunta
+
+def chave_particionada(nome: str) -> PrimaryKeyConstraint:
+    """
+    Chave primária (id, criado_em) das tabelas particionadas por criado_em no PostgreSQL,
+    onde a chave deve conter a chave de partição. No SQLite, sem particionamento, a
+    chave criada é só id, para que o banco gere os IDs (veja a migração 0003).
+    """
+    return PrimaryKeyConstraint("id", "criado_em", name=nome, info={"colunas_sqlite": ("id",)})
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _chave_primaria_sqlite(constraint, compiler, **kw):
+    colunas = constraint.info.get("colunas_sqlite")
+    if colunas is None:
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+    return "PRIMARY KEY (%s)" % ", ".join(compiler.preparer.quote(coluna) for coluna in colunas)
 
 class Formulario(Base):
     """
@@ -12,15 +31,43 @@ class Formulario(Base):
     titulo = Column(String(255), nullable=False)
     descricao = Column(Text, nullable=True)
     ordem = Column(Integer, default=0)
+    # Organização dona do formulário; define o shard em que ele e seus filhos ficam
+    tenant = Column(String(100), nullable=False, default="padrao", server_default="padrao", index=True)
     
     # Relacionamento com perguntas
     perguntas = relationship("Pergunta", back_populates="formulario")
+    versoes = relationship("FormularioVersao", back_populates="formulario")
+    regras = relationship("RegraCondicional", back_populates="formulario")
+
+class TipoPerguntaCatalogo(Base):
+    """
+    Tabela de consulta dos tipos de pergunta (app.models.tipos.TipoPergunta),
+    referenciada pelo código gravado em cada pergunta.
+    """
+    __tablename__ = "tipo_pergunta"
+
+    codigo = Column(SmallInteger, primary_key=True, autoincrement=False)
+    nome = Column(String(50), nullable=False, unique=True)
+
+@event.listens_for(TipoPerguntaCatalogo.__table__, "after_create")
+def _preencher_tipos(tabela, conexao, **kwargs):
+    # Bancos criados com create_all (testes, benchmarks); nas migrações, veja 0005
+    conexao.execute(tabela.insert(), [{"codigo": codigo, "nome": tipo.value} for tipo, codigo in CODIGOS.items()])
 
 class Pergunta(Base):
     """
     Modelo para representar uma pergunta de um formulário.
     """
     __tablename__ = "pergunta"
+    # Um índice por ordenação aceita na listagem das perguntas de um formulário
+    # (crud.pergunta.ORDENACOES), com o id como desempate
+    __table_args__ = (
+        Index("ix_pergunta_formulario_id", "id_formulario", "id"),
+        Index("ix_pergunta_formulario_ordem", "id_formulario", "ordem", "id"),
+        Index("ix_pergunta_formulario_titulo", "id_formulario", "titulo", "id"),
+        Index("ix_pergunta_formulario_codigo", "id_formulario", "codigo", "id"),
+        Index("ix_pergunta_formulario_tipo", "id_formulario", "tipo_pergunta", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     id_formulario = Column(Integer, ForeignKey("formulario.id"), nullable=False)
@@ -30,12 +77,24 @@ class Pergunta(Base):
     ordem = Column(Integer, default=0)
     obrigatoria = Column(Boolean, default=False)
     sub_pergunta = Column(Boolean, default=False)
-    tipo_pergunta = Column(String(50), nullable=False)  # Sim_Não, multipla_escola, unica_escolha, texto_livre, Inteiro, Numero com duas casas decimais
+    tipo_pergunta = Column(CodigoTipoPergunta, ForeignKey("tipo_pergunta.codigo"), nullable=False)
+    id_conjunto_opcoes = Column(Integer, ForeignKey("conjunto_opcoes.id"), nullable=True, index=True)
     
     # Relacionamentos
     formulario = relationship("Formulario", back_populates="perguntas")
     opcoes_respostas = relationship("OpcaoResposta", back_populates="pergunta")
-    opcoes_respostas_multiplas = relationship("OpcoesRespostas", back_populates="pergunta")
+    conjunto_opcoes = relationship("ConjuntoOpcoes")
+
+    @property
+    def opcoes_respostas_multiplas(self) -> list:
+        """
+        Opções do conjunto da pergunta. As listagens as anexam a partir do cache
+        (crud.opcoes.carregar_opcoes); fora delas, são lidas do conjunto.
+        """
+        anexadas = getattr(self, "_opcoes_anexadas", None)
+        if anexadas is not None and anexadas[0] == self.id_conjunto_opcoes:
+            return anexadas[1]
+        return list(self.conjunto_opcoes.opcoes) if self.conjunto_opcoes is not None else []
 
 class OpcaoResposta(Base):
     """
@@ -50,17 +109,181 @@ class OpcaoResposta(Base):
     # Relacionamento
     pergunta = relationship("Pergunta", back_populates="opcoes_respostas")
 
+class ConjuntoOpcoes(Base):
+    """
+    Modelo para representar um conjunto de opções de resposta compartilhado pelas
+    perguntas com as mesmas opções.
+
+    O conjunto é identificado pelo hash do seu conteúdo (veja crud.opcoes) e não é
+    alterado depois de criado: mudar as opções de uma pergunta significa apontá-la
+    para outro conjunto.
+    """
+    __tablename__ = "conjunto_opcoes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    nome = Column(String(255), nullable=True)
+    hash = Column(String(64), nullable=False, unique=True)
+
+    # Relacionamento
+    opcoes = relationship(
+        "OpcoesRespostas", back_populates="conjunto", order_by="(OpcoesRespostas.ordem, OpcoesRespostas.id)"
+    )
+
 class OpcoesRespostas(Base):
     """
-    Modelo para representar as respostas de opções múltiplas.
+    Modelo para representar as respostas de opções múltiplas de um conjunto de opções.
     """
     __tablename__ = "opcoes_respostas"
 
     id = Column(Integer, primary_key=True, index=True)
-    id_pergunta = Column(Integer, ForeignKey("pergunta.id"), nullable=False)
+    id_conjunto = Column(Integer, ForeignKey("conjunto_opcoes.id"), nullable=False, index=True)
     resposta = Column(Text, nullable=True)
     ordem = Column(Integer, default=0)
     resposta_aberta = Column(Boolean, default=False)
     
     # Relacionamento
-    pergunta = relationship("Pergunta", back_populates="opcoes_respostas_multiplas")
+    conjunto = relationship("ConjuntoOpcoes", back_populates="opcoes")
+
+class FormularioVersao(Base):
+    """
+    Modelo para representar uma versão publicada (imutável) de um formulário.
+
+    O conteúdo é o formulário completo (perguntas e opções) serializado em JSON
+    e comprimido com gzip, de modo que leituras não precisem montar o formulário
+    a partir das tabelas relacionadas.
+    """
+    __tablename__ = "formulario_versao"
+    __table_args__ = (
+        UniqueConstraint("id_formulario", "versao", name="uq_formulario_versao"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    id_formulario = Column(Integer, ForeignKey("formulario.id"), nullable=False)
+    versao = Column(Integer, nullable=False)
+    conteudo = Column(LargeBinary, nullable=False)
+    hash = Column(String(64), nullable=False)
+    publicado_em = Column(DateTime, nullable=False, server_default=func.now())
+
+    # Relacionamento
+    formulario = relationship("Formulario", back_populates="versoes")
+
+class RegraCondicional(Base):
+    """
+    Modelo para representar uma regra condicional (ramificação) de um formulário.
+
+    A pergunta de destino só é exibida quando a resposta da pergunta de origem
+    satisfaz o operador em relação ao valor informado.
+    """
+    __tablename__ = "regra_condicional"
+
+    id = Column(Integer, primary_key=True, index=True)
+    id_formulario = Column(Integer, ForeignKey("formulario.id"), nullable=False, index=True)
+    id_pergunta_origem = Column(Integer, ForeignKey("pergunta.id"), nullable=False)
+    operador = Column(String(20), nullable=False)  # igual, diferente, contem, maior, menor, respondida
+    valor = Column(Text, nullable=True)
+    id_pergunta_destino = Column(Integer, ForeignKey("pergunta.id"), nullable=False)
+
+    # Relacionamento
+    formulario = relationship("Formulario", back_populates="regras")
+
+class Submissao(Base):
+    """
+    Modelo para representar uma submissão (rascunho ou enviada) de um formulário.
+
+    A submissão fica vinculada à versão publicada usada no preenchimento.
+    No PostgreSQL, a tabela é particionada por mês de criado_em (veja app.db.particoes)
+    e a chave primária é (id, criado_em). Os IDs vêm de uma sequência e são únicos, então
+    a identidade dos objetos na sessão continua sendo só o id.
+    """
+    __tablename__ = "submissao"
+    __table_args__ = (chave_particionada("submissao_pkey"),)
+
+    id = Column(Integer, server_default=FetchedValue(), index=True)
+    id_formulario = Column(Integer, ForeignKey("formulario.id"), nullable=False, index=True)
+    versao = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="rascunho")  # rascunho, enviada
+    revisao = Column(Integer, nullable=False, default=0)
+    criado_em = Column(DateTime, nullable=False, server_default=func.now())
+    atualizado_em = Column(DateTime, nullable=False, server_default=func.now())
+
+    # Relacionamento
+    respostas = relationship("RespostaSubmissao", back_populates="submissao")
+
+    __mapper_args__ = {"primary_key": [id]}
+
+class RespostaSubmissao(Base):
+    """
+    Modelo para representar a resposta de uma pergunta em uma submissão.
+    O valor é armazenado em JSON.
+
+    criado_em repete a data de criação da submissão: é a chave de partição, de modo
+    que as respostas ficam na mesma partição mensal que a sua submissão.
+    """
+    __tablename__ = "resposta_submissao"
+    __table_args__ = (
+        chave_particionada("resposta_submissao_pkey"),
+        ForeignKeyConstraint(
+            ["id_submissao", "criado_em"], ["submissao.id", "submissao.criado_em"],
+            name="resposta_submissao_id_submissao_fkey",
+        ),
+        UniqueConstraint("id_submissao", "id_pergunta", "criado_em", name="uq_resposta_submissao"),
+    )
+
+    id = Column(Integer, server_default=FetchedValue(), index=True)
+    id_submissao = Column(Integer, nullable=False)
+    id_pergunta = Column(Integer, nullable=False)
+    valor = Column(Text, nullable=False)
+    criado_em = Column(DateTime, nullable=False, server_default=func.now())
+
+    # Relacionamento
+    submissao = relationship("Submissao", back_populates="respostas")
+
+    __mapper_args__ = {"primary_key": [id]}
+
+class TenantShard(Base):
+    """
+    Modelo para representar a atribuição explícita de um tenant a um shard.
+
+    Fica no banco principal (catálogo); tenants sem atribuição são distribuídos
+    entre os shards por hash.
+    """
+    __tablename__ = "tenant_shard"
+
+    tenant = Column(String(100), primary_key=True)
+    shard = Column(String(50), nullable=False)
+
+class EventoSaida(Base):
+    """
+    Modelo para representar um evento de alteração na caixa de saída (outbox).
+
+    É gravado na mesma transação da alteração (veja app.core.eventos) e removido
+    pelo despachante (app.core.saida) depois de entregue a todos os destinos. Não
+    referencia o formulário: os eventos de exclusão sobrevivem a ele.
+    """
+    __tablename__ = "evento_saida"
+
+    id = Column(Integer, primary_key=True, index=True)
+    id_formulario = Column(Integer, nullable=False)
+    tipo = Column(String(50), nullable=False)
+    conteudo = Column(Text, nullable=False)  # o evento completo, em JSON
+    criado_em = Column(DateTime, nullable=False)
+    # Próxima tentativa de entrega, adiada após uma falha
+    disponivel_em = Column(DateTime, nullable=False, index=True)
+    tentativas = Column(Integer, nullable=False, default=0)
+
+class RequisicaoIdempotente(Base):
+    """
+    Modelo para representar uma escrita feita com o cabeçalho Idempotency-Key.
+
+    Guarda a impressão da requisição e a resposta da primeira execução, repetida nas
+    novas tentativas do cliente até expirar (veja app.core.idempotencia). Enquanto a
+    requisição é executada, status é nulo e a linha reserva a chave.
+    """
+    __tablename__ = "requisicao_idempotente"
+
+    chave = Column(LargeBinary(32), primary_key=True)  # sha256 do cliente e da chave
+    impressao = Column(LargeBinary(32), nullable=False)  # sha256 do método, caminho, tenant e corpo
+    status = Column(SmallInteger, nullable=True)
+    tipo_conteudo = Column(String(100), nullable=True)
+    corpo = Column(LargeBinary, nullable=True)
+    expira_em = Column(DateTime, nullable=False, index=True)
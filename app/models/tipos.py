@@ -0,0 +1,69 @@
+"""
+Tipos de pergunta.
+
+O tipo é gravado como um código smallint, referenciando a tabela de consulta
+tipo_pergunta (código e nome); na aplicação e na API ele é o enum TipoPergunta,
+cujos valores são os nomes usados desde a coluna de texto original.
+"""
+import enum
+from typing import Optional
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+class TipoPergunta(str, enum.Enum):
+    """
+    Tipos de pergunta aceitos. O código gravado no banco não pode mudar depois
+    de criado (veja a migração 0005).
+    """
+    SIM_NAO = "Sim_Não"
+    UNICA_ESCOLHA = "unica_escolha"
+    MULTIPLA_ESCOLHA = "multipla_escolha"
+    TEXTO_LIVRE = "texto_livre"
+    INTEIRO = "Inteiro"
+    NUMERO_DECIMAL = "Numero com duas casas decimais"
+
+    @classmethod
+    def _missing_(cls, valor):
+        # Grafia antiga, ainda enviada por clientes e presente em versões publicadas
+        if valor == "multipla_escola":
+            return cls.MULTIPLA_ESCOLHA
+        return None
+
+    @property
+    def codigo(self) -> int:
+        return CODIGOS[self]
+
+    @classmethod
+    def do_codigo(cls, codigo: int) -> "TipoPergunta":
+        return TIPOS_POR_CODIGO[codigo]
+
+CODIGOS = {
+    TipoPergunta.SIM_NAO: 1,
+    TipoPergunta.UNICA_ESCOLHA: 2,
+    TipoPergunta.MULTIPLA_ESCOLHA: 3,
+    TipoPergunta.TEXTO_LIVRE: 4,
+    TipoPergunta.INTEIRO: 5,
+    TipoPergunta.NUMERO_DECIMAL: 6,
+}
+TIPOS_POR_CODIGO = {codigo: tipo for tipo, codigo in CODIGOS.items()}
+
+class CodigoTipoPergunta(TypeDecorator):
+    """
+    Coluna smallint com o código do tipo, lida e escrita como TipoPergunta.
+    Na escrita também aceita o nome do tipo ou o próprio código.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, valor, dialect) -> Optional[int]:
+        if valor is None or isinstance(valor, int):
+            return valor
+        return TipoPergunta(valor).codigo
+
+    def process_result_value(self, valor, dialect) -> Optional[TipoPergunta]:
+        return None if valor is None else TipoPergunta.do_codigo(valor)
+
+    @property
+    def python_type(self):
+        return TipoPergunta
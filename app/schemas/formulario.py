@@ -15,9 +15,14 @@ class FormularioUpdate(FormularioBase):
 
 class FormularioInDB(FormularioBase):
     id: int
+    tenant: str
 
     class Config:
         orm_mode = True
 
 class Formulario(FormularioInDB):
     pass
+
+class FormularioClone(BaseModel):
+    # Título do novo formulário; por padrão, o mesmo do original
+    titulo: Optional[str] = None
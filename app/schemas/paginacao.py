@@ -0,0 +1,12 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Página de uma listagem com o total de registros e o cursor da próxima página.
+# total_exato é falso quando o total é uma estimativa (tabelas grandes ou consultas amplas).
+class Pagina(BaseModel, Generic[T]):
+    items: List[T]
+    total: int
+    total_exato: bool
+    next_cursor: Optional[str] = None
@@ -1,5 +1,7 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator, model_validator
+
+from app.models.tipos import TipoPergunta
 
 # Schemas para OpcoesRespostas
 class OpcoesRespostasBase(BaseModel):
@@ -10,12 +12,19 @@ class OpcoesRespostasBase(BaseModel):
 class OpcoesRespostasCreate(OpcoesRespostasBase):
     id_pergunta: int
 
+class OpcoesRespostasItem(OpcoesRespostasBase):
+    # Opção atual da pergunta a manter ou alterar; sem id, a opção é nova
+    id: Optional[int] = None
+
 class OpcoesRespostasUpdate(OpcoesRespostasBase):
     pass
 
 class OpcoesRespostasInDB(OpcoesRespostasBase):
     id: int
-    id_pergunta: int
+    id_conjunto: int
+    # Compatibilidade com as respostas anteriores aos conjuntos de opções: a pergunta
+    # pela qual a opção foi lida. Vazio fora de uma pergunta, pois o conjunto é compartilhado.
+    id_pergunta: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -23,6 +32,20 @@ class OpcoesRespostasInDB(OpcoesRespostasBase):
 class OpcoesRespostas(OpcoesRespostasInDB):
     pass
 
+# Schemas para ConjuntoOpcoes
+class ConjuntoOpcoesCreate(BaseModel):
+    nome: Optional[str] = None
+    opcoes: List[OpcoesRespostasBase]
+
+class ConjuntoOpcoes(BaseModel):
+    id: int
+    nome: Optional[str] = None
+    hash: str
+    opcoes: List[OpcoesRespostas] = []
+
+    class Config:
+        orm_mode = True
+
 # Schemas para OpcaoResposta
 class OpcaoRespostaBase(BaseModel):
     id_opcao_resposta: int
@@ -52,7 +75,8 @@ class PerguntaBase(BaseModel):
     ordem: Optional[int] = 0
     obrigatoria: Optional[bool] = False
     sub_pergunta: Optional[bool] = False
-    tipo_pergunta: str
+    tipo_pergunta: TipoPergunta
+    id_conjunto_opcoes: Optional[int] = None
 
 class PerguntaCreate(PerguntaBase):
     opcoes_respostas_multiplas: Optional[List[OpcoesRespostasBase]] = []
@@ -60,7 +84,7 @@ class PerguntaCreate(PerguntaBase):
 class PerguntaUpdate(PerguntaBase):
     id_formulario: Optional[int] = None
     titulo: Optional[str] = None
-    tipo_pergunta: Optional[str] = None
+    tipo_pergunta: Optional[TipoPergunta] = None
 
 class PerguntaInDB(PerguntaBase):
     id: int
@@ -71,3 +95,55 @@ class PerguntaInDB(PerguntaBase):
 class Pergunta(PerguntaInDB):
     opcoes_respostas: List[OpcaoResposta] = []
     opcoes_respostas_multiplas: List[OpcoesRespostas] = []
+
+    @model_validator(mode="after")
+    def _preencher_id_pergunta(self):
+        # As opções vêm do cache dos conjuntos, compartilhadas entre perguntas: são copiadas
+        self.opcoes_respostas_multiplas = [
+            opcao if opcao.id_pergunta == self.id else opcao.model_copy(update={"id_pergunta": self.id})
+            for opcao in self.opcoes_respostas_multiplas
+        ]
+        return self
+
+# Schemas para a alteração de perguntas em lote
+class PerguntaFiltroLote(BaseModel):
+    ids: Optional[List[int]] = None
+    formulario_id: Optional[int] = None
+    tipo_pergunta: Optional[TipoPergunta] = None
+
+class PerguntaUpdateLote(BaseModel):
+    orientacao_resposta: Optional[str] = None
+    ordem: Optional[int] = None
+    obrigatoria: Optional[bool] = None
+    sub_pergunta: Optional[bool] = None
+    tipo_pergunta: Optional[TipoPergunta] = None
+    id_conjunto_opcoes: Optional[int] = None
+
+    class Config:
+        # Título, código e formulário são alterados pergunta a pergunta
+        extra = "forbid"
+
+    @field_validator("tipo_pergunta", "obrigatoria", "sub_pergunta")
+    @classmethod
+    def recusar_nulo(cls, valor):
+        # Omitidos, os campos não são alterados; informados, não podem ser nulos
+        if valor is None:
+            raise ValueError("o campo não pode ser nulo")
+        return valor
+
+class PerguntaAlteracaoLote(BaseModel):
+    filtro: PerguntaFiltroLote
+    valores: PerguntaUpdateLote
+    dry_run: bool = False
+
+class ResultadoAlteracaoLote(BaseModel):
+    total: int
+    dry_run: bool
+    perguntas: List[Pergunta] = []
+
+# Resultado da substituição das opções de uma pergunta
+class DiferencaOpcoes(BaseModel):
+    inseridas: int
+    alteradas: int
+    removidas: int
+    pergunta: Pergunta
@@ -0,0 +1,40 @@
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel
+
+# Schemas para RegraCondicional
+class RegraCondicionalBase(BaseModel):
+    id_pergunta_origem: int
+    operador: Literal["igual", "diferente", "contem", "maior", "menor", "respondida"]
+    valor: Optional[str] = None
+    id_pergunta_destino: int
+
+class RegraCondicionalCreate(RegraCondicionalBase):
+    pass
+
+class RegraCondicionalInDB(RegraCondicionalBase):
+    id: int
+    id_formulario: int
+
+    class Config:
+        orm_mode = True
+
+class RegraCondicional(RegraCondicionalInDB):
+    pass
+
+# Schemas para avaliação de respostas
+class RespostasAvaliacao(BaseModel):
+    respostas: Dict[int, Any] = {}
+
+class ErroResposta(BaseModel):
+    id_pergunta: int
+    mensagem: str
+
+class ResultadoAvaliacao(BaseModel):
+    versao: int
+    visiveis: List[int]
+    obrigatorias: List[int]
+    pendentes: List[int]
+
+class ResultadoValidacao(ResultadoAvaliacao):
+    valido: bool
+    erros: List[ErroResposta] = []
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel, field_validator
+
+# Schemas para Submissao
+class SubmissaoCreate(BaseModel):
+    id_formulario: int
+    versao: Optional[int] = None
+
+class SubmissaoResumo(BaseModel):
+    id: int
+    id_formulario: int
+    versao: int
+    status: str
+    revisao: int
+    criado_em: datetime
+    atualizado_em: datetime
+
+class Submissao(SubmissaoResumo):
+    respostas: Dict[int, Any] = {}
+
+# Operação de alteração no estilo JSON Patch, com path "/<id_pergunta>"
+class OperacaoResposta(BaseModel):
+    op: Literal["add", "replace", "remove"]
+    path: str
+    value: Optional[Any] = None
+
+    @field_validator("path")
+    @classmethod
+    def validar_path(cls, path: str) -> str:
+        if not path.startswith("/") or not path[1:].isdigit():
+            raise ValueError("path deve ter o formato /<id_pergunta>")
+        return path
+
+    @property
+    def id_pergunta(self) -> int:
+        return int(self.path[1:])
+
+class ResultadoRascunho(BaseModel):
+    id: int
+    revisao: int
+    respostas_alteradas: int
+    visibilidade_alterada: List[int] = []
+    pendentes: List[int] = []
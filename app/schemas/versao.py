@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional, List
+from pydantic import BaseModel
+
+from app.schemas.pergunta import Pergunta
+from app.schemas.regra import RegraCondicional
+
+# Schemas para FormularioVersao
+class FormularioVersao(BaseModel):
+    id: int
+    id_formulario: int
+    versao: int
+    hash: str
+    publicado_em: datetime
+
+    class Config:
+        orm_mode = True
+
+# Conteúdo congelado de um formulário publicado
+class FormularioPublicado(BaseModel):
+    id_formulario: int
+    versao: int
+    titulo: str
+    descricao: Optional[str] = None
+    ordem: Optional[int] = 0
+    perguntas: List[Pergunta] = []
+    regras: List[RegraCondicional] = []
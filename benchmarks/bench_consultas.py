@@ -0,0 +1,99 @@
+"""
+Benchmark da construção das consultas de listagem de perguntas.
+
+Compara a montagem pela API Query do ORM (como get_perguntas fazia, refeita a cada
+chamada) com a instrução em cache de crud.pergunta.consulta_perguntas (lambda_stmt):
+
+- construcao: montar a instrução e calcular a sua chave de cache, o trabalho feito
+  a cada requisição antes de o SQL compilado ser encontrado no cache do engine;
+- chamada: a listagem completa em um banco SQLite em memória com poucas linhas,
+  para que o custo de construção não fique escondido pelo tempo do banco.
+
+Uso:
+    python -m benchmarks.bench_consultas --repeticoes 5000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import asc, create_engine, desc
+from sqlalchemy.orm import Session
+
+from app.crud.pergunta import CARREGAR_OPCOES, consulta_perguntas, get_perguntas
+from app.db.database import Base
+from app.models.models import Formulario, Pergunta
+
+def get_perguntas_query(db: Session, skip=0, limit=100, formulario_id=None, tipo_pergunta=None,
+                        obrigatoria=None, sort_by="ordem", sort_order="asc"):
+    """
+    Listagem montada com a API Query a cada chamada, para comparação
+    """
+    query = db.query(Pergunta).options(*CARREGAR_OPCOES)
+    if formulario_id is not None:
+        query = query.filter(Pergunta.id_formulario == formulario_id)
+    if tipo_pergunta is not None:
+        query = query.filter(Pergunta.tipo_pergunta == tipo_pergunta)
+    if obrigatoria is not None:
+        query = query.filter(Pergunta.obrigatoria == obrigatoria)
+    ordem = desc if sort_order == "desc" else asc
+    return query.order_by(ordem(getattr(Pergunta, sort_by))).offset(skip).limit(limit)
+
+def _medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1_000_000)
+    tempos.sort()
+    return {
+        "p50_us": round(statistics.median(tempos), 2),
+        "p95_us": round(tempos[int(len(tempos) * 0.95) - 1], 2),
+    }
+
+def executar(repeticoes: int, formularios: int = 20, perguntas: int = 10, seed: int = 42) -> dict:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    aleatorio = random.Random(seed)
+    with Session(engine) as db:
+        for formulario_id in range(1, formularios + 1):
+            db.add(Formulario(id=formulario_id, titulo=f"Formulário {formulario_id}"))
+            for ordem in range(perguntas):
+                db.add(Pergunta(
+                    id_formulario=formulario_id, titulo=f"Pergunta {ordem}", ordem=ordem,
+                    tipo_pergunta=aleatorio.choice(["texto_livre", "Sim_Não"]), obrigatoria=aleatorio.random() < 0.5,
+                ))
+        db.commit()
+
+        def parametros():
+            return {
+                "formulario_id": aleatorio.randint(1, formularios),
+                "tipo_pergunta": aleatorio.choice([None, "texto_livre"]),
+                "sort_order": aleatorio.choice(["asc", "desc"]),
+            }
+
+        def construir_query():
+            get_perguntas_query(db, **parametros()).statement._generate_cache_key()
+
+        def construir_lambda():
+            consulta_perguntas(**parametros())._generate_cache_key()
+
+        resultado = {
+            "construcao": {
+                "query_orm": _medir(construir_query, repeticoes),
+                "lambda_stmt": _medir(construir_lambda, repeticoes),
+            },
+            "chamada": {
+                "query_orm": _medir(lambda: get_perguntas_query(db, **parametros()).all(), repeticoes),
+                "lambda_stmt": _medir(lambda: get_perguntas(db, **parametros()), repeticoes),
+            },
+        }
+    engine.dispose()
+    return {"repeticoes": repeticoes, **resultado}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(executar(args.repeticoes), indent=2))
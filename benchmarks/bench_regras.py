@@ -0,0 +1,82 @@
+"""
+Benchmark do motor de regras condicionais.
+
+Gera um formulário sintético com milhares de perguntas e regras e mede o tempo
+de compilação do grafo, de avaliação completa e de atualização incremental.
+
+Uso:
+    python -m benchmarks.bench_regras --perguntas 5000 --regras 10000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.core.regras import GrafoRegras
+
+def gerar_formulario(num_perguntas: int, num_regras: int, seed: int = 42):
+    """
+    Gera perguntas Sim/Não e regras apontando sempre para perguntas posteriores
+    (o que garante um grafo acíclico), com cadeias e ramificações aleatórias
+    """
+    aleatorio = random.Random(seed)
+    perguntas = [
+        {"id": i, "tipo_pergunta": "Sim_Não", "obrigatoria": aleatorio.random() < 0.5}
+        for i in range(1, num_perguntas + 1)
+    ]
+    regras = []
+    for _ in range(num_regras):
+        origem = aleatorio.randint(1, num_perguntas - 1)
+        destino = aleatorio.randint(origem + 1, min(num_perguntas, origem + 50))
+        regras.append({
+            "id_pergunta_origem": origem,
+            "operador": "igual",
+            "valor": "Sim",
+            "id_pergunta_destino": destino,
+        })
+    return perguntas, regras
+
+def _medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "p50_ms": round(statistics.median(tempos), 4),
+        "p95_ms": round(tempos[int(len(tempos) * 0.95) - 1], 4),
+        "max_ms": round(tempos[-1], 4),
+    }
+
+def executar(num_perguntas: int, num_regras: int, repeticoes: int) -> dict:
+    perguntas, regras = gerar_formulario(num_perguntas, num_regras)
+    aleatorio = random.Random(7)
+    respostas = {p["id"]: aleatorio.choice(["Sim", "Não"]) for p in perguntas}
+
+    compilacao = _medir(lambda: GrafoRegras(perguntas, regras), repeticoes)
+    grafo = GrafoRegras(perguntas, regras)
+    avaliacao_completa = _medir(lambda: grafo.novo_estado(respostas), repeticoes)
+
+    estado = grafo.novo_estado(respostas)
+    def alterar_uma_resposta():
+        pergunta_id = aleatorio.randint(1, num_perguntas)
+        estado.aplicar({pergunta_id: "Sim" if estado.respostas.get(pergunta_id) == "Não" else "Não"})
+    atualizacao_incremental = _medir(alterar_uma_resposta, repeticoes * 10)
+
+    return {
+        "perguntas": num_perguntas,
+        "regras": num_regras,
+        "compilacao": compilacao,
+        "avaliacao_completa": avaliacao_completa,
+        "atualizacao_incremental": atualizacao_incremental,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--perguntas", type=int, default=5000)
+    parser.add_argument("--regras", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(executar(args.perguntas, args.regras, args.repeticoes), indent=2))
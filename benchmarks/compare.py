@@ -0,0 +1,78 @@
+"""
+Compara dois resultados de benchmarks/run.py e aponta regressões.
+
+Uso:
+    python -m benchmarks.compare base.json novo.json --limite 10
+
+Retorna código de saída 1 se algum cenário piorar mais que o limite (em %)
+em p50, p95, p99, vazão ou consultas por requisição.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+# Métrica -> True se valores maiores são piores
+METRICAS = {
+    "p50_ms": True,
+    "p95_ms": True,
+    "p99_ms": True,
+    "vazao_rps": False,
+    "consultas_por_requisicao": True,
+}
+
+def _variacao(base: Optional[float], novo: Optional[float]) -> Optional[float]:
+    if base is None or novo is None:
+        return None
+    if base == 0:
+        return 0.0 if novo == 0 else float("inf")
+    return (novo - base) / base * 100
+
+def comparar(base: dict, novo: dict, limite: float) -> List[dict]:
+    """
+    Variação percentual por cenário e métrica, com a marcação de regressão
+    """
+    linhas = []
+    for cenario, metricas_novo in novo["cenarios"].items():
+        metricas_base = base["cenarios"].get(cenario)
+        if metricas_base is None:
+            continue
+        for metrica, maior_pior in METRICAS.items():
+            variacao = _variacao(metricas_base.get(metrica), metricas_novo.get(metrica))
+            if variacao is None:
+                continue
+            piora = variacao if maior_pior else -variacao
+            linhas.append({
+                "cenario": cenario,
+                "metrica": metrica,
+                "base": metricas_base[metrica],
+                "novo": metricas_novo[metrica],
+                "variacao": round(variacao, 1),
+                "regressao": piora > limite,
+            })
+    return linhas
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("novo")
+    parser.add_argument("--limite", type=float, default=10.0, help="Piora máxima tolerada, em %%")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    with open(args.novo, encoding="utf-8") as arquivo:
+        novo = json.load(arquivo)
+
+    print(f"base: {base['meta'].get('commit')}  novo: {novo['meta'].get('commit')}")
+    linhas = comparar(base, novo, args.limite)
+    for linha in linhas:
+        marca = "  REGRESSÃO" if linha["regressao"] else ""
+        print(f"{linha['cenario']:35s} {linha['metrica']:26s} {linha['base']:>10} -> {linha['novo']:>10} "
+              f"({linha['variacao']:+.1f}%){marca}")
+    regressoes = [linha for linha in linhas if linha["regressao"]]
+    print(f"\n{len(regressoes)} regressão(ões) acima de {args.limite}%")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Conjunto de dados sintético dos benchmarks, gerado por seed_data.gerar_dados
+com semente fixa para que execuções em commits diferentes usem os mesmos dados.
+"""
+from sqlalchemy.engine import Engine
+
+from app.db.database import Base
+from seed_data import gerar_dados
+
+def gerar_dataset(
+    engine: Engine,
+    formularios: int,
+    perguntas_por_formulario: int,
+    opcoes_por_pergunta: int,
+    submissoes_por_formulario: int = 0,
+    seed: int = 42,
+    processos: int = 1,
+) -> dict:
+    """
+    Recria as tabelas e insere o conjunto sintético. Retorna a contagem de registros.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return gerar_dados(
+        engine, formularios, perguntas_por_formulario, opcoes_por_pergunta, submissoes_por_formulario,
+        seed=seed, processos=processos,
+    )
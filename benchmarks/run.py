@@ -0,0 +1,320 @@
+"""
+Suíte de benchmarks dos endpoints da API.
+
+Gera um conjunto de dados sintético na escala configurada e exercita todos os
+endpoints de app/api/endpoints, em processo (cliente ASGI) ou contra um servidor
+HTTP já em execução, reportando latência p50/p95/p99, vazão, consultas SQL e bytes
+transferidos por requisição (e, em processo, tempo de CPU por requisição). O resultado é gravado em JSON para comparação entre commits
+(veja benchmarks/compare.py).
+
+Uso:
+    python -m benchmarks.run --formularios 1000 --perguntas 50 --opcoes 5 --saida resultados.json
+    python -m benchmarks.run --url http://localhost:8000 --database-url postgresql://... --concorrencia 32
+    python -m benchmarks.run --accept-encoding identity --accept application/msgpack --cenarios versoes
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+API = "/api/v1"
+
+def percentil(valores: List[float], p: float) -> float:
+    """
+    Percentil pelo método nearest-rank
+    """
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+def commit_atual() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Cenario:
+    """
+    Requisição a ser medida. `preparar` roda fora da medição, por exemplo para
+    criar o registro que será excluído.
+    """
+
+    def __init__(self, nome: str, metodo: str, caminho: Callable, corpo: Optional[Callable] = None,
+                 preparar: Optional[Callable] = None, esperado=(200, 201, 204)):
+        self.nome = nome
+        self.metodo = metodo
+        self.caminho = caminho
+        self.corpo = corpo
+        self.preparar = preparar
+        self.esperado = esperado
+
+def _nova_pergunta(ctx, aleatorio):
+    return {
+        "id_formulario": aleatorio.choice(ctx["formularios"]),
+        "titulo": "Pergunta de benchmark",
+        "tipo_pergunta": "unica_escolha",
+        "opcoes_respostas_multiplas": [{"resposta": f"Opção {i}", "ordem": i} for i in range(1, 5)],
+    }
+
+# A preparação lê as respostas como JSON, independentemente do Accept medido
+JSON = {"Accept": "application/json"}
+
+async def _criar(cliente, caminho: str, corpo: dict) -> dict:
+    response = await cliente.post(caminho, json=corpo, headers=JSON)
+    response.raise_for_status()
+    return response.json()
+
+def montar_cenarios() -> List[Cenario]:
+    publicado = lambda ctx, a: a.choice(ctx["publicados"])
+    return [
+        # Formulários
+        Cenario("formularios.listar", "GET", lambda ctx, a: f"{API}/formularios/?limit=100"),
+        Cenario("formularios.obter", "GET", lambda ctx, a: f"{API}/formularios/{a.choice(ctx['formularios'])}"),
+        Cenario("formularios.criar", "POST", lambda ctx, a: f"{API}/formularios/",
+                corpo=lambda ctx, a: {"titulo": "Formulário de benchmark", "descricao": "x" * 200}),
+        Cenario("formularios.atualizar", "PUT", lambda ctx, a: f"{API}/formularios/{a.choice(ctx['formularios'])}",
+                corpo=lambda ctx, a: {"descricao": f"Atualizado {a.random()}"}),
+        Cenario("formularios.excluir", "DELETE", lambda ctx, a: f"{API}/formularios/{ctx['preparado']['id']}",
+                preparar=lambda cliente, ctx, a: _criar(cliente, f"{API}/formularios/", {"titulo": "Temporário"})),
+        # Perguntas
+        Cenario("perguntas.listar", "GET", lambda ctx, a: f"{API}/perguntas/?limit=100"),
+        Cenario("perguntas.listar_filtrado", "GET",
+                lambda ctx, a: f"{API}/perguntas/?tipo_pergunta=unica_escolha&obrigatoria=true&limit=50"),
+        Cenario("perguntas.listar_por_formulario", "GET",
+                lambda ctx, a: f"{API}/perguntas/formulario/{a.choice(ctx['formularios'])}"),
+        Cenario("perguntas.obter", "GET", lambda ctx, a: f"{API}/perguntas/{a.choice(ctx['perguntas'])}"),
+        Cenario("perguntas.criar", "POST", lambda ctx, a: f"{API}/perguntas/", corpo=_nova_pergunta),
+        Cenario("perguntas.atualizar", "PUT", lambda ctx, a: f"{API}/perguntas/{a.choice(ctx['perguntas'])}",
+                corpo=lambda ctx, a: {"obrigatoria": a.random() < 0.5}),
+        Cenario("perguntas.excluir", "DELETE", lambda ctx, a: f"{API}/perguntas/{ctx['preparado']['id']}",
+                preparar=lambda cliente, ctx, a: _criar(cliente, f"{API}/perguntas/", _nova_pergunta(ctx, a))),
+        # Versões publicadas
+        Cenario("versoes.publicar", "POST", lambda ctx, a: f"{API}/formularios/{publicado(ctx, a)}/publicar"),
+        Cenario("versoes.listar", "GET", lambda ctx, a: f"{API}/formularios/{publicado(ctx, a)}/versoes"),
+        Cenario("versoes.obter", "GET", lambda ctx, a: f"{API}/formularios/{publicado(ctx, a)}/versoes/1"),
+        Cenario("versoes.ultima", "GET", lambda ctx, a: f"{API}/formularios/{publicado(ctx, a)}/publicado"),
+        # Regras condicionais
+        Cenario("regras.listar", "GET", lambda ctx, a: f"{API}/formularios/{publicado(ctx, a)}/regras"),
+        Cenario("regras.criar", "POST", lambda ctx, a: f"{API}/formularios/{ctx['regra_formulario']}/regras",
+                corpo=lambda ctx, a: ctx["nova_regra"]),
+        Cenario("regras.excluir", "DELETE",
+                lambda ctx, a: f"{API}/formularios/{ctx['regra_formulario']}/regras/{ctx['preparado']['id']}",
+                preparar=lambda cliente, ctx, a: _criar(
+                    cliente, f"{API}/formularios/{ctx['regra_formulario']}/regras", ctx["nova_regra"])),
+        Cenario("regras.avaliar", "POST", lambda ctx, a: f"{API}/formularios/{ctx['regra_formulario']}/avaliar",
+                corpo=lambda ctx, a: {"respostas": ctx["respostas"]}),
+        Cenario("regras.validar", "POST", lambda ctx, a: f"{API}/formularios/{ctx['regra_formulario']}/validar",
+                corpo=lambda ctx, a: {"respostas": ctx["respostas"]}),
+        # Submissões
+        Cenario("submissoes.criar", "POST", lambda ctx, a: f"{API}/submissoes/",
+                corpo=lambda ctx, a: {"id_formulario": publicado(ctx, a)}),
+        Cenario("submissoes.obter", "GET", lambda ctx, a: f"{API}/submissoes/{ctx['rascunho']}"),
+        Cenario("submissoes.salvar_parcial", "PATCH", lambda ctx, a: f"{API}/submissoes/{ctx['rascunho']}",
+                corpo=lambda ctx, a: [{"op": "replace", "path": f"/{ctx['pergunta_texto']}", "value": f"Texto {a.random()}"}]),
+        Cenario("submissoes.enviar", "POST", lambda ctx, a: f"{API}/submissoes/{ctx['preparado']['id']}/enviar",
+                preparar=lambda cliente, ctx, a: _criar(
+                    cliente, f"{API}/submissoes/", {"id_formulario": ctx["regra_formulario"]}),
+                esperado=(200, 422)),
+    ]
+
+async def preparar_contexto(cliente, dataset: dict, aleatorio: random.Random) -> Dict:
+    """
+    Publica alguns formulários, cria uma regra e um rascunho usados pelos cenários
+    """
+    formularios = list(range(1, dataset["formularios"] + 1))
+    ctx = {
+        "formularios": formularios,
+        "perguntas": list(range(1, dataset["perguntas"] + 1)),
+        "publicados": formularios[:20],
+    }
+    for formulario_id in ctx["publicados"]:
+        (await cliente.post(f"{API}/formularios/{formulario_id}/publicar")).raise_for_status()
+
+    formulario_id = ctx["publicados"][0]
+    conteudo = (await cliente.get(f"{API}/formularios/{formulario_id}/publicado", headers=JSON)).json()
+    perguntas = conteudo["perguntas"]
+    ctx["regra_formulario"] = formulario_id
+    ctx["nova_regra"] = {
+        "id_pergunta_origem": perguntas[0]["id"],
+        "operador": "respondida",
+        "id_pergunta_destino": perguntas[-1]["id"],
+    }
+    await _criar(cliente, f"{API}/formularios/{formulario_id}/regras", ctx["nova_regra"])
+    (await cliente.post(f"{API}/formularios/{formulario_id}/publicar")).raise_for_status()
+
+    # Respostas válidas para os tipos sem opções
+    valores = {"Sim_Não": "Sim", "texto_livre": "Texto", "Inteiro": 10, "Numero com duas casas decimais": 1.5}
+    ctx["respostas"] = {p["id"]: valores[p["tipo_pergunta"]] for p in perguntas if p["tipo_pergunta"] in valores}
+
+    ctx["rascunho"] = (await _criar(cliente, f"{API}/submissoes/", {"id_formulario": formulario_id}))["id"]
+    texto = [p["id"] for p in perguntas if p["tipo_pergunta"] == "texto_livre"]
+    if not texto:
+        novo = await _criar(cliente, f"{API}/perguntas/", {
+            "id_formulario": formulario_id, "titulo": "Comentário", "tipo_pergunta": "texto_livre"
+        })
+        (await cliente.post(f"{API}/formularios/{formulario_id}/publicar")).raise_for_status()
+        ctx["rascunho"] = (await _criar(cliente, f"{API}/submissoes/", {"id_formulario": formulario_id}))["id"]
+        texto = [novo["id"]]
+    ctx["pergunta_texto"] = texto[0]
+    return ctx
+
+def _consultas(response) -> Optional[int]:
+    """
+    Número de consultas SQL informado pelo cabeçalho X-SQL-Profile, se presente
+    """
+    perfil = response.headers.get("x-sql-profile")
+    if not perfil:
+        return None
+    for parte in perfil.split(";"):
+        chave, _, valor = parte.strip().partition("=")
+        if chave == "consultas":
+            return int(valor)
+    return None
+
+async def medir_cenario(cliente, cenario: Cenario, ctx: Dict, requisicoes: int, concorrencia: int, seed: int) -> dict:
+    aleatorio = random.Random(seed)
+    latencias: List[float] = []
+    consultas: List[int] = []
+    tamanhos: List[int] = []
+    erros = 0
+    semaforo = asyncio.Semaphore(concorrencia)
+
+    async def executar():
+        nonlocal erros
+        async with semaforo:
+            ctx_requisicao = dict(ctx)
+            if cenario.preparar:
+                ctx_requisicao["preparado"] = await cenario.preparar(cliente, ctx, aleatorio)
+            corpo = cenario.corpo(ctx_requisicao, aleatorio) if cenario.corpo else None
+            caminho = cenario.caminho(ctx_requisicao, aleatorio)
+            inicio = time.perf_counter()
+            response = await cliente.request(cenario.metodo, caminho, json=corpo)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            tamanhos.append(response.num_bytes_downloaded)
+            if response.status_code not in cenario.esperado:
+                erros += 1
+            total = _consultas(response)
+            if total is not None:
+                consultas.append(total)
+
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(executar() for _ in range(requisicoes)))
+    duracao, cpu = time.perf_counter() - inicio, time.process_time() - inicio_cpu
+
+    return {
+        "requisicoes": requisicoes,
+        "erros": erros,
+        "p50_ms": round(percentil(latencias, 50), 3),
+        "p95_ms": round(percentil(latencias, 95), 3),
+        "p99_ms": round(percentil(latencias, 99), 3),
+        "media_ms": round(sum(latencias) / len(latencias), 3),
+        "vazao_rps": round(requisicoes / duracao, 1),
+        "consultas_por_requisicao": round(sum(consultas) / len(consultas), 2) if consultas else None,
+        # Bytes do corpo como recebidos (comprimidos, se negociado)
+        "bytes_por_resposta": round(sum(tamanhos) / len(tamanhos), 1),
+        # Em processo, inclui o cliente; serve para comparar execuções com o mesmo modo
+        "cpu_ms_por_requisicao": round(cpu * 1000 / requisicoes, 3),
+    }
+
+async def executar(args) -> dict:
+    import httpx
+
+    cabecalhos = {"Accept-Encoding": args.accept_encoding, "Accept": args.accept}
+    if args.url:
+        cliente = httpx.AsyncClient(base_url=args.url, timeout=60, headers=cabecalhos)
+    else:
+        from app.core.config import settings
+        from app.main import app
+        # Em processo, o perfil SQL fornece o número de consultas por requisição
+        settings.SQL_PROFILE_ENABLED = True
+        # Mede a aplicação, não os limites de taxa de um único cliente
+        settings.RATE_LIMIT_ENABLED = False
+        cliente = httpx.AsyncClient(app=app, base_url="http://benchmark", timeout=60, headers=cabecalhos)
+
+    dataset = {"formularios": args.formularios, "perguntas": args.formularios * args.perguntas}
+    resultados = {}
+    async with cliente:
+        ctx = await preparar_contexto(cliente, dataset, random.Random(args.seed))
+        for indice, cenario in enumerate(montar_cenarios()):
+            if args.cenarios and not any(cenario.nome.startswith(prefixo) for prefixo in args.cenarios):
+                continue
+            resultados[cenario.nome] = await medir_cenario(
+                cliente, cenario, ctx, args.requisicoes, args.concorrencia, args.seed + indice
+            )
+            print(f"{cenario.nome:35s} p50={resultados[cenario.nome]['p50_ms']:8.2f}ms "
+                  f"p99={resultados[cenario.nome]['p99_ms']:8.2f}ms "
+                  f"{resultados[cenario.nome]['vazao_rps']:8.1f} req/s", file=sys.stderr)
+    return resultados
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db",
+                        help="Banco usado para gerar os dados (e pela aplicação no modo em processo)")
+    parser.add_argument("--url", help="URL de um servidor em execução (gerador de carga HTTP)")
+    parser.add_argument("--formularios", type=int, default=100)
+    parser.add_argument("--perguntas", type=int, default=20, help="Perguntas por formulário")
+    parser.add_argument("--opcoes", type=int, default=4, help="Opções por pergunta de escolha")
+    parser.add_argument("--submissoes", type=int, default=2, help="Submissões por formulário")
+    parser.add_argument("--processos", type=int, default=1, help="Processos usados na geração dos dados")
+    parser.add_argument("--requisicoes", type=int, default=200, help="Requisições por cenário")
+    parser.add_argument("--concorrencia", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--accept-encoding", default="gzip, br", help="Cabeçalho Accept-Encoding das requisições")
+    parser.add_argument("--accept", default="application/json", help="Cabeçalho Accept (ex.: application/msgpack)")
+    parser.add_argument("--cenarios", nargs="*", help="Prefixos dos cenários a executar (ex.: perguntas versoes)")
+    parser.add_argument("--pular-geracao", action="store_true", help="Reutilizar os dados já existentes no banco")
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    # A aplicação lê DATABASE_URL do ambiente ao ser importada
+    os.environ["DATABASE_URL"] = args.database_url
+    from sqlalchemy import create_engine
+    from benchmarks.dataset import gerar_dataset
+
+    if not args.pular_geracao:
+        engine = create_engine(args.database_url)
+        inicio = time.perf_counter()
+        contagem = gerar_dataset(
+            engine, args.formularios, args.perguntas, args.opcoes, args.submissoes,
+            seed=args.seed, processos=args.processos,
+        )
+        print(f"Dados gerados em {time.perf_counter() - inicio:.1f}s: {contagem}", file=sys.stderr)
+        engine.dispose()
+
+    cenarios = asyncio.run(executar(args))
+    resultado = {
+        "meta": {
+            "commit": commit_atual(),
+            "data": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "modo": "http" if args.url else "asgi",
+            "banco": args.database_url.split(":", 1)[0],
+            "dataset": {"formularios": args.formularios, "perguntas_por_formulario": args.perguntas,
+                        "opcoes_por_pergunta": args.opcoes, "submissoes_por_formulario": args.submissoes,
+                        "seed": args.seed},
+            "requisicoes_por_cenario": args.requisicoes,
+            "concorrencia": args.concorrencia,
+            "accept_encoding": args.accept_encoding,
+            "accept": args.accept,
+        },
+        "cenarios": cenarios,
+    }
+    saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(saida)
+    else:
+        print(saida)
+    return resultado
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Configuração do Gunicorn para produção: vários workers Uvicorn (pre-fork),
+reciclagem após um número de requisições e encerramento gracioso.
+
+Uso:
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Todas as opções podem ser ajustadas por variáveis de ambiente.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Um worker por núcleo: os workers Uvicorn são assíncronos e as rotas síncronas
+# rodam no threadpool de cada worker
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Reciclar os workers após um número de requisições limita o crescimento de memória;
+# o jitter evita que todos reiniciem ao mesmo tempo
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Tempo para os workers concluírem as requisições em andamento ao receber SIGTERM
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# A aplicação é importada uma vez no master e compartilhada com os workers.
+# A importação não abre conexões: engine e pool são criados no lifespan de cada worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+
+# Diretório onde cada worker grava as suas métricas para que /metrics combine
+# os valores de todos os processos. Definido antes de a aplicação ser importada.
+os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "metricas_gunicorn"))
+
+def on_starting(server):
+    # Descartar as métricas de execuções anteriores
+    diretorio = os.environ["METRICS_MULTIPROC_DIR"]
+    shutil.rmtree(diretorio, ignore_errors=True)
+    os.makedirs(diretorio, exist_ok=True)
+
+def post_fork(server, worker):
+    # Garantir que nenhuma conexão criada no master seja compartilhada com o worker
+    from app.db.database import dispose_engine
+    dispose_engine()
+
+def child_exit(server, worker):
+    # Preservar contadores e histogramas do worker encerrado e descartar os seus medidores
+    from app.core.metricas import marcar_processo_encerrado
+    marcar_processo_encerrado(os.environ["METRICS_MULTIPROC_DIR"], worker.pid)
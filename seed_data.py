@@ -1,14 +1,68 @@
+"""
+Carga de dados no banco.
+
+Sem argumentos, insere os formulários de exemplo. Com --formularios, gera um
+conjunto sintético em larga escala: formulários, perguntas de todos os tipos,
+opções, versão publicada e submissões com respostas válidas.
+
+A geração é feita em blocos de formulários, inseridos com INSERT em lote (Core)
+ou COPY no PostgreSQL, opcionalmente em vários processos. Os IDs são calculados
+a partir do ID do formulário e cada formulário usa sua própria semente, então o
+resultado é o mesmo independentemente do tamanho dos blocos e do número de processos.
+
+Uso:
+    python seed_data.py
+    python seed_data.py --formularios 100000 --perguntas 20 --opcoes 5 --submissoes 5 --processos 8 --recriar
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from app.db.database import SessionLocal, engine, Base
-from app.models.models import Formulario, Pergunta, OpcoesRespostas
 
-# Recria as tabelas
-Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
+from app.db.database import get_engine, Base
+from app.crud.opcoes import hash_opcoes, normalizar_opcoes, obter_conjunto
+from app.crud.versao import hash_conteudo
+from app.models.models import (
+    ConjuntoOpcoes, Formulario, Pergunta, OpcoesRespostas, FormularioVersao, Submissao, RespostaSubmissao
+)
+from app.models.tipos import TipoPergunta
+from app.schemas.versao import FormularioPublicado
+
+TIPOS_PERGUNTA = list(TipoPergunta)
+TIPOS_COM_OPCOES = {TipoPergunta.UNICA_ESCOLHA, TipoPergunta.MULTIPLA_ESCOLHA}
+
+# Data de referência fixa para que as datas das submissões sejam reproduzíveis
+DATA_REFERENCIA = datetime(2025, 1, 1)
+
+# Conjunto de opções compartilhado pelas perguntas de escolha do conjunto sintético
+CONJUNTO_SINTETICO = 1
 
-db = SessionLocal()
+TABELAS = (
+    ConjuntoOpcoes.__table__,
+    OpcoesRespostas.__table__,
+    Formulario.__table__,
+    Pergunta.__table__,
+    FormularioVersao.__table__,
+    Submissao.__table__,
+    RespostaSubmissao.__table__,
+)
 
-def seed_data():
+def seed_data(engine: Optional[Engine] = None):
+    """
+    Insere os formulários de exemplo
+    """
+    db = Session(bind=engine or get_engine())
     try:
         # Criar formulários de exemplo
         form1 = Formulario(
@@ -16,21 +70,32 @@ def seed_data():
             descricao="Formulário para avaliar a satisfação dos clientes",
             ordem=1
         )
-        
+
         form2 = Formulario(
             titulo="Cadastro de Usuário",
             descricao="Formulário para cadastro de novos usuários",
             ordem=2
         )
-        
-        db.add(form1)
-        db.add(form2)
-        db.commit()
-        
+
         # Criar perguntas para o formulário 1
-        perguntas_form1 = [
+        avaliacao = Pergunta(
+            titulo="Como você avalia nosso atendimento?",
+            codigo="avaliacao",
+            orientacao_resposta="Escolha uma das opções abaixo",
+            ordem=2,
+            obrigatoria=True,
+            tipo_pergunta="unica_escolha"
+        )
+        servicos = Pergunta(
+            titulo="Quais serviços você utilizou?",
+            codigo="servicos",
+            orientacao_resposta="Selecione todos os serviços utilizados",
+            ordem=3,
+            obrigatoria=False,
+            tipo_pergunta="multipla_escolha"
+        )
+        form1.perguntas = [
             Pergunta(
-                id_formulario=1,
                 titulo="Você está satisfeito com nosso serviço?",
                 codigo="satisfacao",
                 orientacao_resposta="Escolha uma opção",
@@ -38,26 +103,9 @@ def seed_data():
                 obrigatoria=True,
                 tipo_pergunta="Sim_Não"
             ),
+            avaliacao,
+            servicos,
             Pergunta(
-                id_formulario=1,
-                titulo="Como você avalia nosso atendimento?",
-                codigo="avaliacao",
-                orientacao_resposta="Escolha uma das opções abaixo",
-                ordem=2,
-                obrigatoria=True,
-                tipo_pergunta="unica_escolha"
-            ),
-            Pergunta(
-                id_formulario=1,
-                titulo="Quais serviços você utilizou?",
-                codigo="servicos",
-                orientacao_resposta="Selecione todos os serviços utilizados",
-                ordem=3,
-                obrigatoria=False,
-                tipo_pergunta="multipla_escola"
-            ),
-            Pergunta(
-                id_formulario=1,
                 titulo="Deixe um comentário ou sugestão",
                 codigo="comentario",
                 orientacao_resposta="Escreva seu comentário",
@@ -66,11 +114,10 @@ def seed_data():
                 tipo_pergunta="texto_livre"
             )
         ]
-        
+
         # Criar perguntas para o formulário 2
-        perguntas_form2 = [
+        form2.perguntas = [
             Pergunta(
-                id_formulario=2,
                 titulo="Nome completo",
                 codigo="nome",
                 orientacao_resposta="Digite seu nome completo",
@@ -79,7 +126,6 @@ def seed_data():
                 tipo_pergunta="texto_livre"
             ),
             Pergunta(
-                id_formulario=2,
                 titulo="Idade",
                 codigo="idade",
                 orientacao_resposta="Digite sua idade",
@@ -88,7 +134,6 @@ def seed_data():
                 tipo_pergunta="Inteiro"
             ),
             Pergunta(
-                id_formulario=2,
                 titulo="Você aceita receber notificações?",
                 codigo="notificacoes",
                 orientacao_resposta="Escolha uma opção",
@@ -97,42 +142,297 @@ def seed_data():
                 tipo_pergunta="Sim_Não"
             )
         ]
-        
-        for pergunta in perguntas_form1 + perguntas_form2:
-            db.add(pergunta)
-        
-        db.commit()
-        
+
         # Adicionar opções de resposta para a pergunta de avaliação
-        opcoes_avaliacao = [
-            OpcoesRespostas(id_pergunta=2, resposta="Excelente", ordem=1),
-            OpcoesRespostas(id_pergunta=2, resposta="Bom", ordem=2),
-            OpcoesRespostas(id_pergunta=2, resposta="Regular", ordem=3),
-            OpcoesRespostas(id_pergunta=2, resposta="Ruim", ordem=4),
-            OpcoesRespostas(id_pergunta=2, resposta="Péssimo", ordem=5)
-        ]
-        
+        avaliacao.conjunto_opcoes = obter_conjunto(db, [
+            {"resposta": "Excelente", "ordem": 1},
+            {"resposta": "Bom", "ordem": 2},
+            {"resposta": "Regular", "ordem": 3},
+            {"resposta": "Ruim", "ordem": 4},
+            {"resposta": "Péssimo", "ordem": 5}
+        ], nome="Escala de satisfação")
+
         # Adicionar opções de resposta para a pergunta de serviços
-        opcoes_servicos = [
-            OpcoesRespostas(id_pergunta=3, resposta="Atendimento ao cliente", ordem=1),
-            OpcoesRespostas(id_pergunta=3, resposta="Suporte técnico", ordem=2),
-            OpcoesRespostas(id_pergunta=3, resposta="Vendas", ordem=3),
-            OpcoesRespostas(id_pergunta=3, resposta="Pós-venda", ordem=4),
-            OpcoesRespostas(id_pergunta=3, resposta="Outro", ordem=5, resposta_aberta=True)
-        ]
-        
-        for opcao in opcoes_avaliacao + opcoes_servicos:
-            db.add(opcao)
-        
+        servicos.conjunto_opcoes = obter_conjunto(db, [
+            {"resposta": "Atendimento ao cliente", "ordem": 1},
+            {"resposta": "Suporte técnico", "ordem": 2},
+            {"resposta": "Vendas", "ordem": 3},
+            {"resposta": "Pós-venda", "ordem": 4},
+            {"resposta": "Outro", "ordem": 5, "resposta_aberta": True}
+        ], nome="Áreas de serviço")
+
+        db.add_all([form1, form2])
         db.commit()
-        
+
         print("Dados de exemplo inseridos com sucesso!")
-        
+
     except Exception as e:
         print(f"Erro ao inserir dados: {e}")
         db.rollback()
     finally:
         db.close()
 
+def _valor_resposta(aleatorio: random.Random, pergunta: dict, opcoes: List[int]):
+    """
+    Valor válido para o tipo da pergunta (veja app.core.validacao)
+    """
+    tipo = pergunta["tipo_pergunta"]
+    if tipo is TipoPergunta.SIM_NAO:
+        return aleatorio.choice(("Sim", "Não"))
+    if tipo is TipoPergunta.UNICA_ESCOLHA:
+        return aleatorio.choice(opcoes)
+    if tipo is TipoPergunta.MULTIPLA_ESCOLHA:
+        return aleatorio.sample(opcoes, aleatorio.randint(1, len(opcoes)))
+    if tipo is TipoPergunta.INTEIRO:
+        return aleatorio.randint(0, 120)
+    if tipo is TipoPergunta.NUMERO_DECIMAL:
+        return round(aleatorio.uniform(0, 10_000), 2)
+    return "Resposta " * aleatorio.randint(1, 20)
+
+def gerar_conjunto_opcoes(opcoes: int) -> Dict[str, list]:
+    """
+    Linhas do conjunto de opções compartilhado pelas perguntas de escolha, por tabela
+    """
+    lista_opcoes = [
+        {
+            "id": ordem,
+            "id_conjunto": CONJUNTO_SINTETICO,
+            "resposta": f"Opção {ordem}",
+            "ordem": ordem,
+            "resposta_aberta": ordem == opcoes,
+        }
+        for ordem in range(1, opcoes + 1)
+    ]
+    conjunto = {"id": CONJUNTO_SINTETICO, "nome": "Opções sintéticas", "hash": hash_opcoes(normalizar_opcoes(lista_opcoes))}
+    return {"conjunto_opcoes": [conjunto] if opcoes else [], "opcoes_respostas": lista_opcoes}
+
+def gerar_formulario(formulario_id: int, perguntas: int, opcoes: int, submissoes: int, seed: int) -> Dict[str, list]:
+    """
+    Gera as linhas de um formulário e de seus registros relacionados, por tabela
+    """
+    aleatorio = random.Random(seed * 1_000_003 + formulario_id)
+    tipos = TIPOS_PERGUNTA if opcoes else [tipo for tipo in TIPOS_PERGUNTA if tipo not in TIPOS_COM_OPCOES]
+    linhas = {tabela.name: [] for tabela in TABELAS}
+    lista_opcoes = gerar_conjunto_opcoes(opcoes)["opcoes_respostas"]
+
+    formulario = {
+        "id": formulario_id,
+        "titulo": f"Formulário {formulario_id}",
+        "descricao": f"Descrição do formulário {formulario_id}",
+        "ordem": formulario_id,
+    }
+    linhas["formulario"].append(formulario)
+
+    lista_perguntas = []
+    opcoes_por_pergunta = {}
+    for ordem in range(1, perguntas + 1):
+        pergunta_id = (formulario_id - 1) * perguntas + ordem
+        pergunta = {
+            "id": pergunta_id,
+            "id_formulario": formulario_id,
+            "titulo": f"Pergunta {ordem} do formulário {formulario_id}",
+            "codigo": f"p{pergunta_id}",
+            "orientacao_resposta": "Responda com atenção " * aleatorio.randint(1, 10),
+            "ordem": ordem,
+            "obrigatoria": aleatorio.random() < 0.5,
+            "sub_pergunta": False,
+            "tipo_pergunta": aleatorio.choice(tipos),
+        }
+        com_opcoes = pergunta["tipo_pergunta"] in TIPOS_COM_OPCOES
+        pergunta["id_conjunto_opcoes"] = CONJUNTO_SINTETICO if com_opcoes else None
+        # A linha leva o código gravado na coluna, como o COPY exige
+        linhas["pergunta"].append({**pergunta, "tipo_pergunta": pergunta["tipo_pergunta"].codigo})
+
+        opcoes_pergunta = lista_opcoes if com_opcoes else []
+        opcoes_por_pergunta[pergunta_id] = [opcao["id"] for opcao in opcoes_pergunta]
+        lista_perguntas.append({**pergunta, "opcoes_respostas": [], "opcoes_respostas_multiplas": opcoes_pergunta})
+
+    if not submissoes:
+        return linhas
+
+    # Versão 1 com o mesmo conteúdo que publicar_formulario geraria
+    publicado = FormularioPublicado.model_validate({
+        **formulario, "id_formulario": formulario_id, "versao": 1, "perguntas": lista_perguntas, "regras": [],
+    })
+    conteudo_json = publicado.model_dump_json().encode("utf-8")
+    linhas["formulario_versao"].append({
+        "id": formulario_id,
+        "id_formulario": formulario_id,
+        "versao": 1,
+        "conteudo": gzip.compress(conteudo_json, mtime=0),
+        "hash": hash_conteudo(conteudo_json),
+        "publicado_em": DATA_REFERENCIA - timedelta(days=366),
+    })
+
+    for indice in range(1, submissoes + 1):
+        submissao_id = (formulario_id - 1) * submissoes + indice
+        enviada = aleatorio.random() < 0.6
+        criado_em = DATA_REFERENCIA - timedelta(seconds=aleatorio.randint(0, 365 * 86400))
+        respondidas = [
+            pergunta for pergunta in lista_perguntas
+            if enviada and pergunta["obrigatoria"] or aleatorio.random() < 0.7
+        ]
+        linhas["submissao"].append({
+            "id": submissao_id,
+            "id_formulario": formulario_id,
+            "versao": 1,
+            "status": "enviada" if enviada else "rascunho",
+            "revisao": len(respondidas),
+            "criado_em": criado_em,
+            "atualizado_em": criado_em + timedelta(minutes=aleatorio.randint(1, 120)),
+        })
+        for pergunta in respondidas:
+            valor = _valor_resposta(aleatorio, pergunta, opcoes_por_pergunta[pergunta["id"]])
+            linhas["resposta_submissao"].append({
+                "id": (submissao_id - 1) * perguntas + pergunta["ordem"],
+                "id_submissao": submissao_id,
+                "id_pergunta": pergunta["id"],
+                "valor": json.dumps(valor),
+                "criado_em": criado_em,
+            })
+    return linhas
+
+def _copiar(conn, tabela, linhas: List[dict]) -> None:
+    """
+    Insere as linhas com COPY ... FROM STDIN (PostgreSQL)
+    """
+    nomes = list(linhas[0])
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for linha in linhas:
+        escritor.writerow("\\x" + valor.hex() if isinstance(valor, bytes) else valor for valor in linha.values())
+    buffer.seek(0)
+    colunas = ", ".join(nomes)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {tabela.name} ({colunas}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+def inserir_linhas(conn, linhas: Dict[str, list]) -> Dict[str, int]:
+    """
+    Insere as linhas geradas, na ordem das chaves estrangeiras
+    """
+    contagem = {}
+    for tabela in TABELAS:
+        registros = linhas[tabela.name]
+        contagem[tabela.name] = len(registros)
+        if not registros:
+            continue
+        if conn.dialect.name == "postgresql":
+            _copiar(conn, tabela, registros)
+        else:
+            conn.execute(insert(tabela), registros)
+    return contagem
+
+def _gerar_bloco(parametros: Tuple) -> Dict[str, int]:
+    """
+    Gera e insere um bloco de formulários. Executado em processos separados,
+    cada um com o seu próprio engine.
+    """
+    url, inicio, fim, perguntas, opcoes, submissoes, seed = parametros
+    engine = create_engine(url)
+    try:
+        linhas = {tabela.name: [] for tabela in TABELAS}
+        for formulario_id in range(inicio, fim):
+            for tabela, registros in gerar_formulario(formulario_id, perguntas, opcoes, submissoes, seed).items():
+                linhas[tabela].extend(registros)
+        with engine.begin() as conn:
+            return inserir_linhas(conn, linhas)
+    finally:
+        engine.dispose()
+
+def _blocos(formularios: int, tamanho: int) -> Iterator[Tuple[int, int]]:
+    for inicio in range(1, formularios + 1, tamanho):
+        yield inicio, min(inicio + tamanho, formularios + 1)
+
+def gerar_dados(
+    engine: Engine,
+    formularios: int,
+    perguntas_por_formulario: int,
+    opcoes_por_pergunta: int,
+    submissoes_por_formulario: int = 0,
+    seed: int = 42,
+    formularios_por_bloco: int = 500,
+    processos: int = 1,
+) -> Dict[str, int]:
+    """
+    Gera o conjunto sintético em um banco vazio. Retorna a contagem de registros por tabela.
+    """
+    url = engine.url.render_as_string(hide_password=False)
+    # O SQLite não admite escritas concorrentes
+    if engine.dialect.name == "sqlite":
+        processos = 1
+
+    tarefas = [
+        (url, inicio, fim, perguntas_por_formulario, opcoes_por_pergunta, submissoes_por_formulario, seed)
+        for inicio, fim in _blocos(formularios, formularios_por_bloco)
+    ]
+    contagem = {tabela.name: 0 for tabela in TABELAS}
+    with engine.begin() as conn:
+        contagem.update(inserir_linhas(conn, {
+            **{tabela.name: [] for tabela in TABELAS}, **gerar_conjunto_opcoes(opcoes_por_pergunta)
+        }))
+    if processos > 1:
+        engine.dispose()
+        with Pool(processos) as pool:
+            resultados = list(pool.imap_unordered(_gerar_bloco, tarefas))
+    else:
+        resultados = []
+        with engine.begin() as conn:
+            for url, inicio, fim, *params in tarefas:
+                linhas = {tabela.name: [] for tabela in TABELAS}
+                for formulario_id in range(inicio, fim):
+                    for tabela, registros in gerar_formulario(formulario_id, *params).items():
+                        linhas[tabela].extend(registros)
+                resultados.append(inserir_linhas(conn, linhas))
+    for resultado in resultados:
+        for tabela, total in resultado.items():
+            contagem[tabela] += total
+
+    # IDs explícitos não avançam as sequências do PostgreSQL
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for tabela in TABELAS:
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{tabela.name}', 'id'), COALESCE(MAX(id), 1)) FROM {tabela.name}"
+                ))
+    return contagem
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Banco de destino (padrão: DATABASE_URL da aplicação)")
+    parser.add_argument("--formularios", type=int, help="Número de formulários sintéticos")
+    parser.add_argument("--perguntas", type=int, default=20, help="Perguntas por formulário")
+    parser.add_argument("--opcoes", type=int, default=5, help="Opções por pergunta de escolha")
+    parser.add_argument("--submissoes", type=int, default=0, help="Submissões por formulário")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bloco", type=int, default=500, help="Formulários por bloco (transação)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--recriar", action="store_true", help="Excluir e recriar as tabelas a partir dos modelos")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url) if args.database_url else get_engine()
+    # O esquema é criado pelas migrações (alembic upgrade head); --recriar o recria
+    # diretamente a partir dos modelos, para bancos descartáveis de benchmark
+    if args.recriar:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+    if args.formularios is None:
+        seed_data(engine)
+        return
+
+    inicio = time.perf_counter()
+    contagem = gerar_dados(
+        engine, args.formularios, args.perguntas, args.opcoes, args.submissoes,
+        seed=args.seed, formularios_por_bloco=args.bloco, processos=args.processos,
+    )
+    duracao = time.perf_counter() - inicio
+    total = sum(contagem.values())
+    print(f"{total} registros inseridos em {duracao:.1f}s ({total / duracao:.0f} registros/s)")
+    for tabela, quantidade in contagem.items():
+        print(f"  {tabela}: {quantidade}")
+
 if __name__ == "__main__":
-    seed_data()
+    main()
@@ -6,12 +6,21 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.db.database import Base, get_db
+from app.core.config import settings
+from app.db.database import Base, get_db, get_db_leitura, get_sessoes_leitura
+from app.core.cache import limpar_caches
+from app.core.limites import limitador_taxa
+from app.crud.opcoes import obter_conjunto
 from app.models.models import Formulario, Pergunta, OpcaoResposta, OpcoesRespostas
 
 # Configuração do banco de dados de teste
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+# O despachante da caixa de saída usaria o engine da aplicação, não o banco de teste;
+# os testes despacham os eventos diretamente (app.core.saida.despachar_lote)
+settings.OUTBOX_DESPACHANTE_ENABLED = False
+settings.OUTBOX_DESTINOS = "webhook"
+
 @pytest.fixture(scope="function")
 def test_db():
     """
@@ -25,6 +34,8 @@ def test_db():
     )
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
+    limpar_caches()
+    limitador_taxa.limpar()
     
     # Sobrescreve a dependência get_db para usar o banco de dados de teste
     def override_get_db():
@@ -34,7 +45,16 @@ def test_db():
         finally:
             db.close()
     
+    def override_get_sessoes_leitura():
+        try:
+            db = TestingSessionLocal()
+            yield [db]
+        finally:
+            db.close()
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_leitura] = override_get_db
+    app.dependency_overrides[get_sessoes_leitura] = override_get_sessoes_leitura
     
     # Retorna a sessão do banco de dados para uso nos testes
     db = TestingSessionLocal()
@@ -117,52 +137,19 @@ def seed_db(test_db):
     test_db.refresh(pergunta2)
     test_db.refresh(pergunta3)
     
-    # Criar opções de resposta para a pergunta de escolha única
-    opcoes_unica = [
-        OpcoesRespostas(
-            id_pergunta=pergunta2.id,
-            resposta="Opção 1",
-            ordem=1,
-            resposta_aberta=False
-        ),
-        OpcoesRespostas(
-            id_pergunta=pergunta2.id,
-            resposta="Opção 2",
-            ordem=2,
-            resposta_aberta=False
-        ),
-        OpcoesRespostas(
-            id_pergunta=pergunta2.id,
-            resposta="Outra",
-            ordem=3,
-            resposta_aberta=True
-        )
-    ]
-    
-    # Criar opções de resposta para a pergunta de múltipla escolha
-    opcoes_multipla = [
-        OpcoesRespostas(
-            id_pergunta=pergunta3.id,
-            resposta="Opção A",
-            ordem=1,
-            resposta_aberta=False
-        ),
-        OpcoesRespostas(
-            id_pergunta=pergunta3.id,
-            resposta="Opção B",
-            ordem=2,
-            resposta_aberta=False
-        ),
-        OpcoesRespostas(
-            id_pergunta=pergunta3.id,
-            resposta="Opção C",
-            ordem=3,
-            resposta_aberta=False
-        )
-    ]
-    
-    test_db.add_all(opcoes_unica)
-    test_db.add_all(opcoes_multipla)
+    # Criar os conjuntos de opções das perguntas de escolha única e de múltipla escolha
+    opcoes_unica = obter_conjunto(test_db, [
+        {"resposta": "Opção 1", "ordem": 1, "resposta_aberta": False},
+        {"resposta": "Opção 2", "ordem": 2, "resposta_aberta": False},
+        {"resposta": "Outra", "ordem": 3, "resposta_aberta": True},
+    ])
+    opcoes_multipla = obter_conjunto(test_db, [
+        {"resposta": "Opção A", "ordem": 1, "resposta_aberta": False},
+        {"resposta": "Opção B", "ordem": 2, "resposta_aberta": False},
+        {"resposta": "Opção C", "ordem": 3, "resposta_aberta": False},
+    ])
+    pergunta2.conjunto_opcoes = opcoes_unica
+    pergunta3.conjunto_opcoes = opcoes_multipla
     test_db.commit()
     
     return {
@@ -0,0 +1,85 @@
+import pytest
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import status
+
+from app.core.coalescencia import Coalescedor, coalescedor, geracao_escritas
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _executar_simultaneas(instancia, chaves, funcao):
+    """
+    Executa uma chamada por chave em threads separadas, liberando a função só
+    depois que todas as chamadas tiverem começado.
+    """
+    liberar = threading.Event()
+
+    def bloqueante():
+        liberar.wait(timeout=5)
+        return funcao()
+
+    with ThreadPoolExecutor(max_workers=len(chaves)) as executor:
+        futuros = [executor.submit(instancia.executar, chave, bloqueante) for chave in chaves]
+        # Aguarda a líder de cada chave registrar a execução em andamento
+        while len(instancia) < len(set(chaves)):
+            time.sleep(0.001)
+        time.sleep(0.05)
+        liberar.set()
+        return [futuro.exception() or futuro.result() for futuro in futuros]
+
+class TestCoalescencia:
+    """
+    Testes para a coalescência de leituras idênticas simultâneas.
+    """
+
+    def test_chamadas_simultaneas(self):
+        """
+        Testa que chamadas simultâneas com a mesma chave executam a função uma vez.
+        """
+        execucoes = []
+        resultados = _executar_simultaneas(
+            Coalescedor(), ["a"] * 10 + ["b"] * 5, lambda: execucoes.append(1) or object()
+        )
+        logger.info(f"{len(execucoes)} execuções para {len(resultados)} chamadas")
+        assert len(execucoes) == 2
+        assert len({id(resultado) for resultado in resultados[:10]}) == 1
+        assert resultados[0] is not resultados[10]
+
+    def test_erro_compartilhado(self):
+        """
+        Testa que a exceção da execução líder é repassada às seguidoras e não fica guardada.
+        """
+        instancia = Coalescedor()
+
+        def falhar():
+            raise ValueError("falha")
+
+        resultados = _executar_simultaneas(instancia, ["a"] * 3, falhar)
+        assert all(isinstance(resultado, ValueError) for resultado in resultados)
+        assert len(instancia) == 0
+        assert instancia.executar("a", lambda: 1) == 1
+
+    def test_leituras_do_endpoint(self, client, seed_db):
+        """
+        Testa que leituras simultâneas do mesmo formulário devolvem a mesma resposta
+        e que uma escrita inicia uma nova geração.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        caminho = f"/api/v1/perguntas/formulario/{formulario_id}?sort_by=ordem"
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            respostas = list(executor.map(lambda _: client.get(caminho), range(16)))
+        assert all(r.status_code == status.HTTP_200_OK for r in respostas)
+        assert len({r.content for r in respostas}) == 1
+        assert len(coalescedor) == 0
+
+        assert client.get("/api/v1/formularios/999999").status_code == status.HTTP_404_NOT_FOUND
+        assert client.get(f"/api/v1/formularios/{formulario_id}").json()["id"] == formulario_id
+
+        geracao = geracao_escritas()
+        client.put(f"/api/v1/formularios/{formulario_id}", json={"titulo": "Novo título"})
+        assert geracao_escritas() > geracao
+        assert client.get(f"/api/v1/formularios/{formulario_id}").json()["titulo"] == "Novo título"
@@ -0,0 +1,118 @@
+import pytest
+import logging
+from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.codificacao import aceita_msgpack, escolher_codificacao
+from app.middleware.compressao import CompressaoMiddleware, bytes_codificados
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _criar_formularios(client, quantidade):
+    for i in range(quantidade):
+        client.post("/api/v1/formularios/", json={"titulo": f"Formulário {i}", "descricao": "Orientação longa. " * 20})
+
+class TestCompressao:
+    """
+    Testes para a negociação de formato e a compressão das respostas.
+    """
+
+    def test_negociacao(self):
+        """
+        Testa a escolha da codificação e do formato pelos cabeçalhos Accept.
+        """
+        assert escolher_codificacao("gzip, deflate, br") == "br"
+        assert escolher_codificacao("gzip;q=1.0, br;q=0.5") == "gzip"
+        assert escolher_codificacao("br;q=0, gzip;q=0") is None
+        assert escolher_codificacao("identity") is None
+        assert escolher_codificacao("*") == "br"
+        assert aceita_msgpack("application/msgpack")
+        assert aceita_msgpack("application/json;q=0.5, application/x-msgpack")
+        assert not aceita_msgpack("application/json")
+        assert not aceita_msgpack("*/*")
+
+    @pytest.mark.parametrize("codificacao", ["gzip", "br"])
+    def test_resposta_comprimida(self, client, codificacao):
+        """
+        Testa que respostas acima do tamanho mínimo são comprimidas.
+        """
+        _criar_formularios(client, 10)
+        response = client.get("/api/v1/formularios/", headers={"Accept-Encoding": codificacao})
+        logger.info(f"{codificacao}: {response.num_bytes_downloaded} bytes para {len(response.content)} bytes")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == codificacao
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.num_bytes_downloaded < len(response.content)
+        assert len(response.json()) == 10
+
+    def test_resposta_pequena_sem_compressao(self, client):
+        """
+        Testa que respostas abaixo do tamanho mínimo são enviadas sem compressão.
+        """
+        response = client.get("/api/v1/formularios/", headers={"Accept-Encoding": "gzip"})
+        assert response.json() == []
+        assert "content-encoding" not in response.headers
+
+        _criar_formularios(client, 10)
+        response = client.get("/api/v1/formularios/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_versao_pre_comprimida(self, client, seed_db):
+        """
+        Testa que a versão publicada é servida com o gzip armazenado, sem recompressão.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        antes = bytes_codificados.exportar()
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}/versoes/1", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"].endswith('-gzip"')
+        assert response.json()["id_formulario"] == formulario_id
+        depois = dict((tuple(chave), valor) for chave, valor in bytes_codificados.exportar())
+        anteriores = dict((tuple(chave), valor) for chave, valor in antes)
+        assert depois[("gzip", "pre-comprimido")] > anteriores.get(("gzip", "pre-comprimido"), 0)
+        assert depois.get(("gzip", "middleware")) == anteriores.get(("gzip", "middleware"))
+
+        # A ETag de qualquer representação identifica a versão
+        response = client.get(
+            f"/api/v1/formularios/{formulario_id}/versoes/1",
+            headers={"Accept-Encoding": "identity", "If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_msgpack(self, client, seed_db):
+        """
+        Testa as respostas em MessagePack quando pedidas no cabeçalho Accept.
+        """
+        msgpack = pytest.importorskip("msgpack")
+        response = client.get("/api/v1/formularios/", headers={"Accept": "application/msgpack"})
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == client.get("/api/v1/formularios/").json()
+
+        formulario_id = seed_db["formularios"][0].id
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        caminho = f"/api/v1/formularios/{formulario_id}/versoes/1"
+        response = client.get(caminho, headers={"Accept": "application/msgpack", "Accept-Encoding": "br"})
+        assert response.headers["content-type"] == "application/msgpack"
+        assert response.headers["content-encoding"] == "br"
+        assert msgpack.unpackb(response.content) == client.get(caminho).json()
+
+    def test_resposta_em_partes(self):
+        """
+        Testa a compressão incremental de respostas enviadas em vários pedaços.
+        """
+        app = FastAPI()
+
+        @app.get("/partes")
+        def partes():
+            return StreamingResponse((f"linha {i}\n".encode() for i in range(1000)), media_type="text/plain")
+
+        app.add_middleware(CompressaoMiddleware)
+        response = TestClient(app).get("/partes", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == "".join(f"linha {i}\n" for i in range(1000))
@@ -0,0 +1,198 @@
+import pytest
+import logging
+from fastapi import status
+
+from app.core.regras import GrafoRegras
+from app.crud import pergunta as crud_pergunta
+from app.middleware.perfil_sql import perfilar_sql
+from app.models.models import OpcoesRespostas
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ESCALA = [{"resposta": texto, "ordem": ordem} for ordem, texto in enumerate(["Ruim", "Regular", "Bom"], start=1)]
+
+def _criar_pergunta(client, formulario_id, titulo, **dados):
+    response = client.post("/api/v1/perguntas/", json={
+        "id_formulario": formulario_id, "titulo": titulo, "tipo_pergunta": "unica_escolha", **dados,
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+def _opcoes(pergunta):
+    # Opções do conjunto, sem id_pergunta (a pergunta pela qual foram lidas)
+    return [{k: v for k, v in opcao.items() if k != "id_pergunta"} for opcao in pergunta["opcoes_respostas_multiplas"]]
+
+class TestConjuntosOpcoes:
+    """
+    Testes para os conjuntos de opções compartilhados entre perguntas.
+    """
+
+    def test_perguntas_compartilham_conjunto(self, client, seed_db, test_db):
+        """
+        Testa que perguntas com as mesmas opções referenciam um único conjunto.
+        """
+        formulario_id = seed_db["formularios"][1].id
+        total_opcoes = test_db.query(OpcoesRespostas).count()
+        primeira = _criar_pergunta(client, formulario_id, "Atendimento", opcoes_respostas_multiplas=ESCALA)
+        # A mesma escala, informada em outra ordem
+        segunda = _criar_pergunta(client, formulario_id, "Entrega", opcoes_respostas_multiplas=ESCALA[::-1])
+        outra = _criar_pergunta(client, formulario_id, "Preço", opcoes_respostas_multiplas=ESCALA[:2])
+
+        assert primeira["id_conjunto_opcoes"] == segunda["id_conjunto_opcoes"] != outra["id_conjunto_opcoes"]
+        assert _opcoes(primeira) == _opcoes(segunda)
+        assert {opcao["id_pergunta"] for opcao in segunda["opcoes_respostas_multiplas"]} == {segunda["id"]}
+        assert [opcao["resposta"] for opcao in segunda["opcoes_respostas_multiplas"]] == ["Ruim", "Regular", "Bom"]
+        assert test_db.query(OpcoesRespostas).count() == total_opcoes + 5
+
+        # Uma pergunta também pode referenciar o conjunto diretamente
+        terceira = _criar_pergunta(client, formulario_id, "Suporte", id_conjunto_opcoes=primeira["id_conjunto_opcoes"])
+        assert _opcoes(terceira) == _opcoes(primeira)
+
+    def test_endpoints_conjuntos(self, client, seed_db):
+        """
+        Testa a criação idempotente, a leitura e as referências inválidas a conjuntos.
+        """
+        response = client.post("/api/v1/conjuntos-opcoes/", json={"nome": "Escala", "opcoes": ESCALA})
+        assert response.status_code == status.HTTP_201_CREATED
+        conjunto = response.json()
+        assert conjunto["nome"] == "Escala"
+        assert len(conjunto["opcoes"]) == 3
+
+        repetido = client.post("/api/v1/conjuntos-opcoes/", json={"nome": "Outro nome", "opcoes": ESCALA}).json()
+        assert repetido == conjunto
+        assert client.get(f"/api/v1/conjuntos-opcoes/{conjunto['id']}").json() == conjunto
+        assert client.get("/api/v1/conjuntos-opcoes/999999").status_code == status.HTTP_404_NOT_FOUND
+
+        response = client.post("/api/v1/perguntas/", json={
+            "id_formulario": seed_db["formularios"][0].id, "titulo": "Sem conjunto",
+            "tipo_pergunta": "unica_escolha", "id_conjunto_opcoes": 999999,
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_opcoes_em_cache(self, test_db, seed_db):
+        """
+        Testa que as opções de cada conjunto são lidas do banco uma única vez.
+        """
+        with perfilar_sql() as perfil:
+            crud_pergunta.get_perguntas(test_db)
+        assert any("opcoes_respostas" in consulta["sql"] for consulta in perfil.consultas)
+
+        with perfilar_sql() as perfil:
+            perguntas = crud_pergunta.get_perguntas(test_db)
+        logger.info(f"Consultas com o cache preenchido: {[consulta['sql'] for consulta in perfil.consultas]}")
+        assert not any("opcoes_respostas" in consulta["sql"] for consulta in perfil.consultas)
+        assert len(perguntas[1].opcoes_respostas_multiplas) == 3
+
+    def test_validacao_por_conjunto(self, client, seed_db):
+        """
+        Testa que as perguntas de um conjunto compartilham os valores aceitos na validação.
+        """
+        formulario_id = seed_db["formularios"][1].id
+        primeira = _criar_pergunta(client, formulario_id, "Atendimento", opcoes_respostas_multiplas=ESCALA)
+        segunda = _criar_pergunta(client, formulario_id, "Entrega", opcoes_respostas_multiplas=ESCALA)
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        publicado = client.get(f"/api/v1/formularios/{formulario_id}/publicado").json()
+
+        grafo = GrafoRegras.de_snapshot(publicado)
+        assert grafo.opcoes[primeira["id"]] is grafo.opcoes[segunda["id"]]
+
+        opcao_id = segunda["opcoes_respostas_multiplas"][0]["id"]
+        response = client.post(f"/api/v1/formularios/{formulario_id}/validar", json={
+            "respostas": {str(primeira["id"]): "Bom", str(segunda["id"]): opcao_id}
+        })
+        assert response.json()["erros"] == []
+        response = client.post(f"/api/v1/formularios/{formulario_id}/validar", json={
+            "respostas": {str(segunda["id"]): "Ótimo"}
+        })
+        assert len(response.json()["erros"]) == 1
+
+    def test_substituir_opcoes(self, client, seed_db, test_db):
+        """
+        Testa a substituição e o upsert das opções de uma pergunta em uma transação.
+        """
+        pergunta = seed_db["perguntas"][1]
+        outra = seed_db["perguntas"][2]
+        conjunto_original = pergunta.id_conjunto_opcoes
+        atuais = client.get(f"/api/v1/perguntas/{pergunta.id}").json()["opcoes_respostas_multiplas"]
+        opcao_1, opcao_2, _ = atuais
+
+        # Altera uma opção, mantém outra, insere uma nova e remove a terceira
+        response = client.put(f"/api/v1/perguntas/{pergunta.id}/opcoes", json=[
+            {"id": opcao_1["id"], "resposta": "Primeira"},
+            {"id": opcao_2["id"]},
+            {"resposta": "Nova", "ordem": 4},
+        ])
+        assert response.status_code == status.HTTP_200_OK
+        resultado = response.json()
+        assert (resultado["inseridas"], resultado["alteradas"], resultado["removidas"]) == (1, 1, 1)
+        opcoes = resultado["pergunta"]["opcoes_respostas_multiplas"]
+        assert [(opcao["resposta"], opcao["ordem"]) for opcao in opcoes] == [("Primeira", 1), ("Opção 2", 2), ("Nova", 4)]
+        # Copy-on-write: o conjunto original continua intacto para as demais perguntas
+        assert resultado["pergunta"]["id_conjunto_opcoes"] != conjunto_original
+        assert len(client.get(f"/api/v1/conjuntos-opcoes/{conjunto_original}").json()["opcoes"]) == 3
+
+        # Upsert: mantém as ausentes da lista
+        response = client.patch(f"/api/v1/perguntas/{pergunta.id}/opcoes", json=[
+            {"id": opcoes[2]["id"], "resposta_aberta": True}, {"resposta": "Quinta", "ordem": 5},
+        ])
+        resultado = response.json()
+        assert (resultado["inseridas"], resultado["alteradas"], resultado["removidas"]) == (1, 1, 0)
+        assert [opcao["resposta"] for opcao in resultado["pergunta"]["opcoes_respostas_multiplas"]] == [
+            "Primeira", "Opção 2", "Nova", "Quinta"
+        ]
+
+        # Sem alterações, a pergunta continua no mesmo conjunto
+        opcoes = resultado["pergunta"]["opcoes_respostas_multiplas"]
+        response = client.put(f"/api/v1/perguntas/{pergunta.id}/opcoes", json=[{"id": opcao["id"]} for opcao in opcoes])
+        assert response.json()["pergunta"]["id_conjunto_opcoes"] == resultado["pergunta"]["id_conjunto_opcoes"]
+        assert (response.json()["inseridas"], response.json()["alteradas"], response.json()["removidas"]) == (0, 0, 0)
+
+        # Ids de opções de outra pergunta ou repetidos são recusados
+        opcao_alheia = client.get(f"/api/v1/perguntas/{outra.id}").json()["opcoes_respostas_multiplas"][0]["id"]
+        response = client.put(f"/api/v1/perguntas/{pergunta.id}/opcoes", json=[{"id": opcao_alheia}])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = client.put(f"/api/v1/perguntas/{pergunta.id}/opcoes", json=[{"id": opcoes[0]["id"]}] * 2)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert client.put("/api/v1/perguntas/999999/opcoes", json=[]).status_code == status.HTTP_404_NOT_FOUND
+
+        # Lista vazia remove todas as opções
+        response = client.put(f"/api/v1/perguntas/{pergunta.id}/opcoes", json=[])
+        assert response.json()["removidas"] == 4
+        assert response.json()["pergunta"]["id_conjunto_opcoes"] is None
+
+    def test_substituir_opcoes_resposta(self, client, seed_db):
+        """
+        Testa a substituição por diferença das opções de resposta de uma pergunta.
+        """
+        pergunta_id = seed_db["perguntas"][0].id
+        response = client.put(f"/api/v1/perguntas/{pergunta_id}/opcoes-resposta", json=[1, 2, 3, 2])
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.json()["inseridas"], response.json()["removidas"]) == (3, 0)
+
+        response = client.put(f"/api/v1/perguntas/{pergunta_id}/opcoes-resposta", json=[2, 4])
+        resultado = response.json()
+        assert (resultado["inseridas"], resultado["removidas"]) == (1, 2)
+        assert sorted(opcao["id_opcao_resposta"] for opcao in resultado["pergunta"]["opcoes_respostas"]) == [2, 4]
+
+        response = client.patch(f"/api/v1/perguntas/{pergunta_id}/opcoes-resposta", json=[4, 5])
+        resultado = response.json()
+        assert (resultado["inseridas"], resultado["removidas"]) == (1, 0)
+        assert sorted(opcao["id_opcao_resposta"] for opcao in resultado["pergunta"]["opcoes_respostas"]) == [2, 4, 5]
+        assert client.patch("/api/v1/perguntas/999999/opcoes-resposta", json=[1]).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_compatibilidade_id_pergunta(self, client, seed_db, test_db):
+        """
+        Testa que as opções lidas por uma pergunta trazem id_pergunta, e as lidas pelo
+        conjunto, não, e que acrescentar uma opção retorna a nova opção da pergunta.
+        """
+        pergunta = _criar_pergunta(client, seed_db["formularios"][1].id, "Atendimento", opcoes_respostas_multiplas=ESCALA)
+        conjunto = client.get(f"/api/v1/conjuntos-opcoes/{pergunta['id_conjunto_opcoes']}").json()
+        assert {opcao["id_pergunta"] for opcao in conjunto["opcoes"]} == {None}
+
+        nova = crud_pergunta.create_opcoes_respostas(test_db, {"id_pergunta": pergunta["id"], "resposta": "Ótimo", "ordem": 4})
+        assert (nova.id_pergunta, nova.resposta) == (pergunta["id"], "Ótimo")
+        opcoes = client.get(f"/api/v1/perguntas/{pergunta['id']}").json()["opcoes_respostas_multiplas"]
+        assert [opcao["resposta"] for opcao in opcoes] == ["Ruim", "Regular", "Bom", "Ótimo"]
+        assert opcoes[-1]["id"] == nova.id
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+
+from fastapi import status
+
+from app.core.config import settings
+from app.core.eventos import broker, invalidar_caches, registrar_evento, transmitir_eventos
+from app.db.shards import SHARD_PADRAO
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _ler(texto: str) -> dict:
+    """
+    Campos de um evento no formato text/event-stream
+    """
+    campos = dict(linha.split(": ", 1) for linha in texto.strip().split("\n"))
+    if "data" in campos:
+        campos["data"] = json.loads(campos["data"])
+    return campos
+
+async def _proximos(transmissao, quantidade: int) -> list:
+    return [_ler(await asyncio.wait_for(transmissao.__anext__(), timeout=5)) for _ in range(quantidade)]
+
+class TestEventos:
+    """
+    Testes para o feed de alterações dos formulários.
+    """
+
+    def test_eventos_das_perguntas(self, client, seed_db):
+        """
+        Testa que criar, reordenar, alterar e excluir perguntas gera eventos na conexão aberta.
+        """
+        formulario_id = seed_db["formularios"][0].id
+
+        async def executar():
+            transmissao = transmitir_eventos((SHARD_PADRAO, formulario_id))
+            assert (await transmissao.__anext__()).startswith("retry:")
+            nova = client.post("/api/v1/perguntas/", json={
+                "id_formulario": formulario_id, "titulo": "Nova", "tipo_pergunta": "texto_livre",
+            }).json()
+            client.put(f"/api/v1/perguntas/{nova['id']}", json={"ordem": 9})
+            client.put(f"/api/v1/perguntas/{nova['id']}", json={"titulo": "Renomeada"})
+            # Alterações de outros formulários não são transmitidas
+            client.put(f"/api/v1/formularios/{seed_db['formularios'][1].id}", json={"titulo": "Outro"})
+            client.delete(f"/api/v1/perguntas/{nova['id']}")
+            eventos = await _proximos(transmissao, 4)
+            await transmissao.aclose()
+            return nova, eventos
+
+        nova, eventos = asyncio.run(executar())
+        logger.info(f"Eventos recebidos: {[evento['event'] for evento in eventos]}")
+        assert [evento["event"] for evento in eventos] == [
+            "pergunta_criada", "pergunta_reordenada", "pergunta_atualizada", "pergunta_excluida",
+        ]
+        assert eventos[0]["data"]["dados"] == nova
+        assert eventos[2]["data"]["dados"]["titulo"] == "Renomeada"
+        assert eventos[3]["data"]["dados"] == {"id": nova["id"]}
+        assert all(evento["id"] == evento["data"]["id"] for evento in eventos)
+
+    def test_retomada(self, client, seed_db):
+        """
+        Testa a retomada a partir de um evento já recebido e o reset para tokens desconhecidos.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        for titulo in ("A", "B", "C"):
+            client.put(f"/api/v1/formularios/{formulario_id}", json={"titulo": titulo})
+
+        historico = list(broker._historicos.get((SHARD_PADRAO, formulario_id)))
+        assert len(historico) == 3
+
+        async def retomar(desde, quantidade):
+            transmissao = transmitir_eventos((SHARD_PADRAO, formulario_id), desde=desde)
+            await transmissao.__anext__()
+            eventos = await _proximos(transmissao, quantidade)
+            await transmissao.aclose()
+            return eventos
+
+        eventos = asyncio.run(retomar(historico[0]["id"], 2))
+        assert [evento["data"]["dados"]["titulo"] for evento in eventos] == ["B", "C"]
+        assert asyncio.run(retomar("desconhecido", 1))[0]["event"] == "reset"
+
+    def test_eventos_descartados_no_rollback(self, test_db, seed_db):
+        """
+        Testa que eventos de transações desfeitas não são publicados.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        registrar_evento(test_db, formulario_id, "formulario_atualizado", {"titulo": "Desfeito"})
+        test_db.rollback()
+        registrar_evento(test_db, formulario_id, "formulario_atualizado", {"titulo": "Confirmado"})
+        test_db.commit()
+        historico = broker._historicos.get((SHARD_PADRAO, formulario_id))
+        assert [evento["dados"]["titulo"] for evento in historico] == ["Confirmado"]
+
+    def test_conexao_atrasada(self, monkeypatch):
+        """
+        Testa que uma conexão que não acompanha os eventos recebe reset em vez de crescer sem limite.
+        """
+        monkeypatch.setattr(settings, "EVENTOS_FILA_MAXIMA", 2)
+        chave = (SHARD_PADRAO, 999)
+
+        async def executar():
+            transmissao = transmitir_eventos(chave)
+            await transmissao.__anext__()
+            for numero in range(5):
+                broker.publicar({"id": str(numero), "shard": SHARD_PADRAO, "formulario_id": 999, "tipo": "teste", "dados": None})
+            await asyncio.sleep(0)
+            eventos = await _proximos(transmissao, 1)
+            await transmissao.aclose()
+            return eventos
+
+        assert asyncio.run(executar())[0]["event"] == "reset"
+
+    def test_invalidacao_dos_caches(self):
+        """
+        Testa que um formulário excluído em outro worker sai dos caches deste ao receber o evento.
+        """
+        from app.crud.submissao import cache_estados
+        from app.crud.versao import cache_grafos, cache_versoes
+
+        def preencher():
+            for formulario_id in (7, 8):
+                cache_versoes.set((SHARD_PADRAO, formulario_id, 1), "snapshot")
+                cache_grafos.set((SHARD_PADRAO, formulario_id, 1), "grafo")
+                cache_estados.set((SHARD_PADRAO, formulario_id * 10), (0, "estado"))
+
+        preencher()
+        invalidar_caches({
+            "id": "1", "shard": SHARD_PADRAO, "formulario_id": 7, "tipo": "formulario_excluido",
+            "dados": {"id": 7, "versoes": [1], "submissoes": [70]},
+        })
+        assert cache_versoes.get((SHARD_PADRAO, 7, 1)) is None
+        assert cache_grafos.get((SHARD_PADRAO, 7, 1)) is None
+        assert cache_estados.get((SHARD_PADRAO, 70)) is None
+        assert cache_versoes.get((SHARD_PADRAO, 8, 1)) == "snapshot"
+        assert cache_estados.get((SHARD_PADRAO, 80)) == (0, "estado")
+
+        # Sem os dados (NOTIFY truncado), os caches são limpos
+        invalidar_caches({"id": "2", "shard": SHARD_PADRAO, "formulario_id": 8, "tipo": "formulario_excluido", "dados": None})
+        assert len(cache_versoes) == len(cache_grafos) == len(cache_estados) == 0
+
+    def test_formulario_inexistente(self, client):
+        """
+        Testa que a transmissão de um formulário inexistente responde 404.
+        """
+        response = client.get("/api/v1/formularios/999/eventos")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
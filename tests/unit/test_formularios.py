@@ -125,3 +125,56 @@ class TestFormularioEndpoints:
         response = client.delete(f"/api/v1/formularios/{formulario_id}")
         assert response.status_code == status.HTTP_404_NOT_FOUND
         logger.info(f"Formulário {formulario_id} não encontrado para exclusão, como esperado")
+
+    def test_clonar_formulario(self, client, seed_db, test_db):
+        """
+        Testa a cópia de um formulário com perguntas, opções e regras remapeadas.
+        """
+        from app.models.models import OpcaoResposta
+
+        formulario_id = seed_db["formularios"][0].id
+        sim_nao, escolha, multipla = [p.id for p in seed_db["perguntas"]]
+        test_db.add(OpcaoResposta(id_opcao_resposta=7, id_pergunta=escolha))
+        test_db.commit()
+        client.post(f"/api/v1/formularios/{formulario_id}/regras", json={
+            "id_pergunta_origem": sim_nao, "operador": "igual", "valor": "Sim", "id_pergunta_destino": escolha,
+        })
+        # Uma pergunta criada depois, em outro formulário, não faz parte da cópia
+        client.post("/api/v1/perguntas/", json={
+            "id_formulario": seed_db["formularios"][1].id, "titulo": "Outra", "tipo_pergunta": "texto_livre",
+        })
+
+        logger.info(f"Testando clonagem do formulário {formulario_id}")
+        response = client.post(f"/api/v1/formularios/{formulario_id}/clone", json={"titulo": "Cópia"})
+        assert response.status_code == status.HTTP_201_CREATED
+        clone = response.json()
+        assert clone["id"] != formulario_id
+        assert clone["titulo"] == "Cópia"
+        assert clone["descricao"] == "Descrição do formulário de teste 1"
+
+        originais = client.get(f"/api/v1/perguntas/formulario/{formulario_id}").json()
+        copias = client.get(f"/api/v1/perguntas/formulario/{clone['id']}").json()
+        ids_copias = {p["id"] for p in copias}
+        assert not ids_copias & {p["id"] for p in originais}
+        remapeados = ("id", "id_formulario", "opcoes_respostas", "opcoes_respostas_multiplas")
+        for original, copia in zip(originais, copias):
+            assert copia["id_formulario"] == clone["id"]
+            assert [{**o, "id_pergunta": original["id"]} for o in copia["opcoes_respostas_multiplas"]] == \
+                original["opcoes_respostas_multiplas"]
+            assert {k: v for k, v in copia.items() if k not in remapeados} == \
+                {k: v for k, v in original.items() if k not in remapeados}
+            assert [(o["id_pergunta"], o["id_opcao_resposta"]) for o in copia["opcoes_respostas"]] == \
+                [(copia["id"], o["id_opcao_resposta"]) for o in original["opcoes_respostas"]]
+        regras = client.get(f"/api/v1/formularios/{clone['id']}/regras").json()
+        assert len(regras) == 1
+        assert {regras[0]["id_pergunta_origem"], regras[0]["id_pergunta_destino"]} <= ids_copias
+
+        # Novas perguntas continuam recebendo ids livres
+        response = client.post("/api/v1/perguntas/", json={
+            "id_formulario": clone["id"], "titulo": "Nova", "tipo_pergunta": "texto_livre",
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["id"] > max(ids_copias)
+
+        assert client.post("/api/v1/formularios/999/clone").status_code == status.HTTP_404_NOT_FOUND
+        logger.info(f"Formulário {formulario_id} clonado como {clone['id']}")
@@ -0,0 +1,129 @@
+import pytest
+import logging
+from datetime import datetime, timedelta
+from fastapi import status
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import limpar_caches
+from app.core.idempotencia import armazem, calcular_chave, calcular_impressao
+from app.models.models import Pergunta, RequisicaoIdempotente, Submissao
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def armazem_teste(test_db, monkeypatch):
+    """
+    Guarda as respostas idempotentes no banco de teste
+    """
+    monkeypatch.setattr(armazem, "abrir_sessao", sessionmaker(bind=test_db.get_bind()))
+    return armazem
+
+class TestIdempotencia:
+    """
+    Testes para as escritas com o cabeçalho Idempotency-Key.
+    """
+
+    def test_nova_tentativa_repete_resposta(self, client, seed_db, test_db, armazem_teste):
+        """
+        Testa que a nova tentativa recebe a resposta original sem criar outra pergunta.
+        """
+        dados = {"id_formulario": seed_db["formularios"][1].id, "titulo": "Nova pergunta", "tipo_pergunta": "texto_livre"}
+        cabecalhos = {"Idempotency-Key": "pergunta-1"}
+        total = test_db.query(Pergunta).count()
+
+        primeira = client.post("/api/v1/perguntas/", json=dados, headers=cabecalhos)
+        assert primeira.status_code == status.HTTP_201_CREATED
+        assert "idempotent-replayed" not in primeira.headers
+
+        segunda = client.post("/api/v1/perguntas/", json=dados, headers=cabecalhos)
+        assert segunda.status_code == status.HTTP_201_CREATED
+        assert segunda.headers["idempotent-replayed"] == "true"
+        assert segunda.json() == primeira.json()
+
+        # Sem o cache em memória, como em outro worker, a resposta vem do banco
+        limpar_caches()
+        terceira = client.post("/api/v1/perguntas/", json=dados, headers=cabecalhos)
+        assert terceira.json() == primeira.json()
+        assert test_db.query(Pergunta).count() == total + 1
+
+        # Sem o cabeçalho, ou com outra chave, a requisição é executada
+        client.post("/api/v1/perguntas/", json=dados)
+        client.post("/api/v1/perguntas/", json=dados, headers={"Idempotency-Key": "pergunta-2"})
+        assert test_db.query(Pergunta).count() == total + 3
+
+    def test_submissao_idempotente(self, client, seed_db, test_db, armazem_teste):
+        """
+        Testa a criação idempotente de rascunhos de submissão.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        cabecalhos = {"Idempotency-Key": "submissao-1"}
+
+        respostas = [
+            client.post("/api/v1/submissoes/", json={"id_formulario": formulario_id}, headers=cabecalhos)
+            for _ in range(3)
+        ]
+        assert {response.json()["id"] for response in respostas} == {respostas[0].json()["id"]}
+        assert test_db.query(Submissao).count() == 1
+
+    def test_conflitos_e_expiracao(self, client, seed_db, test_db, armazem_teste):
+        """
+        Testa a chave reutilizada em outra requisição, a requisição em andamento e a expiração.
+        """
+        dados = {"id_formulario": seed_db["formularios"][1].id, "titulo": "Pergunta", "tipo_pergunta": "texto_livre"}
+        cabecalhos = {"Idempotency-Key": "chave"}
+        assert client.post("/api/v1/perguntas/", json=dados, headers=cabecalhos).status_code == status.HTTP_201_CREATED
+
+        response = client.post("/api/v1/perguntas/", json={**dados, "titulo": "Outra"}, headers=cabecalhos)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        # A mesma requisição pedindo a resposta em outro formato
+        response = client.post("/api/v1/perguntas/", json=dados, headers={**cabecalhos, "Accept": "application/msgpack"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = client.post("/api/v1/perguntas/", json=dados, headers={"Idempotency-Key": ""})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        # Outra requisição com a mesma chave ainda em execução
+        corpo = b'{"titulo": "Em andamento"}'
+        chave = calcular_chave("ip:testclient", "andamento")
+        assert armazem.reservar(chave, calcular_impressao("POST", "/api/v1/perguntas/", "", "application/json", corpo)) is None
+        response = client.post(
+            "/api/v1/perguntas/", content=corpo, headers={"Idempotency-Key": "andamento", "Content-Type": "application/json"}
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.headers["retry-after"] == "1"
+
+        # Respostas expiradas deixam de ser repetidas
+        test_db.execute(update(RequisicaoIdempotente).values(expira_em=datetime.utcnow() - timedelta(seconds=1)))
+        test_db.commit()
+        limpar_caches()
+        total = test_db.query(Pergunta).count()
+        response = client.post("/api/v1/perguntas/", json=dados, headers=cabecalhos)
+        assert "idempotent-replayed" not in response.headers
+        assert test_db.query(Pergunta).count() == total + 1
+
+    def test_erros_de_servidor_nao_sao_guardados(self, client, seed_db, test_db, armazem_teste, monkeypatch):
+        """
+        Testa que uma resposta 5xx desfaz a reserva e a requisição pode ser repetida.
+        """
+        from app.crud import pergunta as crud_pergunta
+
+        dados = {"id_formulario": seed_db["formularios"][1].id, "titulo": "Pergunta", "tipo_pergunta": "texto_livre"}
+        cabecalhos = {"Idempotency-Key": "falha"}
+        original = crud_pergunta.create_pergunta
+
+        def falhar(*args, **kwargs):
+            raise RuntimeError("falha simulada")
+
+        monkeypatch.setattr(crud_pergunta, "create_pergunta", falhar)
+        with pytest.raises(RuntimeError):
+            client.post("/api/v1/perguntas/", json=dados, headers=cabecalhos)
+        assert test_db.query(RequisicaoIdempotente).count() == 0
+
+        monkeypatch.setattr(crud_pergunta, "create_pergunta", original)
+        response = client.post("/api/v1/perguntas/", json=dados, headers=cabecalhos)
+        assert response.status_code == status.HTTP_201_CREATED
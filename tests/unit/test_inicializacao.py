@@ -0,0 +1,32 @@
+import pytest
+import logging
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.db import database
+from app.main import create_app
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestInicializacao:
+    """
+    Testes para a inicialização da aplicação.
+    """
+
+    def test_create_app_sem_banco(self, monkeypatch):
+        """
+        Testa que criar a aplicação não cria o engine nem abre conexões,
+        e que o lifespan cria e descarta o engine.
+        """
+        monkeypatch.setattr(database.settings, "DATABASE_URL", "sqlite:///:memory:")
+        database.dispose_engine()
+
+        app = create_app()
+        assert database._engine is None
+
+        with TestClient(app) as client:
+            assert database._engine is not None
+            assert client.get("/").status_code == status.HTTP_200_OK
+        assert database._engine is None
@@ -0,0 +1,181 @@
+import pytest
+import asyncio
+import logging
+import httpx
+from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.limites import BackendMemoria, limitador_concorrencia
+from app.middleware.limites import LimitesMiddleware, requisicoes_rejeitadas
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def limites_pequenos(monkeypatch):
+    """
+    Baldes com rajada pequena e reposição desprezível durante o teste.
+    """
+    monkeypatch.setattr(settings, "RATE_LIMIT_TAXA", 0.001)
+    monkeypatch.setattr(settings, "RATE_LIMIT_RAJADA", 5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROTA_TAXA", 0.001)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROTA_RAJADA", 3)
+    monkeypatch.setattr(settings, "CHAVES_API", "a,b,c")
+
+class TestLimites:
+    """
+    Testes para os limites de taxa, de concorrência e de paginação.
+    """
+
+    def test_balde_de_tokens(self):
+        """
+        Testa o consumo e a reposição dos tokens de um balde.
+        """
+        backend = BackendMemoria()
+        baldes = [("cliente", 2.0, 3)]
+        assert [backend.consumir(baldes, agora=100.0).permitido for _ in range(4)] == [True, True, True, False]
+
+        decisao = backend.consumir(baldes, agora=100.0)
+        assert decisao.espera == pytest.approx(0.5)
+        # Meio segundo repõe um token à taxa de 2 por segundo
+        assert backend.consumir(baldes, agora=100.5).permitido
+        assert not backend.consumir(baldes, agora=100.5).permitido
+        # A reposição não passa da capacidade
+        assert backend.consumir(baldes, agora=1000.0).restantes == 2
+
+    def test_consumo_atomico(self):
+        """
+        Testa que nenhum balde é consumido quando outro da mesma requisição está vazio.
+        """
+        backend = BackendMemoria()
+        assert backend.consumir([("rota", 0.0, 1)], agora=0.0).permitido
+        assert not backend.consumir([("cliente", 0.0, 5), ("rota", 0.0, 1)], agora=0.0).permitido
+        assert backend.consumir([("cliente", 0.0, 5)], agora=0.0).restantes == 4
+
+    def test_justica_entre_clientes(self, client, limites_pequenos):
+        """
+        Testa que um cliente que esgota o seu limite não afeta os demais.
+        """
+        respostas = [client.get("/api/v1/formularios/", headers={"X-API-Key": "a"}) for _ in range(4)]
+        assert [r.status_code for r in respostas] == [200, 200, 200, 429]
+        assert int(respostas[-1].headers["retry-after"]) >= 1
+        assert respostas[0].headers["x-ratelimit-remaining"] == "2"
+
+        response = client.get("/api/v1/formularios/", headers={"X-API-Key": "b"})
+        assert response.status_code == status.HTTP_200_OK
+        rejeitadas = dict((tuple(chave), valor) for chave, valor in requisicoes_rejeitadas.exportar())
+        assert rejeitadas[("taxa",)] >= 1
+
+    def test_chaves_desconhecidas(self, client, limites_pequenos):
+        """
+        Testa que trocar de chave desconhecida a cada requisição não escapa do limite do IP.
+        """
+        respostas = [
+            client.get("/api/v1/formularios/", headers={"X-API-Key": f"aleatoria-{i}"}) for i in range(4)
+        ]
+        assert [r.status_code for r in respostas] == [200, 200, 200, 429]
+        # Uma chave configurada tem os seus próprios baldes
+        assert client.get("/api/v1/formularios/", headers={"X-API-Key": "a"}).status_code == status.HTTP_200_OK
+
+    def test_limite_por_rota(self, client, limites_pequenos):
+        """
+        Testa que esgotar uma rota não bloqueia as outras rotas do mesmo cliente,
+        e que caminhos com identificadores diferentes contam para a mesma rota.
+        """
+        for formulario_id in (1, 2, 3):
+            assert client.get(f"/api/v1/formularios/{formulario_id}").status_code == status.HTTP_404_NOT_FOUND
+        assert client.get("/api/v1/formularios/4").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert client.get("/api/v1/formularios/").status_code == status.HTTP_200_OK
+        # O limite total do cliente (5) também vale entre rotas; requisições recusadas não consomem tokens
+        assert client.get("/api/v1/perguntas/").status_code == status.HTTP_200_OK
+        assert client.get("/api/v1/submissoes/").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_sobrecarga(self, monkeypatch):
+        """
+        Testa a rejeição com 503 acima do limite de requisições simultâneas do processo
+        e com 429 acima do limite por cliente.
+        """
+        monkeypatch.setattr(settings, "MAX_REQUISICOES_SIMULTANEAS", 2)
+        monkeypatch.setattr(settings, "MAX_REQUISICOES_POR_CLIENTE", 1)
+        monkeypatch.setattr(settings, "CHAVES_API", "a,b,c")
+        app = FastAPI()
+
+        async def executar():
+            liberar = asyncio.Event()
+            em_andamento = asyncio.Event()
+
+            @app.get(f"{settings.API_V1_STR}/lento")
+            async def lento():
+                if limitador_concorrencia.total == 2:
+                    em_andamento.set()
+                await liberar.wait()
+                return {}
+
+            app.add_middleware(LimitesMiddleware)
+            async with httpx.AsyncClient(app=app, base_url="http://teste") as cliente:
+                lentas = [
+                    asyncio.create_task(cliente.get("/api/v1/lento", headers={"X-API-Key": chave}))
+                    for chave in ("a", "b")
+                ]
+                await asyncio.wait_for(em_andamento.wait(), timeout=5)
+                mesmo_cliente = await cliente.get("/api/v1/lento", headers={"X-API-Key": "a"})
+                sobrecarga = await cliente.get("/api/v1/lento", headers={"X-API-Key": "c"})
+                liberar.set()
+                concluidas = await asyncio.gather(*lentas)
+            return mesmo_cliente, sobrecarga, concluidas
+
+        mesmo_cliente, sobrecarga, concluidas = asyncio.run(executar())
+        logger.info(f"Rejeições: {mesmo_cliente.status_code}, {sobrecarga.status_code}")
+        assert sobrecarga.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert sobrecarga.headers["retry-after"] == "1"
+        assert mesmo_cliente.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert [r.status_code for r in concluidas] == [200, 200]
+        assert limitador_concorrencia.total == 0
+
+    def test_transmissao_nao_ocupa_vaga(self, monkeypatch):
+        """
+        Testa que respostas text/event-stream liberam a vaga de concorrência ao começar.
+        """
+        monkeypatch.setattr(settings, "MAX_REQUISICOES_POR_CLIENTE", 1)
+        app = FastAPI()
+
+        async def executar():
+            liberar = asyncio.Event()
+            iniciada = asyncio.Event()
+
+            async def eventos():
+                yield ": inicio\n\n"
+                iniciada.set()
+                await liberar.wait()
+
+            @app.get(f"{settings.API_V1_STR}/eventos")
+            async def transmitir():
+                return StreamingResponse(eventos(), media_type="text/event-stream")
+
+            @app.get(f"{settings.API_V1_STR}/rapida")
+            async def rapida():
+                return {}
+
+            app.add_middleware(LimitesMiddleware)
+            async with httpx.AsyncClient(app=app, base_url="http://teste") as cliente:
+                transmissao = asyncio.create_task(cliente.get("/api/v1/eventos", headers={"X-API-Key": "a"}))
+                await asyncio.wait_for(iniciada.wait(), timeout=5)
+                durante = await cliente.get("/api/v1/rapida", headers={"X-API-Key": "a"})
+                liberar.set()
+                await transmissao
+            return durante
+
+        assert asyncio.run(executar()).status_code == status.HTTP_200_OK
+        assert limitador_concorrencia.total == 0
+
+    def test_limite_de_paginacao(self, client):
+        """
+        Testa que páginas maiores que PAGINACAO_LIMITE_MAXIMO são recusadas.
+        """
+        maximo = settings.PAGINACAO_LIMITE_MAXIMO
+        assert client.get(f"/api/v1/formularios/?limit={maximo}").status_code == status.HTTP_200_OK
+        assert client.get(f"/api/v1/formularios/?limit={maximo + 1}").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get(f"/api/v1/perguntas/?limit={maximo + 1}").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/api/v1/formularios/?skip=-1").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,127 @@
+import pytest
+import logging
+from fastapi import status
+from app.core.metricas import RegistroMetricas, marcar_processo_encerrado
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _valor(texto: str, prefixo: str) -> float:
+    """
+    Obtém o valor da primeira amostra que começa com o prefixo informado
+    """
+    for linha in texto.splitlines():
+        if linha.startswith(prefixo):
+            return float(linha.rsplit(" ", 1)[1])
+    raise AssertionError(f"Amostra não encontrada: {prefixo}")
+
+class TestMetricas:
+    """
+    Testes para a instrumentação e o endpoint /metrics.
+    """
+
+    def test_histograma(self):
+        """
+        Testa a renderização de um histograma no formato do Prometheus.
+        """
+        registro = RegistroMetricas()
+        histograma = registro.histograma("latencia", "Latência", ("rota",), buckets=(0.1, 1.0))
+        histograma.observar("/a", valor=0.05)
+        histograma.observar("/a", valor=0.5)
+        histograma.observar("/a", valor=5)
+        texto = registro.renderizar()
+        assert 'latencia_bucket{rota="/a",le="0.1"} 1' in texto
+        assert 'latencia_bucket{rota="/a",le="1"} 2' in texto
+        assert 'latencia_bucket{rota="/a",le="+Inf"} 3' in texto
+        assert 'latencia_count{rota="/a"} 3' in texto
+
+    def test_combinar_processos(self, tmp_path):
+        """
+        Testa a combinação das métricas gravadas por vários workers e o descarte
+        dos medidores de um worker encerrado.
+        """
+        def criar_registro():
+            registro = RegistroMetricas()
+            registro.contador("requisicoes", "Requisições", ("rota",))
+            registro.medidor("em_andamento", "Em andamento")
+            registro.medidor("taxa", "Taxa", modo="todos")
+            registro.histograma("latencia", "Latência", buckets=(0.1, 1.0))
+            return registro
+
+        worker, outro_worker = criar_registro(), criar_registro()
+        for registro, requisicoes in ((worker, 3), (outro_worker, 2)):
+            registro.metricas["requisicoes"].inc("/a", valor=requisicoes)
+            registro.metricas["em_andamento"].inc()
+            registro.metricas["taxa"].set(valor=0.5)
+            registro.metricas["latencia"].observar(valor=0.05)
+        outro_worker.salvar(str(tmp_path), pid=99999)
+
+        texto = worker.renderizar(str(tmp_path))
+        assert _valor(texto, 'requisicoes{rota="/a"}') == 5
+        assert _valor(texto, "em_andamento") == 2
+        assert _valor(texto, 'taxa{pid="99999"}') == 0.5
+        assert _valor(texto, 'latencia_bucket{le="0.1"}') == 2
+
+        marcar_processo_encerrado(str(tmp_path), 99999)
+        texto = worker.renderizar(str(tmp_path))
+        assert _valor(texto, 'requisicoes{rota="/a"}') == 5
+        assert _valor(texto, "em_andamento") == 1
+        assert 'taxa{pid="99999"}' not in texto
+
+    def test_metricas_por_rota(self, client, seed_db):
+        """
+        Testa que as requisições são medidas pelo caminho da rota e com contagem de consultas.
+        """
+        pergunta_id = seed_db["perguntas"][0].id
+        rota = 'method="GET",route="/api/v1/perguntas/{pergunta_id}"'
+        antes = client.get("/metrics").text
+        try:
+            total_antes = _valor(antes, f'http_requests_total{{{rota},status="200"}}')
+        except AssertionError:
+            total_antes = 0
+
+        client.get(f"/api/v1/perguntas/{pergunta_id}")
+        client.get(f"/api/v1/perguntas/{pergunta_id}")
+
+        response = client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        texto = response.text
+        assert _valor(texto, f'http_requests_total{{{rota},status="200"}}') == total_antes + 2
+        assert _valor(texto, f"http_request_db_queries_sum{{{rota}}}") > 0
+        assert f"http_request_duration_seconds_bucket{{{rota}," in texto
+        assert 'cache_hit_ratio{cache="versoes_formulario"}' in texto
+        logger.info("Métricas por rota registradas corretamente")
+
+    def test_rota_desconhecida(self, client):
+        """
+        Testa que caminhos inexistentes não criam rótulos com o caminho bruto.
+        """
+        client.get("/caminho/inexistente/123")
+        texto = client.get("/metrics").text
+        assert "/caminho/inexistente/123" not in texto
+        assert 'route="desconhecida"' in texto
+
+    def test_consultas_com_erro(self, test_db):
+        """
+        Testa que consultas com erro não deixam estado na conexão nem desalinham as medições.
+        """
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+        from app.middleware.metricas import EstatisticasBanco, estatisticas_banco
+
+        estatisticas = EstatisticasBanco()
+        token = estatisticas_banco.set(estatisticas)
+        try:
+            with test_db.get_bind().connect() as conexao:
+                for _ in range(3):
+                    with pytest.raises(OperationalError):
+                        conexao.execute(text("SELECT * FROM tabela_inexistente"))
+                    conexao.rollback()
+                conexao.execute(text("SELECT 1"))
+                assert not any(isinstance(valor, list) for valor in conexao.info.values())
+        finally:
+            estatisticas_banco.reset(token)
+        assert estatisticas.consultas == 1
+        assert 0 <= estatisticas.duracao < 1
@@ -0,0 +1,75 @@
+import pytest
+import logging
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.database import Base
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def conexao(tmp_path):
+    """
+    Conexão com um banco SQLite vazio e a configuração do Alembic do projeto.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'migracoes.db'}")
+    with engine.begin() as connection:
+        config = Config("alembic.ini")
+        config.attributes["connection"] = connection
+        yield connection, config
+    engine.dispose()
+
+class TestMigracoes:
+    """
+    Testes para as migrações do Alembic.
+    """
+
+    def test_migracoes_correspondem_aos_modelos(self, conexao):
+        """
+        Testa que aplicar todas as migrações produz o esquema definido nos modelos.
+        """
+        connection, config = conexao
+        command.upgrade(config, "head")
+        diferencas = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        logger.info(f"Diferenças entre migrações e modelos: {diferencas}")
+        assert diferencas == []
+
+    def test_downgrade(self, conexao):
+        """
+        Testa que as migrações podem ser revertidas.
+        """
+        connection, config = conexao
+        command.upgrade(config, "head")
+        command.downgrade(config, "base")
+        assert inspect(connection).get_table_names() == ["alembic_version"]
+
+    def test_deduplicar_opcoes(self, conexao):
+        """
+        Testa que a migração 0006 faz as perguntas com as mesmas opções compartilharem um conjunto.
+        """
+        connection, config = conexao
+        command.upgrade(config, "0005")
+        connection.execute(text("INSERT INTO formulario (id, titulo) VALUES (1, 'Formulário')"))
+        for pergunta_id in (1, 2, 3, 4):
+            connection.execute(text(
+                "INSERT INTO pergunta (id, id_formulario, titulo, tipo_pergunta) VALUES (:id, 1, 'Pergunta', 2)"
+            ), {"id": pergunta_id})
+        opcoes = [(1, "A", 0), (1, "B", 1), (2, "B", 1), (2, "A", 0), (3, "C", 0)]
+        for pergunta_id, resposta, ordem in opcoes:
+            connection.execute(text(
+                "INSERT INTO opcoes_respostas (id_pergunta, resposta, ordem) VALUES (:pergunta, :resposta, :ordem)"
+            ), {"pergunta": pergunta_id, "resposta": resposta, "ordem": ordem})
+
+        command.upgrade(config, "head")
+        conjuntos = dict(connection.execute(text("SELECT id, id_conjunto_opcoes FROM pergunta")).all())
+        assert conjuntos[1] == conjuntos[2] != conjuntos[3]
+        assert conjuntos[4] is None
+        linhas = connection.execute(text(
+            "SELECT id_conjunto, resposta FROM opcoes_respostas ORDER BY id_conjunto, ordem"
+        )).all()
+        assert linhas == [(conjuntos[1], "A"), (conjuntos[1], "B"), (conjuntos[3], "C")]
@@ -0,0 +1,111 @@
+import pytest
+import logging
+from fastapi import status
+
+from app.core.config import settings
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _percorrer(client, caminho, limit):
+    """
+    Percorre todas as páginas de uma listagem seguindo next_cursor.
+    """
+    itens, cursor = [], None
+    while True:
+        separador = "&" if "?" in caminho else "?"
+        url = f"{caminho}{separador}limit={limit}" + (f"&cursor={cursor}" if cursor else "&envelope=true")
+        pagina = client.get(url).json()
+        itens.extend(pagina["items"])
+        cursor = pagina["next_cursor"]
+        if cursor is None:
+            return itens
+
+class TestPaginacao:
+    """
+    Testes para o envelope de paginação com total e cursor.
+    """
+
+    def test_envelope_formularios(self, client):
+        """
+        Testa o total e a navegação por cursor na listagem de formulários.
+        """
+        for i in range(5):
+            client.post("/api/v1/formularios/", json={"titulo": f"Formulário {i}"})
+
+        response = client.get("/api/v1/formularios/?limit=2&envelope=true")
+        assert response.status_code == status.HTTP_200_OK
+        pagina = response.json()
+        assert pagina["total"] == 5
+        assert pagina["total_exato"] is True
+        assert len(pagina["items"]) == 2
+        assert pagina["next_cursor"]
+
+        itens = _percorrer(client, "/api/v1/formularios/", 2)
+        assert [item["titulo"] for item in itens] == [f"Formulário {i}" for i in range(5)]
+        # Sem envelope, a resposta continua sendo uma lista
+        assert isinstance(client.get("/api/v1/formularios/").json(), list)
+
+    @pytest.mark.parametrize("sort", ["ordem:asc", "ordem:desc", "codigo:asc", "codigo:desc", "tipo_pergunta:asc", "tipo_pergunta:desc"])
+    def test_cursor_perguntas(self, client, seed_db, sort):
+        """
+        Testa que a navegação por cursor devolve as perguntas na mesma ordem da
+        listagem completa, inclusive com valores nulos no campo de ordenação.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        for i in range(3):
+            client.post("/api/v1/perguntas/", json={
+                "id_formulario": formulario_id, "titulo": f"Sem código {i}", "ordem": 2, "tipo_pergunta": "texto_livre",
+            })
+        caminho = f"/api/v1/perguntas/formulario/{formulario_id}?sort={sort}"
+        completa = [item["id"] for item in client.get(caminho).json()]
+        assert len(completa) == 6
+
+        assert [item["id"] for item in _percorrer(client, caminho, 1)] == completa
+        assert [item["id"] for item in _percorrer(client, caminho, 4)] == completa
+        pagina = client.get(f"{caminho}&envelope=true&tipo_pergunta=texto_livre").json()
+        assert (pagina["total"], pagina["total_exato"]) == (3, True)
+
+    def test_cursor_invalido(self, client, seed_db):
+        """
+        Testa a rejeição de cursores inválidos ou gerados com outra ordenação.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        caminho = f"/api/v1/perguntas/formulario/{formulario_id}"
+        cursor = client.get(f"{caminho}?limit=1&envelope=true").json()["next_cursor"]
+        assert client.get(f"{caminho}?cursor={cursor}").status_code == status.HTTP_200_OK
+        assert client.get(f"{caminho}?cursor={cursor}&sort=titulo").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get(f"{caminho}?cursor=invalido").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/api/v1/formularios/?cursor=e30").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_contagem_limitada(self, client, monkeypatch):
+        """
+        Testa que acima do limite de contagem exata o total é marcado como não exato.
+        """
+        monkeypatch.setattr(settings, "PAGINACAO_CONTAGEM_EXATA_MAXIMA", 3)
+        for i in range(5):
+            client.post("/api/v1/formularios/", json={"titulo": f"Formulário {i}"})
+        pagina = client.get("/api/v1/formularios/?envelope=true").json()
+        logger.info(f"Total: {pagina['total']} (exato: {pagina['total_exato']})")
+        assert pagina["total_exato"] is False
+        assert pagina["total"] > 3
+        assert len(pagina["items"]) == 5
+
+    def test_explain_com_filtro_de_tipo(self):
+        """
+        Testa que o EXPLAIN da estimativa recebe os filtros convertidos pelos tipos das colunas.
+        """
+        from sqlalchemy.dialects import postgresql
+
+        from app.crud.pergunta import contagem_perguntas
+        from app.db.contagem import comando_explain
+        from app.models.tipos import TipoPergunta
+
+        tipo = TipoPergunta("unica_escolha")
+        consulta = contagem_perguntas(tipo_pergunta=tipo, tenant="cliente")
+        comando, parametros = comando_explain(consulta, postgresql.psycopg2.dialect())
+        logger.info(f"Comando: {comando} {parametros}")
+        assert comando.startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert parametros == {"tenant_1": "cliente", "tipo_pergunta_1": tipo.codigo}
+        assert all(f"%({nome})s" in comando for nome in parametros)
@@ -0,0 +1,42 @@
+import pytest
+import logging
+from datetime import date
+
+from app.db.particoes import manter_particoes, meses, nome_particao, somar_meses, sql_criar_particao
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestParticoes:
+    """
+    Testes para a manutenção das partições mensais de submissões.
+    """
+
+    def test_meses(self):
+        """
+        Testa o cálculo dos meses das partições, inclusive na virada do ano.
+        """
+        assert somar_meses(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert somar_meses(date(2026, 1, 1), -1) == date(2025, 12, 1)
+        assert list(meses(date(2026, 11, 20), date(2027, 1, 1))) == [
+            date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1)
+        ]
+
+    def test_sql_criar_particao(self):
+        """
+        Testa o comando de criação da partição de um mês.
+        """
+        assert nome_particao("resposta_submissao", date(2026, 12, 1)) == "resposta_submissao_p2026_12"
+        sql = sql_criar_particao("submissao", date(2026, 12, 1))
+        logger.info(sql)
+        assert sql == (
+            "CREATE TABLE IF NOT EXISTS submissao_p2026_12 PARTITION OF submissao "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        )
+
+    def test_manter_particoes_fora_do_postgresql(self, test_db):
+        """
+        Testa que a manutenção não altera bancos sem particionamento.
+        """
+        assert manter_particoes(test_db.get_bind()) == {"criadas": [], "retiradas": []}
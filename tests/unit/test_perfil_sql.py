@@ -0,0 +1,97 @@
+import pytest
+import logging
+from fastapi import status
+from app.core.config import settings
+from app.crud import pergunta as crud_pergunta
+from app.middleware.perfil_sql import perfilar_sql, normalizar_sql
+from app.models.models import Pergunta
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def perfil_por_cabecalho(monkeypatch):
+    """
+    Habilita o perfil de consultas sob demanda pelo cabeçalho X-Profile-SQL.
+    """
+    monkeypatch.setattr(settings, "SQL_PROFILE_HEADER_ENABLED", True)
+
+class TestPerfilSQL:
+    """
+    Testes para o perfil de consultas SQL e a detecção de N+1.
+    """
+
+    def test_normalizar_sql(self):
+        """
+        Testa que listas IN de tamanhos diferentes têm o mesmo formato.
+        """
+        assert normalizar_sql("SELECT * FROM t WHERE id IN (?, ?)") == normalizar_sql("SELECT *  FROM t\nWHERE id IN (?)")
+
+    def test_detectar_n_mais_um(self, test_db, seed_db):
+        """
+        Testa que carregamentos preguiçosos repetidos são sinalizados como N+1.
+        """
+        perguntas = test_db.query(Pergunta).all()
+        test_db.expire_all()
+        with perfilar_sql(limite_n_mais_um=3) as perfil:
+            for pergunta in test_db.query(Pergunta).all():
+                pergunta.opcoes_respostas
+        assert len(perfil.n_mais_um) == 1
+        assert perfil.n_mais_um[0]["repeticoes"] == len(perguntas)
+
+    def test_get_perguntas_sem_n_mais_um(self, test_db, seed_db):
+        """
+        Testa que a listagem de perguntas carrega os relacionamentos sem N+1.
+        """
+        with perfilar_sql(limite_n_mais_um=2) as perfil:
+            perguntas = crud_pergunta.get_perguntas(test_db)
+            for pergunta in perguntas:
+                pergunta.opcoes_respostas
+                pergunta.opcoes_respostas_multiplas
+        assert perfil.n_mais_um == []
+        assert len(perfil.consultas) <= 3
+        assert perfil.consultas[0]["origem"].startswith("app/crud/pergunta.py")
+
+    def test_cabecalho_e_rota_de_depuracao(self, client, seed_db, perfil_por_cabecalho):
+        """
+        Testa o resumo no cabeçalho da resposta e a rota de depuração.
+        """
+        response = client.get("/api/v1/perguntas/", headers={"X-Profile-SQL": "1"})
+        assert response.status_code == status.HTTP_200_OK
+        assert "n_mais_um=0" in response.headers["x-sql-profile"]
+        perfil_id = int(response.headers["x-sql-profile-id"])
+
+        response = client.get("/debug/sql-profiles")
+        assert response.status_code == status.HTTP_200_OK
+        perfil = next(p for p in response.json() if p["id"] == perfil_id)
+        assert perfil["caminho"] == "/api/v1/perguntas/"
+        assert perfil["consultas"] >= 1
+        logger.info(f"Perfil SQL: {perfil['consultas']} consultas em {perfil['tempo_total_ms']} ms")
+
+    def test_perfil_desativado(self, client, seed_db):
+        """
+        Testa que o perfil não é aplicado sem habilitação explícita.
+        """
+        response = client.get("/api/v1/perguntas/", headers={"X-Profile-SQL": "1"})
+        assert "x-sql-profile" not in response.headers
+        assert client.get("/debug/sql-profiles").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_medicao_unica(self, test_db):
+        """
+        Testa que o perfil e as métricas leem a mesma medição de cada consulta.
+        """
+        from sqlalchemy import text
+        from app.db.tempo_consultas import observadores
+        from app.middleware.metricas import EstatisticasBanco, estatisticas_banco
+
+        estatisticas = EstatisticasBanco()
+        token = estatisticas_banco.set(estatisticas)
+        try:
+            with perfilar_sql() as perfil:
+                test_db.execute(text("SELECT 1"))
+        finally:
+            estatisticas_banco.reset(token)
+        assert len(perfil.consultas) == estatisticas.consultas == 1
+        assert perfil.consultas[0]["duracao_ms"] == round(estatisticas.duracao * 1000, 3)
+        assert len({observador.__module__ for observador in observadores}) == len(observadores)
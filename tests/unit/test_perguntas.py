@@ -159,6 +159,15 @@ class TestPerguntaEndpoints:
         assert get_response.status_code == status.HTTP_404_NOT_FOUND
         logger.info(f"Pergunta {pergunta_id} excluída com sucesso")
     
+    def test_delete_pergunta_com_opcoes(self, client, seed_db):
+        """
+        Testa que a exclusão de uma pergunta remove também suas opções de resposta.
+        """
+        pergunta_id = seed_db["perguntas"][1].id
+        response = client.delete(f"/api/v1/perguntas/{pergunta_id}")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert client.get(f"/api/v1/perguntas/{pergunta_id}").status_code == status.HTTP_404_NOT_FOUND
+    
     def test_delete_pergunta_not_found(self, client):
         """
         Testa o endpoint para excluir uma pergunta que não existe.
@@ -223,3 +232,116 @@ class TestPerguntaEndpoints:
         data = response.json()
         assert len(data) == 1
         logger.info("Paginação funcionou corretamente")
+
+    def test_get_perguntas_ordenacao_invalida(self, client, seed_db):
+        """
+        Testa que apenas os campos de ordenação permitidos são aceitos.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        logger.info("Testando ordenações inválidas")
+        for parametros in ("sort=formulario", "sort=ordem:lado", "sort_by=__class__", "sort_by=ordem&sort_order=x"):
+            response = client.get(f"/api/v1/perguntas/formulario/{formulario_id}?{parametros}")
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+            response = client.get(f"/api/v1/perguntas/?{parametros}")
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        # sort_by e sort_order continuam aceitos
+        response = client.get(f"/api/v1/perguntas/formulario/{formulario_id}?sort_by=titulo&sort_order=DESC")
+        titulos = [item["titulo"] for item in response.json()]
+        assert titulos == sorted(titulos, reverse=True)
+
+    def test_ordenacoes_indexadas(self):
+        """
+        Testa que cada ordenação permitida tem um índice (id_formulario, campo).
+        """
+        from app.crud.pergunta import ORDENACOES
+        from app.models.models import Pergunta
+
+        indices = {tuple(coluna.name for coluna in indice.columns)[:2] for indice in Pergunta.__table__.indexes}
+        for campo, coluna in ORDENACOES.items():
+            assert ("id_formulario", coluna.key) in indices, f"Ordenação {campo} sem índice"
+
+    def test_tipo_pergunta_validado(self, client, seed_db, test_db):
+        """
+        Testa a validação do tipo da pergunta, a grafia antiga de múltipla escolha
+        e a gravação do tipo como código na tabela.
+        """
+        from sqlalchemy import text
+        from app.models.tipos import TipoPergunta
+
+        formulario_id = seed_db["formularios"][0].id
+        pergunta = {"id_formulario": formulario_id, "titulo": "Tipo", "tipo_pergunta": "escolha_qualquer"}
+        response = client.post("/api/v1/perguntas/", json=pergunta)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        response = client.get(f"/api/v1/perguntas/formulario/{formulario_id}?tipo_pergunta=escolha_qualquer")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = client.post("/api/v1/perguntas/", json={**pergunta, "tipo_pergunta": "multipla_escola"})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["tipo_pergunta"] == "multipla_escolha"
+
+        codigo = test_db.scalar(text("SELECT tipo_pergunta FROM pergunta WHERE id = :id"), {"id": response.json()["id"]})
+        assert codigo == TipoPergunta.MULTIPLA_ESCOLHA.codigo
+
+        # O filtro aceita as duas grafias e encontra também a pergunta do seed_db
+        for tipo in ("multipla_escolha", "multipla_escola"):
+            response = client.get(f"/api/v1/perguntas/formulario/{formulario_id}?tipo_pergunta={tipo}")
+            assert len(response.json()) == 2
+
+    def test_update_perguntas_em_lote(self, client, seed_db, test_db):
+        """
+        Testa a alteração em lote com dry_run, filtros, UPDATE único e eventos.
+        """
+        from app.core.eventos import broker
+        from app.middleware.perfil_sql import perfilar_sql
+        from app.models.models import Pergunta as PerguntaModel
+
+        formulario_id = seed_db["formularios"][0].id
+        alteracao = {"filtro": {"formulario_id": formulario_id}, "valores": {"obrigatoria": True}, "dry_run": True}
+        response = client.patch("/api/v1/perguntas/", json=alteracao)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"total": 3, "dry_run": True, "perguntas": []}
+        assert test_db.query(PerguntaModel).filter(PerguntaModel.obrigatoria.is_(False)).count() == 1
+
+        # Filtro por formulário e tipo
+        alteracao = {
+            "filtro": {"formulario_id": formulario_id, "tipo_pergunta": "multipla_escolha"},
+            "valores": {"obrigatoria": True, "orientacao_resposta": "Escolha ao menos uma"},
+        }
+        with perfilar_sql() as perfil:
+            response = client.patch("/api/v1/perguntas/", json=alteracao)
+        assert response.status_code == status.HTTP_200_OK
+        resultado = response.json()
+        assert resultado["total"] == 1 and resultado["dry_run"] is False
+        pergunta = resultado["perguntas"][0]
+        assert pergunta["id"] == seed_db["perguntas"][2].id
+        assert pergunta["obrigatoria"] is True
+        assert pergunta["orientacao_resposta"] == "Escolha ao menos uma"
+        assert len(pergunta["opcoes_respostas_multiplas"]) == 3
+        consultas = [consulta["sql"] for consulta in perfil.consultas]
+        logger.info(f"Consultas da alteração em lote: {consultas}")
+        assert sum(sql.lstrip().upper().startswith("UPDATE") for sql in consultas) == 1
+        assert not any(sql.lstrip().upper().startswith("SELECT PERGUNTA") for sql in consultas)
+
+        # Por ids, com evento de reordenação para cada pergunta
+        ids = [pergunta.id for pergunta in seed_db["perguntas"][:2]]
+        total_historico = len(broker._historicos.get(("padrao", formulario_id)) or ())
+        response = client.patch("/api/v1/perguntas/", json={"filtro": {"ids": ids}, "valores": {"ordem": 10}})
+        assert [pergunta["id"] for pergunta in response.json()["perguntas"]] == ids
+        historico = list(broker._historicos.get(("padrao", formulario_id)))[total_historico:]
+        assert [evento["tipo"] for evento in historico] == ["pergunta_reordenada"] * 2
+        assert all(evento["dados"]["ordem"] == 10 for evento in historico)
+
+        # Sem filtro, sem valores, com campos não permitidos ou conjunto inexistente
+        assert client.patch("/api/v1/perguntas/", json={"filtro": {}, "valores": {"obrigatoria": False}}).status_code == 400
+        assert client.patch("/api/v1/perguntas/", json={"filtro": {"ids": ids}, "valores": {}}).status_code == 400
+        response = client.patch("/api/v1/perguntas/", json={"filtro": {"ids": ids}, "valores": {"id_formulario": 2}})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        response = client.patch("/api/v1/perguntas/", json={"filtro": {"ids": ids}, "valores": {"id_conjunto_opcoes": 999999}})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        # Nulos explícitos em campos obrigatórios são recusados, sem alterar nada
+        for campo in ("tipo_pergunta", "obrigatoria", "sub_pergunta"):
+            response = client.patch("/api/v1/perguntas/", json={"filtro": {"formulario_id": formulario_id}, "valores": {campo: None}})
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert test_db.query(PerguntaModel).filter(PerguntaModel.tipo_pergunta.is_(None)).count() == 0
@@ -0,0 +1,200 @@
+import pytest
+import logging
+from fastapi import status
+from app.core.regras import GrafoRegras, CicloRegrasError
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _grafo_encadeado():
+    """
+    Pergunta 1 (Sim/Não) revela a 2, cuja resposta "Outra" revela a 3.
+    """
+    perguntas = [
+        {"id": 1, "tipo_pergunta": "Sim_Não", "obrigatoria": True},
+        {"id": 2, "tipo_pergunta": "texto_livre", "obrigatoria": True},
+        {"id": 3, "tipo_pergunta": "texto_livre", "obrigatoria": True},
+        {"id": 4, "tipo_pergunta": "Inteiro", "obrigatoria": False},
+    ]
+    regras = [
+        {"id_pergunta_origem": 1, "operador": "igual", "valor": "Sim", "id_pergunta_destino": 2},
+        {"id_pergunta_origem": 2, "operador": "igual", "valor": "Outra", "id_pergunta_destino": 3},
+    ]
+    return GrafoRegras(perguntas, regras)
+
+class TestMotorRegras:
+    """
+    Testes para o motor de regras condicionais.
+    """
+
+    def test_visibilidade_inicial(self):
+        """
+        Testa que perguntas alvo de regras começam ocultas.
+        """
+        estado = _grafo_encadeado().novo_estado()
+        assert estado.visiveis == {1, 4}
+        assert estado.pendentes == {1}
+
+    def test_propagacao_incremental(self):
+        """
+        Testa a propagação de visibilidade em cadeia e a ocultação ao mudar a resposta.
+        """
+        estado = _grafo_encadeado().novo_estado()
+
+        alteradas = estado.aplicar({1: "Sim"})
+        assert alteradas == {2}
+        assert estado.pendentes == {2}
+
+        alteradas = estado.aplicar({2: "Outra"})
+        assert alteradas == {3}
+        assert estado.visiveis == {1, 2, 3, 4}
+
+        # Ocultar a pergunta 2 desconsidera sua resposta e oculta a 3
+        alteradas = estado.aplicar({1: "Não"})
+        assert alteradas == {2, 3}
+        assert estado.visiveis == {1, 4}
+        assert estado.pendentes == set()
+
+        # Remover a resposta volta ao estado pendente
+        estado.aplicar({1: None})
+        assert estado.pendentes == {1}
+
+    def test_estado_incremental_igual_ao_completo(self):
+        """
+        Testa que aplicar respostas aos poucos produz o mesmo resultado que de uma vez.
+        """
+        grafo = _grafo_encadeado()
+        incremental = grafo.novo_estado()
+        for alteracao in ({2: "Outra"}, {1: "Sim"}, {4: 10}):
+            incremental.aplicar(alteracao)
+        completo = grafo.novo_estado({1: "Sim", 2: "Outra", 4: 10})
+        assert incremental.visiveis == completo.visiveis
+        assert incremental.pendentes == completo.pendentes
+
+    def test_ciclo(self):
+        """
+        Testa que regras cíclicas são rejeitadas na compilação.
+        """
+        perguntas = [{"id": 1}, {"id": 2}]
+        regras = [
+            {"id_pergunta_origem": 1, "operador": "respondida", "id_pergunta_destino": 2},
+            {"id_pergunta_origem": 2, "operador": "respondida", "id_pergunta_destino": 1},
+        ]
+        with pytest.raises(CicloRegrasError):
+            GrafoRegras(perguntas, regras)
+
+    def test_validar_tipos(self):
+        """
+        Testa a validação das respostas de acordo com o tipo da pergunta.
+        """
+        estado = _grafo_encadeado().novo_estado({1: "Talvez", 4: "dez"})
+        erros = estado.validar()
+        assert set(erros) == {1, 4}
+
+    def test_validar_grafia_antiga(self):
+        """
+        Testa que a grafia antiga multipla_escola é validada como múltipla escolha
+        e que tipos desconhecidos são validados como texto livre.
+        """
+        from app.core.validacao import validar_resposta
+
+        pergunta = {"tipo_pergunta": "multipla_escola", "opcoes_respostas_multiplas": [{"id": 1, "resposta": "A"}]}
+        assert validar_resposta(pergunta, ["A"]) is None
+        assert validar_resposta(pergunta, "A") == "Resposta deve ser uma lista de opções"
+        assert validar_resposta({"tipo_pergunta": "desconhecido"}, "livre") is None
+
+class TestRegraEndpoints:
+    """
+    Testes para os endpoints de regras condicionais e avaliação de respostas.
+    """
+
+    def _criar_regra(self, client, seed_db):
+        formulario_id = seed_db["formularios"][0].id
+        sim_nao, escolha, _ = [p.id for p in seed_db["perguntas"]]
+        regra = {
+            "id_pergunta_origem": sim_nao,
+            "operador": "igual",
+            "valor": "Sim",
+            "id_pergunta_destino": escolha,
+        }
+        response = client.post(f"/api/v1/formularios/{formulario_id}/regras", json=regra)
+        assert response.status_code == status.HTTP_201_CREATED
+        return formulario_id, sim_nao, escolha
+
+    def test_create_regra(self, client, seed_db):
+        """
+        Testa a criação e listagem de regras.
+        """
+        formulario_id, _, _ = self._criar_regra(client, seed_db)
+        response = client.get(f"/api/v1/formularios/{formulario_id}/regras")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 1
+        logger.info("Regra criada e listada com sucesso")
+
+    def test_create_regra_invalida(self, client, seed_db):
+        """
+        Testa que regras com ciclo ou perguntas de outro formulário são rejeitadas.
+        """
+        formulario_id, sim_nao, escolha = self._criar_regra(client, seed_db)
+        ciclo = {"id_pergunta_origem": escolha, "operador": "respondida", "id_pergunta_destino": sim_nao}
+        response = client.post(f"/api/v1/formularios/{formulario_id}/regras", json=ciclo)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        outro_formulario = seed_db["formularios"][1].id
+        response = client.post(f"/api/v1/formularios/{outro_formulario}/regras", json=ciclo)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_avaliar_e_validar(self, client, seed_db):
+        """
+        Testa a avaliação de visibilidade e a validação sobre a versão publicada.
+        """
+        formulario_id, sim_nao, escolha = self._criar_regra(client, seed_db)
+
+        response = client.post(f"/api/v1/formularios/{formulario_id}/avaliar", json={"respostas": {}})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+
+        response = client.post(f"/api/v1/formularios/{formulario_id}/avaliar", json={"respostas": {sim_nao: "Não"}})
+        assert response.status_code == status.HTTP_200_OK
+        assert escolha not in response.json()["visiveis"]
+
+        response = client.post(f"/api/v1/formularios/{formulario_id}/validar", json={"respostas": {sim_nao: "Sim"}})
+        data = response.json()
+        assert data["valido"] is False
+        assert data["erros"] == [{"id_pergunta": escolha, "mensagem": "Resposta obrigatória"}]
+
+        response = client.post(
+            f"/api/v1/formularios/{formulario_id}/validar",
+            json={"respostas": {sim_nao: "Sim", escolha: "Opção 2"}}
+        )
+        assert response.json()["valido"] is True
+        logger.info("Avaliação e validação funcionaram corretamente")
+
+    def test_mover_pergunta_com_regras(self, client, seed_db, test_db):
+        """
+        Testa que mover uma pergunta para outro formulário exclui as suas regras e que
+        regras inconsistentes impedem a publicação.
+        """
+        from app.models.models import FormularioVersao, RegraCondicional
+
+        formulario_id, sim_nao, escolha = self._criar_regra(client, seed_db)
+        outro_formulario = seed_db["formularios"][1].id
+        response = client.put(f"/api/v1/perguntas/{escolha}", json={"id_formulario": outro_formulario})
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get(f"/api/v1/formularios/{formulario_id}/regras").json() == []
+
+        assert client.post(f"/api/v1/formularios/{formulario_id}/publicar").status_code == status.HTTP_201_CREATED
+        response = client.post(f"/api/v1/formularios/{formulario_id}/avaliar", json={"respostas": {sim_nao: "Sim"}})
+        assert response.status_code == status.HTTP_200_OK
+
+        # Uma regra gravada diretamente com pergunta de outro formulário não é publicada
+        test_db.add(RegraCondicional(
+            id_formulario=formulario_id, id_pergunta_origem=sim_nao, operador="respondida", id_pergunta_destino=escolha,
+        ))
+        test_db.commit()
+        versoes = test_db.query(FormularioVersao).count()
+        response = client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert test_db.query(FormularioVersao).count() == versoes
@@ -0,0 +1,104 @@
+import pytest
+import logging
+from fastapi import status
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.db import database
+from app.db.database import Base, get_db_leitura, get_sessoes_leitura
+from app.db.roteamento import RoteadorReplicas, afinidade_primario_ativa, valor_cookie_primario
+from app.main import app
+from app.models.models import Formulario
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def replicas(test_db, tmp_path, monkeypatch):
+    """
+    Duas réplicas SQLite, cada uma com um formulário que identifica o banco,
+    e o banco de teste como primário.
+    """
+    urls = []
+    for nome in ("replica1", "replica2"):
+        url = f"sqlite:///{tmp_path / nome}.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(Formulario.__table__.insert(), {"titulo": nome})
+        engine.dispose()
+        urls.append(url)
+
+    database.dispose_engine()
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", ",".join(urls))
+    monkeypatch.setattr(database, "_engine", test_db.get_bind())
+    app.dependency_overrides.pop(get_db_leitura)
+    app.dependency_overrides.pop(get_sessoes_leitura)
+    yield
+    monkeypatch.setattr(database, "_engine", None)
+    database.dispose_engine()
+
+def _titulos(client):
+    return [formulario["titulo"] for formulario in client.get("/api/v1/formularios/").json()]
+
+class TestReplicas:
+    """
+    Testes para o roteamento de leituras entre réplicas.
+    """
+
+    def test_round_robin(self, client, replicas):
+        """
+        Testa que as leituras alternam entre as réplicas.
+        """
+        bancos = [_titulos(client) for _ in range(4)]
+        logger.info(f"Bancos usados nas leituras: {bancos}")
+        assert bancos == [["replica1"], ["replica2"], ["replica1"], ["replica2"]]
+
+    def test_leitura_apos_escrita_no_primario(self, client, replicas):
+        """
+        Testa que, após uma escrita, o cliente lê do primário enquanto o cookie é válido.
+        """
+        response = client.post("/api/v1/formularios/", json={"titulo": "primario"})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "db_primario" in response.cookies
+
+        assert _titulos(client) == ["primario"]
+        assert _titulos(client) == ["primario"]
+
+        client.cookies.clear()
+        assert _titulos(client) in (["replica1"], ["replica2"])
+
+    def test_post_somente_leitura_sem_cookie(self, client, seed_db, replicas):
+        """
+        Testa que um POST que não confirma transações, como /avaliar, não envia o cookie.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        response = client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "db_primario" in response.cookies
+        client.cookies.clear()
+
+        response = client.post(f"/api/v1/formularios/{formulario_id}/avaliar", json={"respostas": {}})
+        assert response.status_code == status.HTTP_200_OK
+        assert "db_primario" not in response.cookies
+
+    def test_menos_conexoes(self):
+        """
+        Testa que a estratégia menos_conexoes escolhe a réplica com menos sessões abertas.
+        """
+        roteador = RoteadorReplicas([object(), object()], "menos_conexoes")
+        ocupada = roteador.adquirir()
+        for _ in range(3):
+            outra = roteador.adquirir()
+            assert outra != ocupada
+            roteador.liberar(outra)
+        assert roteador.em_uso()[ocupada] == 1
+
+    def test_cookie_expirado(self):
+        """
+        Testa a validade do cookie de afinidade com o primário.
+        """
+        assert afinidade_primario_ativa(valor_cookie_primario(5, agora=1000), agora=1004)
+        assert not afinidade_primario_ativa(valor_cookie_primario(5, agora=1000), agora=1006)
+        assert not afinidade_primario_ativa("invalido")
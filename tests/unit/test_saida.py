@@ -0,0 +1,129 @@
+import json
+import logging
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.core.eventos import registrar_evento
+from app.core.saida import (
+    Destino, DestinoArquivo, atraso_pendentes, despachar_lote, destinos_configurados, eventos_pendentes, medir_pendentes,
+)
+from app.db.shards import SHARD_PADRAO
+from app.models.models import EventoSaida
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _valor(medidor) -> float:
+    return dict((tuple(chave), valor) for chave, valor in medidor.exportar())[(SHARD_PADRAO,)]
+
+class DestinoMemoria(Destino):
+    nome = "memoria"
+
+    def __init__(self, falhas: int = 0):
+        self.lotes = []
+        self.falhas = falhas
+
+    def entregar(self, eventos):
+        if self.falhas:
+            self.falhas -= 1
+            raise RuntimeError("Destino indisponível")
+        self.lotes.append([evento["tipo"] for evento in eventos])
+
+class TestCaixaSaida:
+    """
+    Testes para a caixa de saída (outbox) dos eventos de alteração.
+    """
+
+    def test_gravada_na_transacao(self, client, seed_db, test_db):
+        """
+        Testa que cada alteração confirmada grava o seu evento e que rollbacks não gravam nada.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        test_db.query(EventoSaida).delete()
+        test_db.commit()
+
+        pergunta_id = seed_db["perguntas"][0].id
+        client.put(f"/api/v1/perguntas/{pergunta_id}", json={"titulo": "Alterada"})
+        client.delete(f"/api/v1/perguntas/{pergunta_id}")
+        # Uma alteração recusada não deixa eventos
+        client.post("/api/v1/perguntas/", json={
+            "id_formulario": formulario_id, "titulo": "X", "tipo_pergunta": "unica_escolha", "id_conjunto_opcoes": 999,
+        })
+        registrar_evento(test_db, formulario_id, "formulario_atualizado", {})
+        test_db.rollback()
+
+        eventos = [json.loads(linha.conteudo) for linha in test_db.query(EventoSaida).order_by(EventoSaida.id)]
+        assert [(evento["formulario_id"], evento["tipo"]) for evento in eventos] == [
+            (formulario_id, "pergunta_atualizada"), (formulario_id, "pergunta_excluida"),
+        ]
+        assert eventos[0]["dados"]["titulo"] == "Alterada"
+
+    def test_entrega_em_lotes(self, client, seed_db, test_db):
+        """
+        Testa a entrega em ordem, em lotes, e a remoção dos eventos entregues.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        test_db.query(EventoSaida).delete()
+        test_db.commit()
+        for titulo in ("A", "B", "C"):
+            client.put(f"/api/v1/formularios/{formulario_id}", json={"titulo": titulo})
+
+        destino = DestinoMemoria()
+        assert despachar_lote(test_db, [destino], tamanho=2) == 2
+        assert despachar_lote(test_db, [destino], tamanho=2) == 1
+        assert despachar_lote(test_db, [destino], tamanho=2) == 0
+        assert destino.lotes == [["formulario_atualizado"] * 2, ["formulario_atualizado"]]
+        assert test_db.query(EventoSaida).count() == 0
+
+    def test_reentrega_apos_falha(self, client, seed_db, test_db):
+        """
+        Testa que uma falha adia o lote e que ele é reentregue a todos os destinos (at-least-once).
+        """
+        formulario_id = seed_db["formularios"][0].id
+        test_db.query(EventoSaida).delete()
+        test_db.commit()
+        client.put(f"/api/v1/formularios/{formulario_id}", json={"titulo": "A"})
+
+        confiavel, instavel = DestinoMemoria(), DestinoMemoria(falhas=1)
+        assert despachar_lote(test_db, [confiavel, instavel]) == 0
+        evento = test_db.query(EventoSaida).one()
+        assert evento.tentativas == 1
+        assert evento.disponivel_em > datetime.utcnow()
+        # Adiado: não é entregue de novo antes do intervalo
+        assert despachar_lote(test_db, [confiavel, instavel]) == 0
+
+        evento.disponivel_em = datetime.utcnow()
+        test_db.commit()
+        medir_pendentes(test_db, SHARD_PADRAO)
+        assert _valor(eventos_pendentes) == 1
+        assert _valor(atraso_pendentes) >= 0
+
+        assert despachar_lote(test_db, [confiavel, instavel]) == 1
+        assert confiavel.lotes == [["formulario_atualizado"]] * 2
+        assert instavel.lotes == [["formulario_atualizado"]]
+        medir_pendentes(test_db, SHARD_PADRAO)
+        assert _valor(eventos_pendentes) == 0
+
+    def test_destinos(self, client, seed_db, test_db, tmp_path, monkeypatch):
+        """
+        Testa o destino em arquivo e a configuração dos destinos.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        test_db.query(EventoSaida).delete()
+        test_db.commit()
+        client.delete(f"/api/v1/formularios/{formulario_id}")
+
+        caminho = tmp_path / "eventos.jsonl"
+        despachar_lote(test_db, [DestinoArquivo(str(caminho))])
+        eventos = [json.loads(linha) for linha in caminho.read_text(encoding="utf-8").splitlines()]
+        assert eventos[-1]["tipo"] == "formulario_excluido"
+        assert eventos[-1]["dados"] == {"id": formulario_id, "versoes": [], "submissoes": []}
+
+        monkeypatch.setattr(settings, "OUTBOX_DESTINOS", "arquivo, webhook")
+        assert [destino.nome for destino in destinos_configurados()] == ["arquivo", "webhook"]
+        monkeypatch.setattr(settings, "OUTBOX_DESTINOS", "fila")
+        with pytest.raises(ValueError):
+            destinos_configurados()
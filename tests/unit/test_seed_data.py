@@ -0,0 +1,50 @@
+import pytest
+import logging
+from fastapi import status
+from seed_data import gerar_dados, gerar_formulario
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestSeedData:
+    """
+    Testes para o gerador de dados sintéticos.
+    """
+
+    def test_gerar_formulario_deterministico(self):
+        """
+        Testa que a mesma semente gera os mesmos registros, independentemente da ordem.
+        """
+        assert gerar_formulario(7, 10, 4, 3, seed=1) == gerar_formulario(7, 10, 4, 3, seed=1)
+        assert gerar_formulario(7, 10, 4, 3, seed=1) != gerar_formulario(7, 10, 4, 3, seed=2)
+
+    def test_gerar_dados(self, client, test_db):
+        """
+        Testa a carga em blocos e a consistência dos dados com a API.
+        """
+        contagem = gerar_dados(test_db.get_bind(), 5, 8, 3, submissoes_por_formulario=2, formularios_por_bloco=2)
+        logger.info(f"Registros gerados: {contagem}")
+        assert contagem["formulario"] == 5
+        assert contagem["pergunta"] == 40
+        assert contagem["formulario_versao"] == 5
+        assert contagem["submissao"] == 10
+
+        response = client.get("/api/v1/perguntas/formulario/3")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 8
+
+        # O snapshot gerado é idêntico ao que a publicação produziria
+        response = client.post("/api/v1/formularios/3/publicar")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["versao"] == 1
+
+        # As respostas geradas são válidas para os tipos das perguntas
+        response = client.post("/api/v1/formularios/3/validar", json={
+            "respostas": client.get("/api/v1/submissoes/5").json()["respostas"]
+        })
+        assert response.json()["erros"] == []
+
+        # Novos registros continuam a partir dos IDs gerados
+        response = client.post("/api/v1/formularios/", json={"titulo": "Novo"})
+        assert response.json()["id"] == 6
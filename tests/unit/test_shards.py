@@ -0,0 +1,152 @@
+import pytest
+import logging
+from fastapi import status
+from sqlalchemy import create_engine, select
+
+from app.core.config import settings
+from app.db import database, shards
+from app.db.database import Base, get_db, get_db_leitura, get_sessoes_leitura
+from app.main import app
+from app.models.models import Formulario
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def bancos_shards(test_db, tmp_path, monkeypatch):
+    """
+    Dois shards SQLite e o banco de teste como banco principal (catálogo).
+    """
+    urls = {}
+    for nome in ("shard1", "shard2"):
+        urls[nome] = f"sqlite:///{tmp_path / nome}.db"
+        engine = create_engine(urls[nome])
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+    database.dispose_engine()
+    monkeypatch.setattr(settings, "DATABASE_SHARDS", ",".join(f"{nome}={url}" for nome, url in urls.items()))
+    monkeypatch.setattr(database, "_engine", test_db.get_bind())
+    for dependencia in (get_db, get_db_leitura, get_sessoes_leitura):
+        app.dependency_overrides.pop(dependencia)
+    yield shards.get_shards()
+    monkeypatch.setattr(database, "_engine", None)
+    database.dispose_engine()
+
+def _titulos_no_shard(engine):
+    with engine.connect() as conn:
+        return list(conn.scalars(select(Formulario.titulo).order_by(Formulario.id)))
+
+class TestShards:
+    """
+    Testes para o roteamento de formulários entre shards por tenant.
+    """
+
+    def test_criar_no_shard_do_tenant(self, client, bancos_shards):
+        """
+        Testa que o formulário é gravado e lido no shard do tenant.
+        """
+        shard = shards.shard_do_tenant("acme")
+        response = client.post("/api/v1/formularios/", json={"titulo": "Cadastro"}, headers={"X-Tenant": "acme"})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["tenant"] == "acme"
+        formulario_id = response.json()["id"]
+
+        assert _titulos_no_shard(bancos_shards[shard]) == ["Cadastro"]
+        outro = next(nome for nome in bancos_shards if nome != shard)
+        assert _titulos_no_shard(bancos_shards[outro]) == []
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}", headers={"X-Tenant": "acme"})
+        assert response.status_code == status.HTTP_200_OK
+        response = client.get(f"/api/v1/formularios/{formulario_id}", headers={"X-Tenant": "outro"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_listagem_combina_shards(self, client, bancos_shards):
+        """
+        Testa que, sem tenant, a listagem consulta todos os shards e intercala os resultados.
+        """
+        shards.atribuir_shard("a", "shard1")
+        shards.atribuir_shard("b", "shard2")
+        for i in range(3):
+            for tenant in ("a", "b"):
+                client.post("/api/v1/formularios/", json={"titulo": f"{tenant}{i}"}, headers={"X-Tenant": tenant})
+
+        response = client.get("/api/v1/formularios/")
+        titulos = [formulario["titulo"] for formulario in response.json()]
+        logger.info(f"Formulários combinados: {titulos}")
+        assert titulos == ["a0", "b0", "a1", "b1", "a2", "b2"]
+
+        response = client.get("/api/v1/formularios/?skip=1&limit=3")
+        assert [formulario["titulo"] for formulario in response.json()] == ["b0", "a1", "b1"]
+
+        response = client.get("/api/v1/formularios/", headers={"X-Tenant": "b"})
+        assert [formulario["titulo"] for formulario in response.json()] == ["b0", "b1", "b2"]
+
+    def test_envelope_combina_shards(self, client, bancos_shards):
+        """
+        Testa o total somado dos shards e o cursor na listagem combinada.
+        """
+        shards.atribuir_shard("a", "shard1")
+        shards.atribuir_shard("b", "shard2")
+        for i in range(3):
+            for tenant in ("a", "b"):
+                client.post("/api/v1/formularios/", json={"titulo": f"{tenant}{i}"}, headers={"X-Tenant": tenant})
+
+        pagina = client.get("/api/v1/formularios/?limit=4&envelope=true").json()
+        assert (pagina["total"], pagina["total_exato"]) == (6, True)
+        seguinte = client.get(f"/api/v1/formularios/?limit=4&cursor={pagina['next_cursor']}").json()
+        titulos = [formulario["titulo"] for formulario in pagina["items"] + seguinte["items"]]
+        assert titulos == ["a0", "b0", "a1", "b1", "a2", "b2"]
+        assert seguinte["next_cursor"] is None
+
+    def test_atribuicao_explicita_invalida_cache(self, client, bancos_shards):
+        """
+        Testa que o mapa tenant -> shard é cacheado e que uma nova atribuição o invalida.
+        """
+        atual = shards.shard_do_tenant("acme")
+        assert shards.cache_tenants.get("acme") == atual
+
+        destino = next(nome for nome in bancos_shards if nome != atual)
+        shards.atribuir_shard("acme", destino)
+        assert shards.cache_tenants.get("acme") is None
+
+        client.post("/api/v1/formularios/", json={"titulo": "Movido"}, headers={"X-Tenant": "acme"})
+        assert _titulos_no_shard(bancos_shards[destino]) == ["Movido"]
+
+        with pytest.raises(ValueError):
+            shards.atribuir_shard("acme", "inexistente")
+
+    def test_escrita_sem_tenant(self, client, bancos_shards):
+        """
+        Testa que escritas exigem o cabeçalho X-Tenant quando há shards.
+        """
+        response = client.post("/api/v1/formularios/", json={"titulo": "Sem tenant"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Cabeçalho X-Tenant obrigatório"
+
+    def test_paginacao_alem_do_limite(self, client, bancos_shards):
+        """
+        Testa que páginas profundas nas listagens combinadas são recusadas com 400.
+        """
+        params = {"skip": settings.PAGINACAO_LIMITE_MAXIMO, "limit": 1}
+        for rota in ("/api/v1/formularios/", "/api/v1/perguntas/"):
+            response = client.get(rota, params=params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert "X-Tenant" in response.json()["detail"]
+
+        with pytest.raises(shards.PaginacaoShardsError):
+            shards.consultar_shards([object(), object()], None, chave=None, **params)
+
+    def test_executor_compartilhado(self, client, bancos_shards):
+        """
+        Testa que as consultas em paralelo reutilizam o mesmo executor, fechado com os shards.
+        """
+        client.get("/api/v1/formularios/")
+        executor = shards._executor
+        assert executor is not None
+        client.get("/api/v1/formularios/")
+        assert shards._executor is executor
+
+        shards.dispose_shards()
+        assert shards._executor is None
@@ -0,0 +1,162 @@
+import pytest
+import logging
+from fastapi import status
+from app.core.cache import limpar_caches
+from app.models.models import RespostaSubmissao
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestSubmissaoEndpoints:
+    """
+    Testes para os rascunhos de submissão com salvamento parcial.
+    """
+
+    def _criar_rascunho(self, client, seed_db):
+        formulario_id = seed_db["formularios"][0].id
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        response = client.post("/api/v1/submissoes/", json={"id_formulario": formulario_id})
+        assert response.status_code == status.HTTP_201_CREATED
+        return response.json()
+
+    def test_create_submissao_sem_versao(self, client, seed_db):
+        """
+        Testa que não é possível iniciar um rascunho de formulário não publicado.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        response = client.post("/api/v1/submissoes/", json={"id_formulario": formulario_id})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_salvamento_parcial(self, client, seed_db, test_db):
+        """
+        Testa que cada salvamento grava apenas as respostas alteradas.
+        """
+        rascunho = self._criar_rascunho(client, seed_db)
+        sim_nao, escolha, multipla = [p.id for p in seed_db["perguntas"]]
+        logger.info(f"Testando salvamento parcial do rascunho {rascunho['id']}")
+
+        operacoes = [
+            {"op": "add", "path": f"/{sim_nao}", "value": "Sim"},
+            {"op": "add", "path": f"/{multipla}", "value": ["Opção A"]},
+        ]
+        response = client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=operacoes)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["revisao"] == 1
+        assert data["respostas_alteradas"] == 2
+        assert data["pendentes"] == [escolha]
+
+        operacoes = [
+            {"op": "replace", "path": f"/{sim_nao}", "value": "Não"},
+            {"op": "remove", "path": f"/{multipla}"},
+        ]
+        response = client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=operacoes)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["revisao"] == 2
+
+        linhas = test_db.query(RespostaSubmissao).filter(RespostaSubmissao.id_submissao == rascunho["id"]).all()
+        assert len(linhas) == 1
+
+        response = client.get(f"/api/v1/submissoes/{rascunho['id']}")
+        assert response.json()["respostas"] == {str(sim_nao): "Não"}
+        logger.info("Salvamento parcial funcionou corretamente")
+
+    def test_estado_em_cache_nao_alterado(self, client, seed_db):
+        """
+        Testa que o salvamento não altera o estado de avaliação em cache da revisão anterior.
+        """
+        from app.crud.submissao import cache_estados
+
+        rascunho = self._criar_rascunho(client, seed_db)
+        sim_nao = seed_db["perguntas"][0].id
+        client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=[{"op": "add", "path": f"/{sim_nao}", "value": "Sim"}])
+        revisao, estado = cache_estados.get(("padrao", rascunho["id"]))
+        assert (revisao, estado.respostas) == (1, {sim_nao: "Sim"})
+
+        client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=[{"op": "replace", "path": f"/{sim_nao}", "value": "Não"}])
+        assert estado.respostas == {sim_nao: "Sim"}
+        revisao, novo = cache_estados.get(("padrao", rascunho["id"]))
+        assert (revisao, novo.respostas) == (2, {sim_nao: "Não"})
+        assert novo is not estado
+
+    def test_salvamento_invalido(self, client, seed_db):
+        """
+        Testa que respostas inválidas são rejeitadas sem gravar nada.
+        """
+        rascunho = self._criar_rascunho(client, seed_db)
+        sim_nao = seed_db["perguntas"][0].id
+        operacoes = [
+            {"op": "add", "path": f"/{sim_nao}", "value": "Talvez"},
+            {"op": "add", "path": "/999", "value": "x"},
+        ]
+        response = client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=operacoes)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert {erro["id_pergunta"] for erro in response.json()["detail"]} == {sim_nao, 999}
+
+        response = client.get(f"/api/v1/submissoes/{rascunho['id']}")
+        assert response.json()["revisao"] == 0
+
+    def test_enviar_submissao(self, client, seed_db):
+        """
+        Testa o envio com validação completa e o bloqueio de alterações após o envio.
+        """
+        rascunho = self._criar_rascunho(client, seed_db)
+        sim_nao, escolha, _ = [p.id for p in seed_db["perguntas"]]
+
+        client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=[{"op": "add", "path": f"/{sim_nao}", "value": "Sim"}])
+        response = client.post(f"/api/v1/submissoes/{rascunho['id']}/enviar")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=[{"op": "add", "path": f"/{escolha}", "value": "Opção 1"}])
+        response = client.post(f"/api/v1/submissoes/{rascunho['id']}/enviar")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "enviada"
+
+        response = client.patch(f"/api/v1/submissoes/{rascunho['id']}", json=[{"op": "remove", "path": f"/{sim_nao}"}])
+        assert response.status_code == status.HTTP_409_CONFLICT
+        logger.info("Envio da submissão funcionou corretamente")
+
+    def test_listar_por_intervalo(self, client, seed_db, test_db):
+        """
+        Testa a listagem de submissões por intervalo de criação e que as respostas
+        ficam com a data de criação da submissão (chave de partição).
+        """
+        from datetime import datetime
+        from app.models.models import Submissao
+
+        antigo = self._criar_rascunho(client, seed_db)
+        recente = self._criar_rascunho(client, seed_db)
+        test_db.query(Submissao).filter(Submissao.id == antigo["id"]).update({"criado_em": datetime(2025, 1, 15)})
+        test_db.commit()
+        # criado_em não muda fora dos testes: a data em cache precisa ser descartada
+        limpar_caches()
+
+        sim_nao = seed_db["perguntas"][0].id
+        client.patch(f"/api/v1/submissoes/{antigo['id']}", json=[{"op": "add", "path": f"/{sim_nao}", "value": "Sim"}])
+        resposta = test_db.query(RespostaSubmissao).filter(RespostaSubmissao.id_submissao == antigo["id"]).one()
+        assert resposta.criado_em == datetime(2025, 1, 15)
+        assert client.get(f"/api/v1/submissoes/{antigo['id']}").json()["respostas"] == {str(sim_nao): "Sim"}
+
+        response = client.get("/api/v1/submissoes/", params={"criado_de": "2025-01-01T00:00:00", "criado_ate": "2025-02-01T00:00:00"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [submissao["id"] for submissao in response.json()] == [antigo["id"]]
+
+        response = client.get("/api/v1/submissoes/")
+        assert [submissao["id"] for submissao in response.json()] == [recente["id"], antigo["id"]]
+
+    def test_consulta_no_mes_da_criacao(self, client, seed_db, test_db):
+        """
+        Testa que a consulta por ID com a data de criação fica restrita ao mês da submissão.
+        """
+        from datetime import datetime
+        from app.crud import submissao as crud_submissao
+
+        rascunho = self._criar_rascunho(client, seed_db)
+        limpar_caches()
+        db_submissao = crud_submissao.get_submissao(test_db, rascunho["id"])
+        assert crud_submissao.cache_criacao.get(("padrao", rascunho["id"])) == db_submissao.criado_em
+
+        limpar_caches()
+        assert crud_submissao.get_submissao(test_db, rascunho["id"], criado_em=db_submissao.criado_em) is not None
+        assert crud_submissao.get_submissao(test_db, rascunho["id"], criado_em=datetime(2020, 1, 1)) is None
@@ -0,0 +1,115 @@
+import gzip
+import json
+import pytest
+import logging
+from fastapi import status
+from app.crud import versao as crud_versao
+from app.models.models import FormularioVersao
+
+# Configuração de logging para os testes
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TestVersaoEndpoints:
+    """
+    Testes para a publicação de versões imutáveis de formulários.
+    """
+
+    def test_publicar_formulario(self, client, seed_db):
+        """
+        Testa a publicação de um formulário e o conteúdo armazenado.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        logger.info(f"Testando publicação do formulário {formulario_id}")
+        response = client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["id_formulario"] == formulario_id
+        assert data["versao"] == 1
+        logger.info(f"Versão {data['versao']} publicada com sucesso")
+
+    def test_publicar_formulario_not_found(self, client):
+        """
+        Testa a publicação de um formulário que não existe.
+        """
+        response = client.post("/api/v1/formularios/999/publicar")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_conteudo_versao(self, client, seed_db, test_db):
+        """
+        Testa que o conteúdo publicado é um único blob comprimido com o formulário completo.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+
+        db_versao = test_db.query(FormularioVersao).filter(FormularioVersao.id_formulario == formulario_id).one()
+        conteudo = json.loads(gzip.decompress(db_versao.conteudo))
+        assert conteudo["titulo"] == "Formulário de Teste 1"
+        assert [p["ordem"] for p in conteudo["perguntas"]] == [1, 2, 3]
+        assert len(conteudo["perguntas"][1]["opcoes_respostas_multiplas"]) == 3
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}/versoes/1")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == conteudo
+        assert "immutable" in response.headers["cache-control"]
+        logger.info("Conteúdo da versão publicado e servido corretamente")
+
+    def test_versao_imutavel(self, client, seed_db):
+        """
+        Testa que alterações no formulário não afetam versões já publicadas.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        pergunta_id = seed_db["perguntas"][0].id
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+
+        client.put(f"/api/v1/perguntas/{pergunta_id}", json={"titulo": "Título alterado"})
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}/versoes/1")
+        assert response.json()["perguntas"][0]["titulo"] == "Pergunta Sim/Não"
+
+        response = client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+        assert response.json()["versao"] == 2
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}/publicado")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["versao"] == 2
+        assert response.json()["perguntas"][0]["titulo"] == "Título alterado"
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}/versoes")
+        assert [v["versao"] for v in response.json()] == [1, 2]
+        logger.info("Versões anteriores permanecem inalteradas")
+
+    def test_publicar_sem_alteracoes(self, client, seed_db):
+        """
+        Testa que publicar sem alterações reaproveita a versão existente.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        primeira = client.post(f"/api/v1/formularios/{formulario_id}/publicar").json()
+        segunda = client.post(f"/api/v1/formularios/{formulario_id}/publicar").json()
+        assert primeira["versao"] == segunda["versao"] == 1
+        assert primeira["hash"] == segunda["hash"]
+
+    def test_versao_em_cache(self, client, seed_db):
+        """
+        Testa que leituras repetidas de uma versão são servidas pelo cache.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        client.post(f"/api/v1/formularios/{formulario_id}/publicar")
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}/versoes/1")
+        acertos = crud_versao.cache_versoes.acertos
+        etag = response.headers["etag"]
+
+        response = client.get(f"/api/v1/formularios/{formulario_id}/versoes/1", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert crud_versao.cache_versoes.acertos == acertos + 1
+
+    def test_versao_not_found(self, client, seed_db):
+        """
+        Testa a obtenção de versões inexistentes.
+        """
+        formulario_id = seed_db["formularios"][0].id
+        response = client.get(f"/api/v1/formularios/{formulario_id}/versoes/1")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = client.get(f"/api/v1/formularios/{formulario_id}/publicado")
+        assert response.status_code == status.HTTP_404_NOT_FOUND